@@ -2,11 +2,13 @@ from __future__ import annotations
 
 # TODO: Provide methods to search for instruments by type or
 #       identification string.
-from pathlib import Path
 
 from qtpy import QtWidgets, QtCore, QtGui
 from QInstrument.lib.QInstrumentWidget import QInstrumentWidget
 from QInstrument.lib.Configure import Configure
+from QInstrument.lib.QStatsPanel import QStatsPanel
+from QInstrument.lib.discovery import (available_instruments,
+                                       find_instrument_module)
 import importlib
 import logging
 
@@ -202,6 +204,9 @@ class QInstrumentRack(QtWidgets.QWidget):
     - A ⋮ drag handle on each slot.  Dragging highlights the target
       slot with a coloured bar and moves the dragged slot to that
       position on release.
+    - A "Statistics" toolbar toggle that shows a :class:`QStatsPanel`
+      below the instruments, with the port utilization and slowest
+      commands of each serial instrument (see :meth:`setStatsVisible`).
 
     Set :attr:`editable` to ``False`` to hide all of the above, for
     example when embedding the rack in an application where the
@@ -249,6 +254,9 @@ class QInstrumentRack(QtWidgets.QWidget):
         self._slots.setContentsMargins(0, 0, 0, 0)
         self._slots.setSpacing(0)
         outer.addLayout(self._slots)
+        self._stats = QStatsPanel()
+        self._stats.setVisible(False)
+        outer.addWidget(self._stats)
         outer.addStretch()
 
     def _makeToolbar(self) -> QtWidgets.QWidget:
@@ -258,6 +266,10 @@ class QInstrumentRack(QtWidgets.QWidget):
         btn = QtWidgets.QPushButton('Add instrument\u2026')
         btn.clicked.connect(self._addInstrumentDialog)
         layout.addWidget(btn)
+        self._statsButton = QtWidgets.QPushButton('Statistics')
+        self._statsButton.setCheckable(True)
+        self._statsButton.toggled.connect(self.setStatsVisible)
+        layout.addWidget(self._statsButton)
         layout.addStretch()
         return bar
 
@@ -302,6 +314,20 @@ class QInstrumentRack(QtWidgets.QWidget):
         for slot in self._iterSlots():
             slot.setEditable(value)
 
+    def setStatsVisible(self, visible: bool) -> None:
+        '''Show or hide the serial traffic statistics panel.
+
+        Statistics are recorded only while the panel is shown.
+
+        Parameters
+        ----------
+        visible : bool
+            ``True`` to show the panel; ``False`` to hide it.
+        '''
+        self._statsButton.setChecked(visible)
+        self._stats.setVisible(visible)
+        self.adjustSize()
+
     def addInstrument(self,
                       instrument: QInstrumentWidget,
                       name: str = '') -> None:
@@ -325,6 +351,9 @@ class QInstrumentRack(QtWidgets.QWidget):
         slot.hoverRequested.connect(self._hoverSlot)
         slot.setEditable(self._editable)
         self._slots.addWidget(slot)
+        device = getattr(instrument, 'device', None)
+        if device is not None:
+            self._stats.addInstrument(name, device)
         self.adjustSize()
 
     def addInstruments(self,
@@ -402,27 +431,18 @@ class QInstrumentRack(QtWidgets.QWidget):
             self.addInstrumentByName(name, fake=fake)
 
     def clearInstruments(self) -> None:
-        '''Remove and schedule deletion of all instrument widgets.'''
+        '''Remove and schedule deletion of all instrument widgets.
+
+        Slots are hidden first so that their widgets release their
+        device subscriptions immediately.
+        '''
+        self._stats.clear()
         while self._slots.count():
             item = self._slots.takeAt(0)
             if item.widget():
+                item.widget().hide()
                 item.widget().deleteLater()
 
-    @classmethod
-    def _instrumentPaths(cls):
-        '''Yield ``(manufacturer, instrument_name)`` for all widget packages.
-
-        Scans ``instruments/`` two levels deep for subdirectories that
-        contain a ``widget.py``.
-        '''
-        instruments_dir = Path(__file__).parent / 'instruments'
-        for mfr in instruments_dir.iterdir():
-            if not mfr.is_dir() or mfr.name.startswith('_'):
-                continue
-            for inst in mfr.iterdir():
-                if inst.is_dir() and (inst / 'widget.py').exists():
-                    yield mfr.name, inst.name
-
     @classmethod
     def availableInstruments(cls) -> list[str]:
         '''Return names of all instruments that have a widget module.
@@ -432,7 +452,7 @@ class QInstrumentRack(QtWidgets.QWidget):
         list[str]
             Sorted list of bare instrument names.
         '''
-        return sorted(name for _, name in cls._instrumentPaths())
+        return available_instruments('widget')
 
     @classmethod
     def _findInstrumentModule(cls, name: str) -> str | None:
@@ -449,14 +469,13 @@ class QInstrumentRack(QtWidgets.QWidget):
             Dotted module path for the widget module, or ``None`` if
             not found.
         '''
-        return next(
-            (f'QInstrument.instruments.{mfr}.{name}.widget'
-             for mfr, inst in cls._instrumentPaths() if inst == name),
-            None)
+        return find_instrument_module(name, 'widget')
 
     def _removeInstrument(self, name: str) -> None:
         for i in range(self._slots.count()):
             if (slot := self._slotAt(i)) is not None and slot._name == name:
+                self._stats.removeInstrument(name)
+                slot.hide()
                 self._slots.takeAt(i).widget().deleteLater()
                 self.adjustSize()
                 break
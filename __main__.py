@@ -10,12 +10,50 @@ configuration is restored from
 
 Pass ``-f`` / ``--fake`` to load fake instruments instead of probing
 for real hardware; all widgets will be fully enabled.
+
+Pass ``--headless`` to run the instruments without a user interface,
+under a ``QCoreApplication``, until interrupted with Ctrl-C or
+SIGTERM.  Saved settings are reconciled with the hardware according to
+``--policy`` (``hardware`` or ``saved``), and ``--log FILE`` records
+every value to ``FILE`` with :class:`QDataLogger`.  See
+:class:`QInstrumentEngine`.
+
+Pass ``-t FILE`` / ``--trace FILE`` to record a timeline of serial
+exchanges, slot deliveries, poll cycles and GUI updates, written to
+``FILE`` in Chrome trace-event format on exit.  Open it in
+https://ui.perfetto.dev.
 '''
 import sys
+import signal
 import argparse
 
-from qtpy.QtWidgets import QApplication
-from QInstrument.QInstrumentRack import QInstrumentRack
+from qtpy import QtCore
+from QInstrument.lib.Tracer import tracer
+
+
+def _headless(args) -> int:
+    '''Run the instruments under a QCoreApplication until interrupted.'''
+    from QInstrument.lib.QInstrumentEngine import QInstrumentEngine
+    from QInstrument.lib.QDataLogger import QDataLogger
+
+    app = QtCore.QCoreApplication.instance() or \
+        QtCore.QCoreApplication(sys.argv)
+    datalogger = QDataLogger(args.log) if args.log else None
+    engine = QInstrumentEngine(instruments=args.instruments,
+                               fake=args.fake, policy=args.policy,
+                               datalogger=datalogger)
+    if not engine.names:
+        print('qinstrument: no instruments found', file=sys.stderr)
+        return 1
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: app.quit())
+    # Return to the interpreter periodically so that it sees signals.
+    timer = QtCore.QTimer()
+    timer.timeout.connect(lambda: None)
+    timer.start(200)
+    app.aboutToQuit.connect(engine.close)
+    engine.start()
+    return app.exec()
 
 
 def main() -> None:
@@ -33,7 +71,36 @@ def main() -> None:
         '-f', '--fake', action='store_true',
         help='use fake instruments instead of probing for hardware',
     )
+    parser.add_argument(
+        '-t', '--trace', metavar='FILE',
+        help='write a Chrome trace-event timeline to FILE on exit',
+    )
+    parser.add_argument(
+        '--headless', action='store_true',
+        help='run the instruments without a user interface',
+    )
+    parser.add_argument(
+        '--policy', choices=('hardware', 'saved'), default='hardware',
+        help='headless: keep the hardware settings or restore the '
+             'saved ones (default: hardware)',
+    )
+    parser.add_argument(
+        '--log', metavar='FILE',
+        help='headless: log every instrument value to FILE',
+    )
     args = parser.parse_args()
+    if args.headless and not args.instruments:
+        parser.error('--headless requires instrument names')
+    if args.trace:
+        tracer.start()
+    if args.headless:
+        status = _headless(args)
+        if args.trace:
+            tracer.save(args.trace)
+        sys.exit(status)
+    from qtpy.QtWidgets import QApplication
+    from QInstrument.QInstrumentRack import QInstrumentRack
+
     app = QApplication.instance() or QApplication(sys.argv)
     rack = QInstrumentRack(
         instruments=args.instruments or None,
@@ -42,7 +109,10 @@ def main() -> None:
     rack.setWindowTitle('QInstrument')
     rack.setMinimumWidth(400)
     rack.show()
-    sys.exit(app.exec())
+    status = app.exec()
+    if args.trace:
+        tracer.save(args.trace)
+    sys.exit(status)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,22 @@
+'''Performance benchmarks for QInstrument.
+
+The suite times the serial transport, the property registry, the poll
+loop, the delivery of values to widgets, configuration I/O and rack
+start-up.  Run it from the repository root:
+
+.. code-block:: bash
+
+    python -m benchmarks run                  # all, saved by commit
+    python -m benchmarks run -k registry -k signals --quick
+    python -m benchmarks run --baseline benchmarks/results/3c34348.json
+    python -m benchmarks compare OLD.json NEW.json
+    python -m benchmarks list
+    python -m benchmarks load --sweep         # see benchmarks.load
+
+Results are saved as JSON, named after the current commit, in
+``benchmarks/results/``.  Comparing two results files, or a run with a
+baseline, prints the relative change of every benchmark and exits
+with status 1 if any became slower than the threshold allows, so the
+comparison can gate a release.  Timings depend on the machine; compare
+results from the same one.
+'''
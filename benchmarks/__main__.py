@@ -0,0 +1,158 @@
+'''Command-line entry point of the benchmark suite.
+
+See :mod:`benchmarks` for usage.
+'''
+import argparse
+import importlib
+import json
+import logging
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+
+MODULES = ('bench_transport', 'bench_registry', 'bench_polling',
+           'bench_signals', 'bench_configure', 'bench_rack')
+
+RESULTS = Path(__file__).parent / 'results'
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description='QInstrument performance benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', help='run benchmarks')
+    run.add_argument('-k', dest='selected', action='append',
+                     metavar='PATTERN',
+                     help='run benchmarks whose names contain PATTERN')
+    run.add_argument('-q', '--quick', action='store_true',
+                     help='take fewer, shorter samples')
+    run.add_argument('-o', '--output', metavar='FILE',
+                     help='results file (default: results/<commit>.json)')
+    run.add_argument('-b', '--baseline', metavar='FILE',
+                     help='compare with an earlier results file')
+    compare = commands.add_parser('compare',
+                                  help='compare two results files')
+    compare.add_argument('baseline', metavar='OLD')
+    compare.add_argument('current', metavar='NEW')
+    for command in (run, compare):
+        command.add_argument('-t', '--threshold', type=float, default=0.1,
+                             help='relative slowdown counted as a '
+                                  'regression (default: 0.1)')
+    commands.add_parser('list', help='list benchmarks')
+    load = commands.add_parser('load', help='run a synthetic load')
+    load.add_argument('-n', '--instruments', type=int, default=4,
+                      help='number of instruments (default: 4)')
+    load.add_argument('-m', '--properties', type=int, default=10,
+                      help='polled properties per instrument (default: 10)')
+    load.add_argument('-r', '--rate', type=float, default=20.,
+                      help='poll rate [Hz] of each property (default: 20)')
+    load.add_argument('--dynamics', default='random',
+                      choices=('constant', 'random', 'sine', 'ramp'),
+                      help='how values evolve (default: random)')
+    load.add_argument('--view', default='widget',
+                      choices=('widget', 'tree'),
+                      help='view showing each instrument (default: widget)')
+    load.add_argument('--threads', action='store_true',
+                      help='run each instrument on a worker thread')
+    load.add_argument('-d', '--duration', type=float, default=2.,
+                      help='measurement window [s] (default: 2)')
+    load.add_argument('--sweep', action='store_true',
+                      help='double the properties until saturation')
+    load.add_argument('--max-latency', type=float, default=100.,
+                      help='p99 latency [ms] counted as saturation '
+                           '(default: 100)')
+    load.add_argument('-o', '--output', metavar='FILE',
+                      help='save the measurements as JSON')
+    return parser
+
+
+def _report(harness, baseline: dict, current: dict,
+            threshold: float) -> int:
+    rows = harness.compare(baseline['results'], current['results'],
+                           threshold)
+    print(f'{baseline.get("commit", "?")} -> {current.get("commit", "?")}')
+    print(harness.format_rows(rows))
+    regressions = [row['name'] for row in rows
+                   if row['status'] == 'regression']
+    if regressions:
+        print(f'Regressions: {", ".join(regressions)}')
+    return 1 if regressions else 0
+
+
+def _load(args) -> int:
+    from benchmarks import load
+
+    options = dict(instruments=args.instruments,
+                   properties=args.properties, rate=args.rate,
+                   dynamics=args.dynamics, view=args.view,
+                   threads=args.threads, duration=args.duration)
+    if args.sweep:
+        report = load.sweep(max_latency=args.max_latency / 1000.,
+                            **options)
+        sustained = report['sustained']
+        if sustained is None:
+            print('Saturated at the smallest load')
+        else:
+            print('Saturation point:')
+            print(load.format_result(sustained))
+        if report['saturated'] is not None:
+            print('First saturated load:')
+            print(load.format_result(report['saturated']))
+    else:
+        report = load.run(**options)
+        print(load.format_result(report))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+def main() -> int:
+    '''Run the command given on the command line.'''
+    args = _parser().parse_args()
+    logging.basicConfig(level=logging.WARNING, format='%(message)s')
+    logging.getLogger('benchmarks').setLevel(logging.INFO)
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from qtpy import QtWidgets
+    from benchmarks import harness
+
+    if args.command == 'compare':
+        return _report(harness, harness.load(args.baseline),
+                       harness.load(args.current), args.threshold)
+
+    if args.command == 'load':
+        app = (QtWidgets.QApplication.instance() or
+               QtWidgets.QApplication([]))
+        with tempfile.TemporaryDirectory() as home:
+            os.environ['HOME'] = home
+            return _load(args)
+
+    for module in MODULES:
+        importlib.import_module(f'benchmarks.{module}')
+    if args.command == 'list':
+        print('\n'.join(harness.names()))
+        return 0
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    with tempfile.TemporaryDirectory() as home:
+        # Keep Configure away from the user's saved configuration.
+        os.environ['HOME'] = home
+        results = harness.run(args.selected, quick=args.quick)
+    app.processEvents()
+    commit = harness.environment()['commit']
+    output = args.output or RESULTS / f'{commit}.json'
+    harness.save(results, output)
+    current = harness.load(output)
+    for name, result in results.items():
+        print(f'{name:<28}{result["value"]:>11.4g} {result["unit"]}')
+    if args.baseline:
+        return _report(harness, harness.load(args.baseline), current,
+                       args.threshold)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
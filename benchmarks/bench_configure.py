@@ -0,0 +1,32 @@
+'''Cost of saving and restoring configuration with Configure.
+
+Writes and reads the settings of a fake SR830 in a temporary
+configuration directory.
+'''
+import tempfile
+
+from QInstrument.lib.Configure import Configure
+from QInstrument.instruments.StanfordResearch.SR830.fake import QFakeSR830
+from benchmarks.harness import benchmark, timed
+
+
+def _measure(quick: bool, operation: str) -> list[float]:
+    number, repeat = (50, 3) if quick else (500, 7)
+    device = QFakeSR830()
+    with tempfile.TemporaryDirectory() as root:
+        configure = Configure(datadir=root, configdir=root)
+        configure.save(device)
+        return timed(lambda: getattr(configure, operation)(device),
+                     number, repeat)
+
+
+@benchmark('configure.save')
+def save(quick: bool) -> list[float]:
+    '''Seconds to save the settings of an instrument.'''
+    return _measure(quick, 'save')
+
+
+@benchmark('configure.restore')
+def restore(quick: bool) -> list[float]:
+    '''Seconds to read and apply the saved settings of an instrument.'''
+    return _measure(quick, 'restore')
@@ -0,0 +1,60 @@
+'''Poll rate achieved by QPollingMixin.
+
+A polled fake SR830 runs its default poll loop with no delay between
+cycles, on a worker thread as it would behind a widget.  The rate is
+the number of ``frequency`` values emitted per second, so it falls as
+the cost of a poll cycle rises.
+'''
+import time
+
+from qtpy import QtCore
+from QInstrument.lib.QPollingMixin import QPollingMixin
+from QInstrument.instruments.StanfordResearch.SR830.fake import QFakeSR830
+from benchmarks.harness import benchmark, wait
+
+
+class _PolledSR830(QPollingMixin, QFakeSR830):
+    '''Fake SR830 that polls every property as fast as it can.'''
+
+    POLL_INTERVAL = 0
+
+
+class _Counter(QtCore.QObject):
+
+    start = QtCore.Signal()
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.count = 0
+
+    def received(self, name: str, value: object) -> None:
+        if name == 'frequency':
+            self.count += 1
+
+
+@benchmark('polling.rate', unit='Hz', better='higher')
+def rate(quick: bool) -> list[float]:
+    '''Polls of one property per second.'''
+    duration, repeat = (0.2, 3) if quick else (1., 5)
+    device = _PolledSR830()
+    counter = _Counter()
+    device.propertyValue.connect(counter.received,
+                                 QtCore.Qt.ConnectionType.DirectConnection)
+    counter.start.connect(device.startPolling)
+    thread = QtCore.QThread()
+    device.moveToThread(thread)
+    thread.start()
+    counter.start.emit()
+    samples = []
+    try:
+        wait(lambda: counter.count > 0)
+        for _ in range(repeat):
+            count, start = counter.count, time.perf_counter()
+            time.sleep(duration)
+            samples.append((counter.count - count) /
+                           (time.perf_counter() - start))
+    finally:
+        device.stopPolling()
+        thread.quit()
+        thread.wait()
+    return samples
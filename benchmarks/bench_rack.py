@@ -0,0 +1,46 @@
+'''Cold start of QInstrumentRack with fake instruments.
+
+Times construction of a rack holding every available instrument with
+fake devices, up to the point where it has been shown and the event
+loop is idle.  Modules are imported by an untimed first start, so
+the timings exclude import costs.  Configuration is read from and
+written to a temporary home directory.
+'''
+import time
+
+from qtpy import QtCore, QtWidgets
+from QInstrument.QInstrumentRack import QInstrumentRack
+from QInstrument.lib.QInstrumentWidget import QInstrumentWidget
+from benchmarks.harness import benchmark
+
+
+def _start(names: list[str]) -> float:
+    app = QtWidgets.QApplication.instance()
+    start = time.perf_counter()
+    rack = QInstrumentRack(instruments=names, fake=True)
+    rack.show()
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+    # Stop the device threads before the widgets are deleted.
+    for widget in rack.findChildren(QInstrumentWidget):
+        widget.close()
+    rack.close()
+    rack.deleteLater()
+    app.sendPostedEvents(None, QtCore.QEvent.Type.DeferredDelete)
+    app.processEvents()
+    return elapsed
+
+
+@benchmark('rack.cold_start')
+def cold_start(quick: bool) -> list[float]:
+    '''Seconds to build and show a rack of every fake instrument.'''
+    names = QInstrumentRack.availableInstruments()
+    _start(names)
+    return [_start(names) for _ in range(3 if quick else 7)]
+
+
+@benchmark('rack.single')
+def single(quick: bool) -> list[float]:
+    '''Seconds to build and show a rack of one fake SR830.'''
+    _start(['SR830'])
+    return [_start(['SR830']) for _ in range(5 if quick else 20)]
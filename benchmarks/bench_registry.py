@@ -0,0 +1,43 @@
+'''Dispatch cost of QAbstractInstrument.get and set.
+
+Uses the fake SR830, whose properties are held in memory, so the
+timings are the cost of the property registry, validation and the
+:attr:`propertyValue` emission rather than of any I/O.
+'''
+from QInstrument.instruments.StanfordResearch.SR830.fake import QFakeSR830
+from benchmarks.harness import benchmark, timed
+
+
+def _repeat(quick: bool) -> tuple[int, int]:
+    return (2000, 5) if quick else (20000, 11)
+
+
+@benchmark('registry.get')
+def get(quick: bool) -> list[float]:
+    '''Seconds per ``get`` of a property.'''
+    device = QFakeSR830()
+    return timed(lambda: device.get('frequency'), *_repeat(quick))
+
+
+@benchmark('registry.set')
+def set_(quick: bool) -> list[float]:
+    '''Seconds per ``set`` of a property within its range.'''
+    device = QFakeSR830()
+    return timed(lambda: device.set('frequency', 1000.), *_repeat(quick))
+
+
+@benchmark('registry.get_connected')
+def get_connected(quick: bool) -> list[float]:
+    '''Seconds per ``get`` with a slot connected to ``propertyValue``.'''
+    device = QFakeSR830()
+    received = []
+    device.propertyValue.connect(lambda name, value: received.append(1))
+    return timed(lambda: device.get('frequency'), *_repeat(quick))
+
+
+@benchmark('registry.settings')
+def settings(quick: bool) -> list[float]:
+    '''Seconds to read every property through ``settings``.'''
+    device = QFakeSR830()
+    number, repeat = _repeat(quick)
+    return timed(lambda: device.settings, number // 100, repeat)
@@ -0,0 +1,95 @@
+'''Cost of delivering property values from a worker thread to the GUI.
+
+A fake SR830 is moved to a worker thread, where a burst of
+``propertyValue`` emissions is queued across to the GUI thread and
+applied by a :class:`QInstrumentWidget`, a :class:`QInstrumentTree`
+or both.  The time per value runs from the start of the burst until
+the GUI thread has applied its last value.
+'''
+import time
+
+from qtpy import QtCore
+from QInstrument.instruments.StanfordResearch.SR830.fake import QFakeSR830
+from QInstrument.instruments.StanfordResearch.SR830.widget import (
+    QSR830Widget)
+from benchmarks.harness import benchmark, wait, Skipped
+
+
+class _Burst(QtCore.QObject):
+    '''Emits the device's values from the device's thread.'''
+
+    requested = QtCore.Signal(int)
+
+    def __init__(self, device: QFakeSR830) -> None:
+        super().__init__()
+        self.device = device
+        self.requested.connect(self.run)
+
+    @QtCore.Slot(int)
+    def run(self, count: int) -> None:
+        emit = self.device.propertyValue.emit
+        for n in range(count):
+            emit('frequency', 1000. + n)
+
+
+class _Counter(QtCore.QObject):
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.count = 0
+
+    @QtCore.Slot(str, object)
+    def received(self, name: str, value: object) -> None:
+        self.count += 1
+
+
+def _fanout(views: list[str], quick: bool) -> list[float]:
+    count, repeat = (500, 3) if quick else (5000, 7)
+    device = QFakeSR830()
+    keep = []
+    if 'widget' in views:
+        keep.append(QSR830Widget(device=device))
+    if 'tree' in views:
+        try:
+            from QInstrument.instruments.StanfordResearch.SR830.tree import (
+                QSR830Tree)
+        except ImportError as ex:
+            raise Skipped(str(ex))
+        keep.append(QSR830Tree(device=device))
+    counter = _Counter()
+    device.propertyValue.connect(counter.received)
+    burst = _Burst(device)
+    thread = QtCore.QThread()
+    device.moveToThread(thread)
+    burst.moveToThread(thread)
+    thread.start()
+    samples = []
+    try:
+        for _ in range(repeat):
+            counter.count = 0
+            start = time.perf_counter()
+            burst.requested.emit(count)
+            wait(lambda: counter.count >= count)
+            samples.append((time.perf_counter() - start) / count)
+    finally:
+        thread.quit()
+        thread.wait()
+    return samples
+
+
+@benchmark('signals.widget')
+def widget(quick: bool) -> list[float]:
+    '''Seconds per value applied by a QInstrumentWidget.'''
+    return _fanout(['widget'], quick)
+
+
+@benchmark('signals.tree')
+def tree(quick: bool) -> list[float]:
+    '''Seconds per value applied by a QInstrumentTree.'''
+    return _fanout(['tree'], quick)
+
+
+@benchmark('signals.widget_and_tree')
+def both(quick: bool) -> list[float]:
+    '''Seconds per value applied by a widget and a tree together.'''
+    return _fanout(['widget', 'tree'], quick)
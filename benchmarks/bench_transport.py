@@ -0,0 +1,100 @@
+'''Framing throughput of QSerialInterface over a pseudo-terminal.
+
+A responder thread plays the instrument on the master side of a pty
+and answers every line it receives, while :class:`QSerialInterface`
+talks to the slave side exactly as it would to a USB serial adapter.
+The timings therefore include the kernel tty layer and QSerialPort,
+but not a physical line.
+'''
+import os
+import sys
+import threading
+import time
+
+from QInstrument.lib.QSerialInterface import QSerialInterface
+from benchmarks.harness import benchmark, Skipped
+
+
+SHORT = b'1000.0,1.2e-3,45.1\n'
+LONG = b'1.0,' * 2000 + b'\n'
+
+
+class _Loopback:
+    '''Pseudo-terminal with a responder thread on the master side.'''
+
+    def __init__(self) -> None:
+        if sys.platform.startswith('win'):
+            raise Skipped('pseudo-terminals are not available')
+        import tty
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.master)
+        tty.setraw(self.slave)
+        self.thread = threading.Thread(target=self._respond, daemon=True)
+        self.thread.start()
+        self.interface = QSerialInterface(eol='\n', timeout=1000)
+        if not self.interface.open(os.ttyname(self.slave)):
+            self.close()
+            raise Skipped('QSerialPort cannot open a pseudo-terminal')
+
+    def _respond(self) -> None:
+        buffer = b''
+        while True:
+            try:
+                data = os.read(self.master, 4096)
+            except OSError:
+                return
+            if not data:
+                return
+            buffer += data
+            while b'\n' in buffer:
+                line, buffer = buffer.split(b'\n', 1)
+                if line == b'QUIT':
+                    return
+                os.write(self.master, LONG if line == b'LONG?' else SHORT)
+
+    def exchange(self, query: str) -> bytes:
+        self.interface.transmit(query)
+        return self.interface.receive(raw=True)
+
+    def close(self) -> None:
+        if self.interface.isOpen():
+            self.interface.transmit('QUIT')
+            self.thread.join(1.)
+            self.interface.close()
+        os.close(self.master)
+        os.close(self.slave)
+
+
+def _rate(loopback: _Loopback, query: str, number: int,
+          repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            loopback.exchange(query)
+        samples.append(number / (time.perf_counter() - start))
+    return samples
+
+
+@benchmark('transport.exchange', unit='Hz', better='higher')
+def exchange(quick: bool) -> list[float]:
+    '''Short query and reply round trips per second.'''
+    loopback = _Loopback()
+    try:
+        return _rate(loopback, 'SNAP?', 200 if quick else 2000,
+                     3 if quick else 7)
+    finally:
+        loopback.close()
+
+
+@benchmark('transport.receive_bytes', unit='MB/s', better='higher')
+def receive_bytes(quick: bool) -> list[float]:
+    '''Megabytes per second framed from 8 kB replies.'''
+    loopback = _Loopback()
+    try:
+        rates = _rate(loopback, 'LONG?', 20 if quick else 200,
+                      3 if quick else 7)
+    finally:
+        loopback.close()
+    size = len(LONG) - 1
+    return [rate * size / 1e6 for rate in rates]
@@ -0,0 +1,215 @@
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+from qtpy import QtCore
+
+
+logger = logging.getLogger(__name__)
+
+
+_registry: dict[str, dict] = {}
+
+
+class Skipped(Exception):
+    '''Raised by a benchmark that cannot run in this environment.'''
+
+
+def benchmark(name: str,
+              unit: str = 's',
+              better: str = 'lower') -> Callable:
+    '''Register a benchmark function under *name*.
+
+    The function takes one argument, ``quick``, which asks for a
+    shorter run, and returns a list of samples in *unit*.
+
+    Parameters
+    ----------
+    name : str
+        Dotted name, e.g. ``'registry.get'``.  Used to select
+        benchmarks on the command line and to match results across
+        runs.
+    unit : str
+        Unit of the samples, e.g. ``'s'`` or ``'Hz'``.
+    better : str
+        ``'lower'`` if smaller values are better (times), ``'higher'``
+        if larger ones are (rates).
+    '''
+    def register(func: Callable) -> Callable:
+        _registry[name] = {'func': func, 'unit': unit, 'better': better}
+        return func
+    return register
+
+
+def names() -> list[str]:
+    '''Return the names of all registered benchmarks.'''
+    return list(_registry)
+
+
+def timed(func: Callable[[], object], number: int,
+          repeat: int) -> list[float]:
+    '''Return the time per call [s] of *func* in *repeat* samples.
+
+    Each sample calls *func* *number* times.
+    '''
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+    return samples
+
+
+def wait(condition: Callable[[], bool], timeout: float = 10.) -> bool:
+    '''Process Qt events until *condition* holds or *timeout* [s] passes.'''
+    app = QtCore.QCoreApplication.instance()
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            return False
+        app.processEvents(QtCore.QEventLoop.ProcessEventsFlag.AllEvents, 10)
+    return True
+
+
+def summarize(samples: list[float], unit: str, better: str) -> dict:
+    '''Return the statistics of *samples* as stored in a results file.'''
+    return {'value': statistics.median(samples),
+            'min': min(samples),
+            'max': max(samples),
+            'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.,
+            'samples': len(samples),
+            'unit': unit,
+            'better': better}
+
+
+def run(selected: list[str] | None = None,
+        quick: bool = False) -> dict[str, dict]:
+    '''Run benchmarks and return their summarized results.
+
+    Parameters
+    ----------
+    selected : list[str] | None
+        Substrings of the names to run.  Default: ``None`` (all).
+    quick : bool
+        Take fewer, shorter samples.  Default: ``False``.
+
+    Returns
+    -------
+    dict[str, dict]
+        Summary (see :func:`summarize`) keyed by benchmark name.
+        Benchmarks that cannot run here, e.g. for lack of an optional
+        dependency, are logged and left out.
+    '''
+    results = {}
+    for name, entry in _registry.items():
+        if selected and not any(s in name for s in selected):
+            continue
+        logger.info(f'Running {name}')
+        try:
+            samples = entry['func'](quick)
+        except Skipped as ex:
+            logger.warning(f'Skipped {name}: {ex}')
+            continue
+        results[name] = summarize(samples, entry['unit'], entry['better'])
+    return results
+
+
+def environment() -> dict:
+    '''Describe the commit and platform that results belong to.'''
+    root = Path(__file__).parent.parent
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=root,
+            capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(
+            ['git', 'status', '--porcelain', '--untracked-files=no'],
+            cwd=root, capture_output=True, text=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        commit, dirty = 'unknown', False
+    return {'commit': commit,
+            'dirty': dirty,
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'qt': QtCore.qVersion(),
+            'platform': platform.platform(),
+            'machine': platform.node()}
+
+
+def save(results: dict[str, dict], filename: str | Path) -> None:
+    '''Write *results* and the :func:`environment` to *filename*.'''
+    filename = Path(filename)
+    filename.parent.mkdir(parents=True, exist_ok=True)
+    with open(filename, 'w', encoding='utf-8') as resultfile:
+        json.dump({**environment(), 'results': results}, resultfile,
+                  indent=2)
+    logger.info(f'Saved results to {filename}')
+
+
+def load(filename: str | Path) -> dict:
+    '''Read a results file written by :func:`save`.'''
+    with open(filename, 'r', encoding='utf-8') as resultfile:
+        return json.load(resultfile)
+
+
+def compare(baseline: dict[str, dict],
+            current: dict[str, dict],
+            threshold: float = 0.1) -> list[dict]:
+    '''Compare two sets of results benchmark by benchmark.
+
+    Parameters
+    ----------
+    baseline, current : dict[str, dict]
+        ``'results'`` of two results files.
+    threshold : float
+        Relative change beyond which a benchmark counts as a
+        regression or an improvement.  Default: ``0.1`` (10%).
+
+    Returns
+    -------
+    list[dict]
+        One row per benchmark present in both, with ``name``,
+        ``baseline``, ``current``, ``unit``, ``change`` (relative
+        change of the value, positive meaning worse) and ``status``:
+        ``'regression'``, ``'improvement'`` or ``'ok'``.
+    '''
+    rows = []
+    for name, now in current.items():
+        then = baseline.get(name)
+        if then is None or not then['value']:
+            continue
+        change = now['value'] / then['value'] - 1.
+        if now['better'] == 'higher':
+            change = then['value'] / now['value'] - 1.
+        if change > threshold:
+            status = 'regression'
+        elif change < -threshold:
+            status = 'improvement'
+        else:
+            status = 'ok'
+        rows.append({'name': name, 'baseline': then['value'],
+                     'current': now['value'], 'unit': now['unit'],
+                     'change': change, 'status': status})
+    return rows
+
+
+def format_rows(rows: list[dict]) -> str:
+    '''Return a comparison from :func:`compare` as a text table.'''
+    lines = [f'{"benchmark":<28}{"baseline":>16}{"current":>16}'
+             f'{"change":>9}  status']
+    for row in rows:
+        lines.append(f'{row["name"]:<28}'
+                     f'{row["baseline"]:>11.4g} {row["unit"]:<4}'
+                     f'{row["current"]:>11.4g} {row["unit"]:<4}'
+                     f'{100. * row["change"]:>+8.1f}%  {row["status"]}')
+    return '\n'.join(lines)
+
+
+__all__ = ['benchmark', 'names', 'timed', 'wait', 'run', 'Skipped',
+           'environment', 'save', 'load', 'compare', 'format_rows']
@@ -0,0 +1,441 @@
+'''Synthetic load generator for racks of polled instruments.
+
+Spawns *instruments* fake instruments, each with *properties* read-only
+properties polled at *rate* Hz by :class:`QPollingMixin`, and shows
+each in a :class:`QInstrumentWidget` or :class:`QInstrumentTree`.
+Property values follow the chosen *dynamics*.  Instruments run on the
+GUI thread or, with *threads*, each on a worker thread of its own, as
+serial instruments do behind a widget.
+
+Over a measurement window the generator records
+
+- ``latency``: time from the poll that generated a value to its
+  application by the view on the GUI thread (p50, p99, max),
+- ``requested``, ``generated``, ``applied``: values asked for by the
+  poll rates, produced by the poll loops and applied by the views,
+- ``coalesced``: the fraction of requested polls that the poll loops
+  could not make in time, which they make up by polling less often,
+- ``backlog``: values generated but still queued for the GUI thread
+  when the window closed, and ``dropped``: values never applied,
+- ``gui_busy``: the fraction of GUI-thread time spent applying values,
+- ``heartbeat``: lateness of a 10 ms GUI-thread timer (p99, max),
+  which is what a user experiences as a sluggish interface,
+- ``memory``: growth of the resident set size over the window.
+
+:func:`sweep` doubles the number of properties per instrument until
+the rack saturates and reports the largest load it sustained.
+
+.. code-block:: bash
+
+    python -m benchmarks load -n 4 -m 10 -r 50 --threads
+    python -m benchmarks load -n 4 -r 50 --view tree --sweep
+'''
+import logging
+import math
+import os
+import random
+import tempfile
+import time
+from collections import deque
+from pathlib import Path
+
+from qtpy import QtCore, QtWidgets
+from QInstrument.lib.QFakeInstrument import QFakeInstrument
+from QInstrument.lib.QPollingMixin import QPollingMixin
+from QInstrument.lib.QInstrumentWidget import QInstrumentWidget
+from QInstrument.lib.LatencyHistogram import LatencyHistogram
+
+
+logger = logging.getLogger(__name__)
+
+
+DYNAMICS = ('constant', 'random', 'sine', 'ramp')
+
+HEARTBEAT = 10
+'''Period [ms] of the GUI-thread heartbeat timer.'''
+
+
+def _rss() -> float:
+    '''Return the resident set size [bytes], or NaN if unknown.'''
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        return 1024. * resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except ImportError:
+        return math.nan
+
+
+class LoadProbe:
+    '''Timestamps values where they are generated and where applied.
+
+    Generation times are queued per instrument and property.  Values of
+    one property reach the GUI thread in order, so each application
+    takes the oldest time from its queue.  Values generated before
+    the measurement window opened are not counted when applied.
+    '''
+
+    def __init__(self) -> None:
+        self._stamps: dict[tuple[int, str], deque] = {}
+        self.reset()
+
+    def reset(self) -> None:
+        '''Start a new measurement window.'''
+        self.latency = LatencyHistogram()
+        self.generated = 0
+        self.applied = 0
+        self.busy = 0.
+        self._since = time.perf_counter()
+
+    def register(self, device: QtCore.QObject, names: list[str]) -> None:
+        for name in names:
+            self._stamps[(id(device), name)] = deque()
+
+    def stamp(self, device: QtCore.QObject, name: str) -> None:
+        '''Record the generation of a value of *name*.'''
+        queue = self._stamps.get((id(device), name))
+        if queue is not None:
+            queue.append(time.perf_counter())
+            self.generated += 1
+
+    def apply(self, device: QtCore.QObject, name: str,
+              start: float, end: float) -> None:
+        '''Record the application of a value that took *start* to *end*.'''
+        queue = self._stamps.get((id(device), name))
+        if not queue:
+            return
+        self.busy += end - start
+        stamp = queue.popleft()
+        if stamp < self._since:
+            return
+        self.latency.add(end - stamp)
+        self.applied += 1
+
+    def pending(self) -> int:
+        '''Return the number of values not yet applied.'''
+        return sum(len(queue) for queue in self._stamps.values())
+
+
+class _LoadInstrument(QPollingMixin, QFakeInstrument):
+    '''Fake instrument with generated, polled properties.'''
+
+    def __init__(self, probe: LoadProbe, properties: int, rate: float,
+                 dynamics: str) -> None:
+        self._probe = probe
+        self._count = properties
+        self._period = 1000. / rate
+        self._dynamics = dynamics
+        self._values = [0.] * properties
+        super().__init__()
+        probe.register(self, self.properties)
+
+    def _registerProperties(self) -> None:
+        for n in range(self._count):
+            self.registerProperty(f'p{n}',
+                                  getter=lambda n=n: self._generate(n),
+                                  setter=None, ptype=float,
+                                  poll_ms=self._period)
+
+    def _generate(self, n: int) -> float:
+        dynamics = self._dynamics
+        if dynamics == 'random':
+            value = self._values[n] + random.gauss(0., 1.)
+        elif dynamics == 'sine':
+            value = 100. * math.sin(time.perf_counter() + n)
+        elif dynamics == 'ramp':
+            value = self._values[n] + 1.
+        else:
+            value = float(n)
+        self._values[n] = value
+        return value
+
+    def get(self, key: str):
+        self._probe.stamp(self, key)
+        return super().get(key)
+
+
+class _LoadWidget(QInstrumentWidget):
+    '''Instrument widget with one spin box per generated property.'''
+
+    UIFILE = 'load.ui'
+    probe: LoadProbe | None = None
+
+    @classmethod
+    def _uiPath(cls) -> Path:
+        return Path(cls.UIFILE)
+
+    @QtCore.Slot(str, object)
+    def _onPropertyValue(self, name: str, value: object) -> None:
+        start = time.perf_counter()
+        super()._onPropertyValue(name, value)
+        self.probe.apply(self.device, name, start, time.perf_counter())
+
+
+def _uifile(directory: str, properties: int) -> str:
+    '''Write a form with *properties* spin boxes and return its path.'''
+    items = ''.join(
+        f'<item row="{n}" column="0"><widget class="QDoubleSpinBox" '
+        f'name="p{n}"><property name="minimum"><double>-1e12</double>'
+        f'</property><property name="maximum"><double>1e12</double>'
+        f'</property></widget></item>' for n in range(properties))
+    ui = ('<?xml version="1.0" encoding="UTF-8"?><ui version="4.0">'
+          '<class>LoadWidget</class>'
+          '<widget class="QWidget" name="LoadWidget">'
+          f'<layout class="QFormLayout" name="layout">{items}</layout>'
+          '</widget></ui>')
+    path = Path(directory) / f'load{properties}.ui'
+    path.write_text(ui, encoding='utf-8')
+    return str(path)
+
+
+def _tree(probe: LoadProbe, device: _LoadInstrument) -> QtWidgets.QWidget:
+    from QInstrument.lib.QInstrumentTree import QInstrumentTree
+
+    class _LoadTree(QInstrumentTree):
+
+        def _onDevicePropertyValue(self, name: str, value) -> None:
+            start = time.perf_counter()
+            super()._onDevicePropertyValue(name, value)
+            probe.apply(self.device, name, start, time.perf_counter())
+
+    return _LoadTree(device=device)
+
+
+class _Heartbeat(QtCore.QObject):
+    '''Measures how late a periodic GUI-thread timer fires.'''
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.lateness = LatencyHistogram()
+        self._last = None
+        self._timer = QtCore.QTimer(self)
+        self._timer.setTimerType(QtCore.Qt.TimerType.PreciseTimer)
+        self._timer.timeout.connect(self._beat)
+
+    def start(self) -> None:
+        self.lateness = LatencyHistogram()
+        self._last = time.perf_counter()
+        self._timer.start(HEARTBEAT)
+
+    def stop(self) -> None:
+        self._timer.stop()
+
+    def _beat(self) -> None:
+        now = time.perf_counter()
+        self.lateness.add(max(now - self._last - HEARTBEAT / 1000., 0.))
+        self._last = now
+
+
+class _Starter(QtCore.QObject):
+
+    start = QtCore.Signal()
+    stop = QtCore.Signal()
+
+
+def _process(seconds: float) -> None:
+    '''Run the GUI event loop for *seconds*.'''
+    app = QtCore.QCoreApplication.instance()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        app.processEvents(QtCore.QEventLoop.ProcessEventsFlag.AllEvents, 5)
+
+
+def run(instruments: int = 4,
+        properties: int = 10,
+        rate: float = 20.,
+        dynamics: str = 'random',
+        view: str = 'widget',
+        threads: bool = False,
+        duration: float = 2.,
+        warmup: float = 0.5) -> dict:
+    '''Run one load and return its measurements.
+
+    Parameters
+    ----------
+    instruments : int
+        Number of fake instruments.  Default: 4.
+    properties : int
+        Polled properties per instrument.  Default: 10.
+    rate : float
+        Poll rate [Hz] of every property.  Default: 20.
+    dynamics : str
+        How values evolve: one of :data:`DYNAMICS`.  Default:
+        ``'random'``.
+    view : str
+        ``'widget'`` or ``'tree'``.  Default: ``'widget'``.
+    threads : bool
+        Run each instrument on a worker thread.  Default: ``False``.
+    duration : float
+        Length [s] of the measurement window.  Default: 2.
+    warmup : float
+        Time [s] allowed for polling to settle first.  Default: 0.5.
+
+    Returns
+    -------
+    dict
+        The configuration and the measurements listed in the module
+        description.  Times are in seconds.
+    '''
+    if dynamics not in DYNAMICS:
+        raise ValueError(f'dynamics must be one of {DYNAMICS}')
+    app = QtWidgets.QApplication.instance()
+    probe = LoadProbe()
+    window = QtWidgets.QWidget()
+    layout = QtWidgets.QHBoxLayout(window)
+    devices, views, workers = [], [], []
+    starter = _Starter()
+    with tempfile.TemporaryDirectory() as directory:
+        _LoadWidget.UIFILE = _uifile(directory, properties)
+        _LoadWidget.probe = probe
+        for _ in range(instruments):
+            device = _LoadInstrument(probe, properties, rate, dynamics)
+            if view == 'tree':
+                widget = _tree(probe, device)
+            else:
+                widget = _LoadWidget(device=device)
+            layout.addWidget(widget)
+            devices.append(device)
+            views.append(widget)
+    window.show()
+    _process(0.1)
+    for device in devices:
+        if threads:
+            worker = QtCore.QThread()
+            worker.setObjectName(f'load{len(workers)}')
+            device.moveToThread(worker)
+            worker.start()
+            workers.append(worker)
+        starter.start.connect(device.startPolling)
+        starter.stop.connect(device.stopPolling)
+    heartbeat = _Heartbeat()
+    starter.start.emit()
+    _process(warmup)
+
+    probe.reset()
+    memory = _rss()
+    heartbeat.start()
+    start = time.perf_counter()
+    _process(duration)
+    elapsed = time.perf_counter() - start
+    heartbeat.stop()
+    generated, applied = probe.generated, probe.applied
+    backlog = probe.pending()
+    memory = _rss() - memory
+    latency, busy = probe.latency, probe.busy
+
+    starter.stop.emit()
+    for device in devices:
+        device.stopPolling()
+    for worker in workers:
+        worker.quit()
+        worker.wait()
+    _process(0.2)
+    dropped = probe.pending()
+    for widget in views:
+        widget.close()
+    window.close()
+    window.deleteLater()
+    app.sendPostedEvents(None, QtCore.QEvent.Type.DeferredDelete)
+
+    requested = instruments * properties * rate * elapsed
+    return {'instruments': instruments,
+            'properties': properties,
+            'rate': rate,
+            'dynamics': dynamics,
+            'view': view,
+            'threads': threads,
+            'duration': elapsed,
+            'load': instruments * properties * rate,
+            'requested': requested,
+            'generated': generated,
+            'applied': applied,
+            'coalesced': max(1. - generated / requested, 0.),
+            'backlog': backlog,
+            'dropped': dropped,
+            'latency_p50': latency.quantile(0.5),
+            'latency_p99': latency.quantile(0.99),
+            'latency_max': latency.maximum if latency.count else math.nan,
+            'gui_busy': busy / elapsed,
+            'heartbeat_p99': heartbeat.lateness.quantile(0.99),
+            'heartbeat_max': heartbeat.lateness.maximum,
+            'memory': memory}
+
+
+def saturated(result: dict, max_latency: float = 0.1,
+              max_coalesced: float = 0.1) -> bool:
+    '''Return True if *result* shows a rack that cannot keep up.
+
+    The rack is saturated when the p99 latency of values or of the
+    heartbeat exceeds *max_latency* [s], or when more than
+    *max_coalesced* of the requested polls were not made.
+    '''
+    return (result['latency_p99'] > max_latency or
+            result['heartbeat_p99'] > max_latency or
+            result['coalesced'] > max_coalesced or
+            math.isnan(result['latency_p99']))
+
+
+def sweep(limit: int = 1024, max_latency: float = 0.1,
+          max_coalesced: float = 0.1, **kwargs) -> dict:
+    '''Double the properties per instrument until the rack saturates.
+
+    Parameters
+    ----------
+    limit : int
+        Largest number of properties per instrument tried.
+        Default: 1024.
+    max_latency, max_coalesced : float
+        Saturation criteria; see :func:`saturated`.
+    **kwargs
+        Further arguments of :func:`run`, starting with
+        ``properties``.
+
+    Returns
+    -------
+    dict
+        ``runs``: the result of every load tried, ``sustained``: the
+        largest one that did not saturate (or ``None``), and
+        ``saturated``: the first that did (or ``None``).
+    '''
+    properties = kwargs.pop('properties', 1)
+    runs, sustained, failed = [], None, None
+    while properties <= limit:
+        result = run(properties=properties, **kwargs)
+        runs.append(result)
+        logger.info(f'{result["load"]:.0f} values/s: '
+                    f'p99 {1000. * result["latency_p99"]:.1f} ms, '
+                    f'heartbeat {1000. * result["heartbeat_p99"]:.1f} ms, '
+                    f'coalesced {100. * result["coalesced"]:.0f}%')
+        if saturated(result, max_latency, max_coalesced):
+            failed = result
+            break
+        sustained = result
+        properties *= 2
+    return {'runs': runs, 'sustained': sustained, 'saturated': failed}
+
+
+def format_result(result: dict) -> str:
+    '''Return the measurements of one load as text.'''
+    ms = 1000.
+    return (f'{result["instruments"]} x {result["properties"]} properties '
+            f'at {result["rate"]:g} Hz ({result["view"]}, '
+            f'{"threads" if result["threads"] else "GUI thread"}): '
+            f'{result["load"]:.0f} values/s\n'
+            f'  latency    p50 {ms * result["latency_p50"]:.2f} ms, '
+            f'p99 {ms * result["latency_p99"]:.2f} ms, '
+            f'max {ms * result["latency_max"]:.2f} ms\n'
+            f'  values     {result["generated"]} generated, '
+            f'{result["applied"]} applied, '
+            f'{100. * result["coalesced"]:.1f}% coalesced, '
+            f'{result["backlog"]} queued, {result["dropped"]} dropped\n'
+            f'  GUI        {100. * result["gui_busy"]:.1f}% busy, '
+            f'heartbeat p99 {ms * result["heartbeat_p99"]:.2f} ms, '
+            f'max {ms * result["heartbeat_max"]:.2f} ms\n'
+            f'  memory     {result["memory"] / 1e6:+.1f} MB')
+
+
+__all__ = ['LoadProbe', 'DYNAMICS', 'run', 'saturated', 'sweep',
+           'format_result']
@@ -35,42 +35,51 @@ class QFakeIPGLaser(QFakeInstrument, QIPGLaser):
                 'current',
                 min(float(v), self._store.get('maximum_current', 100.))),
             minimum=0., maximum=100.,
-            debounce=500)
+            debounce=500, poll_ms=1000)
         self.registerProperty(
             'maximum_current', ptype=float,
             getter=lambda: self._store.get('maximum_current', 100.),
             setter=lambda v: self._store.__setitem__(
                 'maximum_current', float(v)),
-            minimum=0., maximum=100.)
+            minimum=0., maximum=100., poll_ms=5000)
         self.registerProperty(
             'aiming', ptype=bool,
             getter=lambda: self._store.get('aiming', False),
-            setter=lambda v: self._store.__setitem__('aiming', bool(v)))
+            setter=lambda v: self._store.__setitem__('aiming', bool(v)),
+            poll_ms=1000)
         self.registerProperty(
             'emission', ptype=bool,
             getter=lambda: self._store.get('emission', False),
-            setter=lambda v: self._store.__setitem__('emission', bool(v)))
+            setter=lambda v: self._store.__setitem__('emission', bool(v)),
+            poll_ms=1000)
         self.registerProperty(
             'power', ptype=float, setter=None,
-            getter=lambda: self._store.get('power', 0.))
+            getter=lambda: self._store.get('power', 0.),
+            poll_ms=200, poll_priority=1)
         self.registerProperty(
             'power_supply', ptype=bool, setter=None,
-            getter=lambda: self._store.get('power_supply', True))
+            getter=lambda: self._store.get('power_supply', True),
+            poll_ms=1000)
         self.registerProperty(
             'keyswitch', ptype=bool, setter=None,
-            getter=lambda: self._store.get('keyswitch', True))
+            getter=lambda: self._store.get('keyswitch', True),
+            poll_ms=1000)
         self.registerProperty(
             'fault', ptype=bool, setter=None,
-            getter=lambda: self._store.get('fault', False))
+            getter=lambda: self._store.get('fault', False),
+            poll_ms=1000)
         self.registerProperty(
             'minimum_current', ptype=float, setter=None,
-            getter=lambda: self._minimum_current)
+            getter=lambda: self._minimum_current,
+            poll_ms=60000)
         self.registerProperty(
             'firmware', ptype=str, setter=None,
-            getter=lambda: self._store.get('firmware', 'Fake IPG v1.0'))
+            getter=lambda: self._store.get('firmware', 'Fake IPG v1.0'),
+            poll_ms=60000)
         self.registerProperty(
             'temperature', ptype=float, setter=None,
-            getter=lambda: self._store.get('temperature', 25.))
+            getter=lambda: self._store.get('temperature', 25.),
+            poll_ms=5000)
         self.identification = 'Fake IPG Fiber Laser'
 
     def identify(self) -> bool:
@@ -1,11 +1,13 @@
 import logging
+from QInstrument.lib.QPollingMixin import QPollingMixin
 from QInstrument.lib.QSerialInstrument import QSerialInstrument
+from QInstrument.lib.ResponseParser import ResponseParser
 
 
 logger = logging.getLogger(__name__)
 
 
-class QIPGLaser(QSerialInstrument):
+class QIPGLaser(QPollingMixin, QSerialInstrument):
     '''IPG Photonics YLR Ytterbium Fiber Laser.
 
     The IPG command interface does not follow the ``CMD?`` / ``CMDvalue``
@@ -55,6 +57,15 @@ class QIPGLaser(QSerialInstrument):
     temperature : float [deg C]
         Laser diode temperature (``RCT``).
 
+    Polling
+    =======
+    Every property carries ``poll_ms`` metadata for the poll loop of
+    :class:`QPollingMixin`: ``power`` is read first, every 200 ms, the
+    status flags and ``current`` every second, ``temperature`` and
+    ``maximum_current`` every 5 s, and ``firmware`` and
+    ``minimum_current`` every minute.  The five status flags share
+    one ``STA`` query per poll cycle.
+
     Reference
     =========
     IPG Photonics Fiber Laser User Manual, dated February 26, 2010.
@@ -145,6 +156,13 @@ class QIPGLaser(QSerialInstrument):
                 flowControl=QSerialInstrument.FlowControl.NoFlowControl,
                 eol='\r')
 
+    STATUS = ResponseParser(int, count=1, prefix='STA:')
+    '''Parser for the ``STA`` status word.'''
+
+    POWER = ResponseParser(float, count=1, prefix='ROP:',
+                           specials={'Off': 0., 'Low': 0.1})
+    '''Parser for ``ROP`` replies: a power [W], ``Off`` or ``Low``.'''
+
     def _registerProperties(self) -> None:
         '''Register all instrument properties via ``registerProperty()``.
 
@@ -159,31 +177,38 @@ class QIPGLaser(QSerialInstrument):
                               getter=lambda: float(self._command('RCS')),
                               setter=self._setCurrent,
                               minimum=0., maximum=100.,
-                              debounce=500)
+                              debounce=500, poll_ms=1000)
         self.registerProperty('maximum_current', ptype=float,
                               getter=lambda: self._maximum_current,
                               setter=self._setMaximumCurrent,
-                              minimum=0., maximum=100.)
+                              minimum=0., maximum=100., poll_ms=5000)
         self.registerProperty('aiming', ptype=bool,
                               getter=lambda: self._flagSet('AIM'),
-                              setter=self._setAiming)
+                              setter=self._setAiming, poll_ms=1000)
         self.registerProperty('emission', ptype=bool,
                               getter=lambda: self._flagSet('EMX'),
-                              setter=self._setEmission)
+                              setter=self._setEmission, poll_ms=1000)
         self.registerProperty('power', ptype=float, setter=None,
-                              getter=self._getPower)
+                              getter=self._getPower,
+                              poll_ms=200, poll_priority=1)
         self.registerProperty('power_supply', ptype=bool, setter=None,
-                              getter=lambda: not self._flagSet('PWR'))
+                              getter=lambda: not self._flagSet('PWR'),
+                              poll_ms=1000)
         self.registerProperty('keyswitch', ptype=bool, setter=None,
-                              getter=lambda: self._flagSet('KEY'))
+                              getter=lambda: self._flagSet('KEY'),
+                              poll_ms=1000)
         self.registerProperty('fault', ptype=bool, setter=None,
-                              getter=lambda: self._flagSet('ERR'))
+                              getter=lambda: self._flagSet('ERR'),
+                              poll_ms=1000)
         self.registerProperty('minimum_current', ptype=float, setter=None,
-                              getter=lambda: self._minimum_current)
+                              getter=lambda: self._minimum_current,
+                              poll_ms=60000)
         self.registerProperty('firmware', ptype=str, setter=None,
-                              getter=lambda: self._command('RFV'))
+                              getter=lambda: self._command('RFV'),
+                              poll_ms=60000)
         self.registerProperty('temperature', ptype=float, setter=None,
-                              getter=lambda: float(self._command('RCT')))
+                              getter=lambda: float(self._command('RCT')),
+                              poll_ms=5000)
 
     def identify(self) -> bool:
         '''Return True if the connected device responds as an IPG laser.
@@ -210,6 +235,11 @@ class QIPGLaser(QSerialInstrument):
         by their mnemonic only, so the argument does not interfere with
         the echo check.
 
+        A reply that echoes another mnemonic belongs to an earlier
+        command: the streams are out of step, so the command is
+        repeated after :meth:`recover`.  ``ERR`` replies are answers to
+        this command and are returned as they are.
+
         Parameters
         ----------
         cmd : str
@@ -222,17 +252,61 @@ class QIPGLaser(QSerialInstrument):
             Value token from the echoed response, or the full response
             if the mnemonic echo is absent.
         '''
-        response = self.handshake(cmd)
         mnemonic = cmd.split()[0]
+        responses = []
+
+        def read():
+            response = self.receive().strip()
+            responses.append(response)
+            if mnemonic in response or response.startswith('ERR'):
+                return response
+            return None
+        response = self.exchange(cmd, read)
+        if response is None:
+            response = responses[-1]
         if mnemonic not in response:
             logger.info(f'Unexpected response to {cmd!r}: {response!r}')
             return response
         parts = response.split()
         return parts[1] if len(parts) >= 2 else response
 
+    def _read(self, cmd: str, parser: ResponseParser) -> float | int:
+        '''Send a query and return the single value of its reply.
+
+        Raises
+        ------
+        ValueError
+            If *parser* cannot parse the reply.
+        '''
+        values = self.getValues(cmd, parser)
+        if values is None:
+            raise ValueError(f'Could not parse reply to {cmd!r}')
+        return values[0]
+
+    def _poll(self) -> None:
+        '''Poll the instrument, reading ``STA`` at most once per cycle.
+
+        The status word read for the first status flag that falls due
+        is reused by the other flags polled in the same cycle.
+        '''
+        self._cycle = {}
+        try:
+            super()._poll()
+        finally:
+            self._cycle = None
+
     def _flags(self) -> int:
-        '''Return the raw instrument status word.'''
-        return int(self._command('STA'))
+        '''Return the raw instrument status word.
+
+        The word is cached for the rest of a poll cycle.
+        '''
+        cycle = getattr(self, '_cycle', None)
+        if cycle is not None and 'STA' in cycle:
+            return cycle['STA']
+        flags = self._read('STA', self.STATUS)
+        if cycle is not None:
+            cycle['STA'] = flags
+        return flags
 
     def _flagSet(self, flagname: str) -> bool:
         '''Return True if the named status flag is set.
@@ -249,14 +323,9 @@ class QIPGLaser(QSerialInstrument):
 
         The instrument responds with ``'Off'`` when emission is disabled,
         ``'Low'`` when power is below the measurable threshold, or a
-        numeric string otherwise.
+        numeric string otherwise.  These map to ``0`` and ``0.1``.
         '''
-        value = self._command('ROP')
-        if 'Off' in value:
-            return 0.
-        if 'Low' in value:
-            return 0.1
-        return float(value)
+        return self._read('ROP', self.POWER)
 
     def _setCurrent(self, v: float) -> None:
         '''Set the diode current setpoint, clamped to ``maximum_current``.
@@ -315,8 +384,7 @@ class QIPGLaser(QSerialInstrument):
         '''Return a snapshot of all polled status properties.
 
         Reads the status word (``STA``) and output power (``ROP``) once
-        each, avoiding redundant ``STA`` queries.  Intended for use by
-        the widget poll loop.
+        each, for callers outside the poll loop that want every flag.
 
         Returns
         -------
@@ -14,13 +14,13 @@ class QIPGLaserWidget(QInstrumentWidget):
     toggle each state.  Diode current is set with a rotary encoder
     spinbox.  Output power is shown as a read-only display.
 
-    The widget polls the instrument every :attr:`poll_interval` ms to
-    refresh all status fields.
+    Status fields are refreshed by the instrument's poll loop, which
+    the widget starts when it is first shown.  See :class:`QIPGLaser`
+    for the rate at which each field is read.
     '''
 
     UIFILE = 'IPGLaserWidget.ui'
     INSTRUMENT = QIPGLaser
-    poll_interval = 500  # ms
 
     wsetter = QInstrumentWidget.wsetter | {
         'QLedWidget':            'setValue',
@@ -36,12 +36,8 @@ class QIPGLaserWidget(QInstrumentWidget):
 
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
-        self._timer = QtCore.QTimer(self)
-        self._timer.setInterval(self.poll_interval)
-        self._timer.timeout.connect(self._poll)
         if self.device is not None and self.device.isOpen():
             self._setupControls()
-            self._timer.start()
 
     def _setupControls(self) -> None:
         '''Configure LED colors and rotary encoder range from device state.
@@ -72,6 +68,11 @@ class QIPGLaserWidget(QInstrumentWidget):
         self.current.setMinimum(min_c)
         self.current.setMaximum(max_c)
 
+    def _firstShow(self) -> None:
+        '''Start the instrument's poll loop after reconciliation.'''
+        super()._firstShow()
+        self._startPolling()
+
     def showEvent(self, event) -> None:
         '''Re-apply current range after the first-show config restore.'''
         super().showEvent(event)
@@ -99,32 +100,24 @@ class QIPGLaserWidget(QInstrumentWidget):
         '''Toggle laser emission on or off.'''
         self.device.set('emission', not bool(self.device.get('emission')))
 
-    @QtCore.Slot()
-    def _poll(self) -> None:
-        '''Read all polled status properties and update the UI.
+    @QtCore.Slot(str, object)
+    def _onPropertyValue(self, name: str, value: object) -> None:
+        '''Update the widget for *name*, blinking the fault LED.
 
-        Calls :meth:`device.status` once per poll interval to minimise
-        serial traffic, then updates each named widget.  The ``fault``
-        LED is set to blink while a fault condition is active.
+        The ``fault`` LED blinks while a fault condition is active.
+        Other values are applied as in
+        :meth:`QInstrumentWidget._onPropertyValue`.
         '''
-        for prop, value in self.device.status().items():
-            widget = self.__dict__.get(prop)
-            if widget is None:
-                continue
-            if prop == 'fault' and isinstance(widget, QLedWidget):
-                # Stop any existing blink, set the correct state, then
-                # re-enable blinking only when a fault is active.
-                widget.blink = False
-                widget.state = QLedWidget.ON if value else QLedWidget.OFF
-                if value:
-                    widget.blink = True
-                continue
-            setter = self._wmethod(widget, self.wsetter)
-            if setter is None:
-                continue
-            widget.blockSignals(True)
-            setter(value)
-            widget.blockSignals(False)
+        widget = self.__dict__.get(name)
+        if name != 'fault' or not isinstance(widget, QLedWidget):
+            super()._onPropertyValue(name, value)
+            return
+        # Stop any existing blink, set the correct state, then
+        # re-enable blinking only when a fault is active.
+        widget.blink = False
+        widget.state = QLedWidget.ON if value else QLedWidget.OFF
+        if value:
+            widget.blink = True
 
 
 if __name__ == '__main__':
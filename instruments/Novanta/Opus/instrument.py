@@ -1,5 +1,6 @@
 import logging
 from QInstrument.lib.QSerialInstrument import QSerialInstrument
+from QInstrument.lib.ResponseParser import ResponseParser
 
 
 logger = logging.getLogger(__name__)
@@ -57,6 +58,15 @@ class QOpus(QSerialInstrument):
                 eol='\r\n',
                 timeout=500)
 
+    POWER = ResponseParser(float, count=1, suffix='mW')
+    '''Parser for ``POWER?`` replies, e.g. ``'0123.4mW'``.'''
+
+    CURRENT = ResponseParser(float, count=1, suffix='%')
+    '''Parser for ``CURRENT?`` replies, e.g. ``'050.0%'``.'''
+
+    TEMPERATURE = ResponseParser(float, count=1, suffix=' C')
+    '''Parser for ``LASTEMP?`` and ``PSUTEMP?`` replies.'''
+
     def _registerProperties(self) -> None:
         '''Register all instrument properties via ``registerProperty()``.
 
@@ -116,9 +126,9 @@ class QOpus(QSerialInstrument):
         (e.g. ``'0123.4mW'``).  Caches the result in ``_power`` so
         the ``emission`` getter can read it without a second query.
         '''
-        response = self.handshake('POWER?')
-        if response:
-            self._power = float(response.rstrip('mW'))
+        values = self.getValues('POWER?', self.POWER)
+        if values is not None:
+            self._power = values[0]
         return self._power
 
     def _getCurrent(self) -> float:
@@ -127,21 +137,21 @@ class QOpus(QSerialInstrument):
         The instrument responds with a value and ``%`` suffix
         (e.g. ``'050.0%'``).
         '''
-        response = self.handshake('CURRENT?')
-        return float(response.rstrip('%')) if response else 0.
+        values = self.getValues('CURRENT?', self.CURRENT)
+        return 0. if values is None else values[0]
 
     def _parseTemp(self, cmd: str) -> float:
         '''Query a temperature command and return the value [°C].
 
-        Strips trailing unit characters (``C``) before conversion.
+        The unit (``C``) is stripped by :attr:`TEMPERATURE`.
 
         Parameters
         ----------
         cmd : str
             Temperature query mnemonic (``'LASTEMP?'`` or ``'PSUTEMP?'``).
         '''
-        response = self.handshake(cmd)
-        return float(response.rstrip(' C')) if response else 0.
+        values = self.getValues(cmd, self.TEMPERATURE)
+        return 0. if values is None else values[0]
 
     def _getStatus(self) -> bool:
         '''Query and return the laser enable status.
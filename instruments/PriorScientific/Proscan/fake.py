@@ -14,6 +14,11 @@ class QFakeProscan(QFakeInstrument, QProscan):
 
     positionChanged = QtCore.Signal(object)
     limitsChanged = QtCore.Signal(object)
+    pointReached = QtCore.Signal(int, float)
+    trajectoryFinished = QtCore.Signal(object)
+    motionFinished = QtCore.Signal(bool)
+
+    _watchRequested = QtCore.Signal(int)
 
     def _registerProperties(self) -> None:
         for name, default in (('speed',         50),
@@ -26,14 +31,14 @@ class QFakeProscan(QFakeInstrument, QProscan):
                 name,
                 getter=lambda n=name, d=default: self._store.get(n, d),
                 setter=lambda v, n=name: self._store.update({n: int(v)}),
-                ptype=int)
+                ptype=int, poll_ms=5000)
         for name, default in (('stepsize',   1.0),
                               ('zstepsize',  1.0)):
             self.registerProperty(
                 name,
                 getter=lambda n=name, d=default: self._store.get(n, d),
                 setter=lambda v, n=name: self._store.update({n: float(v)}),
-                ptype=float)
+                ptype=float, poll_ms=5000)
         for name, default in (('xresolution', 0.1),
                               ('yresolution', 0.1),
                               ('zresolution', 0.1)):
@@ -41,34 +46,39 @@ class QFakeProscan(QFakeInstrument, QProscan):
                 name,
                 getter=lambda n=name, d=default: self._store.get(n, d),
                 setter=None,
-                ptype=float)
+                ptype=float, poll_ms=60000)
         for name, default in (('upr',  1.0),
                               ('zupr', 1.0)):
             self.registerProperty(
                 name,
                 getter=lambda n=name, d=default: self._store.get(n, d),
                 setter=lambda v, n=name: self._store.update({n: float(v)}),
-                ptype=float)
+                ptype=float, poll_ms=60000)
         self.registerProperty(
             'flip',
             getter=lambda: self._store.get('flip', False),
             setter=lambda v: self._store.update({'flip': bool(v)}),
-            ptype=bool)
+            ptype=bool, poll_ms=5000)
         self.registerProperty(
             'mirror',
             getter=lambda: self._store.get('mirror', False),
             setter=lambda v: self._store.update({'mirror': bool(v)}),
-            ptype=bool)
+            ptype=bool, poll_ms=5000)
         self.registerProperty(
             'moving',
             getter=lambda: self._store.get('moving', False),
             setter=None,
-            ptype=bool)
+            ptype=bool, poll_ms=1000)
+        self.registerProperty(
+            'position',
+            getter=lambda: self.position(),
+            setter=None,
+            ptype=object, poll_priority=2)
         self.registerProperty(
             'limits',
-            getter=lambda: self.active_limits(),
+            getter=lambda: self._readLimits(),
             setter=None,
-            ptype=object)
+            ptype=object, poll_priority=1)
         self.identification = 'Fake Prior Proscan'
 
     def identify(self) -> bool:
@@ -104,6 +114,7 @@ class QFakeProscan(QFakeInstrument, QProscan):
         return None
 
     def stop(self) -> bool:
+        self._cancelMotion()
         return True
 
     def move_to(self, position: list[int],
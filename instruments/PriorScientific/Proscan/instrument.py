@@ -1,15 +1,41 @@
 from __future__ import annotations
 
 import logging
+import threading
+import time
+from typing import Callable
+import numpy as np
 from qtpy import QtCore
 from QInstrument.lib.QAbstractInstrument import QAbstractInstrument
 from QInstrument.lib.QPollingMixin import QPollingMixin
 from QInstrument.lib.QSerialInstrument import QSerialInstrument
+from QInstrument.lib.ResponseParser import ResponseParser
 
 
 logger = logging.getLogger(__name__)
 
 
+class _Trajectory:
+    '''State of one :meth:`QProscan.run_trajectory` run.'''
+
+    __slots__ = ('points', 'arrivals', 'depth', 'dwell', 'callback',
+                 'tolerance', 'sent', 'reached', 'interval', 'last')
+
+    def __init__(self, points: np.ndarray, depth: int, dwell: float,
+                 callback: Callable | None, tolerance: float,
+                 interval: int) -> None:
+        self.points = points
+        self.arrivals = np.full(len(points), np.nan)
+        self.depth = depth
+        self.dwell = dwell
+        self.callback = callback
+        self.tolerance = tolerance
+        self.sent = 0
+        self.reached = 0
+        self.interval = interval
+        self.last = None
+
+
 class QProscan(QPollingMixin, QSerialInstrument):
     '''Prior Scientific Proscan II/III Microscope Stage Controller.
 
@@ -22,9 +48,20 @@ class QProscan(QPollingMixin, QSerialInstrument):
         Emitted by :meth:`position` with the current ``[x, y, z]``
         coordinates in µm.
     limitsChanged(object)
-        Emitted by :meth:`_poll` with the result of :meth:`active_limits`
-        after each position update.  Value is a
-        ``tuple[bool, bool, bool, bool]`` or ``None``.
+        Emitted whenever the ``limits`` property is read, including by
+        the poll loop, with the result of :meth:`active_limits`.  Value
+        is a ``tuple[bool, bool, bool, bool]`` or ``None``.
+    pointReached(int, float)
+        Emitted by :meth:`run_trajectory` when the stage arrives at a
+        point, with the point's index and the :func:`time.monotonic`
+        arrival time in seconds.
+    trajectoryFinished(object)
+        Emitted when a trajectory ends, with the ``numpy.ndarray`` of
+        arrival times.  Points that were not reached are ``NaN``.
+    motionFinished(bool)
+        Emitted by :meth:`watchMotion` and :meth:`waitForMotion`:
+        ``True`` when the stage has come to rest, ``False`` if the
+        wait was cancelled by :meth:`stop` or timed out.
 
     Properties
     ==========
@@ -61,10 +98,18 @@ class QProscan(QPollingMixin, QSerialInstrument):
     moving : bool
         True if the stage or focus drive is currently in motion.
         Read-only.
+    position : list[int]
+        Current ``[x, y, z]`` stage position [µm]. Read-only.
     limits : tuple[bool, bool, bool, bool] or None
         Active limit switches per axis ``(x, y, z, fourth)``, or
         ``None`` if no limits are currently active. Read-only.
 
+    The poll loop reads ``position`` and then ``limits`` every
+    :attr:`POLL_INTERVAL` ms.  The other properties carry ``poll_ms``
+    metadata and are read between them: ``moving`` every second,
+    ``upr``, ``zupr`` and the resolutions every minute, and the other
+    settings every 5 s.
+
     Limit Switch Bits
     -----------------
 
@@ -216,9 +261,45 @@ class QProscan(QPollingMixin, QSerialInstrument):
 
     positionChanged = QtCore.Signal(object)
     limitsChanged = QtCore.Signal(object)
+    pointReached = QtCore.Signal(int, float)
+    trajectoryFinished = QtCore.Signal(object)
+    motionFinished = QtCore.Signal(bool)
+
+    _watchRequested = QtCore.Signal(int)
 
     POLL_INTERVAL: int = 200
 
+    QUEUE_DEPTH: int = 4
+    '''Moves that :meth:`run_trajectory` keeps queued on the controller.
+
+    Sending more moves than the controller can queue is answered with
+    ``E18``.  A trajectory that meets ``E18`` anyway lowers its own
+    depth to the number of moves in flight and carries on.
+    '''
+
+    MOTION_POLL_MIN: int = 5
+    '''Initial interval [ms] between motion status queries.'''
+
+    MOTION_POLL_MAX: int = 50
+    '''Longest interval [ms] between motion status queries.'''
+
+    MOTION_TIMEOUT: int = 10000
+    '''Default longest wait [ms] for the stage to come to rest.'''
+
+    TIMEOUT_EXCLUDE = frozenset({'G', 'GR', 'M', 'VS', 'I', 'K',
+                                 'L', 'R', 'F', 'B', 'U', 'D'})
+    '''Motion commands: their acknowledgement time depends on the move.'''
+
+    POSITION = ResponseParser(int)
+    '''Parser for the ``P`` reply: ``x,y,z`` [µm].'''
+
+    STEPSIZE = ResponseParser(float)
+    '''Parser for the ``X`` reply: ``x,y`` step sizes [µm].'''
+
+    _trajectory: _Trajectory | None = None
+    _motionWatch: int = 0
+    _motionWatching: bool = False
+
     _VOLATILE: frozenset[str] = frozenset({'speed', 'zspeed'})
     '''Properties excluded from save/restore.
 
@@ -264,17 +345,17 @@ class QProscan(QPollingMixin, QSerialInstrument):
                 name,
                 getter=lambda c=cmd: self.getValue(c, int),
                 setter=lambda v, c=cmd: self.expect(f'{c},{int(v)}', '0'),
-                ptype=int)
+                ptype=int, poll_ms=5000)
         self.registerProperty(
             'stepsize',
-            getter=lambda: float(self.handshake('X').split(',')[0]),
+            getter=self._stepsize,
             setter=lambda v: self.expect(f'X,{float(v)},{float(v)}', '0'),
-            ptype=float)
+            ptype=float, poll_ms=5000)
         self.registerProperty(
             'zstepsize',
             getter=lambda: self.getValue('C', float),
             setter=lambda v: self.expect(f'C,{float(v)}', '0'),
-            ptype=float)
+            ptype=float, poll_ms=5000)
         for name, axis in (('xresolution', 'X'),
                            ('yresolution', 'Y'),
                            ('zresolution', 'Z')):
@@ -282,56 +363,66 @@ class QProscan(QPollingMixin, QSerialInstrument):
                 name,
                 getter=lambda a=axis: self.getValue(f'RES,{a}', float),
                 setter=None,
-                ptype=float)
+                ptype=float, poll_ms=60000)
         self.registerProperty(
             'upr',
             getter=lambda: self.getValue('UPR', float),
             setter=lambda v: self.expect(f'UPR,{float(v)}', '0'),
-            ptype=float)
+            ptype=float, poll_ms=60000)
         self.registerProperty(
             'zupr',
             getter=lambda: self.getValue('ZUPR', float),
             setter=lambda v: self.expect(f'ZUPR,{float(v)}', '0'),
-            ptype=float)
+            ptype=float, poll_ms=60000)
         self.registerProperty(
             'flip',
             getter=lambda: self._flip,
             setter=self._set_flip,
-            ptype=bool)
+            ptype=bool, poll_ms=5000)
         self.registerProperty(
             'mirror',
             getter=lambda: self._mirror,
             setter=self._set_mirror,
-            ptype=bool)
+            ptype=bool, poll_ms=5000)
         self.registerProperty(
             'moving',
             getter=lambda: bool(self.status() & 0xF),
             setter=None,
-            ptype=bool)
+            ptype=bool, poll_ms=1000)
+        self.registerProperty(
+            'position',
+            getter=lambda: self.position(),
+            setter=None,
+            ptype=object, poll_priority=2)
         self.registerProperty(
             'limits',
-            getter=lambda: self.active_limits(),
+            getter=lambda: self._readLimits(),
             setter=None,
-            ptype=object)
+            ptype=object, poll_priority=1)
 
-    def receive(self, **kwargs) -> str:
+    def receive(self, **kwargs) -> str | bytes:
         '''Return the next response line, handling E18 queue-full errors.
 
         If the controller returns ``E18`` (command queue full), logs a
-        warning and returns an empty string so that all callers treat
-        the response as a failed read.
+        warning and returns an empty response so that all callers treat
+        it as a failed read.
 
         Returns
         -------
-        str
-            Response string, or ``''`` on timeout or E18.
+        str | bytes
+            Response, or an empty one on timeout or E18.
         '''
         response = super().receive(**kwargs)
-        if response == 'E18':
+        if response in ('E18', b'E18'):
             logger.warning('controller queue full (E18)')
-            return ''
+            return response[:0]
         return response
 
+    def _stepsize(self) -> float | None:
+        '''Return the x step size [µm], or None if the reply is invalid.'''
+        values = self.getValues('X', self.STEPSIZE)
+        return None if values is None else values[0]
+
     def identify(self) -> bool:
         '''Return True if the device responds to ``COMP,0`` with ``'0'``.
 
@@ -349,26 +440,6 @@ class QProscan(QPollingMixin, QSerialInstrument):
         '''Return the 3-character firmware version string.'''
         return self.handshake('VERSION')
 
-    def _poll(self) -> None:
-        '''Query position and limit switches, emitting both signals.
-
-        Overrides :meth:`QPollingMixin._poll` to batch the two most
-        time-sensitive reads — stage position and active limits — into
-        a single poll cycle.  Position is emitted via
-        :attr:`positionChanged`; limits via :attr:`limitsChanged`.
-        Parse errors are logged at DEBUG level and skipped without
-        stopping the loop.
-        '''
-        if not getattr(self, '_polling', False):
-            return
-        try:
-            self.position()
-            self.limitsChanged.emit(self.active_limits())
-        except (ValueError, TypeError) as exc:
-            logger.debug('poll error: %s', exc)
-        if getattr(self, '_polling', False):
-            QtCore.QTimer.singleShot(self.POLL_INTERVAL, self._poll)
-
     def position(self) -> list[int]:
         '''Return the current stage position and emit :attr:`positionChanged`.
 
@@ -377,8 +448,16 @@ class QProscan(QPollingMixin, QSerialInstrument):
         list[int]
             ``[x, y, z]`` coordinates of the current stage position
             in µm.
+
+        Raises
+        ------
+        ValueError
+            If the reply cannot be parsed.
         '''
-        pos = list(map(int, self.handshake('P').split(',')))
+        values = self.getValues('P', self.POSITION)
+        if values is None:
+            raise ValueError('Could not parse position')
+        pos = list(values)
         self.positionChanged.emit(pos)
         return pos
 
@@ -435,7 +514,7 @@ class QProscan(QPollingMixin, QSerialInstrument):
         '''
         cmd = 'GR' if relative else 'G'
         coords = ','.join(map(str, position))
-        return self.expect(f'{cmd},{coords}', 'R')
+        return self._move(f'{cmd},{coords}')
 
     def move_to_origin(self) -> bool:
         '''Move the stage to the coordinate origin.
@@ -445,7 +524,7 @@ class QProscan(QPollingMixin, QSerialInstrument):
         bool
             True once the controller acknowledges the motion command.
         '''
-        return self.expect('M', 'R')
+        return self._move('M')
 
     @QtCore.Slot(object)
     def set_velocity(self, velocity: list[float]) -> None:
@@ -460,18 +539,22 @@ class QProscan(QPollingMixin, QSerialInstrument):
             ``[vx, vy]`` velocity components in µm/s.
         '''
         v = ','.join(map(str, velocity))
-        self.expect(f'VS,{v}', 'R')
+        self._move(f'VS,{v}')
 
     @QtCore.Slot()
     def stop(self) -> bool:
         '''Stop all stage and focus motion immediately.
 
+        Also ends a running :meth:`run_trajectory` and cancels
+        :meth:`watchMotion` and :meth:`waitForMotion`.
+
         Returns
         -------
         bool
             True once the controller acknowledges the stop command.
         '''
-        return self.expect('I', 'R')
+        self._cancelMotion()
+        return self._move('I')
 
     def status(self) -> int:
         '''Return the raw controller status word.
@@ -483,6 +566,129 @@ class QProscan(QPollingMixin, QSerialInstrument):
         '''
         return self.getValue('$', int)
 
+    def _moving(self) -> bool:
+        '''Return True unless the status word reports the stage at rest.'''
+        status = self.status()
+        return status is None or bool(status & 0xF)
+
+    def watchMotion(self, timeout: int | None = None) -> None:
+        '''Emit :attr:`motionFinished` when the stage comes to rest.
+
+        Queries the ``$`` status word, the shortest query the
+        controller answers, every :attr:`MOTION_POLL_MIN` ms at first
+        and then at intervals that double up to
+        :attr:`MOTION_POLL_MAX` ms.  A move that ends quickly is
+        therefore seen within a few milliseconds, while a long move
+        costs only a few queries per second.  The queries are driven
+        by the event loop of the instrument's thread, so other
+        requests, including :meth:`stop`, are served in between.
+
+        Must be called on the instrument's thread.  A new call
+        replaces a watch that is still running.
+
+        Parameters
+        ----------
+        timeout : int or None, optional
+            Milliseconds after which :attr:`motionFinished` reports
+            ``False``.  Default: :attr:`MOTION_TIMEOUT`.
+        '''
+        timeout = self.MOTION_TIMEOUT if timeout is None else timeout
+        self._motionWatch += 1
+        self._motionWatching = True
+        self._checkMotion(self._motionWatch,
+                          time.monotonic() + timeout / 1000.,
+                          self.MOTION_POLL_MIN)
+
+    def _checkMotion(self, watch: int, deadline: float,
+                     interval: int) -> None:
+        if watch != self._motionWatch:
+            return
+        if not self._moving():
+            self._finishMotion(True)
+        elif time.monotonic() >= deadline:
+            logger.warning('stage still moving after timeout')
+            self._finishMotion(False)
+        else:
+            following = min(2 * interval, self.MOTION_POLL_MAX)
+            QtCore.QTimer.singleShot(interval, lambda: self._checkMotion(
+                watch, deadline, following))
+
+    def _finishMotion(self, arrived: bool) -> None:
+        self._motionWatch += 1
+        self._motionWatching = False
+        self.motionFinished.emit(arrived)
+
+    def _cancelMotion(self) -> None:
+        '''End any trajectory and motion wait in progress.'''
+        self._endTrajectory()
+        if self._motionWatching:
+            self._finishMotion(False)
+        else:
+            self._motionWatch += 1
+
+    def waitForMotion(self, timeout: int | None = None) -> bool:
+        '''Block until the stage comes to rest.
+
+        Called from another thread, e.g. a script driving a stage on
+        its worker, this starts :meth:`watchMotion` on the
+        instrument's thread and waits for :attr:`motionFinished`.
+        Called on the instrument's own thread, it runs
+        :meth:`watchMotion` in a local :class:`QEventLoop` that exits
+        on :attr:`motionFinished`, so queued requests are still
+        served while it waits.  Either way, :meth:`stop` cancels the
+        wait, including a :meth:`stop` queued from another thread.
+
+        Parameters
+        ----------
+        timeout : int or None, optional
+            Longest wait in milliseconds.
+            Default: :attr:`MOTION_TIMEOUT`.
+
+        Returns
+        -------
+        bool
+            True if the stage is at rest; False if the wait was
+            cancelled or timed out.
+        '''
+        timeout = self.MOTION_TIMEOUT if timeout is None else timeout
+        if QtCore.QThread.currentThread() is not self.thread():
+            return self._waitForWatch(timeout)
+        loop = QtCore.QEventLoop()
+        result = []
+
+        def finished(arrived: bool) -> None:
+            result.append(arrived)
+            loop.quit()
+
+        self.motionFinished.connect(
+            finished, QtCore.Qt.ConnectionType.DirectConnection)
+        try:
+            self.watchMotion(timeout)
+            if not result:
+                loop.exec()
+        finally:
+            self.motionFinished.disconnect(finished)
+        return bool(result and result[0])
+
+    def _waitForWatch(self, timeout: int) -> bool:
+        done = threading.Event()
+        result = []
+
+        def finished(arrived: bool) -> None:
+            result.append(arrived)
+            done.set()
+
+        self.motionFinished.connect(
+            finished, QtCore.Qt.ConnectionType.DirectConnection)
+        self._watchRequested.connect(self.watchMotion)
+        try:
+            self._watchRequested.emit(timeout)
+            done.wait(timeout / 1000. + 1.)
+        finally:
+            self._watchRequested.disconnect(self.watchMotion)
+            self.motionFinished.disconnect(finished)
+        return bool(result and result[0])
+
     @QtCore.Slot()
     def emergency_stop(self) -> bool:
         '''Stop all stage and focus motion immediately without deceleration.
@@ -495,7 +701,7 @@ class QProscan(QPollingMixin, QSerialInstrument):
         bool
             True if the controller acknowledged the command.
         '''
-        return self.expect('K', 'R')
+        return self._move('K')
 
     def triggered_limits(self) -> tuple[bool, bool, bool, bool] | None:
         '''Return per-axis limit switches triggered since the last read.
@@ -526,6 +732,12 @@ class QProscan(QPollingMixin, QSerialInstrument):
         '''
         return self._parse_limits(int(self.handshake('LMT'), 16))
 
+    def _readLimits(self) -> tuple[bool, bool, bool, bool] | None:
+        '''Return :meth:`active_limits` and emit :attr:`limitsChanged`.'''
+        limits = self.active_limits()
+        self.limitsChanged.emit(limits)
+        return limits
+
     def _parse_limits(self, raw: int) -> tuple[bool, bool, bool, bool] | None:
         if raw == 0:
             return None
@@ -534,27 +746,193 @@ class QProscan(QPollingMixin, QSerialInstrument):
 
     def stepLeft(self) -> bool:
         '''Step the stage one increment in the −X direction.'''
-        return self.expect('L', 'R')
+        return self._move('L')
 
     def stepRight(self) -> bool:
         '''Step the stage one increment in the +X direction.'''
-        return self.expect('R', 'R')
+        return self._move('R')
 
     def stepForward(self) -> bool:
         '''Step the stage one increment in the +Y direction.'''
-        return self.expect('F', 'R')
+        return self._move('F')
 
     def stepBackward(self) -> bool:
         '''Step the stage one increment in the −Y direction.'''
-        return self.expect('B', 'R')
+        return self._move('B')
 
     def stepUp(self) -> bool:
         '''Step the focus drive one increment upward.'''
-        return self.expect('U', 'R')
+        return self._move('U')
 
     def stepDown(self) -> bool:
         '''Step the focus drive one increment downward.'''
-        return self.expect('D', 'R')
+        return self._move('D')
+
+    def _move(self, command: str) -> bool:
+        '''Send a motion *command* and resume fast polling.
+
+        The command is sent once: a late acknowledgement means that
+        the controller has already started the move, and sending a
+        relative move again would move the stage twice.
+
+        Returns
+        -------
+        bool
+            True once the controller acknowledges the command.
+        '''
+        self.resetPollInterval()
+        return self.expect(command, 'R', retry=False)
+
+    @QtCore.Slot(object)
+    def run_trajectory(self,
+                       points,
+                       dwell: float = 0.,
+                       callback: Callable | None = None,
+                       tolerance: float = 1.) -> bool:
+        '''Move the stage through a sequence of points.
+
+        Absolute ``G`` moves are streamed to the controller so that up
+        to :attr:`QUEUE_DEPTH` of them are queued at a time, and the
+        stage runs from one point to the next without waiting for the
+        host.  Arrival at each point is detected by polling the
+        position, starting every :attr:`MOTION_POLL_MIN` ms after
+        each arrival and backing off to :attr:`MOTION_POLL_MAX` ms.
+        Each arrival is announced by :attr:`pointReached`; a point
+        the stage passed between two position reads is stamped with
+        the time of the read that found it further on.
+
+        With a *dwell* time or a *callback*, the stage instead stops
+        at every point: one move is sent at a time and arrival is
+        detected with the cheaper ``$`` status query.  The callback
+        runs when the stage has come to rest, e.g. to trigger an
+        acquisition, and the next move is sent *dwell* seconds later.
+
+        The trajectory runs on the instrument's thread, driven by its
+        event loop, so call this method there (e.g. through a queued
+        signal).  It returns at once; :attr:`trajectoryFinished`
+        reports the arrival times.  :meth:`stop` ends the trajectory.
+
+        Parameters
+        ----------
+        points : array_like
+            Array of shape ``(N, 2)`` of ``[x, y]`` or ``(N, 3)`` of
+            ``[x, y, z]`` coordinates in µm.
+        dwell : float, optional
+            Seconds to rest at each point.  Default: ``0``.
+        callback : callable or None, optional
+            Called as ``callback(index, point)`` at each point.
+            Default: ``None``.
+        tolerance : float, optional
+            Largest distance [µm] on any axis from a point at which
+            the stage counts as having arrived.  Default: ``1``.
+
+        Returns
+        -------
+        bool
+            True if the trajectory started.
+
+        Raises
+        ------
+        ValueError
+            If *points* does not have shape ``(N, 2)`` or ``(N, 3)``.
+        '''
+        points = np.asarray(points)
+        if points.ndim != 2 or points.shape[1] not in (2, 3):
+            raise ValueError('points must have shape (N, 2) or (N, 3), '
+                             f'not {points.shape}')
+        self._endTrajectory()
+        if not len(points):
+            self.trajectoryFinished.emit(np.empty(0))
+            return False
+        pause = dwell > 0 or callback is not None
+        self._trajectory = _Trajectory(
+            points, 1 if pause else max(1, self.QUEUE_DEPTH),
+            dwell, callback, tolerance, self.MOTION_POLL_MIN)
+        self._stepTrajectory(self._trajectory)
+        return True
+
+    def _stepTrajectory(self, state: _Trajectory) -> None:
+        '''Advance the trajectory *state*: queue moves, look for arrivals.'''
+        if state is not self._trajectory:
+            return
+        try:
+            if not self._queueMoves(state):
+                return
+            found = self._arrivals(state)
+        except (ValueError, TypeError) as exc:
+            logger.warning(f'trajectory stopped: {exc}')
+            self._endTrajectory()
+            return
+        if state is not self._trajectory:
+            return
+        if found is None:
+            state.interval = min(2 * state.interval, self.MOTION_POLL_MAX)
+            QtCore.QTimer.singleShot(
+                state.interval, lambda: self._stepTrajectory(state))
+            return
+        now = time.monotonic()
+        for index in range(state.reached, found + 1):
+            state.arrivals[index] = now
+            self.pointReached.emit(index, now)
+        state.reached = found + 1
+        state.interval = self.MOTION_POLL_MIN
+        if state.callback is not None:
+            state.callback(found, state.points[found])
+        if state.reached == len(state.points):
+            self._endTrajectory()
+            return
+        delay = round(1000. * state.dwell)
+        QtCore.QTimer.singleShot(delay, lambda: self._stepTrajectory(state))
+
+    def _queueMoves(self, state: _Trajectory) -> bool:
+        '''Send moves until :attr:`_Trajectory.depth` are in flight.
+
+        Returns
+        -------
+        bool
+            False if the trajectory had to be abandoned.
+        '''
+        while (state.sent < len(state.points) and
+               state.sent - state.reached < state.depth):
+            if self.move_to(state.points[state.sent].tolist()):
+                state.sent += 1
+                continue
+            inflight = state.sent - state.reached
+            if not inflight:
+                logger.warning(f'trajectory stopped: move {state.sent} '
+                               'was not acknowledged')
+                self._endTrajectory()
+                return False
+            state.depth = inflight
+            logger.debug(f'trajectory queue depth lowered to {inflight}')
+            break
+        return True
+
+    def _arrivals(self, state: _Trajectory) -> int | None:
+        '''Return the index of the furthest point reached, if any.'''
+        if state.depth == 1:
+            if self._moving():
+                return None
+            return state.reached
+        position = np.asarray(self.position()[:state.points.shape[1]])
+        pending = state.points[state.reached:state.sent]
+        near = np.all(np.abs(pending - position) <= state.tolerance, axis=1)
+        if near.any():
+            return state.reached + int(np.argmax(near))
+        if state.last is not None and np.array_equal(position, state.last):
+            if not self._moving():
+                logger.warning(f'trajectory stopped: stage at rest at '
+                               f'{position.tolist()} before point '
+                               f'{state.reached}')
+                self._endTrajectory()
+        state.last = position
+        return None
+
+    def _endTrajectory(self) -> None:
+        '''Finish the running trajectory, if any.'''
+        state, self._trajectory = self._trajectory, None
+        if state is not None:
+            self.trajectoryFinished.emit(state.arrivals)
 
     def description(self) -> list[str]:
         '''Return lines of hardware description from the controller.'''
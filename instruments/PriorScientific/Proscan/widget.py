@@ -4,6 +4,7 @@ import logging
 from pathlib import Path
 from qtpy import QtCore
 from QInstrument.lib.QInstrumentWidget import QInstrumentWidget
+from QInstrument.lib.QVelocityStreamer import QVelocityStreamer
 from QInstrument.instruments.PriorScientific.Proscan.instrument import QProscan
 
 
@@ -22,11 +23,19 @@ class QProscanWidget(QInstrumentWidget):
 
     Position displays turn red when the corresponding axis limit switch
     is active.
+
+    Joystick deflection reaches the stage through a
+    :class:`QVelocityStreamer`, which sends the latest velocity at a
+    fixed control rate and a zero velocity as soon as the joystick is
+    released or the widget is closed.
     '''
 
     UIFILE = str(Path(__file__).parent / 'ProscanWidget.ui')
     INSTRUMENT = QProscan
     HARDWARE_DOMINANT = True
+    SUBSCRIPTIONS = ('position', 'limits')
+    VELOCITY_DEADBAND: float = 1.
+    '''Smallest joystick velocity change sent to the stage [µm/s].'''
 
     def __init__(self, *args,
                  interval: int | None = None, **kwargs) -> None:
@@ -45,6 +54,8 @@ class QProscanWidget(QInstrumentWidget):
 
     def _connectSignals(self) -> None:
         super()._connectSignals()
+        self._streamer = QVelocityStreamer(
+            self.device, deadband=self.VELOCITY_DEADBAND, parent=self)
         self.joystick.positionChanged.connect(self._updateVelocity)
         self.joystick.stepped.connect(self._onStep)
         self.zdial.stepUp.connect(self.device.stepUp)
@@ -59,9 +70,7 @@ class QProscanWidget(QInstrumentWidget):
     def _firstShow(self) -> None:
         super()._firstShow()
         self.device.POLL_INTERVAL = self._interval
-        QtCore.QMetaObject.invokeMethod(
-            self.device, 'startPolling',
-            QtCore.Qt.ConnectionType.QueuedConnection)
+        self._startPolling()
 
     @QtCore.Slot(bool)
     def _onAdvancedToggled(self, checked: bool) -> None:
@@ -114,7 +123,14 @@ class QProscanWidget(QInstrumentWidget):
     def _updateVelocity(self, velocity: object) -> None:
         '''Forward joystick position to the stage as a velocity command.'''
         logger.debug(f'velocity: {velocity}')
-        self.device.set_velocity(velocity)
+        self._streamer.setVelocity(velocity)
+
+    def closeEvent(self, event: object) -> None:
+        '''Bring the stage to rest before the worker thread stops.'''
+        streamer = getattr(self, '_streamer', None)
+        if streamer is not None:
+            streamer.stop()
+        super().closeEvent(event)
 
 
 __all__ = ['QProscanWidget']
@@ -1,3 +1,4 @@
+from qtpy import QtCore
 from QInstrument.lib.QFakeInstrument import QFakeInstrument
 from QInstrument.instruments.StanfordResearch.DS345.instrument import QDS345
 
@@ -5,9 +6,9 @@ from QInstrument.instruments.StanfordResearch.DS345.instrument import QDS345
 class QFakeDS345(QFakeInstrument, QDS345):
     '''Fake DS345 for UI development without hardware.
 
-    All standard properties are backed by an in-memory store via
-    ``QFakeInstrument._register()``.  Two properties are re-registered
-    after the parent registration runs:
+    All command-map properties are backed by an in-memory store via
+    ``QFakeInstrument._queryCommands()`` and ``_writeCommand()``.  Two
+    properties are re-registered per instance:
 
     - ``amplitude``: the real instrument uses a non-standard response
       format (``'1.000VP'``), so the fake uses a plain float store entry.
@@ -16,8 +17,10 @@ class QFakeDS345(QFakeInstrument, QDS345):
       so that the amplitude widget reflects the muted/unmuted state.
     '''
 
+    uploadProgress = QtCore.Signal(int, int)
+
     def _registerProperties(self) -> None:
-        QDS345._registerProperties(self)
+        super()._registerProperties()
         self.registerProperty('amplitude',
                               getter=lambda: self._store.get('amplitude', 1.),
                               setter=lambda v: self._store.__setitem__('amplitude', float(v)))
@@ -36,7 +39,8 @@ class QFakeDS345(QFakeInstrument, QDS345):
 
         self.registerProperty('mute', ptype=bool,
                               getter=lambda: self._muted,
-                              setter=_mute_setter)
+                              setter=_mute_setter,
+                              after=('amplitude',))
 
     def identify(self) -> bool:
         return True
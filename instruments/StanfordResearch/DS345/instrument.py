@@ -1,13 +1,18 @@
 import logging
 import numpy as np
 from numpy.typing import ArrayLike
+from qtpy import QtCore
+from QInstrument.lib.PropertySpec import PropertySpec
 from QInstrument.lib.QSerialInstrument import QSerialInstrument
+from QInstrument.lib.QCommandMapMixin import QCommandMapMixin, Command
+from QInstrument.instruments.StanfordResearch.DS345 import waveforms
+from QInstrument.instruments.StanfordResearch.DS345.waveforms import Waveform
 
 
 logger = logging.getLogger(__name__)
 
 
-class QDS345(QSerialInstrument):
+class QDS345(QCommandMapMixin, QSerialInstrument):
     '''SRS DS345 Function Generator
 
     Properties
@@ -96,8 +101,29 @@ class QDS345(QSerialInstrument):
     sampling_frequency: float [Hz]
         Sampling rate for arbitrary waveform playback.
         Range: 1 mHz – 40 MHz
+
+    Signals
+    =======
+    uploadProgress(int, int)
+        Emitted by :meth:`load_waveform` and
+        :meth:`amplitude_modulation` after each chunk of an upload,
+        with the number of bytes sent and the total.
     '''
 
+    uploadProgress = QtCore.Signal(int, int)
+
+    ARB_POINTS: int = waveforms.ARB_POINTS
+    '''Largest arbitrary waveform [points].'''
+
+    AM_POINTS: int = waveforms.AM_POINTS
+    '''Largest arbitrary modulation waveform [points].'''
+
+    UPLOAD_CHUNK: int = 256
+    '''Bytes sent between progress reports and cancellation checks.'''
+
+    UPLOAD_TIMEOUT: int = 2000
+    '''Longest wait [ms] for one chunk to leave the serial port.'''
+
     comm = dict(baudRate=QSerialInstrument.BaudRate.Baud9600,
                 dataBits=QSerialInstrument.DataBits.Data8,
                 stopBits=QSerialInstrument.StopBits.TwoStop,
@@ -105,42 +131,48 @@ class QDS345(QSerialInstrument):
                 flowControl=QSerialInstrument.FlowControl.NoFlowControl,
                 eol='\n')
 
-    def _registerProperties(self) -> None:
-        '''Register all instrument properties via ``registerProperty()``.
-
-        Called automatically by ``QAbstractInstrument.__init__``. Subclasses
-        that extend the property set should call
-        ``super()._registerProperties()`` first.
-        '''
-        self._muted: bool = False
-        self._saved_amplitude: float
-        register = self.registerProperty
-        register('amplitude',
-                 getter=lambda: float(self.handshake('AMPL?')[:-4]),
-                 setter=lambda v: self.transmit(f'AMPL {float(v)}VP'))
-        register('mute', ptype=bool,
-                 getter=lambda: self._muted,
-                 setter=self._setMute)
-        self._register('frequency',              'FREQ')
-        self._register('offset',                 'OFFS')
-        self._register('phase',                  'PHSE')
-        self._register('sampling_frequency',     'FSMP')
-        self._register('waveform',               'FUNC', int)
-        self._register('invert',                 'INVT', bool)
-        self._register('modulation',             'MENA', bool)
-        self._register('modulation_type',        'MTYP', int)
-        self._register('modulation_waveform',    'MDWF', int)
-        self._register('modulation_rate',        'RATE')
-        self._register('burst_count',            'BCNT', int)
-        self._register('am_depth',               'DPTH', int)
-        self._register('fm_span',                'FDEV')
-        self._register('pm_span',                'PDEV')
-        self._register('sweep_span',             'SPAN')
-        self._register('sweep_center_frequency', 'SPCF')
-        self._register('sweep_start_frequency',  'STFR')
-        self._register('sweep_stop_frequency',   'SPFR')
-        self._register('trigger_rate',           'TRAT')
-        self._register('trigger_source',         'TSRC', int)
+    TIMEOUTS = {'*RST': 1000}
+    '''Slow commands: a reset reloads the default settings.'''
+
+    _muted: bool = False
+    _saved_amplitude: float
+    _uploads: dict[str, bytes] = {}
+    _uploadCancelled: bool = False
+
+    PROPERTIES = (
+        PropertySpec('amplitude',
+                     getter=lambda inst: float(inst.handshake('AMPL?')[:-4]),
+                     setter=lambda inst, v: inst.transmit(
+                         f'AMPL {float(v)}VP')),
+        PropertySpec('mute', ptype=bool,
+                     getter=lambda inst: inst._muted,
+                     setter=lambda inst, v: inst._setMute(v),
+                     after=('amplitude',)),
+    )
+
+    COMMANDS = (
+        Command('frequency',              'FREQ', float, 1e-6, 30.2e6),
+        Command('offset',                 'OFFS', float, -5., 5.),
+        Command('phase',                  'PHSE', float, 0., 7199.999),
+        Command('sampling_frequency',     'FSMP', float, 1e-3, 40e6),
+        Command('waveform',               'FUNC', int,   0, 5),
+        Command('invert',                 'INVT', bool),
+        Command('modulation',             'MENA', bool,
+                after=('modulation_type', 'modulation_waveform')),
+        Command('modulation_type',        'MTYP', int,   0, 5),
+        Command('modulation_waveform',    'MDWF', int,   0, 6),
+        Command('modulation_rate',        'RATE', float, 1e-3, 1e4),
+        Command('burst_count',            'BCNT', int,   1, 30000),
+        Command('am_depth',               'DPTH', int,   -100, 100),
+        Command('fm_span',                'FDEV', float, 0.),
+        Command('pm_span',                'PDEV', float, 0., 7199.999),
+        Command('sweep_span',             'SPAN'),
+        Command('sweep_center_frequency', 'SPCF', float, 0., 30.2e6),
+        Command('sweep_start_frequency',  'STFR', float, 0., 30.2e6),
+        Command('sweep_stop_frequency',   'SPFR', float, 0., 30.2e6),
+        Command('trigger_rate',           'TRAT', float, 1e-3, 1e4),
+        Command('trigger_source',         'TSRC', int,   0, 4),
+    )
 
     def _registerMethods(self) -> None:
         '''Register all instrument methods via ``registerMethod()``.
@@ -151,30 +183,6 @@ class QDS345(QSerialInstrument):
         self.registerMethod('reset', self.reset)
         self.registerMethod('trigger', self.trigger)
 
-    def _register(self, name: str, cmd: str, dtype: type = float) -> None:
-        '''Register a standard instrument property.
-
-        Builds getter and setter from the DS345 command convention:
-        query is ``cmd + '?'``, set is ``cmd + value``. Bool properties
-        are transmitted as integers (0/1) per the instrument protocol.
-
-        Parameters
-        ----------
-        name : str
-            Property name passed to ``registerProperty``.
-        cmd : str
-            DS345 command mnemonic (e.g. ``'FREQ'``).
-        dtype : type, optional
-            Value type: ``float`` (default), ``int``, or ``bool``.
-        '''
-        if dtype is bool:
-            def getter(): return bool(self.getValue(f'{cmd}?', int))
-            def setter(v): return self.transmit(f'{cmd}{int(bool(v))}')
-        else:
-            def getter(): return self.getValue(f'{cmd}?', dtype)
-            def setter(v): return self.transmit(f'{cmd}{dtype(v)}')
-        self.registerProperty(name, getter=getter, setter=setter, ptype=dtype)
-
     def identify(self) -> bool:
         '''Return True if the connected device identifies as a DS345.
 
@@ -185,6 +193,7 @@ class QDS345(QSerialInstrument):
 
     def reset(self) -> None:
         '''Reset the DS345 to its factory default settings.'''
+        self.clearUploadCache()
         self.transmit('*RST')
 
     def trigger(self) -> None:
@@ -234,54 +243,162 @@ class QDS345(QSerialInstrument):
         '''Set output amplitude and offset to ECL levels.'''
         self.transmit('AECL')
 
-    def load_waveform(self, waveform: ArrayLike) -> None:
+    def load_waveform(self, waveform: ArrayLike | Waveform,
+                      force: bool = False) -> bool:
         '''Load an arbitrary waveform into the DS345.
 
+        The upload is skipped if the same waveform is already loaded
+        (see :meth:`clearUploadCache`).
+
         Parameters
         ----------
-        waveform : ArrayLike
-            Up to 16300 samples. Values are clipped and rounded to
-            the range [-2048, 2047] before transmission.
+        waveform : ArrayLike or Waveform
+            Up to :attr:`ARB_POINTS` samples. Values are clipped and
+            rounded to the range [-2048, 2047] before transmission.
+            A :class:`Waveform` for the ``'waveform'`` slot, e.g. from
+            the generators in :mod:`.waveforms`, is sent as it is.
+        force : bool, optional
+            True: upload even if the waveform is already loaded.
+            Default: False.
+
+        Returns
+        -------
+        bool
+            True if the waveform is loaded.
         '''
-        data = np.asarray(waveform)
-        npts = len(data)
-        if npts > 16300:
-            logger.error('waveform can contain at most 16300 points')
-            return
+        waveform = self._waveform(waveform, 'waveform', 1.)
+        if waveform is None:
+            return False
+        if self._isUploaded(waveform, force):
+            return True
+        npts = len(waveform)
         if not self.expect(f'LDWF?0,{npts}', '1'):
             logger.error(f'Not able to load waveform of length {npts}.')
-            return
-        data = np.clip(np.round(data), -2048, 2047).astype('>i2')
-        checksum = (np.sum(data) & 0xFFFF).astype('>i2')
-        data = np.append(data, checksum)
-        self.transmit(data.tobytes())
+            return False
+        return self._upload(waveform)
 
-    def amplitude_modulation(self, waveform: ArrayLike) -> None:
+    def amplitude_modulation(self, waveform: ArrayLike | Waveform,
+                             force: bool = False) -> bool:
         '''Load an arbitrary amplitude modulation waveform.
 
         Configures the instrument for arbitrary AM and uploads the
-        waveform. Modulation is enabled on completion.
+        waveform, unless it is already loaded (see
+        :meth:`clearUploadCache`). Modulation is enabled on
+        completion.
 
         Parameters
         ----------
-        waveform : ArrayLike
-            Up to 10000 samples normalized to [-1, 1], where -1 is
-            full off and +1 is full on.
+        waveform : ArrayLike or Waveform
+            Up to :attr:`AM_POINTS` samples normalized to [-1, 1],
+            where -1 is full off and +1 is full on, or a
+            :class:`Waveform` for the ``'modulation'`` slot, e.g. from
+            :func:`.waveforms.am_envelope`.
+        force : bool, optional
+            True: upload even if the waveform is already loaded.
+            Default: False.
+
+        Returns
+        -------
+        bool
+            True if modulation was enabled.
         '''
-        data = np.asarray(waveform)
-        if len(data) > 10000:
-            logger.error('waveform can contain at most 10000 points')
-            return
-        signal = np.round(32767. * data).astype('>i2')
-        checksum = (np.sum(signal) & 0xFFFF).astype('>i2').tobytes()
+        waveform = self._waveform(waveform, 'modulation', None)
+        if waveform is None:
+            return False
         self.transmit('MENA0')
         self.transmit('MTYP2')
         self.transmit('MDWF5')
-        self.transmit(f'AMOD?{len(signal)}')
-        self.receive()
-        self.transmit(signal.tobytes())
-        self.transmit(checksum)
+        if not self._isUploaded(waveform, force):
+            self.transmit(f'AMOD?{len(waveform)}')
+            self.receive()
+            if not self._upload(waveform):
+                return False
         self.transmit('MENA1')
+        return True
+
+    @staticmethod
+    def _waveform(waveform: ArrayLike | Waveform, slot: str,
+                  scale: float | None) -> Waveform | None:
+        '''Return *waveform* as a :class:`Waveform` for *slot*.
+
+        Raises
+        ------
+        ValueError
+            If *waveform* is a :class:`Waveform` for another slot.
+        '''
+        if isinstance(waveform, Waveform):
+            if waveform.slot != slot:
+                raise ValueError(f'Expected a {slot} Waveform, '
+                                 f'not {waveform.slot}')
+            return waveform
+        try:
+            return Waveform(waveform, slot, scale)
+        except ValueError as exc:
+            logger.error(str(exc))
+            return None
+
+    def clearUploadCache(self) -> None:
+        '''Forget which waveforms are loaded, so the next ones are sent.
+
+        Call this if the instrument may have lost its waveform memory
+        behind our back, e.g. after a power cycle.
+        '''
+        self._uploads = {}
+
+    def cancelUpload(self) -> None:
+        '''Cancel the upload in progress.
+
+        The DS345 reads a fixed number of points once an upload has
+        started, so the rest of the upload is replaced by zeros with a
+        checksum that makes the instrument discard the waveform.  Only
+        sets a flag, so it may be called from any thread.
+        '''
+        self._uploadCancelled = True
+
+    def _isUploaded(self, waveform: Waveform, force: bool) -> bool:
+        if force or self._uploads.get(waveform.slot) != waveform.digest:
+            return False
+        logger.debug(f'{waveform.slot} already loaded; upload skipped')
+        return True
+
+    def _upload(self, waveform: Waveform) -> bool:
+        '''Send *waveform* in chunks, reporting progress.
+
+        Returns
+        -------
+        bool
+            False if the upload was cancelled.
+        '''
+        slot = waveform.slot
+        self._uploads = {k: v for k, v in self._uploads.items()
+                         if k != slot}
+        self._uploadCancelled = False
+        raw = waveform.data
+        total = len(raw)
+        for start in range(0, total, self.UPLOAD_CHUNK):
+            if self._uploadCancelled:
+                logger.warning(f'{slot} upload cancelled')
+                self._abandonUpload(waveform.buffer, start // 2)
+                return False
+            self.transmit(raw[start:start + self.UPLOAD_CHUNK])
+            self._drain()
+            self.uploadProgress.emit(
+                min(start + self.UPLOAD_CHUNK, total), total)
+        self._uploads = {**self._uploads, slot: waveform.digest}
+        return True
+
+    def _abandonUpload(self, buffer: np.ndarray, sent: int) -> None:
+        '''Complete a cancelled upload with zeros and a bad checksum.'''
+        tail = np.zeros(len(buffer) - sent, dtype=buffer.dtype)
+        tail[-1] = waveforms._word(buffer[:sent].sum(dtype=np.int64) + 1)
+        self.transmit(tail.tobytes())
+        self._drain()
+
+    def _drain(self) -> None:
+        '''Wait for transmitted bytes to leave the serial port.'''
+        interface = getattr(self, '_interface', None)
+        if interface is not None:
+            interface.waitForBytesWritten(self.UPLOAD_TIMEOUT)
 
 
 if __name__ == '__main__':
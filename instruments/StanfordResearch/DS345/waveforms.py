@@ -0,0 +1,313 @@
+import hashlib
+import numpy as np
+from numpy.typing import ArrayLike
+
+
+ARB_POINTS: int = 16300
+'''Largest arbitrary waveform [points].'''
+
+AM_POINTS: int = 10000
+'''Largest arbitrary modulation waveform [points].'''
+
+
+def _word(value: int) -> int:
+    '''Return the low 16 bits of *value* as a signed integer.'''
+    value = int(value) & 0xFFFF
+    return value - 0x10000 if value & 0x8000 else value
+
+
+def _pack(samples: np.ndarray, scale: float, low: int, high: int,
+          dtype: str) -> np.ndarray:
+    '''Quantize *samples* into an upload buffer.
+
+    Returns
+    -------
+    numpy.ndarray
+        16-bit array of *dtype* holding the samples, scaled by
+        *scale*, rounded and clipped to ``[low, high]``, followed by
+        their 16-bit checksum.
+    '''
+    buffer = np.empty(len(samples) + 1, dtype=dtype)
+    data = buffer[:-1]
+    scaled = np.multiply(samples, scale, dtype=float)
+    np.rint(scaled, out=scaled)
+    np.clip(scaled, low, high, out=scaled)
+    data[:] = scaled
+    buffer[-1] = _word(data.sum(dtype=np.int64))
+    return buffer
+
+
+class Waveform:
+    '''Quantized upload buffer for one DS345 waveform memory.
+
+    Holds the samples as 16-bit integers followed by their checksum,
+    exactly as they are sent to the instrument, so
+    :meth:`QDS345.load_waveform` and :meth:`QDS345.amplitude_modulation`
+    transmit the buffer without converting or copying it.  The buffer
+    is read-only, and its :attr:`digest` is computed once, so a
+    waveform that is uploaded repeatedly costs nothing to prepare.
+
+    Parameters
+    ----------
+    samples : array_like
+        One-dimensional samples, normalized to [-1, 1] unless *scale*
+        is given.
+    slot : str, optional
+        ``'waveform'`` for the arbitrary waveform (12-bit, up to
+        :data:`ARB_POINTS` points) or ``'modulation'`` for the
+        arbitrary AM table (16-bit, up to :data:`AM_POINTS` points).
+        Default: ``'waveform'``.
+    scale : float or None, optional
+        Factor applied before rounding.  Default: ``None``, which maps
+        [-1, 1] onto the full range of *slot*.
+
+    Raises
+    ------
+    ValueError
+        If *slot* is unknown, or *samples* is not one-dimensional or
+        has no points or too many.
+    '''
+
+    SLOTS = {'waveform':   (2047., -2048, 2047, '<i2', ARB_POINTS),
+             'modulation': (32767., -32767, 32767, '>i2', AM_POINTS)}
+    '''Full scale, range, wire format and point limit of each slot.'''
+
+    __slots__ = ('slot', 'buffer', '_digest')
+
+    def __init__(self, samples: ArrayLike,
+                 slot: str = 'waveform',
+                 scale: float | None = None) -> None:
+        if slot not in self.SLOTS:
+            raise ValueError(f'Unknown waveform slot: {slot}')
+        full, low, high, dtype, limit = self.SLOTS[slot]
+        samples = np.asarray(samples)
+        if samples.ndim != 1 or not 0 < len(samples) <= limit:
+            raise ValueError(f'{slot} needs 1 to {limit} points, '
+                             f'not shape {samples.shape}')
+        self.slot = slot
+        self.buffer = _pack(samples, full if scale is None else scale,
+                            low, high, dtype)
+        self.buffer.flags.writeable = False
+        self._digest = None
+
+    def __len__(self) -> int:
+        return len(self.buffer) - 1
+
+    @property
+    def samples(self) -> np.ndarray:
+        '''Quantized samples: a read-only view of :attr:`buffer`.'''
+        return self.buffer[:-1]
+
+    @property
+    def checksum(self) -> int:
+        '''16-bit checksum sent after the samples.'''
+        return int(self.buffer[-1])
+
+    @property
+    def data(self) -> memoryview:
+        '''Bytes to transmit: a view of :attr:`buffer`.'''
+        return memoryview(self.buffer).cast('B')
+
+    @property
+    def digest(self) -> bytes:
+        '''Hash of :attr:`buffer`, identifying the waveform.'''
+        if self._digest is None:
+            self._digest = hashlib.blake2b(
+                self.buffer, digest_size=16).digest()
+        return self._digest
+
+
+def _check(npts: int) -> None:
+    if not 0 < npts <= ARB_POINTS:
+        raise ValueError(f'npts must be 1 to {ARB_POINTS}, not {npts}')
+
+
+def _times(npts: int, rate: float) -> np.ndarray:
+    _check(npts)
+    return np.arange(npts) / rate
+
+
+def _shape(phase: np.ndarray, shape: str) -> np.ndarray:
+    '''Periodic *shape* in [-1, 1] of *phase* in cycles.'''
+    cycle = np.mod(phase, 1.)
+    if shape == 'sine':
+        return np.sin(2. * np.pi * cycle)
+    if shape == 'square':
+        return np.where(cycle < 0.5, 1., -1.)
+    if shape == 'triangle':
+        return 1. - 4. * np.abs(cycle - 0.5)
+    if shape == 'ramp':
+        return 2. * cycle - 1.
+    raise ValueError(f'Unknown shape: {shape}')
+
+
+def chirp(npts: int, rate: float, start: float, stop: float,
+          spacing: str = 'linear', phase: float = 0.) -> np.ndarray:
+    '''Return a sine wave whose frequency sweeps from *start* to *stop*.
+
+    Parameters
+    ----------
+    npts : int
+        Number of points.
+    rate : float
+        Sampling frequency [Hz] at which the waveform will be played.
+    start, stop : float
+        Instantaneous frequencies [Hz] at the first point and at the
+        end of the waveform.
+    spacing : str, optional
+        ``'linear'`` or ``'log'`` (exponential) frequency sweep.
+        Default: ``'linear'``.
+    phase : float, optional
+        Starting phase [degrees].  Default: ``0``.
+
+    Returns
+    -------
+    numpy.ndarray
+        Samples in [-1, 1].
+    '''
+    t = _times(npts, rate)
+    duration = npts / rate
+    if spacing == 'linear':
+        cycles = t * (start + 0.5 * (stop - start) * t / duration)
+    elif spacing == 'log':
+        if start <= 0 or stop <= 0:
+            raise ValueError('log chirp needs positive frequencies')
+        if start == stop:
+            cycles = start * t
+        else:
+            k = np.log(stop / start) / duration
+            cycles = start * np.expm1(k * t) / k
+    else:
+        raise ValueError(f'Unknown spacing: {spacing}')
+    return np.sin(2. * np.pi * cycles + np.radians(phase))
+
+
+def multitone(npts: int, rate: float, frequencies: ArrayLike,
+              amplitudes: ArrayLike | None = None,
+              phases: ArrayLike | None = None) -> np.ndarray:
+    '''Return a sum of sine waves, scaled to a peak of 1.
+
+    Parameters
+    ----------
+    npts : int
+        Number of points.
+    rate : float
+        Sampling frequency [Hz].
+    frequencies : array_like
+        Tone frequencies [Hz].
+    amplitudes : array_like or None, optional
+        Relative amplitude of each tone.  Default: all equal.
+    phases : array_like or None, optional
+        Phase of each tone [degrees].  Default: all zero.
+
+    Returns
+    -------
+    numpy.ndarray
+        Samples in [-1, 1].
+    '''
+    t = _times(npts, rate)
+    frequencies = np.atleast_1d(np.asarray(frequencies, dtype=float))
+    amplitudes = (np.ones_like(frequencies) if amplitudes is None else
+                  np.broadcast_to(amplitudes, frequencies.shape))
+    phases = (np.zeros_like(frequencies) if phases is None else
+              np.radians(np.broadcast_to(phases, frequencies.shape)))
+    tones = np.sin(2. * np.pi * np.outer(frequencies, t) + phases[:, None])
+    signal = amplitudes @ tones
+    peak = np.max(np.abs(signal))
+    return signal / peak if peak > 0 else signal
+
+
+def pulse_train(npts: int, rate: float, period: float, width: float,
+                delay: float = 0., low: float = -1.,
+                high: float = 1.) -> np.ndarray:
+    '''Return a train of rectangular pulses.
+
+    Parameters
+    ----------
+    npts : int
+        Number of points.
+    rate : float
+        Sampling frequency [Hz].
+    period : float
+        Pulse period [s].
+    width : float
+        Pulse width [s].
+    delay : float, optional
+        Start of the first pulse [s].  Default: ``0``.
+    low, high : float, optional
+        Levels between and during pulses.  Default: ``-1`` and ``1``.
+
+    Returns
+    -------
+    numpy.ndarray
+        Samples.
+    '''
+    t = _times(npts, rate)
+    return np.where(np.mod(t - delay, period) < width, high, low)
+
+
+def am_envelope(npts: int, rate: float, frequency: float,
+                depth: float = 1., shape: str = 'sine') -> np.ndarray:
+    '''Return an amplitude modulation table.
+
+    The carrier amplitude varies periodically between ``1 - depth``
+    and full scale.  The result is in the form that
+    :meth:`QDS345.amplitude_modulation` expects: -1 is full off and
+    +1 full on.
+
+    Parameters
+    ----------
+    npts : int
+        Number of points.
+    rate : float
+        Rate [Hz] at which the table is played.
+    frequency : float
+        Modulation frequency [Hz].
+    depth : float, optional
+        Modulation depth in [0, 1].  Default: ``1``.
+    shape : str, optional
+        ``'sine'``, ``'square'``, ``'triangle'`` or ``'ramp'``.
+        Default: ``'sine'``.
+
+    Returns
+    -------
+    numpy.ndarray
+        Samples in [-1, 1].
+    '''
+    t = _times(npts, rate)
+    envelope = 1. - depth * (1. - _shape(frequency * t, shape)) / 2.
+    return 2. * envelope - 1.
+
+
+def sweep(npts: int, start: float = -1., stop: float = 1.,
+          spacing: str = 'linear') -> np.ndarray:
+    '''Return a single sweep from *start* to *stop*.
+
+    Useful as an amplitude ramp or, played as a modulation table, to
+    sweep the carrier.
+
+    Parameters
+    ----------
+    npts : int
+        Number of points.
+    start, stop : float, optional
+        First and last values.  Default: ``-1`` and ``1``.
+    spacing : str, optional
+        ``'linear'``, or ``'log'`` for geometric spacing of values
+        that share a sign.  Default: ``'linear'``.
+
+    Returns
+    -------
+    numpy.ndarray
+        Samples.
+    '''
+    _check(npts)
+    if spacing == 'linear':
+        return np.linspace(start, stop, npts)
+    if spacing == 'log':
+        return np.geomspace(start, stop, npts)
+    raise ValueError(f'Unknown spacing: {spacing}')
+
+
+__all__ = ['Waveform', 'chirp', 'multitone', 'pulse_train',
+           'am_envelope', 'sweep', 'ARB_POINTS', 'AM_POINTS']
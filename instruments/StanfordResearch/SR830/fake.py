@@ -11,7 +11,7 @@ class QFakeSR830(QFakeInstrument, QSR830):
     '''
 
     def _registerProperties(self) -> None:
-        QSR830._registerProperties(self)
+        super()._registerProperties()
         self.identification = 'Fake SR830 Lock-in Amplifier'
 
     def identify(self) -> bool:
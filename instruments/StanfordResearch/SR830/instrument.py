@@ -1,11 +1,13 @@
 import logging
 from QInstrument.lib.QSerialInstrument import QSerialInstrument
+from QInstrument.lib.QCommandMapMixin import QCommandMapMixin, Command
+from QInstrument.lib.ResponseParser import ResponseParser
 
 
 logger = logging.getLogger(__name__)
 
 
-class QSR830(QSerialInstrument):
+class QSR830(QCommandMapMixin, QSerialInstrument):
     '''SRS SR830 Lock-in Amplifier
 
     Properties
@@ -73,7 +75,7 @@ class QSR830(QSerialInstrument):
         False: no synchronous filter.
     time_constant : int
         Input filter time constant.
-        0:  20 μs    10:   1 s
+        0:  10 μs    10:   1 s
         1:  30 μs    11:   3 s
         2: 100 μs    12:  10 s
         3: 300 μs    13:  30 s
@@ -93,31 +95,61 @@ class QSR830(QSerialInstrument):
                 flowControl=QSerialInstrument.FlowControl.NoFlowControl,
                 eol='\n')
 
-    def _registerProperties(self) -> None:
-        '''Register all instrument properties via ``registerProperty()``.
+    TIMEOUTS = {'*RST': 1000, 'AGAN': 5000, 'ARSV': 5000,
+                'APHS': 2000, 'AOFF': 2000}
+    '''Slow commands: autoranging can take several time constants.'''
 
-        Called automatically by ``QAbstractInstrument.__init__``. Subclasses
-        that extend the property set should call
-        ``super()._registerProperties()`` first.
-        '''
+    SNAP = ResponseParser(float, count=3)
+    '''Parser for the ``SNAP?`` reply of :meth:`report`.'''
+
+    COMMANDS = (
         # Reference and Phase
-        self._register('amplitude',          'SLVL', float)
-        self._register('frequency',          'FREQ', float)
-        self._register('harmonic',           'HARM', int)
-        self._register('internal_reference', 'FMOD', bool)
-        self._register('phase',              'PHAS', float)
-        self._register('reference_trigger',  'RSLP', int)
+        Command('amplitude',          'SLVL', float, 0.004, 5.),
+        Command('frequency',          'FREQ', float, 0.001, 102e3,
+                after=('harmonic',)),
+        Command('harmonic',           'HARM', int,   1, 19999),
+        Command('internal_reference', 'FMOD', bool),
+        Command('phase',              'PHAS', float, -360., 729.99),
+        Command('reference_trigger',  'RSLP', int,   0, 2),
         # Input and Filter
-        self._register('dc_coupling',         'ICPL', bool)
-        self._register('input_configuration', 'ISRC', int)
-        self._register('line_filter',         'ILIN', int)
-        self._register('shield_grounding',    'IGND', bool)
+        Command('dc_coupling',         'ICPL', bool),
+        Command('input_configuration', 'ISRC', int, 0, 3),
+        Command('line_filter',         'ILIN', int, 0, 3),
+        Command('shield_grounding',    'IGND', bool),
         # Gain and Time Constant
-        self._register('dynamic_reserve',    'RMOD', int)
-        self._register('low_pass_slope',     'OFSL', int)
-        self._register('sensitivity',        'SENS', int)
-        self._register('synchronous_filter', 'SYNC', bool)
-        self._register('time_constant',      'OFLT', int)
+        Command('dynamic_reserve',    'RMOD', int, 0, 2),
+        Command('low_pass_slope',     'OFSL', int, 0, 3),
+        Command('sensitivity',        'SENS', int, 0, 26),
+        Command('synchronous_filter', 'SYNC', bool),
+        Command('time_constant',      'OFLT', int, 0, 19),
+    )
+
+    SETTLE_FACTORS = (5., 7., 9., 10.)
+    '''Time constants for the output to settle within 1% of a step,
+    indexed by ``low_pass_slope`` (6, 12, 18 and 24 dB/octave).'''
+
+    @staticmethod
+    def tau(time_constant: int) -> float:
+        '''Return the time constant in seconds for index *time_constant*.
+
+        The indices run 10 μs, 30 μs, 100 μs, ... 30 ks.
+        '''
+        decade, third = divmod(time_constant, 2)
+        return (3. if third else 1.) * 10.**(decade - 5)
+
+    def settleTime(self) -> float:
+        '''Return the seconds the outputs need to settle after a change.
+
+        Computed from the current ``time_constant`` and
+        ``low_pass_slope`` (one multi-query) using
+        :attr:`SETTLE_FACTORS`.  Used by
+        :class:`~QInstrument.lib.QSequencer.QSequencer`.
+        '''
+        values = self.readCommands(['time_constant', 'low_pass_slope'])
+        tc, slope = values['time_constant'], values['low_pass_slope']
+        if tc is None or slope is None:
+            return 0.
+        return self.SETTLE_FACTORS[slope] * self.tau(tc)
 
     def _registerMethods(self) -> None:
         '''Register all instrument methods via ``registerMethod()``.
@@ -133,31 +165,6 @@ class QSR830(QSerialInstrument):
         self.registerMethod('auto_offset_y',  self.auto_offset_y)
         self.registerMethod('auto_offset_r',  self.auto_offset_r)
 
-    def _register(self, name: str, cmd: str, ptype: type = float) -> None:
-        '''Register a standard instrument property.
-
-        Builds getter and setter from the SR830 command convention:
-        query is ``cmd + '?'``, set is ``cmd + value``. Bool properties
-        are transmitted as integers (0/1) per the instrument protocol.
-
-        Parameters
-        ----------
-        name : str
-            Property name passed to ``registerProperty``.
-        cmd : str
-            SR830 command mnemonic (e.g. ``'FREQ'``).
-        ptype : type, optional
-            Value type: ``float`` (default), ``int``, or ``bool``.
-        '''
-        if ptype is bool:
-            def getter(): return bool(self.getValue(f'{cmd}?', int))
-            def setter(v): self.transmit(f'{cmd}{int(bool(v))}')
-        else:
-            def getter(): return self.getValue(f'{cmd}?', ptype)
-            def setter(v): self.transmit(f'{cmd}{ptype(v)}')
-        self.registerProperty(name, getter=getter, setter=setter,
-                              ptype=ptype)
-
     def identify(self) -> bool:
         '''Return True if the connected device identifies as an SR830.
 
@@ -176,9 +183,16 @@ class QSR830(QSerialInstrument):
         -------
         list[float]
             [frequency [Hz], R [V], theta [degrees]]
+
+        Raises
+        ------
+        ValueError
+            If the reply cannot be parsed.
         '''
-        response = self.handshake('SNAP?9,3,4')
-        return list(map(float, response.split(',')))
+        values = self.getValues('SNAP?9,3,4', self.SNAP)
+        if values is None:
+            raise ValueError('Could not parse SNAP? reply')
+        return list(values)
 
     def reset(self) -> None:
         '''Reset the SR830 to its factory default settings.'''
@@ -11,7 +11,7 @@ class QFakeSR844(QFakeInstrument, QSR844):
     '''
 
     def _registerProperties(self) -> None:
-        QSR844._registerProperties(self)
+        super()._registerProperties()
         self.identification = 'Fake SR844 RF Lock-in Amplifier'
 
     def identify(self) -> bool:
@@ -1,11 +1,13 @@
 import logging
 from QInstrument.lib.QSerialInstrument import QSerialInstrument
+from QInstrument.lib.QCommandMapMixin import QCommandMapMixin, Command
+from QInstrument.lib.ResponseParser import ResponseParser
 
 
 logger = logging.getLogger(__name__)
 
 
-class QSR844(QSerialInstrument):
+class QSR844(QCommandMapMixin, QSerialInstrument):
     '''SRS SR844 RF Lock-in Amplifier
 
     Properties
@@ -16,7 +18,7 @@ class QSR844(QSerialInstrument):
     frequency : float [Hz]
         Reference frequency for the internal oscillator.
         Rounded to 5 significant digits or 0.0001 Hz, whichever is greater.
-        Range: 25 MHz <= frequency <= 200 MHz
+        Range: 25 kHz <= frequency <= 200 MHz
     harmonic : int
         Detection harmonic.
         Range: 1 <= harmonic < 20000, frequency * harmonic <= 200 MHz
@@ -76,27 +78,30 @@ class QSR844(QSerialInstrument):
                 flowControl=QSerialInstrument.FlowControl.NoFlowControl,
                 eol='\r')
 
-    def _registerProperties(self) -> None:
-        '''Register all instrument properties via ``registerProperty()``.
+    TIMEOUTS = {'*RST': 1000, 'AGAN': 5000, 'ACRS': 5000,
+                'AWRS': 5000, 'APHS': 2000, 'AOFF': 2000}
+    '''Slow commands: autoranging can take several time constants.'''
 
-        Called automatically by ``QAbstractInstrument.__init__``. Subclasses
-        that extend the property set should call
-        ``super()._registerProperties()`` first.
-        '''
+    SNAP = ResponseParser(float, count=3)
+    '''Parser for the ``SNAP?`` reply of :meth:`report`.'''
+
+    COMMANDS = (
         # Reference and Phase
-        self._register('frequency',           'FREQ', float)
-        self._register('harmonic',            'HARM', int)
-        self._register('internal_reference',  'FMOD', bool)
-        self._register('phase',               'PHAS', float)
-        self._register('reference_impedance', 'REFZ', int)
+        Command('frequency',           'FREQ', float, 25e3, 200e6,
+                after=('harmonic',)),
+        Command('harmonic',            'HARM', int,   1, 19999),
+        Command('internal_reference',  'FMOD', bool),
+        Command('phase',               'PHAS', float, -360., 729.99),
+        Command('reference_impedance', 'REFZ', int,   0, 1),
         # Signal Input
-        self._register('input_impedance', 'INPZ', int)
-        self._register('wide_reserve',    'WRSV', int)
+        Command('input_impedance', 'INPZ', int, 0, 1),
+        Command('wide_reserve',    'WRSV', int, 0, 2),
         # Gain and Time Constant
-        self._register('close_reserve',  'CRSV', int)
-        self._register('low_pass_slope', 'OFSL', int)
-        self._register('sensitivity',    'SENS', int)
-        self._register('time_constant',  'OFLT', int)
+        Command('close_reserve',  'CRSV', int, 0, 2),
+        Command('low_pass_slope', 'OFSL', int, 0, 3),
+        Command('sensitivity',    'SENS', int, 0, 14),
+        Command('time_constant',  'OFLT', int, 0, 17),
+    )
 
     def _registerMethods(self) -> None:
         '''Register all instrument methods via ``registerMethod()``.
@@ -113,30 +118,6 @@ class QSR844(QSerialInstrument):
         self.registerMethod('auto_offset_y',      self.auto_offset_y)
         self.registerMethod('auto_offset_r',      self.auto_offset_r)
 
-    def _register(self, name: str, cmd: str, dtype: type = float) -> None:
-        '''Register a standard instrument property.
-
-        Builds getter and setter from the SR844 command convention:
-        query is ``cmd + '?'``, set is ``cmd + value``. Bool properties
-        are transmitted as integers (0/1) per the instrument protocol.
-
-        Parameters
-        ----------
-        name : str
-            Property name passed to ``registerProperty``.
-        cmd : str
-            SR844 command mnemonic (e.g. ``'FREQ'``).
-        dtype : type, optional
-            Value type: ``float`` (default), ``int``, or ``bool``.
-        '''
-        if dtype is bool:
-            def getter(): return bool(self.getValue(f'{cmd}?', int))
-            def setter(v): self.transmit(f'{cmd}{int(bool(v))}')
-        else:
-            def getter(): return self.getValue(f'{cmd}?', dtype)
-            def setter(v): self.transmit(f'{cmd}{dtype(v)}')
-        self.registerProperty(name, getter=getter, setter=setter, ptype=dtype)
-
     def identify(self) -> bool:
         '''Return True if the connected device identifies as an SR844.
 
@@ -155,9 +136,16 @@ class QSR844(QSerialInstrument):
         -------
         list[float]
             [frequency [Hz], R [V], theta [degrees]]
+
+        Raises
+        ------
+        ValueError
+            If the reply cannot be parsed.
         '''
-        response = self.handshake('SNAP?9,3,4')
-        return list(map(float, response.split(',')))
+        values = self.getValues('SNAP?9,3,4', self.SNAP)
+        if values is None:
+            raise ValueError('Could not parse SNAP? reply')
+        return list(values)
 
     def reset(self) -> None:
         '''Reset the SR844 to its factory default settings.'''
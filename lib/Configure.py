@@ -5,7 +5,8 @@ import logging
 from datetime import datetime
 from pathlib import Path
 
-from qtpy import QtCore, QtWidgets
+from qtpy import QtCore
+from QInstrument.lib.Tracer import tracer
 
 
 logger = logging.getLogger(__name__)
@@ -119,7 +120,8 @@ class Configure(QtCore.QObject):
         if not settings:
             return
         filename = self.configname(obj)
-        with open(filename, 'w', encoding='utf-8') as configfile:
+        with (tracer.span('save', 'config', file=filename),
+              open(filename, 'w', encoding='utf-8') as configfile):
             json.dump(settings, configfile,
                       indent=2, separators=(',', ': '),
                       ensure_ascii=False)
@@ -140,7 +142,8 @@ class Configure(QtCore.QObject):
         filename = self.configname(obj)
         try:
             logger.info(f'Configuring {filename}')
-            with open(filename, 'r', encoding='utf-8') as configfile:
+            with (tracer.span('restore', 'config', file=filename),
+                  open(filename, 'r', encoding='utf-8') as configfile):
                 obj.settings = json.load(configfile)
         except Exception as ex:
             logger.warning(
@@ -166,7 +169,8 @@ class Configure(QtCore.QObject):
         '''
         filename = self.configname(obj)
         try:
-            with open(filename, 'r', encoding='utf-8') as configfile:
+            with (tracer.span('read', 'config', file=filename),
+                  open(filename, 'r', encoding='utf-8') as configfile):
                 return json.load(configfile)
         except Exception:
             return None
@@ -182,6 +186,7 @@ class Configure(QtCore.QObject):
         obj : object
             Object to save if the user confirms.
         '''
+        from qtpy import QtWidgets
         mbox = QtWidgets.QMessageBox
         msg = mbox(self.parent())
         msg.setWindowTitle('Confirmation')
@@ -0,0 +1,247 @@
+import threading
+from collections.abc import Callable, Iterable
+from concurrent import futures
+
+from qtpy import QtCore
+
+
+class _Invoker(QtCore.QObject):
+    '''Runs jobs on the thread of the instrument it serves.'''
+
+    requested = QtCore.Signal(object)
+
+    def __init__(self, device: QtCore.QObject) -> None:
+        super().__init__()
+        self.device = device
+        self.moveToThread(device.thread())
+        self.requested.connect(self.run)
+
+    @QtCore.Slot(object)
+    def run(self, job: tuple) -> None:
+        '''Make the calls of *job* and settle its future.'''
+        future, calls, single = job
+        if not future.set_running_or_notify_cancel():
+            return
+        device = self.device
+        try:
+            results = [(getattr(device, method) if isinstance(method, str)
+                        else method)(*args, **kwargs)
+                       for method, args, kwargs in calls]
+        except Exception as ex:
+            future.set_exception(ex)
+        else:
+            future.set_result(results[0] if single else results)
+
+
+class InstrumentProxy:
+    '''Thread-safe, blocking access to an instrument from any thread.
+
+    Once a widget, tree or :class:`QInstrumentEngine` has moved an
+    instrument to a worker thread, calling its methods directly from
+    another thread, such as a script or a Jupyter notebook on the main
+    thread, races the worker for the serial port.  A proxy instead
+    queues each call to the instrument's own thread, where it runs
+    between the worker's other requests, and waits for the result:
+
+    .. code-block:: python
+
+        lockin = InstrumentProxy(widget.device)
+        lockin.set('amplitude', 0.5)
+        x, y = lockin.batch([('get', 'x'), ('get', 'y')])
+        frequency = lockin.get('frequency', timeout=1.)
+
+    :meth:`submit` and :meth:`submitBatch` return a
+    :class:`concurrent.futures.Future` instead of waiting, so a caller
+    on the GUI thread need not block.  A batch runs as one queued
+    operation: its calls are made back to back, with no other request
+    to the instrument in between.  Calls from the instrument's own
+    thread run immediately.
+
+    Other attributes of the instrument are reached through the proxy:
+    methods are called, and properties read, on the instrument's
+    thread.
+
+    .. code-block:: python
+
+        saved = lockin.settings
+        stage.moveTo(100., 200.)
+
+    A blocking call needs the instrument's thread to process events:
+    calling from the GUI thread an instrument that still lives there
+    runs immediately, but calling it from another thread times out
+    while the GUI thread is blocked.
+
+    Parameters
+    ----------
+    device : QAbstractInstrument
+        Instrument to proxy.
+    timeout : float | None
+        Seconds to wait for a result, or ``None`` to wait
+        indefinitely.  Default: :attr:`TIMEOUT`.  Each call may
+        override it.
+
+    Class Attributes
+    ----------------
+    TIMEOUT : float
+        Default timeout [s].
+    '''
+
+    TIMEOUT: float = 10.
+
+    def __init__(self, device: QtCore.QObject,
+                 timeout: float | None = TIMEOUT) -> None:
+        self._device = device
+        self.timeout = timeout
+        self._invoker = None
+        self._lock = threading.Lock()
+
+    @property
+    def device(self) -> QtCore.QObject:
+        '''The proxied instrument.'''
+        return self._device
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({type(self._device).__name__})'
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        attribute = getattr(type(self._device), name, None)
+        if isinstance(attribute, property):
+            return self.call(lambda: getattr(self._device, name))
+        if not callable(getattr(self._device, name)):
+            raise AttributeError(
+                f'{type(self._device).__name__}.{name} is neither a '
+                'method nor a property')
+
+        def method(*args, **kwargs):
+            return self.call(name, *args, **kwargs)
+        method.__name__ = name
+        return method
+
+    def submit(self, method: str | Callable,
+               *args, **kwargs) -> futures.Future:
+        '''Queue one call to the instrument and return its future.
+
+        Parameters
+        ----------
+        method : str or callable
+            Name of the instrument method, or a callable.
+        *args, **kwargs
+            Arguments of the call.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Settles with the result of the call, or the exception it
+            raised.
+        '''
+        return self._submit([(method, args, kwargs)], True)
+
+    def submitBatch(self, calls: Iterable[tuple]) -> futures.Future:
+        '''Queue several calls as one operation and return its future.
+
+        Parameters
+        ----------
+        calls : Iterable[tuple]
+            ``(method, *args)`` tuples, with *method* as for
+            :meth:`submit`.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Settles with the list of results, or with the exception
+            of the first call that raised one; later calls are not
+            made.
+        '''
+        return self._submit([(call[0], call[1:], {}) for call in calls],
+                            False)
+
+    def call(self, method: str | Callable, *args,
+             timeout: float | None = None, **kwargs):
+        '''Call *method* on the instrument's thread and return the result.
+
+        Parameters
+        ----------
+        method : str or callable
+            Name of the instrument method, or a callable.
+        *args, **kwargs
+            Arguments of the call.
+        timeout : float or None, optional
+            Seconds to wait.  Default: ``None``, which uses
+            :attr:`timeout`.
+
+        Raises
+        ------
+        TimeoutError
+            If no result arrives in time.  A call that has not
+            started by then is not made.
+        '''
+        return self._wait(self.submit(method, *args, **kwargs), timeout)
+
+    def batch(self, calls: Iterable[tuple],
+              timeout: float | None = None) -> list:
+        '''Make several calls as one operation and return the results.
+
+        See :meth:`submitBatch` and :meth:`call`.
+        '''
+        return self._wait(self.submitBatch(calls), timeout)
+
+    def get(self, key: str, timeout: float | None = None):
+        '''Return the value of property *key*.  See :meth:`call`.'''
+        return self.call('get', key, timeout=timeout)
+
+    def set(self, key: str, value: object,
+            timeout: float | None = None) -> None:
+        '''Set property *key* to *value*.  See :meth:`call`.'''
+        self.call('set', key, value, timeout=timeout)
+
+    def execute(self, key: str, timeout: float | None = None) -> None:
+        '''Run the registered method *key*.  See :meth:`call`.'''
+        self.call('execute', key, timeout=timeout)
+
+    def getMany(self, keys: Iterable[str],
+                timeout: float | None = None) -> dict:
+        '''Return the values of *keys*, read in one batch.
+
+        See :meth:`batch`.
+        '''
+        keys = list(keys)
+        values = self.batch([('get', key) for key in keys], timeout)
+        return dict(zip(keys, values))
+
+    def _submit(self, calls: list, single: bool) -> futures.Future:
+        future = futures.Future()
+        job = (future, calls, single)
+        invoker = self._invokerFor()
+        if QtCore.QThread.currentThread() is self._device.thread():
+            invoker.run(job)
+        else:
+            invoker.requested.emit(job)
+        return future
+
+    def _invokerFor(self) -> _Invoker:
+        '''Return an invoker on the instrument's current thread.
+
+        The instrument may have moved since the last call, for example
+        when its widget was first shown.
+        '''
+        with self._lock:
+            invoker = self._invoker
+            if invoker is None or invoker.thread() is not \
+                    self._device.thread():
+                invoker = self._invoker = _Invoker(self._device)
+            return invoker
+
+    def _wait(self, future: futures.Future, timeout: float | None):
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            return future.result(timeout)
+        except futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(
+                f'{type(self._device).__name__} did not respond within '
+                f'{timeout} s') from None
+
+
+__all__ = ['InstrumentProxy']
@@ -0,0 +1,80 @@
+import bisect
+import math
+import numpy as np
+
+
+class LatencyHistogram:
+    '''Fixed-size histogram of response latencies.
+
+    Latencies are counted in logarithmically spaced bins from
+    :attr:`LOW` to :attr:`HIGH` seconds (:attr:`BINS` bins per decade,
+    about 8% wide), plus one bin below and one above.  Memory and the
+    cost of :meth:`add` are therefore constant however many samples are
+    recorded, and quantiles are accurate to the width of one bin.
+
+    .. code-block:: python
+
+        hist = LatencyHistogram()
+        for latency in (0.004, 0.005, 0.0052, 0.012):
+            hist.add(latency)
+        hist.quantile(0.99)     # upper edge of the bin holding p99, s
+    '''
+
+    LOW: float = 1e-4
+    '''Lower edge of the first regular bin [s].'''
+
+    HIGH: float = 100.
+    '''Upper edge of the last regular bin [s].'''
+
+    BINS: int = 30
+    '''Bins per decade.'''
+
+    EDGES: list[float] = np.geomspace(
+        LOW, HIGH, int(BINS * math.log10(HIGH / LOW)) + 1).tolist()
+    '''Bin edges [s].'''
+
+    __slots__ = ('counts', 'count', 'total', 'maximum')
+
+    def __init__(self) -> None:
+        self.counts = np.zeros(len(self.EDGES) + 1, dtype=np.int64)
+        self.count = 0
+        self.total = 0.
+        self.maximum = 0.
+
+    def add(self, latency: float) -> None:
+        '''Record one *latency* [s].'''
+        self.counts[bisect.bisect_right(self.EDGES, latency)] += 1
+        self.count += 1
+        self.total += latency
+        if latency > self.maximum:
+            self.maximum = latency
+
+    @property
+    def mean(self) -> float:
+        '''Mean latency [s], or NaN before the first sample.'''
+        return self.total / self.count if self.count else math.nan
+
+    def quantile(self, q: float) -> float:
+        '''Return an upper bound on the *q*-quantile of the latencies.
+
+        Parameters
+        ----------
+        q : float
+            Quantile in [0, 1], e.g. ``0.99``.
+
+        Returns
+        -------
+        float
+            Upper edge [s] of the bin holding the quantile, never more
+            than :attr:`maximum`, or NaN before the first sample.
+        '''
+        if not self.count:
+            return math.nan
+        rank = max(1, math.ceil(q * self.count))
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        edges = self.EDGES
+        edge = edges[index] if index < len(edges) else math.inf
+        return min(edge, self.maximum)
+
+
+__all__ = ['LatencyHistogram']
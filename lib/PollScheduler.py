@@ -0,0 +1,189 @@
+import math
+import time
+from typing import Callable
+
+
+def _monotonic_ms() -> float:
+    return time.monotonic() * 1000.
+
+
+class _Entry:
+    '''Schedule and timing statistics of one polled property.'''
+
+    __slots__ = ('name', 'period', 'priority', 'deadline',
+                 'last', 'mean', 'var', 'count')
+
+    def __init__(self, name: str, period: float | None,
+                 priority: int, deadline: float) -> None:
+        self.name = name
+        self.period = period
+        self.priority = priority
+        self.deadline = deadline
+        self.last = None
+        self.mean = 0.
+        self.var = 0.
+        self.count = 0
+
+
+class PollScheduler:
+    '''Deadline-ordered poll planner for the properties of one instrument.
+
+    Each property is polled either at its own period (``poll_ms``
+    metadata) or, when it has none, once per poll cycle with
+    :attr:`interval` milliseconds between cycles.  A cycle polls the
+    properties that are due, highest ``poll_priority`` first and then
+    most overdue first.  A cycle that runs longer than :attr:`slice`
+    leaves the remaining properties for the next cycle, so slow
+    properties that fall due together are spread out instead of
+    delaying the fast ones.
+
+    The delay before the next cycle is the time until the next
+    deadline, stretched if necessary so that the port is busy for no
+    more than :attr:`budget` of the time.
+
+    Parameters
+    ----------
+    interval : float, optional
+        Milliseconds between cycles for properties without a period.
+        Default: ``0``.
+    budget : float, optional
+        Largest fraction of time, in ``(0, 1]``, spent polling.
+        Default: ``1.0`` (no limit).
+    clock : callable, optional
+        Zero-argument callable returning the time in milliseconds.
+        Default: :func:`time.monotonic` scaled to milliseconds.
+    '''
+
+    ALPHA: float = 0.1
+    '''Weight of the newest sample in the rate and jitter averages.'''
+
+    def __init__(self,
+                 interval: float = 0,
+                 budget: float = 1.,
+                 clock: Callable[[], float] | None = None) -> None:
+        self.interval = interval
+        self.budget = budget
+        self.clock = clock or _monotonic_ms
+        self.duty = 0.
+        self._entries: dict[str, _Entry] = {}
+
+    def add(self,
+            name: str,
+            period: float | None = None,
+            priority: int = 0) -> None:
+        '''Schedule *name*, due immediately.
+
+        Parameters
+        ----------
+        name : str
+            Property name.
+        period : float or None, optional
+            Poll period in milliseconds, or ``None`` to poll every
+            cycle.  Default: ``None``.
+        priority : int, optional
+            Higher priorities are polled first.  Default: ``0``.
+        '''
+        self._entries[name] = _Entry(name, period, priority, self.clock())
+
+    def remove(self, name: str) -> None:
+        '''Stop polling *name*.  Unknown names are ignored.'''
+        self._entries.pop(name, None)
+
+    @property
+    def names(self) -> list[str]:
+        '''Names of all scheduled properties.'''
+        return list(self._entries)
+
+    @property
+    def slice(self) -> float:
+        '''Longest cycle, in ms, before remaining work is deferred.
+
+        Equal to the shortest property period scaled by :attr:`budget`,
+        or infinite when no property has a period.
+        '''
+        periods = [e.period for e in self._entries.values() if e.period]
+        return min(periods) * self.budget if periods else math.inf
+
+    def due(self, now: float | None = None) -> list[str]:
+        '''Return the names due at *now*, in polling order.'''
+        now = self.clock() if now is None else now
+        entries = [e for e in self._entries.values() if e.deadline <= now]
+        entries.sort(key=lambda e: (-e.priority, e.deadline))
+        return [e.name for e in entries]
+
+    def polled(self, name: str, start: float, end: float) -> None:
+        '''Record that *name* was polled from *start* to *end*.
+
+        Updates the rate and jitter statistics and sets the next
+        deadline.  A property that fell behind by more than one period
+        skips the missed polls rather than bursting to catch up.
+        '''
+        entry = self._entries.get(name)
+        if entry is None:
+            return
+        if entry.last is not None:
+            dt = start - entry.last
+            if entry.count == 1:
+                entry.mean = dt
+            delta = dt - entry.mean
+            entry.mean += self.ALPHA * delta
+            entry.var = (1. - self.ALPHA) * (entry.var +
+                                             self.ALPHA * delta * delta)
+        entry.last = start
+        entry.count += 1
+        if entry.period:
+            deadline = entry.deadline + entry.period
+            if deadline <= start:
+                deadline = start + entry.period
+            entry.deadline = deadline
+        else:
+            entry.deadline = end + self.interval
+
+    def delay(self, start: float, end: float) -> int:
+        '''Return the milliseconds to wait after a cycle.
+
+        Properties without a period that were polled during the cycle
+        fall due :attr:`interval` milliseconds after *end*.
+
+        Parameters
+        ----------
+        start : float
+            Time at which the cycle began.
+        end : float
+            Time at which the cycle finished.
+        '''
+        busy = end - start
+        idle = busy * (1. - self.budget) / self.budget
+        for entry in self._entries.values():
+            if not entry.period and entry.last is not None and \
+                    entry.last >= start:
+                entry.deadline = end + self.interval
+        if self._entries:
+            wait = min(e.deadline for e in self._entries.values()) - end
+        else:
+            wait = self.interval
+        wait = max(wait, idle, 0.)
+        if busy + wait > 0:
+            sample = busy / (busy + wait)
+            self.duty += self.ALPHA * (sample - self.duty)
+        return int(math.ceil(wait))
+
+    def stats(self) -> dict[str, dict]:
+        '''Return achieved poll statistics for every scheduled property.
+
+        Returns
+        -------
+        dict
+            Property names mapped to dicts with keys ``period_ms``
+            (requested, ``None`` for every cycle), ``rate`` (achieved,
+            Hz), ``jitter_ms`` (standard deviation of the poll
+            interval) and ``count`` (polls so far).
+        '''
+        return {e.name: dict(period_ms=e.period,
+                             rate=1000. / e.mean if e.mean > 0 else 0.,
+                             jitter_ms=math.sqrt(e.var),
+                             count=e.count)
+                for e in self._entries.values()}
+
+
+__all__ = ['PollScheduler']
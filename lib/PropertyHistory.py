@@ -0,0 +1,197 @@
+import logging
+import time
+from typing import Callable
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+
+class _Ring:
+    '''Preallocated (timestamp, value) ring buffer for one property.
+
+    Every sample is written twice, at ``i`` and ``i + depth``, so the
+    newest ``depth`` samples always occupy the contiguous slice
+    ``[head, head + depth)`` and any window of them is a plain slice
+    view — no copy, no wrap-around handling for the reader.
+    '''
+
+    __slots__ = ('depth', 't', 'v', 'head', 'count')
+
+    def __init__(self, depth: int, shape: tuple) -> None:
+        self.depth = depth
+        self.t = np.zeros(2 * depth)
+        self.v = np.zeros((2 * depth,) + shape)
+        self.head = 0
+        self.count = 0
+
+    def append(self, t: float, value: np.ndarray) -> None:
+        depth = self.depth
+        i = (self.head + self.count) % depth
+        self.v[i] = self.v[i + depth] = value
+        self.t[i] = self.t[i + depth] = t
+        if self.count < depth:
+            self.count += 1
+        else:
+            self.head = (self.head + 1) % depth
+
+    def window(self) -> tuple[np.ndarray, np.ndarray]:
+        start, stop = self.head, self.head + self.count
+        return self.t[start:stop], self.v[start:stop]
+
+
+class PropertyHistory:
+    '''Bounded history of timestamped property values.
+
+    Keeps the most recent :attr:`depth` samples of each named value in
+    a preallocated NumPy ring buffer, so memory is fixed once a name
+    has been recorded and :meth:`append` costs O(1) however long the
+    session runs.  Numeric scalars, booleans and fixed-length numeric
+    sequences (e.g. a stage position ``[x, y, z]``) are recorded;
+    other values are ignored.
+
+    :meth:`history` returns read-only views into the buffers rather
+    than copies.  The views are live: copy them before holding on to
+    them while recording continues.
+
+    Parameters
+    ----------
+    depth : int, optional
+        Samples kept per name.  Default: ``1024``.
+    clock : callable, optional
+        Zero-argument callable returning the time in seconds.
+        Default: :func:`time.monotonic`.
+    '''
+
+    def __init__(self,
+                 depth: int = 1024,
+                 clock: Callable[[], float] | None = None) -> None:
+        if depth < 1:
+            raise ValueError(f'depth must be positive, not {depth}')
+        self.depth = depth
+        self.clock = clock or time.monotonic
+        self._rings: dict[str, _Ring | None] = {}
+
+    @property
+    def names(self) -> list[str]:
+        '''Names with at least one recorded sample.'''
+        return [name for name, ring in self._rings.items()
+                if ring is not None and ring.count]
+
+    def append(self, name: str, value: object,
+               t: float | None = None) -> bool:
+        '''Record *value* for *name* at time *t*.
+
+        The buffer for *name* is allocated on its first numeric value
+        and takes the shape of that value.  Later values of a
+        different shape, and values that are not numeric, are ignored.
+
+        Parameters
+        ----------
+        name : str
+            Property name.
+        value : object
+            Value to record.
+        t : float or None, optional
+            Timestamp in seconds.  Default: ``None``, which reads
+            :attr:`clock`.
+
+        Returns
+        -------
+        bool
+            True if the value was recorded.
+        '''
+        ring = self._rings.get(name, False)
+        if ring is None:
+            return False
+        try:
+            value = np.asarray(value, dtype=float)
+        except (TypeError, ValueError):
+            if ring is False:
+                logger.debug(f'{name}: not recording {type(value).__name__}')
+                self._rings[name] = None
+            return False
+        if ring is False:
+            ring = self._rings[name] = _Ring(self.depth, value.shape)
+        elif value.shape != ring.v.shape[1:]:
+            return False
+        ring.append(self.clock() if t is None else t, value)
+        return True
+
+    def history(self, name: str,
+                seconds: float | None = None
+                ) -> tuple[np.ndarray, np.ndarray]:
+        '''Return the recorded timestamps and values of *name*.
+
+        Parameters
+        ----------
+        name : str
+            Property name.
+        seconds : float or None, optional
+            Only return samples from the last *seconds*, measured from
+            the newest sample.  Default: ``None`` (everything kept).
+
+        Returns
+        -------
+        tuple[numpy.ndarray, numpy.ndarray]
+            Read-only views ``(t, v)``, oldest first.  ``v`` has one
+            row per sample for sequence values.  Both are empty if
+            nothing has been recorded.
+        '''
+        ring = self._rings.get(name)
+        if ring is None:
+            return np.empty(0), np.empty(0)
+        t, v = ring.window()
+        if seconds is not None and len(t):
+            start = np.searchsorted(t, t[-1] - seconds, side='left')
+            t, v = t[start:], v[start:]
+        t, v = t.view(), v.view()
+        t.flags.writeable = v.flags.writeable = False
+        return t, v
+
+    def decimate(self, name: str,
+                 bins: int,
+                 seconds: float | None = None
+                 ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        '''Return a min/max summary of the history of *name* for plotting.
+
+        The window returned by :meth:`history` is split into at most
+        *bins* runs of consecutive samples.  Drawing the minimum and
+        maximum of every run preserves spikes that plain subsampling
+        would drop, at a cost independent of :attr:`depth`.
+
+        Parameters
+        ----------
+        name : str
+            Property name.
+        bins : int
+            Largest number of runs.
+        seconds : float or None, optional
+            As for :meth:`history`.
+
+        Returns
+        -------
+        tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+            ``(t, vmin, vmax)`` with one entry per run; ``t`` is the
+            timestamp of the first sample of the run.  The views of
+            :meth:`history` are returned unchanged when the window has
+            no more than *bins* samples.
+        '''
+        t, v = self.history(name, seconds)
+        if len(t) <= bins:
+            return t, v, v
+        starts = np.unique(np.linspace(0, len(t), bins, endpoint=False,
+                                       dtype=int))
+        return (t[starts],
+                np.minimum.reduceat(v, starts, axis=0),
+                np.maximum.reduceat(v, starts, axis=0))
+
+    def clear(self, name: str | None = None) -> None:
+        '''Forget the history of *name*, or of every name if ``None``.'''
+        if name is None:
+            self._rings.clear()
+        else:
+            self._rings.pop(name, None)
+
+
+__all__ = ['PropertyHistory']
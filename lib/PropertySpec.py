@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from operator import attrgetter
+from types import MappingProxyType
+from typing import Callable
+
+
+_AUTO = object()  # sentinel: auto-generate getter/setter from _name convention
+
+
+class PropertySpec:
+    '''Compiled description of one registered instrument property.
+
+    A spec bundles the accessor callables, the value type and the
+    metadata of a property into a single slotted object.  Specs
+    declared in an instrument's :attr:`~QAbstractInstrument.PROPERTIES`
+    table are built once when the class is defined and shared by every
+    instance; specs created by
+    :meth:`~QAbstractInstrument.registerProperty` belong to a single
+    instance.
+
+    Specs are treated as immutable once created.  To change a property,
+    register a new spec under the same name.
+
+    Parameters
+    ----------
+    name : str
+        Property name used with :meth:`~QAbstractInstrument.get` and
+        :meth:`~QAbstractInstrument.set`.
+    getter : callable, optional
+        Callable returning the current value.  Class-level specs take
+        the instrument as their only argument; bound specs take no
+        argument.  Default: read the ``_name`` backing attribute.
+    setter : callable or None, optional
+        Callable that applies a new value.  Class-level specs take
+        ``(instrument, value)``; bound specs take ``(value)``.
+        ``None`` marks the property read-only.
+        Default: write ``ptype(value)`` to the ``_name`` backing
+        attribute.
+    ptype : type, optional
+        Python type of the property value.  Default: ``float``.
+    bound : bool, optional
+        ``True`` if *getter* and *setter* are already bound to one
+        instrument and take no instrument argument.  Default: ``False``.
+    **meta :
+        Arbitrary metadata (e.g. ``minimum``, ``maximum``, ``after``).
+
+    Examples
+    --------
+    .. code-block:: python
+
+        class QMyInstrument(QSerialInstrument):
+            PROPERTIES = (
+                PropertySpec('gain', ptype=int, minimum=0, maximum=10),
+                PropertySpec('serial', setter=None, ptype=str,
+                             getter=lambda inst: inst.handshake('SN?')),
+            )
+    '''
+
+    __slots__ = ('name', 'getter', 'setter', 'ptype', 'bound', 'meta')
+
+    def __init__(self,
+                 name: str,
+                 getter: Callable | None = _AUTO,
+                 setter: Callable | None = _AUTO,
+                 ptype: type = float,
+                 bound: bool = False,
+                 **meta) -> None:
+        if bound and (getter is _AUTO or setter is _AUTO):
+            raise ValueError('bound specs need explicit accessors')
+        if getter is _AUTO:
+            getter = attrgetter(f'_{name}')
+        if setter is _AUTO:
+            attr = f'_{name}'
+
+            def setter(instrument, value):
+                setattr(instrument, attr, ptype(value))
+        self.name = name
+        self.getter = getter
+        self.setter = setter
+        self.ptype = ptype
+        self.bound = bound
+        self.meta = MappingProxyType(meta)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.name!r})'
+
+    @property
+    def readonly(self) -> bool:
+        '''bool: ``True`` if the property has no setter.'''
+        return self.setter is None
+
+    def read(self, instrument: object) -> object:
+        '''Return the current value of this property on *instrument*.'''
+        if self.bound:
+            return self.getter()
+        return self.getter(instrument)
+
+    def write(self, instrument: object, value: object) -> None:
+        '''Apply *value* to this property on *instrument*.'''
+        if self.bound:
+            self.setter(value)
+        else:
+            self.setter(instrument, value)
+
+
+__all__ = ['PropertySpec']
@@ -1,20 +1,32 @@
 import logging
 from qtpy import QtCore
+from types import MappingProxyType
 from typing import Callable
+from QInstrument.lib.lazy import values_differ
+from QInstrument.lib.PropertySpec import PropertySpec, _AUTO
+from QInstrument.lib.Tracer import tracer
 
 
 logger = logging.getLogger(__name__)
 
-_AUTO = object()  # sentinel: auto-generate getter/setter from _name convention
-
 
 class QAbstractInstrument(QtCore.QObject):
     '''Abstract base class for scientific instruments.
 
-    Models instrument state as named properties registered via
-    :meth:`registerProperty` and accessed through the thread-safe
-    :meth:`get` and :meth:`set` slots.  Methods are registered via
-    :meth:`registerMethod` and invoked by name via :meth:`execute`.
+    Models instrument state as named properties accessed through the
+    thread-safe :meth:`get` and :meth:`set` slots.  Properties are
+    declared in the class-level :attr:`PROPERTIES` table or registered
+    per instance via :meth:`registerProperty`.  Methods are registered
+    via :meth:`registerMethod` and invoked by name via :meth:`execute`.
+
+    The declared :class:`PropertySpec` tables of a class and its bases
+    are compiled once, when the class is defined, into a read-only
+    mapping shared by every instance.  The registry is an immutable
+    snapshot: registration replaces it with an updated copy instead of
+    modifying it, so :meth:`get` and :meth:`set` look up properties
+    without taking a lock.  Registrations made during construction
+    are collected first and frozen into the snapshot once, so that
+    registering N properties costs O(N) rather than N copies.
 
     This class has no concept of hardware communication.  A concrete
     transport subclass (e.g. :class:`QSerialInstrument`) provides the
@@ -25,20 +37,46 @@ class QAbstractInstrument(QtCore.QObject):
     propertyValue(str, object)
         Emitted by :meth:`get` and :meth:`set` with the property name
         and its current value.
+    settingsRead(object)
+        Emitted by :meth:`readSettings` with the dict of current
+        :attr:`settings`.
     '''
 
     PropertyValue = bool | int | float | str
     Settings = dict[str, PropertyValue]
 
     propertyValue = QtCore.Signal(str, object)
+    settingsRead = QtCore.Signal(object)
+
+    PROPERTIES: tuple[PropertySpec, ...] = ()
+    _specs = MappingProxyType({})
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        '''Compile the :attr:`PROPERTIES` tables of *cls* and its bases.
+
+        Tables are merged in reverse method-resolution order, so a
+        subclass spec replaces a base-class spec of the same name.
+        '''
+        super().__init_subclass__(**kwargs)
+        specs = {}
+        for klass in reversed(cls.__mro__):
+            for spec in vars(klass).get('PROPERTIES', ()):
+                specs[spec.name] = spec
+        cls._specs = MappingProxyType(specs)
 
     def __init__(self, **kwargs) -> None:
         super().__init__(**kwargs)
         self.mutex = QtCore.QMutex()
-        self._properties = {}
-        self._methods = {}
+        self._properties = self._specs
+        self._methods = MappingProxyType({})
+        self._constructing = True
         self._registerProperties()
         self._registerMethods()
+        self._constructing = False
+        if isinstance(self._properties, dict):
+            self._properties = MappingProxyType(self._properties)
+        if isinstance(self._methods, dict):
+            self._methods = MappingProxyType(self._methods)
 
     def __repr__(self) -> str:
         return f'{self.__class__.__name__}()'
@@ -47,8 +85,9 @@ class QAbstractInstrument(QtCore.QObject):
         '''Register instrument properties.
 
         Called automatically by :meth:`__init__`.  No-op base
-        implementation; concrete instruments override this to call
-        :meth:`registerProperty` for each of their properties.
+        implementation; instruments whose properties cannot be declared
+        in :attr:`PROPERTIES` override this to call
+        :meth:`registerProperty` for each of them.
         Subclasses that extend the property set of a parent instrument
         should call ``super()._registerProperties()`` first.
         '''
@@ -76,6 +115,9 @@ class QAbstractInstrument(QtCore.QObject):
         ``self._name``.  Pass an explicit callable to override either,
         or pass ``setter=None`` to make the property read-only.
 
+        The property applies to this instance only and replaces any
+        declared or previously registered property of the same name.
+
         Parameters
         ----------
         name : str
@@ -85,6 +127,7 @@ class QAbstractInstrument(QtCore.QObject):
             Default: ``lambda: getattr(self, f'_{name}')``.
         setter : callable or None, optional
             Single-argument callable that applies a new value.
+            It may raise ``ValueError`` to reject the value.
             ``None`` marks the property read-only.
             Default: ``lambda v: setattr(self, f'_{name}', ptype(v))``.
         ptype : type, optional
@@ -94,7 +137,9 @@ class QAbstractInstrument(QtCore.QObject):
             Default: ``float``.
         **meta :
             Arbitrary metadata stored alongside the property
-            (e.g. ``minimum``, ``maximum``, ``step``).
+            (e.g. ``minimum``, ``maximum``, ``step``).  ``after``
+            names properties that :meth:`applySettings` must write
+            before this one.
         '''
         if getter is _AUTO:
             def _getter(): return getattr(self, f'_{name}')
@@ -102,8 +147,12 @@ class QAbstractInstrument(QtCore.QObject):
         if setter is _AUTO:
             def _setter(v): return setattr(self, f'_{name}', ptype(v))
             setter = _setter
-        self._properties[name] = dict(
-            getter=getter, setter=setter, ptype=ptype, **meta)
+        spec = PropertySpec(name, getter, setter, ptype, bound=True, **meta)
+        registry = self._properties
+        if type(registry) is dict:
+            registry[name] = spec
+        else:
+            self._addToRegistry('_properties', name, spec)
 
     def registerMethod(self,
                        name: str,
@@ -119,7 +168,28 @@ class QAbstractInstrument(QtCore.QObject):
         method : callable
             Zero-argument callable to invoke.
         '''
-        self._methods[name] = method
+        self._addToRegistry('_methods', name, method)
+
+    def _addToRegistry(self, attribute: str, name: str, entry) -> None:
+        '''Register *entry* as *name* in the registry *attribute*.
+
+        During construction, the registry is copied once into a plain
+        dict, to which further entries are added in place, and
+        :meth:`__init__` freezes it once all are registered; no other
+        thread can see the instrument yet.  Afterwards the registry is
+        replaced with an updated, read-only copy.
+        '''
+        if self._constructing:
+            registry = getattr(self, attribute)
+            if not isinstance(registry, dict):
+                registry = dict(registry)
+                setattr(self, attribute, registry)
+            registry[name] = entry
+            return
+        with QtCore.QMutexLocker(self.mutex):
+            registry = dict(getattr(self, attribute))
+            registry[name] = entry
+            setattr(self, attribute, MappingProxyType(registry))
 
     @property
     def properties(self) -> list[str]:
@@ -139,7 +209,8 @@ class QAbstractInstrument(QtCore.QObject):
         Unlike :meth:`set`, the setter does not emit
         :attr:`propertyValue` for each key; call
         :meth:`_syncProperties` after a bulk restore if the UI must
-        reflect the new values.
+        reflect the new values.  Use :meth:`applySettings` to write
+        only the keys that differ from the current state.
 
         Subclasses that need to exclude specific properties from
         save/restore (e.g. motion-speed parameters that must not be
@@ -147,23 +218,116 @@ class QAbstractInstrument(QtCore.QObject):
         getter and setter to filter those names.  See
         :class:`QProscan` for an example.
         '''
-        with QtCore.QMutexLocker(self.mutex):
-            props = list(self._properties.items())
         return {
-            name: info['getter']()
-            for name, info in props
-            if info['setter'] is not None
+            name: spec.read(self)
+            for name, spec in self._properties.items()
+            if spec.setter is not None
         }
 
     @settings.setter
     def settings(self, settings: Settings) -> None:
-        with QtCore.QMutexLocker(self.mutex):
-            calls = [(self._properties[k]['setter'], v)
-                     for k, v in settings.items()
-                     if k in self._properties]
-        for setter, value in calls:
-            if setter is not None:
-                setter(value)
+        registry = self._properties
+        for key, value in settings.items():
+            spec = registry.get(key)
+            if spec is not None and spec.setter is not None:
+                self._write(spec, value)
+
+    @QtCore.Slot()
+    def readSettings(self) -> None:
+        '''Read :attr:`settings` and emit :attr:`settingsRead`.
+
+        Thread-safe Qt slot intended to be invoked through a queued
+        connection once the instrument lives in a worker thread, so
+        that every getter runs on the thread that owns the transport
+        and the caller receives all values in a single signal.
+        '''
+        self.settingsRead.emit(self.settings)
+
+    @QtCore.Slot(object)
+    @QtCore.Slot(object, object)
+    def applySettings(self,
+                      target: Settings,
+                      current: Settings | None = None) -> Settings:
+        '''Write only the settings in *target* that differ from *current*.
+
+        Thread-safe Qt slot.  Compares each key present in both *target*
+        and *current* with :func:`~QInstrument.lib.lazy.values_differ`
+        and calls the setter only for keys whose values differ, so the
+        cost of a restore scales with the size of the change rather
+        than the size of the configuration.  Keys that are unknown,
+        read-only, or absent from *current* are skipped, as are values
+        the setter rejects with ``ValueError``.  Emits
+        :attr:`propertyValue` for every key written.
+
+        Writes follow the dependency order declared with the ``after``
+        property metadata: a property registered with
+        ``after=('harmonic',)`` is written after ``harmonic`` whenever
+        both are written.  Properties without dependencies keep the
+        order in which they appear in *target*.
+
+        Parameters
+        ----------
+        target : Settings
+            Desired property values.
+        current : Settings or None, optional
+            Known current values, for example from
+            :meth:`readSettings`.  Default: ``None``, which reads
+            :attr:`settings`.
+
+        Returns
+        -------
+        Settings
+            The keys that were written, with the values written.
+        '''
+        if current is None:
+            current = self.settings
+        registry = self._properties
+        info = {k: registry[k] for k in target
+                if k in registry and registry[k].setter is not None}
+        changed = [k for k in target
+                   if k in info and k in current
+                   and values_differ(current[k], target[k])]
+        written = {}
+        for key in self._writeOrder(changed, info):
+            logger.debug(f'Restoring {key}: {target[key]}')
+            if self._write(info[key], target[key]):
+                written[key] = target[key]
+        for key, value in written.items():
+            self.propertyValue.emit(key, value)
+        return written
+
+    def _writeOrder(self, names: list[str], info: dict) -> list[str]:
+        '''Return *names* ordered so each follows its ``after`` dependencies.
+
+        Dependencies that are not in *names* are ignored.  A cycle is
+        logged as a warning and broken at the point of detection.
+
+        Parameters
+        ----------
+        names : list[str]
+            Property names to order.
+        info : dict
+            :class:`PropertySpec` for (at least) every name in *names*.
+        '''
+        selected = set(names)
+        ordered = []
+        placed = set()
+
+        def visit(name: str, stack: tuple[str, ...]) -> None:
+            if name in placed:
+                return
+            if name in stack:
+                logger.warning(f'Circular write order: {stack + (name,)}')
+                return
+            for dep in info[name].meta.get('after', ()):
+                if dep in selected:
+                    visit(dep, stack + (name,))
+            placed.add(name)
+            ordered.append(name)
+
+        for name in names:
+            visit(name, ())
+        return ordered
 
     @property
     def methods(self) -> list[str]:
@@ -174,9 +338,9 @@ class QAbstractInstrument(QtCore.QObject):
     def get(self, key: str) -> PropertyValue | None:
         '''Return the current value of a registered property.
 
-        Thread-safe Qt slot.  The registry lock is released before
-        calling the getter, so the getter may safely call other
-        instrument methods without deadlocking.  Emits
+        Thread-safe Qt slot.  The lookup reads the immutable registry
+        snapshot without locking, so the getter may safely call other
+        instrument methods.  Emits
         :attr:`propertyValue` with the name and value.  Logs an error
         and returns ``None`` if the key is not registered.
 
@@ -190,12 +354,16 @@ class QAbstractInstrument(QtCore.QObject):
         PropertyValue or None
             Current value, or ``None`` if *key* is unknown.
         '''
-        with QtCore.QMutexLocker(self.mutex):
-            if key not in self._properties:
-                logger.error(f'Unknown property: {key}')
-                return None
-            getter = self._properties[key]['getter']
-        value = getter()
+        spec = self._properties.get(key)
+        if spec is None:
+            logger.error(f'Unknown property: {key}')
+            return None
+        if tracer.enabled:
+            with tracer.span(f'get {key}', 'instrument',
+                             instrument=self.__class__.__name__):
+                value = spec.read(self)
+        else:
+            value = spec.read(self)
         self.propertyValue.emit(key, value)
         return value
 
@@ -203,12 +371,13 @@ class QAbstractInstrument(QtCore.QObject):
     def set(self, key: str, value: PropertyValue) -> None:
         '''Set a registered property to the given value.
 
-        Thread-safe Qt slot.  The registry lock is released before
-        calling the setter, so the setter may safely call other
-        instrument methods without deadlocking.  Emits
+        Thread-safe Qt slot.  The lookup reads the immutable registry
+        snapshot without locking, so the setter may safely call other
+        instrument methods.  Emits
         :attr:`propertyValue` with the new value on success.  Logs a
-        warning if the property is read-only and an error if the key
-        is not registered.
+        warning if the property is read-only or the setter rejects the
+        value with ``ValueError``, and an error if the key is not
+        registered.
 
         Parameters
         ----------
@@ -217,17 +386,37 @@ class QAbstractInstrument(QtCore.QObject):
         value : PropertyValue
             New value to assign.
         '''
-        with QtCore.QMutexLocker(self.mutex):
-            if key not in self._properties:
-                logger.error(f'Unknown property: {key}')
-                return
-            setter = self._properties[key]['setter']
-        if setter is None:
+        spec = self._properties.get(key)
+        if spec is None:
+            logger.error(f'Unknown property: {key}')
+            return
+        if spec.setter is None:
             logger.warning(f'Property {key!r} is read-only')
             return
         logger.debug(f'Setting {key}: {value}')
-        setter(value)
-        self.propertyValue.emit(key, value)
+        if tracer.enabled:
+            with tracer.span(f'set {key}', 'instrument',
+                             instrument=self.__class__.__name__,
+                             value=value):
+                written = self._write(spec, value)
+        else:
+            written = self._write(spec, value)
+        if written:
+            self.propertyValue.emit(key, value)
+
+    def _write(self, spec: PropertySpec, value: PropertyValue) -> bool:
+        '''Apply *value* through *spec*, returning ``False`` if rejected.
+
+        Setters reject a value by raising ``ValueError``, for example
+        when it lies outside the property's range.  The rejection is
+        logged as a warning.
+        '''
+        try:
+            spec.write(self, value)
+        except ValueError as ex:
+            logger.warning(f'Rejected {spec.name}={value!r}: {ex}')
+            return False
+        return True
 
     def propertyMeta(self, name: str) -> dict:
         '''Return a copy of the metadata for a registered property.
@@ -246,13 +435,10 @@ class QAbstractInstrument(QtCore.QObject):
             Metadata dict (e.g. ``ptype``, ``minimum``, ``maximum``,
             ``step``, ``debounce``).
         '''
-        with QtCore.QMutexLocker(self.mutex):
-            if name not in self._properties:
-                return {}
-            info = self._properties[name].copy()
-        info.pop('getter', None)
-        info['readonly'] = info.pop('setter', None) is None
-        return info
+        spec = self._properties.get(name)
+        if spec is None:
+            return {}
+        return dict(spec.meta, ptype=spec.ptype, readonly=spec.readonly)
 
     @QtCore.Slot(str)
     def execute(self, key: str) -> None:
@@ -266,12 +452,16 @@ class QAbstractInstrument(QtCore.QObject):
         key : str
             Registered method name.
         '''
-        with QtCore.QMutexLocker(self.mutex):
-            if key not in self._methods:
-                logger.error(f'Unknown method: {key}')
-                return
-            method = self._methods[key]
-        method()
+        method = self._methods.get(key)
+        if method is None:
+            logger.error(f'Unknown method: {key}')
+            return
+        if tracer.enabled:
+            with tracer.span(f'execute {key}', 'instrument',
+                             instrument=self.__class__.__name__):
+                method()
+        else:
+            method()
 
 
 __all__ = ['QAbstractInstrument']
@@ -0,0 +1,254 @@
+import logging
+from types import MappingProxyType
+from typing import Iterable
+from QInstrument.lib.PropertySpec import PropertySpec
+from QInstrument.lib.QAbstractInstrument import QAbstractInstrument
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command:
+    '''One entry in an instrument command map.
+
+    Describes a property that the instrument exposes through a single
+    mnemonic: the query is ``mnemonic + '?'`` and the set command is
+    ``mnemonic + value``.  A command compiles itself into the
+    :class:`~QInstrument.lib.PropertySpec.PropertySpec` that
+    :class:`QCommandMapMixin` declares for the property.
+
+    Parameters
+    ----------
+    name : str
+        Property name.
+    mnemonic : str
+        Instrument command mnemonic (e.g. ``'FREQ'``).
+    ptype : type, optional
+        Value type: ``float`` (default), ``int``, or ``bool``.
+    minimum : float or None, optional
+        Smallest accepted value.  Default: ``None`` (unbounded).
+    maximum : float or None, optional
+        Largest accepted value.  Default: ``None`` (unbounded).
+    boolint : bool or None, optional
+        Transmit and parse the value as an integer ``0``/``1``.
+        Default: ``None``, which enables it for ``bool`` properties.
+    **meta :
+        Additional property metadata (e.g. ``after``).
+    '''
+
+    __slots__ = ('name', 'mnemonic', 'ptype', 'minimum', 'maximum',
+                 'boolint', 'query', 'spec')
+
+    def __init__(self,
+                 name: str,
+                 mnemonic: str,
+                 ptype: type = float,
+                 minimum: float | None = None,
+                 maximum: float | None = None,
+                 boolint: bool | None = None,
+                 **meta) -> None:
+        self.name = name
+        self.mnemonic = mnemonic
+        self.ptype = ptype
+        self.minimum = minimum
+        self.maximum = maximum
+        self.boolint = (ptype is bool) if boolint is None else boolint
+        self.query = f'{mnemonic}?'
+        if minimum is not None:
+            meta['minimum'] = minimum
+        if maximum is not None:
+            meta['maximum'] = maximum
+        self.spec = PropertySpec(
+            name,
+            getter=lambda inst: inst._readCommand(self),
+            setter=lambda inst, value: inst._writeCommand(self, value),
+            ptype=ptype, **meta)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.name!r}, {self.mnemonic!r})'
+
+    @property
+    def default(self):
+        '''Zero value of :attr:`ptype`, raised to :attr:`minimum`.'''
+        value = self.ptype()
+        if self.minimum is not None and value < self.minimum:
+            value = self.ptype(self.minimum)
+        return value
+
+    def validate(self, value):
+        '''Return *value* coerced to :attr:`ptype`.
+
+        Raises
+        ------
+        ValueError
+            If *value* cannot be coerced or lies outside
+            [:attr:`minimum`, :attr:`maximum`].
+        '''
+        try:
+            value = self.ptype(value)
+        except (TypeError, ValueError):
+            raise ValueError(f'{self.name}: invalid value {value!r}')
+        if ((self.minimum is not None and value < self.minimum) or
+                (self.maximum is not None and value > self.maximum)):
+            raise ValueError(f'{self.name}: {value} outside '
+                             f'[{self.minimum}, {self.maximum}]')
+        return value
+
+    def encode(self, value) -> str:
+        '''Return the set command for an already validated *value*.'''
+        if self.boolint:
+            return f'{self.mnemonic}{int(bool(value))}'
+        return f'{self.mnemonic}{value}'
+
+    def decode(self, response: str):
+        '''Return the typed value of a query *response*, or ``None``.'''
+        try:
+            if self.boolint:
+                return self.ptype(int(response))
+            return self.ptype(response)
+        except (ValueError, TypeError):
+            return None
+
+
+class QCommandMapMixin:
+    '''Mixin that builds instrument properties from a command map.
+
+    Instruments whose properties follow the ``CMD?`` / ``CMDvalue``
+    convention (e.g. the Stanford Research Systems family) declare
+    them as data in a class-level :attr:`COMMANDS` table instead of
+    writing getters and setters:
+
+    .. code-block:: python
+
+        class QMyInstrument(QCommandMapMixin, QSerialInstrument):
+            COMMANDS = (
+                Command('frequency', 'FREQ', minimum=1e-3, maximum=1e5),
+                Command('harmonic',  'HARM', int, minimum=1),
+                Command('coupling',  'ICPL', bool),
+            )
+
+    Each command is compiled once, when the class is defined, into a
+    :attr:`~QAbstractInstrument.PROPERTIES` entry.  Setters validate
+    values against the declared range before anything is sent and
+    reject out-of-range values with ``ValueError``.  Reading
+    :attr:`settings` fetches every command property with as few
+    ``;``-joined multi-queries as :attr:`MAX_QUERY_LENGTH` allows.
+
+    Fakes override :meth:`_queryCommands` and :meth:`_writeCommand`
+    (see :class:`~QInstrument.lib.QFakeInstrument.QFakeInstrument`).
+    '''
+
+    COMMANDS: tuple[Command, ...] = ()
+    _commands = MappingProxyType({})
+
+    MAX_QUERY_LENGTH: int = 255
+    '''Longest command line, in characters, sent by
+    :meth:`readCommands`.  Default: ``255``, one less than the input
+    buffer of the SRS instruments.'''
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        commands = vars(cls).get('COMMANDS')
+        if commands:
+            cls.PROPERTIES = (tuple(vars(cls).get('PROPERTIES', ())) +
+                              tuple(c.spec for c in commands))
+        merged = {}
+        for klass in reversed(cls.__mro__):
+            for command in vars(klass).get('COMMANDS', ()):
+                merged[command.name] = command
+        cls._commands = MappingProxyType(merged)
+        super().__init_subclass__(**kwargs)
+
+    @property
+    def commands(self) -> list[str]:
+        '''Names of all properties declared in the command map.'''
+        return list(self._commands)
+
+    def _readCommand(self, command: Command):
+        '''Query one command and return its typed value.'''
+        return self._queryCommands([command])[0]
+
+    def _writeCommand(self, command: Command, value) -> None:
+        '''Validate *value* and send the set command.'''
+        self.transmit(command.encode(command.validate(value)))
+
+    def _queryCommands(self, commands: list[Command]) -> list:
+        '''Query *commands* in batches and return their typed values.
+
+        Commands are joined with ``;`` into command lines no longer
+        than :attr:`MAX_QUERY_LENGTH`.  The instrument answers each
+        query with its own terminated response.  A batch with a
+        response that cannot be decoded is repeated after
+        :meth:`~QSerialInstrument.recover`; responses that still
+        cannot be decoded give ``None``.
+        '''
+        values = []
+        for batch in self._batches(commands):
+            decoded = []
+
+            def read(batch=batch, decoded=decoded):
+                decoded[:] = [c.decode(self.receive().strip())
+                              for c in batch]
+                return None if None in decoded else decoded
+            self.exchange(';'.join(c.query for c in batch), read)
+            values.extend(decoded)
+        return values
+
+    def _batches(self, commands: list[Command]):
+        batch, length = [], -1
+        for command in commands:
+            size = len(command.query) + 1
+            if batch and length + size > self.MAX_QUERY_LENGTH:
+                yield batch
+                batch, length = [], -1
+            batch.append(command)
+            length += size
+        if batch:
+            yield batch
+
+    def readCommands(self,
+                     names: Iterable[str] | None = None) -> dict:
+        '''Return the values of command-map properties in bulk.
+
+        Parameters
+        ----------
+        names : Iterable[str] or None, optional
+            Property names to read.  Names not in the command map are
+            ignored.  Default: ``None``, which reads every command.
+
+        Returns
+        -------
+        dict
+            Property names mapped to values (``None`` on parse failure).
+        '''
+        if names is None:
+            commands = list(self._commands.values())
+        else:
+            commands = [self._commands[n] for n in names
+                        if n in self._commands]
+        values = self._queryCommands(commands)
+        return {c.name: v for c, v in zip(commands, values)}
+
+    @property
+    def settings(self) -> QAbstractInstrument.Settings:
+        '''Current values of all writable registered properties.
+
+        Same as :attr:`QAbstractInstrument.settings`, except that
+        command-map properties are read with batched multi-queries.
+        Properties re-registered per instance are read through their
+        own getters.
+        '''
+        registry = self._properties
+        batched = [c for name, c in self._commands.items()
+                   if registry.get(name) is c.spec]
+        values = dict(zip((c.name for c in batched),
+                          self._queryCommands(batched)))
+        return {name: values[name] if name in values else spec.read(self)
+                for name, spec in registry.items()
+                if spec.setter is not None}
+
+    @settings.setter
+    def settings(self, settings: QAbstractInstrument.Settings) -> None:
+        QAbstractInstrument.settings.fset(self, settings)
+
+
+__all__ = ['Command', 'QCommandMapMixin']
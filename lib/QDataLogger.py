@@ -0,0 +1,435 @@
+import csv
+import logging
+import time
+from pathlib import Path
+import numpy as np
+from qtpy import QtCore
+from QInstrument.lib.Configure import Configure
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+
+logger = logging.getLogger(__name__)
+
+
+class _Chunk:
+    '''Preallocated columnar block of ``(t, channel, value)`` samples.'''
+
+    __slots__ = ('t', 'channel', 'value', 'count')
+
+    def __init__(self, size: int) -> None:
+        self.t = np.empty(size)
+        self.channel = np.empty(size, dtype=np.int32)
+        self.value = np.empty(size)
+        self.count = 0
+
+    def columns(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        n = self.count
+        return self.t[:n], self.channel[:n], self.value[:n]
+
+
+class _HDF5Writer:
+    '''Appends chunks to resizable ``t``/``channel``/``value`` datasets.'''
+
+    suffix = '.h5'
+
+    def __init__(self, path: Path, chunk_size: int) -> None:
+        self.file = h5py.File(path, 'a')
+        for name, dtype in (('t', 'f8'), ('channel', 'i4'), ('value', 'f8')):
+            if name not in self.file:
+                self.file.create_dataset(name, (0,), dtype=dtype,
+                                         maxshape=(None,),
+                                         chunks=(chunk_size,))
+
+    def write(self, columns, channels, meta) -> None:
+        n = len(columns[0])
+        for name, data in zip(('t', 'channel', 'value'), columns):
+            dataset = self.file[name]
+            start = dataset.shape[0]
+            dataset.resize((start + n,))
+            dataset[start:] = data
+        self.file.attrs['channels'] = list(channels)
+        self.file.attrs.update(meta)
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class _NpzWriter:
+    '''Writes each chunk as a numbered ``.npz`` file in a directory.'''
+
+    suffix = ''
+
+    def __init__(self, path: Path, chunk_size: int) -> None:
+        path.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.index = len(list(path.glob('chunk_*.npz')))
+
+    def write(self, columns, channels, meta) -> None:
+        name = self.path / f'chunk_{self.index:06d}.npz'
+        t, channel, value = columns
+        np.savez(name, t=t, channel=channel, value=value,
+                 channels=np.array(channels, dtype=str),
+                 **{k: np.asarray(v) for k, v in meta.items()})
+        self.index += 1
+
+    def close(self) -> None:
+        pass
+
+
+class _CSVWriter:
+    '''Appends ``t,channel,value`` rows to a text file.'''
+
+    suffix = '.csv'
+
+    def __init__(self, path: Path, chunk_size: int) -> None:
+        new = not path.exists()
+        self.file = open(path, 'a', newline='')
+        self.writer = csv.writer(self.file)
+        if new:
+            self.writer.writerow(('t', 'channel', 'value'))
+
+    def write(self, columns, channels, meta) -> None:
+        t, channel, value = columns
+        self.writer.writerows(zip(t.tolist(),
+                                  (channels[c] for c in channel),
+                                  value.tolist()))
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+_WRITERS = {'hdf5': _HDF5Writer, 'npz': _NpzWriter, 'csv': _CSVWriter}
+
+
+class _Writer(QtCore.QObject):
+    '''Owns the output file on the logger's background thread.'''
+
+    written = QtCore.Signal(int)
+
+    def __init__(self, backend: type, path: Path, chunk_size: int) -> None:
+        super().__init__()
+        self._backend = backend
+        self._path = path
+        self._chunkSize = chunk_size
+        self._file = None
+
+    @QtCore.Slot(object, object, object)
+    def write(self, columns, channels, meta) -> None:
+        try:
+            if self._file is None:
+                self._path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = self._backend(self._path, self._chunkSize)
+            self._file.write(columns, channels, meta)
+        except (OSError, ValueError) as exc:
+            logger.error(f'Could not write {self._path}: {exc}')
+            return
+        self.written.emit(len(columns[0]))
+
+    @QtCore.Slot()
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class QDataLogger(QtCore.QObject):
+    '''Background logger for instrument property values.
+
+    Records every value an instrument emits through
+    :attr:`~QAbstractInstrument.propertyValue` and
+    :attr:`~QAbstractInstrument.settingsRead` as a ``(t, channel,
+    value)`` sample.  ``t`` is :func:`time.monotonic` seconds and
+    ``channel`` indexes :attr:`channels`, whose entries are
+    ``'<label>.<property>'``; each element of a sequence value (e.g.
+    a stage position) is its own channel, ``'<label>.<property>[i]'``.
+    Non-numeric values are not logged.
+
+    Samples are recorded on the emitting thread into preallocated
+    columnar NumPy chunks of :attr:`CHUNK_SIZE` samples — no event is
+    posted to the GUI thread per sample.  A full chunk, or the partial
+    chunk every :attr:`FLUSH_INTERVAL` milliseconds, is handed to a
+    writer on a background thread, so neither the GUI nor the device
+    workers wait for the disk.
+
+    Output formats:
+
+    ``'hdf5'``
+        One file with appendable ``t``, ``channel`` and ``value``
+        datasets and a ``channels`` attribute.  Requires ``h5py``.
+    ``'npz'``
+        A directory of numbered ``chunk_NNNNNN.npz`` files.
+    ``'csv'``
+        One text file of ``t,channel,value`` rows.
+
+    :func:`read_log` loads any of them back.
+
+    .. code-block:: python
+
+        log = QDataLogger()
+        log.addInstrument(lockin, ['x', 'y'])
+        log.addInstrument(stage, label='stage')
+        log.start()
+        ...
+        log.stop()
+
+    Parameters
+    ----------
+    filename : str or None, optional
+        Output path without suffix.  Default: ``None``, which uses
+        :meth:`Configure.filename` with prefix ``'QDataLogger'``.
+    format : str or None, optional
+        ``'hdf5'``, ``'npz'`` or ``'csv'``.  Default: ``None``, which
+        selects ``'hdf5'`` when ``h5py`` is installed and ``'npz'``
+        otherwise.
+    chunk_size : int or None, optional
+        Overrides :attr:`CHUNK_SIZE`.
+    flush_interval : int or None, optional
+        Overrides :attr:`FLUSH_INTERVAL`.
+
+    Signals
+    -------
+    written(int)
+        Emitted after each chunk is written, carrying its length.
+    '''
+
+    CHUNK_SIZE: int = 4096
+    '''Samples per chunk.'''
+
+    FLUSH_INTERVAL: int = 5000
+    '''Milliseconds between writes of a partially filled chunk.'''
+
+    written = QtCore.Signal(int)
+
+    _chunkReady = QtCore.Signal(object, object, object)
+    _closeRequested = QtCore.Signal()
+
+    def __init__(self,
+                 filename: str | None = None,
+                 format: str | None = None,
+                 chunk_size: int | None = None,
+                 flush_interval: int | None = None,
+                 parent: QtCore.QObject | None = None) -> None:
+        super().__init__(parent)
+        if format is None:
+            format = 'hdf5' if h5py is not None else 'npz'
+        if format not in _WRITERS:
+            raise ValueError(f'Unknown log format: {format!r}')
+        if format == 'hdf5' and h5py is None:
+            raise ImportError("h5py is required for HDF5 logging. "
+                              "Install it with: pip install h5py")
+        self.format = format
+        self.chunkSize = chunk_size or self.CHUNK_SIZE
+        self.flushInterval = flush_interval or self.FLUSH_INTERVAL
+        backend = _WRITERS[format]
+        if filename is None:
+            filename = Configure().filename('QDataLogger')
+        self.path = Path(str(filename) + backend.suffix)
+        self.mutex = QtCore.QMutex()
+        self._chunk = _Chunk(self.chunkSize)
+        self._channels: dict[str, int] = {}
+        self._sources: dict[object, tuple] = {}
+        self._running = False
+        self._meta = {}
+        self._writer = _Writer(backend, self.path, self.chunkSize)
+        self._writer.written.connect(self.written)
+        self._chunkReady.connect(self._writer.write)
+        self._closeRequested.connect(
+            self._writer.close,
+            QtCore.Qt.ConnectionType.BlockingQueuedConnection)
+        self._thread = QtCore.QThread(self)
+        self._writer.moveToThread(self._thread)
+        self._timer = QtCore.QTimer(self)
+        self._timer.timeout.connect(self.flush)
+
+    @property
+    def channels(self) -> list[str]:
+        '''Channel names, indexed by the logged ``channel`` column.'''
+        return list(self._channels)
+
+    def isRunning(self) -> bool:
+        '''Return True between :meth:`start` and :meth:`stop`.'''
+        return self._running
+
+    def addInstrument(self,
+                      instrument: QtCore.QObject,
+                      names: list[str] | None = None,
+                      label: str | None = None) -> None:
+        '''Log the property values of *instrument*.
+
+        If the instrument supports subscriptions (see
+        :meth:`QPollingMixin.subscribe`), the logger subscribes to the
+        logged properties so that they keep being polled.
+
+        Parameters
+        ----------
+        instrument : QAbstractInstrument
+            Instrument to log.
+        names : list[str] or None, optional
+            Properties to log.  Default: ``None`` (all).
+        label : str or None, optional
+            Channel prefix.  Default: the instrument's class name.
+        '''
+        if instrument in self._sources:
+            return
+        label = label or type(instrument).__name__
+        wanted = None if names is None else frozenset(names)
+
+        def onValue(name, value):
+            if wanted is None or name in wanted:
+                self.record(f'{label}.{name}', value)
+
+        def onSettings(settings):
+            for name, value in settings.items():
+                onValue(name, value)
+
+        direct = QtCore.Qt.ConnectionType.DirectConnection
+        instrument.propertyValue.connect(onValue, direct)
+        instrument.settingsRead.connect(onSettings, direct)
+        subscribed = list(instrument.properties if names is None else names)
+        if hasattr(instrument, 'subscribe'):
+            instrument.subscribe(subscribed)
+        self._sources[instrument] = (onValue, onSettings, subscribed)
+
+    def removeInstrument(self, instrument: QtCore.QObject) -> None:
+        '''Stop logging *instrument*.  Unknown instruments are ignored.'''
+        source = self._sources.pop(instrument, None)
+        if source is None:
+            return
+        onValue, onSettings, subscribed = source
+        instrument.propertyValue.disconnect(onValue)
+        instrument.settingsRead.disconnect(onSettings)
+        if hasattr(instrument, 'unsubscribe'):
+            instrument.unsubscribe(subscribed)
+
+    def record(self, channel: str, value: object,
+               t: float | None = None) -> None:
+        '''Log *value* on *channel*.
+
+        Thread-safe.  Does nothing while the logger is stopped, or if
+        *value* is not numeric.
+
+        Parameters
+        ----------
+        channel : str
+            Channel name.
+        value : object
+            Number, bool, or sequence of numbers.
+        t : float or None, optional
+            Timestamp in :func:`time.monotonic` seconds.
+            Default: ``None`` (now).
+        '''
+        if not self._running:
+            return
+        try:
+            data = np.asarray(value, dtype=float)
+        except (TypeError, ValueError):
+            return
+        t = time.monotonic() if t is None else t
+        if data.ndim == 0:
+            samples = ((channel, float(data)),)
+        else:
+            samples = ((f'{channel}[{i}]', float(v))
+                       for i, v in enumerate(data.ravel()))
+        with QtCore.QMutexLocker(self.mutex):
+            for name, v in samples:
+                index = self._channels.setdefault(name, len(self._channels))
+                chunk = self._chunk
+                n = chunk.count
+                chunk.t[n] = t
+                chunk.channel[n] = index
+                chunk.value[n] = v
+                chunk.count = n + 1
+                if chunk.count == self.chunkSize:
+                    self._handOff()
+
+    def _handOff(self) -> None:
+        '''Pass the current chunk to the writer.  Holds :attr:`mutex`.'''
+        chunk, self._chunk = self._chunk, _Chunk(self.chunkSize)
+        self._chunkReady.emit(chunk.columns(), tuple(self._channels),
+                              self._meta)
+
+    @QtCore.Slot()
+    def flush(self) -> None:
+        '''Write the samples recorded so far.'''
+        with QtCore.QMutexLocker(self.mutex):
+            if self._chunk.count:
+                self._handOff()
+
+    @QtCore.Slot()
+    def start(self) -> None:
+        '''Start recording and the background writer.'''
+        if self._running:
+            return
+        self._meta = dict(start_monotonic=time.monotonic(),
+                          start_time=time.time())
+        self._thread.start()
+        self._timer.start(self.flushInterval)
+        self._running = True
+
+    @QtCore.Slot()
+    def stop(self) -> None:
+        '''Stop recording, write what remains and close the file.'''
+        if not self._running:
+            return
+        self._running = False
+        self._timer.stop()
+        self.flush()
+        self._closeRequested.emit()
+        self._thread.quit()
+        self._thread.wait()
+
+    def close(self) -> None:
+        '''Stop logging and release every instrument.'''
+        for instrument in list(self._sources):
+            self.removeInstrument(instrument)
+        self.stop()
+
+
+def read_log(path: str | Path) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    '''Load a log written by :class:`QDataLogger`.
+
+    Parameters
+    ----------
+    path : str or Path
+        ``.h5`` file, ``.csv`` file, or directory of ``.npz`` chunks.
+
+    Returns
+    -------
+    dict
+        Channel names mapped to ``(t, value)`` arrays in time order.
+    '''
+    path = Path(path)
+    if path.is_dir():
+        chunks = [np.load(f) for f in sorted(path.glob('chunk_*.npz'))]
+        if not chunks:
+            return {}
+        channels = list(chunks[-1]['channels'])
+        t, channel, value = (np.concatenate([c[k] for c in chunks])
+                             for k in ('t', 'channel', 'value'))
+    elif path.suffix == '.csv':
+        with open(path, newline='') as f:
+            rows = list(csv.reader(f))[1:]
+        channels = list(dict.fromkeys(r[1] for r in rows))
+        index = {name: i for i, name in enumerate(channels)}
+        t = np.array([float(r[0]) for r in rows])
+        channel = np.array([index[r[1]] for r in rows], dtype=int)
+        value = np.array([float(r[2]) for r in rows])
+    else:
+        if h5py is None:
+            raise ImportError('h5py is required to read HDF5 logs')
+        with h5py.File(path, 'r') as f:
+            channels = [str(c) for c in f.attrs['channels']]
+            t, channel, value = (f[k][()] for k in ('t', 'channel', 'value'))
+    order = np.argsort(t, kind='stable')
+    t, channel, value = t[order], channel[order], value[order]
+    return {name: (t[channel == i], value[channel == i])
+            for i, name in enumerate(channels)}
+
+
+__all__ = ['QDataLogger', 'read_log']
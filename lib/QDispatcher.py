@@ -0,0 +1,176 @@
+import logging
+import time
+from typing import Callable
+import numpy as np
+from qtpy import QtCore
+
+
+logger = logging.getLogger(__name__)
+
+
+class _Agent(QtCore.QObject):
+    '''Runs the dispatcher's calls for one label on its instrument's thread.'''
+
+    def __init__(self, dispatcher: 'QDispatcher', label: str) -> None:
+        super().__init__()
+        self._dispatcher = dispatcher
+        self._label = label
+
+    @QtCore.Slot(int, object)
+    def call(self, token: int, calls: dict) -> None:
+        fn = calls.get(self._label)
+        if fn is None:
+            return
+        t0 = time.monotonic()
+        try:
+            result = fn()
+        except Exception as exc:
+            logger.error(f'{self._label}: {exc}')
+            result = None
+        t1 = time.monotonic()
+        self._dispatcher._deliver(token, self._label, t0, t1, result)
+
+
+class QDispatcher(QtCore.QObject):
+    '''Runs calls in parallel, each on the thread of its instrument.
+
+    Instruments are registered under labels with
+    :meth:`setInstrument`.  :meth:`dispatch` posts one queued request
+    to the worker threads of all the labels it names at once, so the
+    calls overlap instead of following one another, and waits for
+    them to finish.  Each call is bracketed by :func:`time.monotonic`
+    timestamps taken on the worker.  Instruments on the calling thread
+    (e.g. fakes) are served synchronously, one after another.
+
+    A call that raises is logged and returns ``None``.  Results of a
+    call that finishes after :meth:`dispatch` has given up on it are
+    discarded.
+
+    This is the engine shared by :class:`QSnapshot` and
+    :class:`QSequencer`.
+    '''
+
+    _callRequested = QtCore.Signal(int, object)
+
+    def __init__(self, parent: QtCore.QObject | None = None) -> None:
+        super().__init__(parent)
+        self.mutex = QtCore.QMutex()
+        self._instruments: dict[str, QtCore.QObject] = {}
+        self._agents: dict[str, _Agent] = {}
+        self._token = 0
+        self._results: dict[str, tuple] = {}
+        self._semaphore = QtCore.QSemaphore()
+
+    def setInstrument(self, label: str, instrument: QtCore.QObject) -> None:
+        '''Serve the calls of *label* on the thread of *instrument*.'''
+        if self._instruments.get(label) is not instrument:
+            self.removeInstrument(label)
+            self._instruments[label] = instrument
+
+    def removeInstrument(self, label: str) -> None:
+        '''Forget *label*.'''
+        self._instruments.pop(label, None)
+        agent = self._agents.pop(label, None)
+        if agent is not None:
+            agent.deleteLater()
+
+    def _agent(self, label: str) -> _Agent:
+        '''Return the agent of *label*, living on its instrument's thread.
+
+        A new agent is made whenever the instrument has moved to
+        another thread (e.g. when a widget starts its worker).
+        '''
+        instrument = self._instruments[label]
+        agent = self._agents.get(label)
+        if agent is None or agent.thread() is not instrument.thread():
+            if agent is not None:
+                agent.deleteLater()
+            agent = _Agent(self, label)
+            agent.moveToThread(instrument.thread())
+            self._callRequested.connect(agent.call)
+            self._agents[label] = agent
+        return agent
+
+    def _deliver(self, token: int, label: str,
+                 t0: float, t1: float, result: object) -> None:
+        '''Store the result of one call.  Called on its thread.'''
+        with QtCore.QMutexLocker(self.mutex):
+            if token != self._token:
+                return
+            self._results[label] = (t0, t1, result)
+            semaphore = self._semaphore
+        semaphore.release()
+
+    def dispatch(self, calls: dict[str, Callable],
+                 timeout: int) -> dict[str, tuple]:
+        '''Run *calls* in parallel, each on its instrument's thread.
+
+        Blocks until every call has finished or *timeout* milliseconds
+        have passed.
+
+        Parameters
+        ----------
+        calls : dict
+            Labels mapped to callables that take no arguments.
+        timeout : int
+            Milliseconds to wait.
+
+        Returns
+        -------
+        dict
+            Labels mapped to ``(t0, t1, result)``.  Labels that did
+            not finish in time are missing.
+        '''
+        if not calls:
+            return {}
+        for label in calls:
+            self._agent(label)
+        with QtCore.QMutexLocker(self.mutex):
+            self._token += 1
+            token = self._token
+            self._results = {}
+            self._semaphore = semaphore = QtCore.QSemaphore()
+        self._callRequested.emit(token, calls)
+        semaphore.tryAcquire(len(calls), timeout)
+        with QtCore.QMutexLocker(self.mutex):
+            self._token += 1
+            return self._results
+
+
+def readValues(instrument: QtCore.QObject, names: list[str]) -> dict:
+    '''Read *names* of *instrument* and return them as a dict.
+
+    Command-map properties (see :class:`QCommandMapMixin`) are read
+    with a single multi-query and announced on
+    :attr:`propertyValue`.  Other properties are read with
+    :meth:`get`.  A name that is not a property is called as a method
+    that takes no arguments.
+    '''
+    commands = getattr(instrument, 'commands', ())
+    batched = [n for n in names if n in commands]
+    values = instrument.readCommands(batched) if batched else {}
+    properties = instrument.properties
+    for name in names:
+        if name in values:
+            instrument.propertyValue.emit(name, values[name])
+        elif name in properties:
+            values[name] = instrument.get(name)
+        else:
+            values[name] = getattr(instrument, name)()
+    return values
+
+
+def field(name: str, value: object) -> tuple:
+    '''Return the structured dtype field that holds values like *value*.
+
+    Numeric values become ``float64`` fields, fixed-length numeric
+    sequences ``float64`` subarrays, and anything else ``object``.
+    '''
+    try:
+        shape = np.asarray(value, dtype=float).shape
+    except (TypeError, ValueError):
+        return (name, 'O')
+    return (name, 'f8', shape)
+
+
+__all__ = ['QDispatcher', 'readValues', 'field']
@@ -1,4 +1,5 @@
 import logging
+from qtpy import QtCore
 from .QAbstractInstrument import QAbstractInstrument
 
 logger = logging.getLogger(__name__)
@@ -18,7 +19,11 @@ class QFakeInstrument(QAbstractInstrument):
 
     MRO resolution ensures that :meth:`_register` here is called instead of
     the real instrument's version, wiring every standard property to
-    :attr:`_store` rather than to the serial port.  :meth:`__init__`
+    :attr:`_store` rather than to the serial port.  Instruments that
+    declare a command map through
+    :class:`~QInstrument.lib.QCommandMapMixin.QCommandMapMixin` are
+    redirected the same way by :meth:`_queryCommands` and
+    :meth:`_writeCommand`.  :meth:`__init__`
     initializes :attr:`_store`, then calls ``QAbstractInstrument.__init__``
     directly, bypassing ``QSerialInstrument`` so no serial port is created.
     ``QAbstractInstrument.__init__`` calls ``_registerProperties()`` and
@@ -35,6 +40,11 @@ class QFakeInstrument(QAbstractInstrument):
     properties directly via :meth:`registerProperty`.
     '''
 
+    # Signals of QSerialInstrument are not part of a fake's metaobject,
+    # which follows this, the first base class.  Declared here so that
+    # fakes can stand in for serial instruments; it is never emitted.
+    statsUpdated = QtCore.Signal(dict)
+
     def __init__(self, *args, **kwargs) -> None:
         '''Initialize the in-memory store and register all properties.
 
@@ -48,7 +58,8 @@ class QFakeInstrument(QAbstractInstrument):
         self.identification = f'Fake {type(self).__name__}'
         QAbstractInstrument.__init__(self, *args, **kwargs)
 
-    def _register(self, name: str, cmd: str, dtype: type = float) -> None:
+    def _register(self, name: str, cmd: str,
+                  dtype: type = float, **meta) -> None:
         '''Register a property backed by :attr:`_store`.
 
         Overrides the real instrument's ``_register()`` via MRO.  *cmd* is
@@ -62,6 +73,9 @@ class QFakeInstrument(QAbstractInstrument):
             Ignored.  Present to match the real instrument's signature.
         dtype : type, optional
             Value type for storage coercion.  Default: ``float``.
+        **meta :
+            Additional property metadata passed to
+            :meth:`registerProperty` (e.g. ``after``).
         '''
         def getter():
             return self._store.get(name, dtype())
@@ -72,7 +86,26 @@ class QFakeInstrument(QAbstractInstrument):
         self.registerProperty(name,
                               getter=getter,
                               setter=setter,
-                              ptype=dtype)
+                              ptype=dtype,
+                              **meta)
+
+    def _queryCommands(self, commands: list) -> list:
+        '''Return stored values for command-map properties.
+
+        Overrides :meth:`QCommandMapMixin._queryCommands` via MRO.
+        Commands that were never written return their
+        :attr:`~QInstrument.lib.QCommandMapMixin.Command.default`.
+        '''
+        return [self._store.get(c.name, c.default) for c in commands]
+
+    def _writeCommand(self, command, value) -> None:
+        '''Validate and store a command-map property value.
+
+        Overrides :meth:`QCommandMapMixin._writeCommand` via MRO, so
+        fakes reject out-of-range values exactly like the hardware
+        driver.
+        '''
+        self._store[command.name] = command.validate(value)
 
     def transmit(self, data) -> None:
         '''No-op: fake instruments have no transport layer.'''
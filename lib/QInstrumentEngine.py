@@ -0,0 +1,442 @@
+import importlib
+import logging
+
+from qtpy import QtCore
+from QInstrument.lib.QSerialInstrument import QSerialInstrument
+from QInstrument.lib.Configure import Configure
+from QInstrument.lib.InstrumentProxy import InstrumentProxy
+from QInstrument.lib.lazy import find_fake_cls, values_differ
+from QInstrument.lib.discovery import (available_instruments,
+                                       find_instrument_module)
+
+
+logger = logging.getLogger(__name__)
+
+
+class _Link(QtCore.QObject):
+    '''Runs requests to one instrument on the instrument's thread.
+
+    Lives on the same thread as its instrument, so that requests
+    emitted on any other thread are queued to it.  Calls the
+    instrument directly rather than connecting to its slots, which
+    are missing from the metaobject of some fakes.
+    '''
+
+    readRequested = QtCore.Signal()
+    applyRequested = QtCore.Signal(object, object)
+    pollRequested = QtCore.Signal()
+
+    def __init__(self, device: QtCore.QObject) -> None:
+        super().__init__()
+        self.device = device
+        self.moveToThread(device.thread())
+        self.readRequested.connect(self._read)
+        self.applyRequested.connect(self._apply)
+        self.pollRequested.connect(self._poll)
+
+    @QtCore.Slot()
+    def _read(self) -> None:
+        self.device.readSettings()
+
+    @QtCore.Slot(object, object)
+    def _apply(self, target: dict, current: dict) -> None:
+        self.device.applySettings(target, current)
+
+    @QtCore.Slot()
+    def _poll(self) -> None:
+        self.device.startPolling()
+
+
+class _Entry:
+    '''State of one instrument managed by the engine.'''
+
+    __slots__ = ('device', 'link', 'thread', 'reconciling', 'ready',
+                 'settings', 'onValue')
+
+    def __init__(self, device: QtCore.QObject) -> None:
+        self.device = device
+        self.link = None
+        self.thread = None
+        self.reconciling = False
+        self.ready = False
+        self.settings: dict = {}
+        self.onValue = None
+
+
+class QInstrumentEngine(QtCore.QObject):
+    '''Runs a set of instruments without a graphical user interface.
+
+    The engine does for a set of instruments what
+    :class:`QInstrumentWidget` and :class:`QInstrumentTree` do for one
+    instrument on first show and on close, using only ``QtCore``, so
+    acquisition can run under a :class:`QCoreApplication` on a machine
+    without a display:
+
+    - **Discovery**: :meth:`addInstrumentByName` finds an instrument
+      under ``instruments/`` by its bare name, probes the serial ports
+      for it, or uses its fake.
+    - **Threads**: :meth:`start` moves every :class:`QSerialInstrument`
+      to a worker thread of its own, so that instruments do not block
+      each other or the main thread.
+    - **Settings**: the hardware settings are then read on each
+      instrument's thread and reconciled with the saved configuration
+      according to :attr:`policy` rather than a dialog.
+    - **Polling**: instruments with a :meth:`startPolling` slot start
+      polling once their settings have been reconciled.
+    - **Logging**: instruments are added to the optional
+      :class:`QDataLogger`, which runs while the engine does.
+    - **Saving**: :meth:`close` stops the instruments and saves the
+      last known settings of each.
+
+    Widgets become optional views of a running engine.  A widget or
+    tree given a device that already lives on a worker thread leaves
+    the thread to the engine:
+
+    .. code-block:: python
+
+        app = QtCore.QCoreApplication(sys.argv)
+        engine = QInstrumentEngine(instruments=['Proscan', 'SR830'],
+                                   policy='saved',
+                                   datalogger=QDataLogger('run'))
+        engine.start()
+        app.aboutToQuit.connect(engine.close)
+        app.exec()
+
+    Parameters
+    ----------
+    parent : QObject | None
+        Parent object.  Default: ``None``.
+    instruments : list[str] | None
+        Bare instrument names (e.g. ``'DS345'``) to add on
+        construction.  Default: ``None``.
+    fake : bool
+        Use fake devices for *instruments* instead of probing for
+        hardware.  Default: ``False``.
+    policy : str
+        How saved settings are reconciled with the hardware; one of
+        :attr:`POLICIES`.  Default: ``'hardware'``.
+    polling : bool
+        Start polling instruments that support it.  Default: ``True``.
+    datalogger : QDataLogger | None
+        Logger to which every instrument is added.  Default: ``None``.
+    configure : Configure | None
+        Configuration store.  Default: a new :class:`Configure`.
+
+    Class Attributes
+    ----------------
+    POLICIES : tuple[str, ...]
+        ``'hardware'`` keeps the hardware settings and records them as
+        the saved configuration; ``'saved'`` writes the saved settings
+        that differ to the hardware.  Without a saved configuration,
+        both record the hardware settings.
+
+    Signals
+    -------
+    instrumentReady(str)
+        Emitted with the instrument's name once its settings have been
+        reconciled and polling has been requested.
+    '''
+
+    POLICIES: tuple[str, ...] = ('hardware', 'saved')
+
+    instrumentReady = QtCore.Signal(str)
+
+    def __init__(self,
+                 parent: QtCore.QObject | None = None,
+                 instruments: list[str] | None = None,
+                 fake: bool = False,
+                 policy: str = 'hardware',
+                 polling: bool = True,
+                 datalogger: QtCore.QObject | None = None,
+                 configure: Configure | None = None) -> None:
+        super().__init__(parent)
+        if policy not in self.POLICIES:
+            raise ValueError(f'policy must be one of {self.POLICIES}')
+        self.policy = policy
+        self.polling = polling
+        self.datalogger = datalogger
+        self._configure = configure or Configure()
+        self._entries: dict[str, _Entry] = {}
+        self._running = False
+        self.addInstrumentsByNames(instruments, fake=fake)
+
+    @property
+    def names(self) -> list[str]:
+        '''Names of the managed instruments, in the order added.'''
+        return list(self._entries)
+
+    def device(self, name: str) -> QtCore.QObject | None:
+        '''Return the instrument called *name*, or ``None``.'''
+        entry = self._entries.get(name)
+        return entry.device if entry is not None else None
+
+    def proxy(self, name: str) -> InstrumentProxy | None:
+        '''Return a thread-safe proxy of *name*, or ``None``.
+
+        Scripts use the proxy to call the instrument while the engine
+        runs it on a worker thread.  See :class:`InstrumentProxy`.
+        '''
+        device = self.device(name)
+        return InstrumentProxy(device) if device is not None else None
+
+    def isRunning(self) -> bool:
+        '''Return True between :meth:`start` and :meth:`stop`.'''
+        return self._running
+
+    def isReady(self, name: str) -> bool:
+        '''Return True once the settings of *name* are reconciled.'''
+        entry = self._entries.get(name)
+        return entry is not None and entry.ready
+
+    def addInstrument(self, device: QtCore.QObject, name: str = '') -> str:
+        '''Manage *device*, starting it if the engine is running.
+
+        Parameters
+        ----------
+        device : QAbstractInstrument
+            Open instrument.
+        name : str
+            Name of the instrument.  Default: the class name without
+            its ``Q`` prefix.  A name in use gets a numeric suffix.
+
+        Returns
+        -------
+        str
+            The name under which the instrument is managed.
+        '''
+        name = name or type(device).__name__.removeprefix('Q')
+        base, n = name, 1
+        while name in self._entries:
+            n += 1
+            name = f'{base}-{n}'
+        self._entries[name] = _Entry(device)
+        if self.datalogger is not None:
+            self.datalogger.addInstrument(device, label=name)
+        if self._running:
+            self._startInstrument(name)
+        return name
+
+    def addInstrumentByName(self, name: str,
+                            fake: bool = False) -> QtCore.QObject | None:
+        '''Find and manage an instrument by its bare name.
+
+        Searches manufacturer subdirectories under ``instruments/``
+        for a package named *name* that contains an ``instrument.py``
+        and instantiates ``Q<name>``.  Logs a warning and returns
+        ``None`` if the instrument cannot be loaded or found.
+
+        Parameters
+        ----------
+        name : str
+            Bare instrument name (e.g. ``'DS345'``).
+        fake : bool
+            Use the fake device from the sibling ``fake.py`` instead of
+            probing for hardware.  Default: ``False``.
+
+        Returns
+        -------
+        QAbstractInstrument | None
+            The instrument, or ``None``.
+        '''
+        modulename = self._findInstrumentModule(name)
+        if modulename is None:
+            logger.warning(f"Instrument '{name}' not found.")
+            return None
+        try:
+            cls = getattr(importlib.import_module(modulename), f'Q{name}')
+        except (ModuleNotFoundError, AttributeError) as e:
+            logger.warning(f"Error loading instrument '{name}': {e}")
+            return None
+        fake_cls = find_fake_cls(cls) if fake else None
+        if fake and fake_cls is None:
+            logger.warning(f"No fake available for '{name}'; "
+                           'probing for hardware.')
+        device = fake_cls() if fake_cls is not None else cls().find()
+        if not device.isOpen():
+            logger.warning(f"Instrument '{name}' is not connected.")
+            return None
+        self.addInstrument(device, name)
+        return device
+
+    def addInstrumentsByNames(self, names: list[str] | None,
+                              fake: bool = False) -> None:
+        '''Add instruments by their bare names.
+
+        Parameters
+        ----------
+        names : list[str] | None
+            Bare instrument names.  ``None`` is treated as an empty
+            list.
+        fake : bool
+            Passed to :meth:`addInstrumentByName`.  Default: ``False``.
+        '''
+        for name in (names or []):
+            self.addInstrumentByName(name, fake=fake)
+
+    def removeInstrument(self, name: str) -> None:
+        '''Stop, save and release the instrument called *name*.
+
+        Unknown names are ignored.
+        '''
+        entry = self._entries.pop(name, None)
+        if entry is None:
+            return
+        if self.datalogger is not None:
+            self.datalogger.removeInstrument(entry.device)
+        self._closeInstrument(entry)
+
+    @classmethod
+    def availableInstruments(cls) -> list[str]:
+        '''Return the sorted bare names of all instruments.'''
+        return available_instruments('instrument')
+
+    @classmethod
+    def _findInstrumentModule(cls, name: str) -> str | None:
+        '''Return the dotted path of *name*'s instrument module.'''
+        return find_instrument_module(name, 'instrument')
+
+    @QtCore.Slot()
+    def start(self) -> None:
+        '''Start the instruments and the data logger.
+
+        Instruments started before resume polling; the others are
+        moved to their threads and their settings reconciled first.
+        '''
+        if self._running:
+            return
+        self._running = True
+        if self.datalogger is not None:
+            self.datalogger.start()
+        for name in self._entries:
+            self._startInstrument(name)
+
+    @QtCore.Slot()
+    def stop(self) -> None:
+        '''Stop polling and logging.  The worker threads keep running.'''
+        if not self._running:
+            return
+        self._running = False
+        for entry in self._entries.values():
+            if hasattr(entry.device, 'stopPolling'):
+                entry.device.stopPolling()
+        if self.datalogger is not None:
+            self.datalogger.stop()
+
+    @QtCore.Slot()
+    def close(self) -> None:
+        '''Stop, save the settings of and release every instrument.'''
+        self.stop()
+        for name in list(self._entries):
+            self.removeInstrument(name)
+        if self.datalogger is not None:
+            self.datalogger.close()
+
+    def _startInstrument(self, name: str) -> None:
+        entry = self._entries[name]
+        if entry.link is None:
+            self._startDeviceThread(name, entry)
+            entry.reconciling = True
+            entry.link.readRequested.emit()
+        elif entry.ready:
+            self._startPolling(entry)
+
+    def _startDeviceThread(self, name: str, entry: _Entry) -> None:
+        '''Move a serial instrument to a worker thread and link it.
+
+        Other instruments, and instruments that already live on a
+        thread other than the engine's, stay where they are.  The
+        link is made after the move, so that requests are queued to
+        the instrument's thread.
+        '''
+        device = entry.device
+        if (isinstance(device, QSerialInstrument) and
+                device.thread() is self.thread()):
+            entry.thread = QtCore.QThread(self)
+            entry.thread.setObjectName(name)
+            device.moveToThread(entry.thread)
+            entry.thread.start()
+        link = _Link(device)
+        device.settingsRead.connect(self._onSettingsRead)
+
+        def onValue(name, value):
+            # Runs on the instrument's thread; tracks saved settings.
+            if name in entry.settings:
+                entry.settings[name] = value
+
+        device.propertyValue.connect(
+            onValue, QtCore.Qt.ConnectionType.DirectConnection)
+        entry.link, entry.onValue = link, onValue
+
+    def _startPolling(self, entry: _Entry) -> None:
+        if self.polling and hasattr(entry.device, 'startPolling'):
+            entry.link.pollRequested.emit()
+
+    @QtCore.Slot(object)
+    def _onSettingsRead(self, hw: dict) -> None:
+        '''Reconcile the hardware settings read on request.
+
+        Ignores emissions of :attr:`device.settingsRead` that were not
+        requested by :meth:`_startInstrument`.
+        '''
+        device = self.sender()
+        for name, entry in self._entries.items():
+            if entry.device is device:
+                break
+        else:
+            return
+        if not entry.reconciling:
+            return
+        entry.reconciling = False
+        entry.settings = dict(hw)
+        self._reconcileSettings(name, entry, hw)
+        entry.ready = True
+        if self._running:
+            self._startPolling(entry)
+        self.instrumentReady.emit(name)
+
+    def _reconcileSettings(self, name: str, entry: _Entry,
+                           hw: dict) -> None:
+        '''Reconcile *hw* with the saved configuration by :attr:`policy`.
+
+        Mirrors :meth:`QInstrumentWidget._reconcileSettings`, with the
+        policy taking the place of the user's choice.
+        '''
+        device = entry.device
+        saved = self._configure.read(device)
+        if saved is None:
+            self._configure.save(device, settings=hw)
+            return
+        differ = [k for k in hw
+                  if k in saved and values_differ(hw[k], saved[k])]
+        if not differ:
+            return
+        if self.policy == 'hardware':
+            logger.info(f'Keeping hardware settings of {name}: '
+                        f'{", ".join(differ)}')
+            self._configure.save(device, settings=hw)
+        else:
+            logger.info(f'Restoring saved settings of {name}: '
+                        f'{", ".join(differ)}')
+            entry.link.applyRequested.emit(saved, hw)
+
+    def _closeInstrument(self, entry: _Entry) -> None:
+        '''Stop the instrument's thread and save its settings.
+
+        Saves the last settings read or emitted by the instrument
+        rather than querying it, avoiding any cross-thread read.
+        '''
+        device = entry.device
+        if hasattr(device, 'stopPolling'):
+            device.stopPolling()
+        if entry.thread is not None:
+            entry.thread.quit()
+            entry.thread.wait()
+        if entry.link is not None:
+            device.settingsRead.disconnect(self._onSettingsRead)
+            device.propertyValue.disconnect(entry.onValue)
+            entry.link = None
+        if entry.ready:
+            self._configure.save(device, settings=entry.settings)
+
+
+__all__ = ['QInstrumentEngine']
@@ -1,9 +1,11 @@
 import logging
+from collections.abc import Iterable
 from qtpy import QtCore
 from QInstrument.lib.QAbstractInstrument import QAbstractInstrument
 from QInstrument.lib.Configure import Configure
 from QInstrument.lib.QReconcileDialog import QReconcileDialog
 from QInstrument.lib.lazy import find_fake_cls, values_differ
+from QInstrument.lib.Tracer import tracer
 
 try:
     from pyqtgraph.parametertree import Parameter, ParameterTree
@@ -35,10 +37,11 @@ class QInstrumentTree(ParameterTree):
     (``setter=None``) appear as non-editable display items.  Registered
     methods appear as action buttons.
 
-    On first show, saved settings are reconciled with the hardware state
-    via :class:`QReconcileDialog`, and the device is moved to a dedicated
-    worker thread so that serial I/O does not block the GUI.  Settings are
-    saved on close.
+    On first show, the device is moved to a dedicated worker thread so
+    that serial I/O does not block the GUI, and saved settings are then
+    reconciled with the hardware state via :class:`QReconcileDialog`
+    once a background read of the hardware settings completes.  Settings
+    are saved on close.
 
     Subclass this for each instrument and declare :attr:`INSTRUMENT`:
 
@@ -67,6 +70,10 @@ class QInstrumentTree(ParameterTree):
     calls ``INSTRUMENT().find()`` automatically.  Pass an explicit
     ``device`` to override (e.g. to inject a fake for testing).
 
+    A polling device is subscribed to the displayed properties only
+    while the tree is visible, its root group is expanded and its
+    window is not minimized (see :meth:`QPollingMixin.subscribe`).
+
     Class Attributes
     ----------------
     INSTRUMENT : type | None
@@ -92,6 +99,14 @@ class QInstrumentTree(ParameterTree):
     FIELDS: list[str] | None = None
     HARDWARE_DOMINANT: bool = False
 
+    # Window watched for minimize; a class default because the scroll
+    # area routes viewport events through eventFilter during __init__.
+    _window = None
+
+    _getRequested = QtCore.Signal(str)
+    _settingsRequested = QtCore.Signal()
+    _settingsApplied = QtCore.Signal(object, object)
+
     def __init__(self, *args,
                  device: QAbstractInstrument | None = None,
                  fields: list[str] | None = None,
@@ -101,12 +116,18 @@ class QInstrumentTree(ParameterTree):
         self._params: dict[str, Parameter] = {}
         self._updating: bool = False
         self._restored: bool = False
+        self._reconciling: bool = False
         self._thread: QtCore.QThread | None = None
+        self._external: bool = False
         self._configure = Configure()
         self._fields: list[str] | None = (
             fields if fields is not None else self.FIELDS)
         self._visibleProps: list[str] = []
         self._visibleMethods: list[str] = []
+        self._subscribed: bool = False
+        self._stale: bool = False
+        self.itemExpanded.connect(self._updateSubscription)
+        self.itemCollapsed.connect(self._updateSubscription)
         if device is None and self.INSTRUMENT is not None:
             device = self.INSTRUMENT().find()
         self.device = device
@@ -220,15 +241,32 @@ class QInstrumentTree(ParameterTree):
         }
         self.setParameters(root, showTop=True)
 
-    def _syncProperties(self) -> None:
+    def _syncProperties(self, exclude: Iterable[str] = ()) -> None:
         '''Request current device values for all visible properties.
 
         Calls :meth:`device.get` for each property, which emits
         :attr:`device.propertyValue` and updates the tree via
-        :meth:`_onDevicePropertyValue`.
+        :meth:`_onDevicePropertyValue`.  Works whether the device is
+        on the main thread (direct call, synchronous) or a worker
+        thread (queued via :attr:`_getRequested`, asynchronous).
+
+        Parameters
+        ----------
+        exclude : Iterable[str], optional
+            Property names whose values are already known and need
+            not be requested again.
         '''
+        exclude = set(exclude)
         for name in self._visibleProps:
-            self._device.get(name)
+            if name in exclude:
+                continue
+            if self._device.thread() is self.thread():
+                self._device.get(name)
+            else:
+                if tracer.enabled:
+                    tracer.instant(f'request get {name}', 'gui',
+                                   instrument=type(self._device).__name__)
+                self._getRequested.emit(name)
 
     def _connectSignals(self) -> None:
         '''Connect parameter signals to the device and device signals to
@@ -251,6 +289,10 @@ class QInstrumentTree(ParameterTree):
                 lambda p, n=name: self._device.execute(n))
 
         self._device.propertyValue.connect(self._onDevicePropertyValue)
+        self._device.settingsRead.connect(self._onSettingsRead)
+        self._getRequested.connect(self._device.get)
+        self._settingsRequested.connect(self._device.readSettings)
+        self._settingsApplied.connect(self._device.applySettings)
 
     def showEvent(self, event) -> None:
         '''Reconcile device settings and move to a worker thread on first show.
@@ -265,26 +307,116 @@ class QInstrumentTree(ParameterTree):
             self._restored = True
             QtCore.QTimer.singleShot(0, self._firstShow)
         super().showEvent(event)
+        window = self.window()
+        if window is not self._window:
+            if self._window is not None:
+                self._window.removeEventFilter(self)
+            window.installEventFilter(self)
+            self._window = window
+        self._updateSubscription()
+
+    def hideEvent(self, event) -> None:
+        '''Drop the device subscriptions while the tree is hidden.'''
+        self._setSubscribed(False)
+        super().hideEvent(event)
+
+    def eventFilter(self, obj, event) -> bool:
+        '''Follow minimize and restore of the top-level window.'''
+        if (obj is self._window and
+                event.type() == QtCore.QEvent.Type.WindowStateChange):
+            self._updateSubscription()
+        return super().eventFilter(obj, event)
+
+    def _updateSubscription(self, *args) -> None:
+        '''Subscribe while visible, expanded and not minimized.'''
+        root = self.topLevelItem(0)
+        self._setSubscribed(self.isVisible() and
+                            not self.window().isMinimized() and
+                            (root is None or root.isExpanded()))
+
+    def _setSubscribed(self, subscribed: bool) -> None:
+        '''Subscribe to, or unsubscribe from, the displayed properties.
+
+        Does nothing if the device does not support subscriptions.
+        Values that may have changed while unsubscribed are requested
+        again on resubscription.
+        '''
+        device = self._device
+        if subscribed == self._subscribed or \
+                not hasattr(device, 'subscribe'):
+            return
+        self._subscribed = subscribed
+        if subscribed:
+            device.subscribe(self._visibleProps)
+            if self._stale and device.isOpen():
+                self._syncProperties()
+        else:
+            device.unsubscribe(self._visibleProps)
+            self._stale = True
 
     @QtCore.Slot()
     def _firstShow(self) -> None:
-        '''Restore settings, sync the tree, then start the device thread.
+        '''Start the device thread, then reconcile settings in the background.
 
-        Restores saved settings and syncs the tree while the device is
-        still on the main thread, then moves the device to a dedicated
-        worker thread.  Polling is not started automatically; call
+        Moves the device to a dedicated worker thread first, then
+        requests a background read of the hardware settings.  The
+        reconciliation dialog (if any) appears only once that read has
+        completed, so the GUI stays responsive while the instrument is
+        queried.  Polling is not started automatically; call
         :meth:`startPolling` explicitly or connect a control to it when
         continuous updates are needed.
+
+        A device that already runs on a thread of its own belongs to
+        its owner, e.g. a :class:`QInstrumentEngine`, which has
+        reconciled its settings.  The tree then only requests the
+        current values, and does not save them on close.
         '''
-        self._restoreSettings()
-        self._syncProperties()
         self._startDeviceThread()
+        if self._external:
+            self._syncProperties()
+        else:
+            self._restoreSettings()
 
     def _restoreSettings(self) -> None:
+        '''Request the hardware settings for reconciliation.
+
+        Emits :attr:`_settingsRequested`, which invokes
+        :meth:`device.readSettings` on the device's own thread.  The
+        result arrives through :attr:`device.settingsRead` and is
+        handled by :meth:`_onSettingsRead`.  When the device has not
+        been moved to a worker thread the whole exchange completes
+        synchronously.
+        '''
+        self._reconciling = True
+        self._settingsRequested.emit()
+
+    @QtCore.Slot(object)
+    def _onSettingsRead(self, hw: dict) -> None:
+        '''Reconcile and display the hardware settings read by the device.
+
+        Ignores emissions of :attr:`device.settingsRead` that were not
+        requested by :meth:`_restoreSettings`.  Applies *hw* to the
+        tree, runs :meth:`_reconcileSettings`, and requests values for
+        any visible properties not covered by *hw*.
+
+        Parameters
+        ----------
+        hw : dict
+            Current hardware settings.
+        '''
+        if not self._reconciling:
+            return
+        self._reconciling = False
+        for name, value in hw.items():
+            self._onDevicePropertyValue(name, value)
+        self._reconcileSettings(hw)
+        self._syncProperties(exclude=hw)
+
+    def _reconcileSettings(self, hw: dict) -> None:
         '''Reconcile hardware state with the saved configuration file.
 
-        Reads the current hardware state via :attr:`device.settings`
-        and the saved configuration via :meth:`Configure.read`.
+        Compares *hw* with the saved configuration read via
+        :meth:`Configure.read`.
 
         - **No saved file**: writes hardware values to the config file
           and returns without changing the hardware.
@@ -292,16 +424,23 @@ class QInstrumentTree(ParameterTree):
         - **Files differ**: shows a :class:`QReconcileDialog`.  If the
           user chooses "Keep Hardware" (or dismisses the dialog), the
           config file is updated to reflect the hardware.  If the user
-          chooses "Use Saved", the saved values are pushed to the device.
+          chooses "Use Saved", the saved values are sent to
+          :meth:`device.applySettings` through :attr:`_settingsApplied`,
+          so only the differing keys are written, on the device's own
+          thread.
 
         The default button in the dialog is controlled by
         :attr:`HARDWARE_DOMINANT`.
+
+        Parameters
+        ----------
+        hw : dict
+            Current hardware settings.
         '''
-        hw = self._device.settings
         saved = self._configure.read(self._device)
 
         if saved is None:
-            self._configure.save(self._device)
+            self._configure.save(self._device, settings=hw)
             return
 
         diff_keys = [
@@ -320,24 +459,30 @@ class QInstrumentTree(ParameterTree):
         accepted = dialog.exec()
 
         if not accepted or dialog.keep_hardware:
-            self._configure.save(self._device)
+            self._configure.save(self._device, settings=hw)
         else:
-            self._device.settings = saved
+            self._settingsApplied.emit(saved, hw)
 
     def _startDeviceThread(self) -> None:
         '''Move the device into a dedicated worker thread.
 
         Only applies to :class:`QSerialInstrument` instances — fake
-        instruments stay on the main thread.  After this call, all
+        instruments stay on the main thread, and instruments that
+        already run on a thread of their own, for example under a
+        :class:`QInstrumentEngine`, stay there.  After this call, all
         :meth:`device.get` and :meth:`device.set` invocations from the
         GUI thread are delivered as queued slot calls and processed
         sequentially by the worker thread's event loop, keeping serial
         I/O off the main thread entirely.
         '''
         from QInstrument.lib.QSerialInstrument import QSerialInstrument
+        if self._device.thread() is not self.thread():
+            self._external = True
+            return
         if not isinstance(self._device, QSerialInstrument):
             return
         self._thread = QtCore.QThread(self)
+        self._thread.setObjectName(self._device.__class__.__name__)
         self._device.moveToThread(self._thread)
         self._thread.start()
 
@@ -350,14 +495,17 @@ class QInstrumentTree(ParameterTree):
         stopped; it only sets a flag, so it is safe from any thread.
         Only saves if the tree was previously shown, so that test
         instances closed during teardown do not overwrite saved
-        configuration.
+        configuration, and never for a device that belongs to another
+        owner.
         '''
         if self._thread is not None:
             if hasattr(self._device, 'stopPolling'):
                 self._device.stopPolling()
             self._thread.quit()
             self._thread.wait()
-        if self._restored and self._device is not None:
+        self._setSubscribed(False)
+        if (self._restored and self._device is not None and
+                not self._external):
             self._configure.save(self._device)
         super().closeEvent(event)
 
@@ -401,7 +549,12 @@ class QInstrumentTree(ParameterTree):
             return
         self._updating = True
         try:
-            self._params[name].setValue(value)
+            if tracer.enabled:
+                with tracer.span(f'apply {name}', 'gui',
+                                 instrument=type(self._device).__name__):
+                    self._params[name].setValue(value)
+            else:
+                self._params[name].setValue(value)
         except Exception:
             logger.debug(f'Could not update tree for {name!r} = {value!r}')
         finally:
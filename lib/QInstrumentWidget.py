@@ -1,10 +1,14 @@
+from collections.abc import Iterable
 from pathlib import Path
+import contextlib
 import inspect
 import logging
 
 from qtpy import uic, QtWidgets, QtCore
+from QInstrument.lib.InstrumentProxy import InstrumentProxy
 from QInstrument.lib.QSerialInstrument import QSerialInstrument
 from .Configure import Configure
+from QInstrument.lib.Tracer import tracer
 from .QReconcileDialog import QReconcileDialog
 from .lazy import find_fake_cls, values_differ
 
@@ -21,10 +25,18 @@ class QInstrumentWidget(QtWidgets.QWidget):
     widget calls :meth:`device.set`; the device value is read back and
     the widget is updated without re-triggering the signal.
 
-    On first show, saved settings are reconciled with the hardware state
-    via :class:`QReconcileDialog`, and the device is moved to a dedicated
-    worker thread so that serial I/O does not block the GUI.  Settings are
-    saved on close.
+    On first show, the device is moved to a dedicated worker thread so
+    that serial I/O does not block the GUI, and saved settings are then
+    reconciled with the hardware state via :class:`QReconcileDialog`
+    once a background read of the hardware settings completes.  Settings
+    are saved on close.
+
+    While the widget is visible in a window that is not minimized it
+    subscribes to its linked properties (see
+    :meth:`QPollingMixin.subscribe`), so a polling device only queries
+    what is on screen.  The subscriptions are dropped when the widget
+    is hidden, for example in a collapsed container or a removed rack
+    slot, and when its window is minimized.
 
     Subclass this, declare :attr:`UIFILE`, and supply a device:
 
@@ -55,6 +67,9 @@ class QInstrumentWidget(QtWidgets.QWidget):
         Maps widget class name to its value-getter method name.
     wsignal : dict[str, str]
         Maps widget class name to the signal emitted on user interaction.
+    SUBSCRIPTIONS : tuple[str, ...]
+        Polled values displayed without a linked widget (for example
+        ``'position'``), subscribed alongside the linked properties.
 
     Signals
     -------
@@ -95,16 +110,27 @@ class QInstrumentWidget(QtWidgets.QWidget):
     UIFILE: str | None = None
     INSTRUMENT: type | None = None
     HARDWARE_DOMINANT: bool = False
+    SUBSCRIPTIONS: tuple[str, ...] = ()
 
     propertyChanged = QtCore.Signal(str, object)
     closeRequested = QtCore.Signal()
 
+    _getRequested = QtCore.Signal(str)
+    _settingsRequested = QtCore.Signal()
+    _settingsApplied = QtCore.Signal(object, object)
+
     def __init__(self, *args, device=None, **kwargs) -> None:
         super().__init__(*args, **kwargs)
         self._device = None
         self._configure = Configure()
         self._restored = False
+        self._reconciling = False
         self._thread = None
+        self._external = False
+        self._proxy = None
+        self._subscribed = False
+        self._stale = False
+        self._window = None
         uic.loadUi(self._uiPath(), self)
         if device is None and self.INSTRUMENT is not None:
             device = self.INSTRUMENT().find()
@@ -261,17 +287,32 @@ class QInstrumentWidget(QtWidgets.QWidget):
         self._properties = list(uwidgets & dproperties)
         self._methods = list(uwidgets & dmethods)
 
-    def _syncProperties(self) -> None:
+    def _syncProperties(self, exclude: Iterable[str] = ()) -> None:
         '''Request current device values for all linked properties.
 
         Calls :meth:`device.get` for each property, which emits
         :attr:`propertyValue` and updates the corresponding widget
         via :meth:`_onPropertyValue`.  Works whether the device is
-        on the main thread (direct connection, synchronous) or a
-        worker thread (queued connection, asynchronous).
+        on the main thread (direct call, synchronous) or a worker
+        thread (queued via :attr:`_getRequested`, asynchronous).
+
+        Parameters
+        ----------
+        exclude : Iterable[str], optional
+            Property names whose values are already known and need
+            not be requested again.
         '''
+        exclude = set(exclude)
         for prop in self.properties:
-            self.device.get(prop)
+            if prop in exclude:
+                continue
+            if self.device.thread() is self.thread():
+                self.device.get(prop)
+            else:
+                if tracer.enabled:
+                    tracer.instant(f'request get {prop}', 'gui',
+                                   instrument=type(self.device).__name__)
+                self._getRequested.emit(prop)
 
     @QtCore.Slot(str, object)
     def _onPropertyValue(self, name: str, value: object) -> None:
@@ -297,7 +338,10 @@ class QInstrumentWidget(QtWidgets.QWidget):
         setter = self._wmethod(widget, self.wsetter)
         if setter is None:
             return
-        with QtCore.QSignalBlocker(widget):
+        span = (tracer.span(f'apply {name}', 'gui',
+                            instrument=type(self.device).__name__)
+                if tracer.enabled else contextlib.nullcontext())
+        with span, QtCore.QSignalBlocker(widget):
             try:
                 setter(value)
             except Exception as ex:
@@ -316,6 +360,10 @@ class QInstrumentWidget(QtWidgets.QWidget):
         value after the debounce interval elapses is sent to the device.
         '''
         self.device.propertyValue.connect(self._onPropertyValue)
+        self.device.settingsRead.connect(self._onSettingsRead)
+        self._getRequested.connect(self.device.get)
+        self._settingsRequested.connect(self.device.readSettings)
+        self._settingsApplied.connect(self.device.applySettings)
         for prop in self.properties:
             widget = getattr(self, prop)
             signal = self._wmethod(widget, self.wsignal)
@@ -426,42 +474,146 @@ class QInstrumentWidget(QtWidgets.QWidget):
             self._restored = True
             QtCore.QTimer.singleShot(0, self._firstShow)
         super().showEvent(event)
+        window = self.window()
+        if window is not self._window:
+            if self._window is not None:
+                self._window.removeEventFilter(self)
+            window.installEventFilter(self)
+            self._window = window
+        self._setSubscribed(not window.isMinimized())
+
+    def hideEvent(self, event) -> None:
+        '''Drop the device subscriptions while the widget is hidden.'''
+        self._setSubscribed(False)
+        super().hideEvent(event)
+
+    def eventFilter(self, obj, event) -> bool:
+        '''Follow minimize and restore of the top-level window.'''
+        if (obj is self._window and
+                event.type() == QtCore.QEvent.Type.WindowStateChange):
+            self._setSubscribed(self.isVisible() and not obj.isMinimized())
+        return super().eventFilter(obj, event)
+
+    def _setSubscribed(self, subscribed: bool) -> None:
+        '''Subscribe to, or unsubscribe from, the displayed values.
+
+        Does nothing if the device does not support subscriptions.
+        Values that may have changed while unsubscribed are requested
+        again on resubscription.
+        '''
+        device = self._device
+        if subscribed == self._subscribed or \
+                not hasattr(device, 'subscribe'):
+            return
+        self._subscribed = subscribed
+        names = self.properties + list(self.SUBSCRIPTIONS)
+        if subscribed:
+            device.subscribe(names)
+            if self._stale and device.isOpen():
+                self._syncProperties()
+        else:
+            device.unsubscribe(names)
+            self._stale = True
 
     @QtCore.Slot()
     def _firstShow(self) -> None:
         '''Run first-show reconciliation after the event loop is idle.
 
-        Restores saved settings and syncs the UI while the device is still
-        on the main thread, then moves the device to a dedicated worker
-        thread.  Polling is not started automatically; call
+        Moves the device to a dedicated worker thread first, then
+        requests a background read of the hardware settings.  The
+        reconciliation dialog (if any) appears only once that read has
+        completed, so the GUI stays responsive while the instrument is
+        queried.  Polling is not started automatically; call
         :meth:`startPolling` explicitly or connect a control to it when
         continuous updates are needed.
+
+        A device that already runs on a thread of its own belongs to
+        its owner, e.g. a :class:`QInstrumentEngine`, which has
+        reconciled its settings.  The widget then only requests the
+        current values, and does not save them on close.
         '''
-        self._restoreSettings()
-        self._syncProperties()
         self._startDeviceThread()
+        if self._external:
+            self._syncProperties()
+        else:
+            self._restoreSettings()
 
     def _startDeviceThread(self) -> None:
         '''Move the device into a dedicated worker thread.
 
         Only applies to :class:`QSerialInstrument` instances — fake
-        instruments stay on the main thread.  After this call, all
+        instruments stay on the main thread, and instruments that
+        already run on a thread of their own, for example under a
+        :class:`QInstrumentEngine`, stay there.  After this call, all
         :meth:`device.get` and :meth:`device.set` invocations from the
         GUI thread are delivered as queued slot calls and processed
         sequentially by the worker thread's event loop, keeping serial
         I/O off the main thread entirely.
         '''
+        if self._device.thread() is not self.thread():
+            self._external = True
+            return
         if not isinstance(self._device, QSerialInstrument):
             return
         self._thread = QtCore.QThread(self)
+        self._thread.setObjectName(self._device.__class__.__name__)
         self._device.moveToThread(self._thread)
         self._thread.start()
 
+    def _startPolling(self) -> None:
+        '''Start the poll loop of a polling device on its own thread.
+
+        The call is queued through an :class:`InstrumentProxy` rather
+        than a signal, because the metaobject of a fake instrument does
+        not list the slots of :class:`QPollingMixin`.  The proxy is kept
+        so that its invoker outlives the queued call.  Does nothing for
+        devices without a poll loop, or whose owner runs it.
+        '''
+        if hasattr(self._device, 'startPolling') and not self._external:
+            self._proxy = InstrumentProxy(self._device)
+            self._proxy.submit('startPolling')
+
     def _restoreSettings(self) -> None:
+        '''Request the hardware settings for reconciliation.
+
+        Emits :attr:`_settingsRequested`, which invokes
+        :meth:`device.readSettings` on the device's own thread.  All
+        getters run there in one batch; the result arrives through
+        :attr:`device.settingsRead` and is handled by
+        :meth:`_onSettingsRead`.  When the device has not been moved to
+        a worker thread the whole exchange completes synchronously.
+        '''
+        self._reconciling = True
+        self._settingsRequested.emit()
+
+    @QtCore.Slot(object)
+    def _onSettingsRead(self, hw: dict) -> None:
+        '''Reconcile and display the hardware settings read by the device.
+
+        Ignores emissions of :attr:`device.settingsRead` that were not
+        requested by :meth:`_restoreSettings`.  Applies *hw* to the
+        linked widgets, runs :meth:`_reconcileSettings`, and requests
+        values for any linked properties not covered by *hw* (for
+        example, read-only status properties).
+
+        Parameters
+        ----------
+        hw : dict
+            Current hardware settings.
+        '''
+        if not self._reconciling:
+            return
+        self._reconciling = False
+        for name, value in hw.items():
+            self._onPropertyValue(name, value)
+        self._reconcileSettings(hw)
+        self._syncProperties(exclude=hw)
+
+    def _reconcileSettings(self, hw: dict) -> None:
         '''Reconcile hardware state with the saved configuration file.
 
-        Reads the current hardware state via :attr:`device.settings`
-        and the saved configuration via :meth:`Configure.read`.
+        Compares *hw* with the saved configuration read via
+        :meth:`Configure.read`.
 
         - **No saved file**: writes hardware values to the config file
           and returns without changing the hardware.
@@ -469,16 +621,23 @@ class QInstrumentWidget(QtWidgets.QWidget):
         - **Files differ**: shows a :class:`QReconcileDialog`.  If the
           user chooses "Keep Hardware" (or dismisses the dialog), the
           config file is updated to reflect the hardware.  If the user
-          chooses "Use Saved", the saved values are pushed to the device.
+          chooses "Use Saved", the saved values are sent to
+          :meth:`device.applySettings` through :attr:`_settingsApplied`,
+          so only the differing keys are written, on the device's own
+          thread.
 
         The default button in the dialog is controlled by
         :attr:`HARDWARE_DOMINANT`.
+
+        Parameters
+        ----------
+        hw : dict
+            Current hardware settings.
         '''
-        hw = self._device.settings
         saved = self._configure.read(self._device)
 
         if saved is None:
-            self._configure.save(self._device)
+            self._configure.save(self._device, settings=hw)
             return
 
         diff_keys = [
@@ -497,9 +656,9 @@ class QInstrumentWidget(QtWidgets.QWidget):
         accepted = dialog.exec()
 
         if not accepted or dialog.keep_hardware:
-            self._configure.save(self._device)
+            self._configure.save(self._device, settings=hw)
         else:
-            self._device.settings = saved
+            self._settingsApplied.emit(saved, hw)
 
     def closeEvent(self, event) -> None:
         '''Stop the worker thread and save settings when the widget is closed.
@@ -512,14 +671,17 @@ class QInstrumentWidget(QtWidgets.QWidget):
         known device state) rather than querying the device directly,
         avoiding any cross-thread read.  Only saves if the widget was
         previously shown, so that test widgets closed during teardown do
-        not overwrite saved configuration.
+        not overwrite saved configuration, and never for a device that
+        belongs to another owner.
         '''
         if self._thread is not None:
             if hasattr(self._device, 'stopPolling'):
                 self._device.stopPolling()
             self._thread.quit()
             self._thread.wait()
-        if self._restored and self._device is not None:
+        self._setSubscribed(False)
+        if (self._restored and self._device is not None and
+                not self._external):
             self._configure.save(self._device, settings=self.settings)
         super().closeEvent(event)
 
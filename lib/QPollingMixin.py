@@ -1,4 +1,29 @@
+import contextlib
+import logging
+from collections.abc import Iterable, Sequence
+from numbers import Number
+from types import MappingProxyType
 from qtpy import QtCore
+from QInstrument.lib.PollScheduler import PollScheduler
+from QInstrument.lib.PropertyHistory import PropertyHistory
+from QInstrument.lib.Tracer import tracer
+
+
+logger = logging.getLogger(__name__)
+
+
+_UNSET = object()
+
+
+def _exceeds(a: object, b: object, deadband: float) -> bool:
+    '''Return True if *a* and *b* differ by more than *deadband*.'''
+    if (isinstance(a, Number) and isinstance(b, Number) and
+            not isinstance(a, bool) and not isinstance(b, bool)):
+        return abs(a - b) > deadband
+    if (isinstance(a, Sequence) and isinstance(b, Sequence) and
+            not isinstance(a, str) and len(a) == len(b)):
+        return any(_exceeds(x, y, deadband) for x, y in zip(a, b))
+    return a != b
 
 
 class QPollingMixin:
@@ -24,6 +49,44 @@ class QPollingMixin:
     :meth:`stopPolling` may be called from any thread — it only sets
     a flag that :meth:`_poll` checks before scheduling its next call.
 
+    The default :meth:`_poll` is driven by a :class:`PollScheduler`.
+    Properties registered with ``poll_ms`` metadata are polled at that
+    period; properties without it are polled every cycle, with
+    :attr:`POLL_INTERVAL` between cycles.  ``poll_priority`` metadata
+    orders properties that fall due together, and
+    :attr:`POLL_BUDGET` caps the fraction of time spent polling.
+    :meth:`pollStats` reports the achieved rate and jitter of each
+    property:
+
+    .. code-block:: python
+
+        self.registerProperty('power', getter=..., setter=None,
+                              poll_ms=100, poll_priority=1)
+        self.registerProperty('temperature', getter=..., setter=None,
+                              poll_ms=5000)
+
+    Setting :attr:`POLL_ADAPTIVE` enables adaptive polling: while
+    every polled value stays within its deadband (``deadband``
+    metadata, else :attr:`POLL_DEADBAND`), the delay between cycles
+    grows by :attr:`POLL_BACKOFF` per cycle up to
+    :attr:`POLL_MAX_INTERVAL`.  A change beyond the deadband, a
+    :meth:`set` or an :meth:`execute` snaps it back to
+    :attr:`POLL_MIN_INTERVAL`.  Custom :meth:`_poll` implementations
+    take part by reporting changes through :meth:`_pollChanged` and
+    rescheduling with :meth:`_nextPoll`.
+
+    Views and clients declare which properties they need with
+    :meth:`subscribe` and release them with :meth:`unsubscribe`.  Until
+    the first subscription every property is polled; afterwards only
+    properties with at least one subscriber are, so an instrument
+    nobody is watching costs no bandwidth.  Custom :meth:`_poll`
+    implementations check :meth:`isSubscribed`.
+
+    Every value passed to :meth:`_pollChanged` is also recorded in a
+    fixed-size :class:`PropertyHistory` of :attr:`HISTORY_DEPTH`
+    samples per name, available through :meth:`history` and
+    :meth:`decimatedHistory`.
+
     Usage
     -----
     .. code-block:: python
@@ -38,15 +101,233 @@ class QPollingMixin:
                 x, y = self._snap()
                 self.propertyValue.emit('x', x)
                 self.propertyValue.emit('y', y)
-                if getattr(self, '_polling', False):
-                    QtCore.QTimer.singleShot(
-                        self.POLL_INTERVAL, self._poll)
+                changed = self._pollChanged('xy', (x, y))
+                self._nextPoll(self.POLL_INTERVAL, changed)
     '''
 
     POLL_INTERVAL: int = 0
     '''Milliseconds between the end of one poll response and the start
     of the next query.  Default: ``0`` (maximum throughput).'''
 
+    POLL_BUDGET: float = 1.
+    '''Largest fraction of time, in ``(0, 1]``, that the default
+    :meth:`_poll` keeps the instrument busy.  Default: ``1.0``
+    (no limit).'''
+
+    POLL_ADAPTIVE: bool = False
+    '''Back off while polled values are steady.  Default: ``False``.'''
+
+    POLL_MIN_INTERVAL: int | None = None
+    '''Adaptive delay, in ms, after a change.  Default: ``None``,
+    which uses :attr:`POLL_INTERVAL`.'''
+
+    POLL_MAX_INTERVAL: int = 2000
+    '''Longest adaptive delay in ms.  Default: ``2000``.'''
+
+    POLL_BACKOFF: float = 2.
+    '''Factor by which the adaptive delay grows per steady cycle.'''
+
+    POLL_DEADBAND: float = 0.
+    '''Largest change of a numeric value that counts as steady, for
+    values without ``deadband`` metadata.  Default: ``0``.'''
+
+    HISTORY_DEPTH: int = 1024
+    '''Polled samples kept per value by :attr:`propertyHistory`.
+    ``0`` disables recording.  Default: ``1024``.'''
+
+    def subscribe(self, names: str | Iterable[str]) -> None:
+        '''Register interest in one or more polled values.
+
+        Thread-safe.  Each call must be balanced by a matching call to
+        :meth:`unsubscribe`.
+
+        Parameters
+        ----------
+        names : str or Iterable[str]
+            Property (or other polled value) names.
+        '''
+        self._updateSubscriptions(names, 1)
+
+    def unsubscribe(self, names: str | Iterable[str]) -> None:
+        '''Release interest registered with :meth:`subscribe`.
+
+        Thread-safe.  Names without subscribers are ignored.
+        '''
+        self._updateSubscriptions(names, -1)
+
+    def _updateSubscriptions(self,
+                             names: str | Iterable[str],
+                             delta: int) -> None:
+        if isinstance(names, str):
+            names = [names]
+        with QtCore.QMutexLocker(self.mutex):
+            counts = dict(getattr(self, '_subscriptions', None) or {})
+            for name in names:
+                count = counts.get(name, 0) + delta
+                if count > 0:
+                    counts[name] = count
+                else:
+                    counts.pop(name, None)
+            self._subscriptions = MappingProxyType(counts)
+
+    @property
+    def subscriptions(self) -> dict[str, int] | None:
+        '''Subscriber count of each subscribed name, or ``None`` if
+        no subscription has been made yet.'''
+        subscriptions = getattr(self, '_subscriptions', None)
+        return None if subscriptions is None else dict(subscriptions)
+
+    def isSubscribed(self, name: str) -> bool:
+        '''Return True if *name* should be polled.'''
+        subscriptions = getattr(self, '_subscriptions', None)
+        return subscriptions is None or name in subscriptions
+
+    @property
+    def pollInterval(self) -> int:
+        '''Current adaptive delay between poll cycles in ms.'''
+        return getattr(self, '_pollInterval', self._minPollInterval())
+
+    def _minPollInterval(self) -> int:
+        if self.POLL_MIN_INTERVAL is None:
+            return self.POLL_INTERVAL
+        return self.POLL_MIN_INTERVAL
+
+    @QtCore.Slot()
+    def resetPollInterval(self) -> None:
+        '''Return to the fastest poll rate.
+
+        Called automatically after :meth:`set` and :meth:`execute`.
+        If a backed-off poll is pending, it is brought forward.
+        Must be called from the instrument's own thread.
+        '''
+        self._pollInterval = self._minPollInterval()
+        timer = getattr(self, '_pollTimer', None)
+        if (timer is not None and timer.isActive() and
+                timer.remainingTime() > self._pollInterval):
+            timer.start(self._pollInterval)
+
+    def _pollChanged(self, name: str, value: object) -> bool:
+        '''Record a polled *value* and return True if it changed.
+
+        The value is appended to :attr:`propertyHistory`.
+
+        A value changes when it differs from the previous value for
+        *name* by more than the deadband.  The first value for a name
+        always counts as a change.
+        '''
+        history = self.propertyHistory
+        if history is not None:
+            history.append(name, value)
+        last = self.__dict__.setdefault('_pollLast', {}).get(name, _UNSET)
+        self._pollLast[name] = value
+        if last is _UNSET:
+            return True
+        deadband = self.propertyMeta(name).get('deadband',
+                                               self.POLL_DEADBAND)
+        return _exceeds(last, value, deadband)
+
+    def _nextPoll(self, delay: int, changed: bool = True) -> None:
+        '''Schedule the next :meth:`_poll` call after *delay* ms.
+
+        In adaptive mode the delay is lengthened to the current
+        adaptive interval, which first snaps back or backs off
+        according to *changed*.  Does nothing once polling stops.
+        '''
+        if not getattr(self, '_polling', False):
+            return
+        if not self.POLL_ADAPTIVE:
+            QtCore.QTimer.singleShot(delay, self._poll)
+            return
+        if changed:
+            interval = self._minPollInterval()
+        else:
+            interval = min(max(self.pollInterval, 1) * self.POLL_BACKOFF,
+                           self.POLL_MAX_INTERVAL)
+        self._pollInterval = int(interval)
+        timer = getattr(self, '_pollTimer', None)
+        if timer is None:
+            timer = QtCore.QTimer(self)
+            timer.setSingleShot(True)
+            timer.timeout.connect(self._poll)
+            self._pollTimer = timer
+        timer.start(max(delay, self._pollInterval))
+
+    @QtCore.Slot(str, object)
+    def set(self, key: str, value: object) -> None:
+        super().set(key, value)
+        self.resetPollInterval()
+
+    @QtCore.Slot(str)
+    def execute(self, key: str) -> None:
+        super().execute(key)
+        self.resetPollInterval()
+
+    @property
+    def pollScheduler(self) -> PollScheduler:
+        '''Scheduler used by the default :meth:`_poll`.
+
+        Built from the ``poll_ms`` and ``poll_priority`` metadata of
+        the subscribed properties.  It is rebuilt whenever the property
+        registry changes, and updated when subscriptions change.
+        '''
+        scheduler = getattr(self, '_pollScheduler', None)
+        if (scheduler is None or
+                getattr(self, '_pollRegistry', None) is not self._properties):
+            scheduler = PollScheduler()
+            self._pollScheduler = scheduler
+            self._pollRegistry = self._properties
+            self._pollSubscriptions = _UNSET
+        subscriptions = getattr(self, '_subscriptions', None)
+        if self._pollSubscriptions is not subscriptions:
+            self._pollSubscriptions = subscriptions
+            scheduled = set(scheduler.names)
+            for name in self.properties:
+                if not self.isSubscribed(name):
+                    scheduler.remove(name)
+                elif name not in scheduled:
+                    meta = self.propertyMeta(name)
+                    scheduler.add(name, meta.get('poll_ms'),
+                                  meta.get('poll_priority', 0))
+        scheduler.interval = self.POLL_INTERVAL
+        scheduler.budget = self.POLL_BUDGET
+        return scheduler
+
+    def pollStats(self) -> dict[str, dict]:
+        '''Return the achieved poll rate and jitter of each property.
+
+        See :meth:`PollScheduler.stats`.
+        '''
+        return self.pollScheduler.stats()
+
+    @property
+    def propertyHistory(self) -> PropertyHistory | None:
+        '''Recorded history of polled values, or ``None`` when
+        :attr:`HISTORY_DEPTH` is ``0``.  Created on first use.'''
+        history = getattr(self, '_propertyHistory', None)
+        if history is None and self.HISTORY_DEPTH > 0:
+            history = self._propertyHistory = PropertyHistory(
+                self.HISTORY_DEPTH)
+        return history
+
+    def history(self, name: str, seconds: float | None = None):
+        '''Return the polled history of *name* as ``(t, v)`` views.
+
+        Timestamps are :func:`time.monotonic` seconds.  See
+        :meth:`PropertyHistory.history`.
+        '''
+        if self.propertyHistory is None:
+            return PropertyHistory().history(name)
+        return self.propertyHistory.history(name, seconds)
+
+    def decimatedHistory(self, name: str, bins: int,
+                         seconds: float | None = None):
+        '''Return ``(t, vmin, vmax)`` min/max runs of the history of
+        *name* for plotting.  See :meth:`PropertyHistory.decimate`.
+        '''
+        if self.propertyHistory is None:
+            return PropertyHistory().decimate(name, bins)
+        return self.propertyHistory.decimate(name, bins, seconds)
+
     @QtCore.Slot()
     def startPolling(self) -> None:
         '''Start the self-scheduling poll loop.
@@ -72,26 +353,50 @@ class QPollingMixin:
     def _poll(self) -> None:
         '''Poll the instrument once and schedule the next call.
 
-        The default implementation calls :meth:`get` for every
-        registered property, which emits :attr:`propertyValue` for
-        each one.  Override this in instruments that can batch
-        multiple properties into a single query for efficiency.
+        The default implementation calls :meth:`get`, which emits
+        :attr:`propertyValue`, for every property that
+        :attr:`pollScheduler` reports due, then waits until the next
+        one falls due.  With no subscribed properties it only checks
+        back every :attr:`POLL_MAX_INTERVAL` milliseconds.  Override
+        this in instruments that can batch multiple properties into a
+        single query for efficiency.  A property whose getter raises
+        ``ValueError`` or ``TypeError``, for example on an unreadable
+        reply, is skipped until it next falls due.  The reads are
+        recorded as one ``'poll'`` span by :data:`tracer`.
 
         Subclass implementations must follow the same guard pattern::
 
             if not getattr(self, '_polling', False):
                 return
             # ... do work ...
-            if getattr(self, '_polling', False):
-                QtCore.QTimer.singleShot(
-                    self.POLL_INTERVAL, self._poll)
+            self._nextPoll(self.POLL_INTERVAL, changed)
         '''
         if not getattr(self, '_polling', False):
             return
-        for name in self.properties:
-            self.get(name)
-        if getattr(self, '_polling', False):
-            QtCore.QTimer.singleShot(self.POLL_INTERVAL, self._poll)
+        scheduler = self.pollScheduler
+        if not scheduler.names and self.subscriptions is not None:
+            self._nextPoll(self.POLL_MAX_INTERVAL, False)
+            return
+        clock = scheduler.clock
+        start = now = clock()
+        limit = start + scheduler.slice
+        changed = False
+        span = (tracer.span('poll', 'poll', instrument=type(self).__name__)
+                if tracer.enabled else contextlib.nullcontext())
+        with span:
+            for name in scheduler.due(start):
+                try:
+                    value = self.get(name)
+                except (ValueError, TypeError) as ex:
+                    logger.debug(f'poll error: {name}: {ex}')
+                else:
+                    changed |= self._pollChanged(name, value)
+                end = clock()
+                scheduler.polled(name, now, end)
+                now = end
+                if now >= limit:
+                    break
+        self._nextPoll(scheduler.delay(start, now), changed)
 
 
 __all__ = ['QPollingMixin']
@@ -0,0 +1,428 @@
+import logging
+import math
+import threading
+import time
+from functools import partial
+from typing import Callable
+import numpy as np
+from qtpy import QtCore
+from QInstrument.lib.QDispatcher import QDispatcher, field, readValues
+
+
+logger = logging.getLogger(__name__)
+
+_UNSET = object()
+
+
+class QSequencer(QtCore.QObject):
+    '''Setpoint scan engine that overlaps I/O across instruments.
+
+    A scan steps through a grid of setpoints.  At every step the
+    sequencer
+
+    1. writes the setpoints that changed since the previous step,
+    2. waits for the longest settle time that applies,
+    3. reads every readout,
+
+    and stores the readings in a preallocated structured array.  All
+    instruments are served in parallel in each phase, each on its own
+    worker thread (instruments on the calling thread are served in
+    turn), so a step costs the slowest round trip plus the settle time
+    rather than the sum of all round trips.  The calls are run by a
+    :class:`QDispatcher`.
+
+    These phases are the built-in nodes ``'write'`` and ``'read'`` of
+    the step graph.  :meth:`addAction` adds further nodes, e.g. an
+    auto-range before the read or a shutter that opens alongside the
+    writes.  Nodes that are ready at the same time run in parallel.
+
+    Settle times come from two places:
+
+    - ``settle`` property metadata: seconds to wait after writing
+      that property.
+    - An instrument's ``settleTime()`` method, if it has one: seconds
+      its readings need after any change, e.g.
+      :meth:`QSR830.settleTime` from the time constant and filter
+      slope.  It is queried before the first step and again after
+      each step that writes to that instrument.
+
+    .. code-block:: python
+
+        seq = QSequencer()
+        seq.addSetpoints(ds345, 'frequency', np.linspace(1e3, 2e3, 101))
+        seq.addReadout(sr830, ['x', 'y'])
+        data = seq.run()
+        plt.plot(data['QDS345']['frequency'], data['QSR830']['x'])
+
+    :meth:`run` blocks the calling thread for the duration of the
+    scan; call it from a script or from a thread other than the GUI
+    thread.
+
+    Parameters
+    ----------
+    timeout : int, optional
+        Milliseconds to wait for the instruments in each phase.
+        Default: ``10000``.
+
+    Signals
+    -------
+    stepFinished(int, int)
+        Emitted after each step with the step index and the number of
+        steps.
+    '''
+
+    stepFinished = QtCore.Signal(int, int)
+
+    def __init__(self, timeout: int = 10000,
+                 parent: QtCore.QObject | None = None) -> None:
+        super().__init__(parent)
+        self.timeout = timeout
+        self._instruments: dict[str, QtCore.QObject] = {}
+        self._axes: list[tuple[str, str, np.ndarray]] = []
+        self._readouts: dict[str, list[str]] = {}
+        self._actions: dict[str, tuple[str, Callable, tuple]] = {}
+        self._dispatcher = QDispatcher(self)
+        self._abort = threading.Event()
+
+    def _label(self, instrument: QtCore.QObject, label: str | None) -> str:
+        label = label or type(instrument).__name__
+        known = self._instruments.get(label)
+        if known is not None and known is not instrument:
+            raise ValueError(f'Sequencer label already in use: {label}')
+        self._instruments[label] = instrument
+        self._dispatcher.setInstrument(label, instrument)
+        return label
+
+    def addSetpoints(self,
+                     instrument: QtCore.QObject,
+                     name: str,
+                     values,
+                     label: str | None = None) -> None:
+        '''Add a scan axis that sets property *name* to each of *values*.
+
+        Axes form a grid; the first axis added varies slowest.
+
+        Parameters
+        ----------
+        instrument : QAbstractInstrument
+            Instrument to set.
+        name : str
+            Writable property name.
+        values : array_like
+            Setpoints of this axis.
+        label : str or None, optional
+            Key of the instrument in the results.  Default: the
+            instrument's class name.
+
+        Raises
+        ------
+        ValueError
+            If *label* belongs to another instrument or already holds
+            *name*.
+        '''
+        label = self._label(instrument, label)
+        self._checkField(label, name)
+        self._axes.append((label, name, np.asarray(values)))
+
+    def addReadout(self,
+                   instrument: QtCore.QObject,
+                   names: str | list[str],
+                   label: str | None = None) -> None:
+        '''Read *names* of *instrument* at every step.
+
+        Each name is a property or, failing that, a method of the
+        instrument that takes no arguments (e.g. ``'report'`` for the
+        SR830 ``SNAP?`` query).
+
+        Parameters
+        ----------
+        instrument : QAbstractInstrument
+            Instrument to read.
+        names : str or list[str]
+            Property or method names.
+        label : str or None, optional
+            As for :meth:`addSetpoints`.  Reading back a scanned
+            property needs a label of its own.
+
+        Raises
+        ------
+        ValueError
+            If *label* already holds a field of the same name.
+        '''
+        label = self._label(instrument, label)
+        if isinstance(names, str):
+            names = [names]
+        for name in names:
+            self._checkField(label, name)
+        self._readouts.setdefault(label, []).extend(names)
+
+    def addAction(self,
+                  instrument: QtCore.QObject,
+                  name: str,
+                  action: Callable | None = None,
+                  after=('write',),
+                  label: str | None = None) -> None:
+        '''Call *action* on the thread of *instrument* at every step.
+
+        The action becomes node *name* of the step graph.  It starts
+        once every node in *after* has finished.  ``'read'`` waits
+        for every action that does not come after it.
+
+        Parameters
+        ----------
+        instrument : QAbstractInstrument
+            Instrument whose thread runs the action.
+        name : str
+            Name of the node.  Later actions may name it in *after*.
+        action : callable or None, optional
+            Called without arguments; its result is discarded.
+            Default: the method *name* of *instrument*.
+        after : iterable of str, optional
+            Nodes that must finish first: ``'write'``, ``'read'`` or
+            actions added earlier.  Default: ``('write',)``, which
+            runs the action after the setpoints have settled.  An
+            empty *after* runs it alongside the writes.
+        label : str or None, optional
+            As for :meth:`addSetpoints`.
+
+        Raises
+        ------
+        ValueError
+            If *name* is already a node or *after* names an unknown
+            node.
+        '''
+        nodes = {'write', 'read'} | set(self._actions)
+        if name in nodes:
+            raise ValueError(f'Step graph already has a node {name!r}')
+        after = tuple(after)
+        unknown = sorted(set(after) - nodes)
+        if unknown:
+            raise ValueError(f'Unknown step graph nodes: {unknown}')
+        label = self._label(instrument, label)
+        if action is None:
+            action = getattr(instrument, name)
+        self._actions[name] = (label, action, after)
+
+    def _layers(self) -> list[list[str]]:
+        '''Return the nodes of the step graph in order of execution.
+
+        Each layer holds the nodes whose predecessors are all in
+        earlier layers.
+        '''
+        after = {'write': ()}
+        following = {'read'}
+        for name, (_, _, previous) in self._actions.items():
+            after[name] = previous
+            if following & set(previous):
+                following.add(name)
+        after['read'] = [name for name in after if name not in following]
+        depth = {}
+        for name in ['write', 'read', *self._actions]:
+            self._depth(name, after, depth)
+        layers: dict[int, list[str]] = {}
+        for name, level in depth.items():
+            layers.setdefault(level, []).append(name)
+        return [layers[level] for level in sorted(layers)]
+
+    def _depth(self, name: str, after: dict, depth: dict) -> int:
+        if name not in depth:
+            depth[name] = 1 + max((self._depth(n, after, depth)
+                                   for n in after[name]), default=-1)
+        return depth[name]
+
+    def _checkField(self, label: str, name: str) -> None:
+        fields = ([n for lab, n, _ in self._axes if lab == label] +
+                  self._readouts.get(label, []))
+        if name in fields:
+            raise ValueError(f'{label}.{name} is already in the scan; '
+                             'read it back under another label')
+
+    def grid(self) -> np.ndarray:
+        '''Return the setpoint grid as an array of shape ``(N, axes)``.'''
+        if not self._axes:
+            return np.zeros((1, 0))
+        mesh = np.meshgrid(*(values for _, _, values in self._axes),
+                           indexing='ij')
+        return np.stack([m.ravel() for m in mesh], axis=-1)
+
+    @QtCore.Slot()
+    def abort(self) -> None:
+        '''Stop a running scan after the current step.  Thread-safe.'''
+        self._abort.set()
+
+    def _dispatch(self, calls: dict[str, Callable]) -> dict[str, tuple]:
+        '''Run *calls* in parallel, each on its instrument's thread.
+
+        Returns
+        -------
+        dict
+            Labels mapped to ``(t0, t1, result)``.
+
+        Raises
+        ------
+        TimeoutError
+            If an instrument does not finish within :attr:`timeout`.
+        '''
+        results = self._dispatcher.dispatch(calls, self.timeout)
+        missing = sorted(set(calls) - set(results))
+        if missing:
+            raise TimeoutError(f'No response from {missing}')
+        return results
+
+    def _writer(self, label: str, writes: list[tuple[str, object]]):
+        instrument = self._instruments[label]
+        settle = getattr(instrument, 'settleTime', None)
+
+        def write():
+            for name, value in writes:
+                instrument.set(name, value)
+            return settle() if settle is not None else 0.
+        return write
+
+    def _reader(self, label: str):
+        return partial(readValues, self._instruments[label],
+                       self._readouts[label])
+
+    def _settleTimes(self) -> dict[str, float]:
+        '''Query the ``settleTime()`` of every readout instrument.'''
+        calls = {label: self._instruments[label].settleTime
+                 for label in self._readouts
+                 if hasattr(self._instruments[label], 'settleTime')}
+        return {label: result for label, (_, _, result)
+                in self._dispatch(calls).items()}
+
+    def _dtype(self, first: dict) -> np.dtype:
+        '''Return the result dtype, given the readings of the first step.'''
+        groups: dict[str, list] = {}
+        for label, name, values in self._axes:
+            groups.setdefault(label, []).append((name, values.dtype))
+        for label, names in self._readouts.items():
+            groups.setdefault(label, []).extend(
+                field(name, first[label][name]) for name in names)
+        return np.dtype([('t', 'f8')] +
+                        [(label, fields) for label, fields in groups.items()])
+
+    def run(self, points=None) -> np.ndarray:
+        '''Run the scan and return the results.
+
+        Parameters
+        ----------
+        points : array_like or None, optional
+            Setpoints of shape ``(N, axes)``, one column per
+            :meth:`addSetpoints` axis in the order added (the values
+            given there are then ignored).  Default: ``None``, which
+            scans :meth:`grid`.
+
+        Returns
+        -------
+        numpy.ndarray
+            Structured array with one row per completed step.  Field
+            ``t`` is the :func:`time.monotonic` midpoint of the reads;
+            ``data[label][name]`` holds setpoints and readings.  A scan
+            that is aborted or times out returns the completed rows.
+        '''
+        points = self.grid() if points is None else np.asarray(points)
+        points = points.reshape(len(points), -1)
+        self._abort.clear()
+        data = None
+        step = 0
+        try:
+            settle = self._settleTimes()
+            layers = self._layers()
+            previous = {}
+            for step, point in enumerate(points):
+                if self._abort.is_set():
+                    break
+                readings = self._step(layers, point, previous, settle)
+                if data is None:
+                    data = np.zeros(len(points), dtype=self._dtype(
+                        {k: r for k, (_, _, r) in readings.items()}))
+                self._store(data, step, point, readings)
+                self.stepFinished.emit(step, len(points))
+            else:
+                step = len(points)
+        except TimeoutError as exc:
+            logger.error(f'Scan stopped at step {step}: {exc}')
+        if data is None:
+            return np.zeros(0, dtype=[('t', 'f8')])
+        return data[:step]
+
+    def _step(self, layers: list[list[str]], point,
+              previous: dict, settle: dict) -> dict[str, tuple]:
+        '''Run the step graph for *point*; return the readings.
+
+        The nodes of each layer are dispatched together.  Nodes of one
+        layer that share a label run in turn in one call.  The layer
+        holding ``'write'`` ends after the settle time.  A readout
+        that fails reads as ``None`` for each of its names.
+        '''
+        readings = {}
+        for layer in layers:
+            calls: dict[str, list] = {}
+            delay = 0.
+            if 'write' in layer:
+                writes, delay = self._writes(point, previous)
+                for label, pairs in writes.items():
+                    calls.setdefault(label, []).append(
+                        ('write', self._writer(label, pairs)))
+            if 'read' in layer:
+                for label in self._readouts:
+                    calls.setdefault(label, []).append(
+                        ('read', self._reader(label)))
+            for name in layer:
+                if name in self._actions:
+                    label, action, _ = self._actions[name]
+                    calls.setdefault(label, []).append((name, action))
+            results = self._dispatch({label: self._chain(nodes)
+                                      for label, nodes in calls.items()})
+            for label, (t0, t1, result) in results.items():
+                result = result or {}
+                if (label in self._readouts and
+                        result.get('write') is not None):
+                    settle[label] = result['write']
+                if 'read' in layer:
+                    values = result.get('read')
+                    if values is None and label in self._readouts:
+                        values = dict.fromkeys(self._readouts[label])
+                    readings[label] = (t0, t1, values)
+            if 'write' in layer:
+                delay = max([delay] + list(settle.values()))
+                if delay > 0:
+                    time.sleep(delay)
+        return readings
+
+    @staticmethod
+    def _chain(nodes: list[tuple[str, Callable]]) -> Callable:
+        def run():
+            return {name: fn() for name, fn in nodes}
+        return run
+
+    def _writes(self, point, previous: dict) -> tuple[dict, float]:
+        '''Return the changed setpoints of *point* and their settle time.'''
+        writes: dict[str, list] = {}
+        delay = 0.
+        for (label, name, _), value in zip(self._axes, point):
+            value = value.item() if hasattr(value, 'item') else value
+            if previous.get((label, name), _UNSET) == value:
+                continue
+            previous[(label, name)] = value
+            writes.setdefault(label, []).append((name, value))
+            meta = self._instruments[label].propertyMeta(name)
+            delay = max(delay, meta.get('settle', 0.))
+        return writes, delay
+
+    def _store(self, data, step, point, readings) -> None:
+        mids = [(t0 + t1) / 2. for t0, t1, _ in readings.values()]
+        data['t'][step] = sum(mids) / len(mids) if mids else math.nan
+        for (label, name, _), value in zip(self._axes, point):
+            data[label][name][step] = value
+        for label, (_, _, values) in readings.items():
+            for name, value in (values or {}).items():
+                try:
+                    data[label][name][step] = (math.nan if value is None
+                                               else value)
+                except (TypeError, ValueError):
+                    logger.debug(f'{label}.{name}: cannot store {value!r}')
+
+
+__all__ = ['QSequencer']
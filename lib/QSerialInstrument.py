@@ -1,8 +1,16 @@
 import logging
+import re
+import time
+from typing import Callable
 
+from qtpy import QtCore
 from qtpy.QtSerialPort import QSerialPortInfo
 from QInstrument.lib.QAbstractInstrument import QAbstractInstrument
 from QInstrument.lib.QSerialInterface import QSerialInterface
+from QInstrument.lib.LatencyHistogram import LatencyHistogram
+from QInstrument.lib.ResponseParser import ResponseParser
+from QInstrument.lib.SerialStats import SerialStats
+from QInstrument.lib.Tracer import tracer
 
 
 logger = logging.getLogger(__name__)
@@ -24,11 +32,53 @@ class QSerialInstrument(QAbstractInstrument):
     - :meth:`handshake` — send a command and return the raw response
     - :meth:`expect` — send a command and test the response string
     - :meth:`getValue` — send a command and return a typed value
+    - :meth:`getValues` — send a command and parse the raw reply with
+      a :class:`ResponseParser`
 
-    All four methods are defined here.  A future transport subclass
+    All five methods are defined here.  A future transport subclass
     (e.g. ``QGPIBInstrument``) would provide the same API over a
     different physical layer.
 
+    Queries recover from desynchronisation.  A reply that is dropped or
+    arrives late leaves the request and reply streams off by one, so
+    that every later query would read the answer to the one before.
+    Once the instrument has been identified, a query whose reply times
+    out or cannot be converted is treated as a desync: :meth:`recover`
+    discards stale input, optionally sends a break and re-identifies
+    the instrument, and the query is repeated up to :attr:`RETRIES`
+    times with a doubling delay.  :meth:`recoveryStats` counts what
+    happened.
+
+    Reply timeouts adapt to each command.  The latency of every valid
+    reply is recorded in a :class:`LatencyHistogram` per mnemonic
+    (``'FREQ'`` for ``'FREQ?'``, ``'SDC'`` for ``'SDC 50.0'``), and
+    once a mnemonic has :attr:`TIMEOUT_SAMPLES` samples its replies
+    are awaited for :attr:`TIMEOUT_FACTOR` times the
+    :attr:`TIMEOUT_QUANTILE` of its latency, clamped to
+    [:attr:`TIMEOUT_FLOOR`, :attr:`TIMEOUT_CEILING`].  A dropped reply
+    to a fast query is then detected in a few milliseconds instead of
+    the port's worst-case ``timeout``.  Commands known to be slow are
+    listed in :attr:`TIMEOUTS`; the time they need also extends the
+    wait for whatever reply comes next, since the instrument answers
+    nothing until it has finished.  Commands whose reply time depends
+    on their arguments, such as stage moves, are listed in
+    :attr:`TIMEOUT_EXCLUDE` and always wait for the port's
+    ``timeout``.
+
+    Traffic statistics are off by default and cost one attribute test
+    per transmit and receive.  :meth:`setStatsEnabled` turns them on;
+    :meth:`stats` then reports counts, bytes, latencies, timeouts and
+    errors per mnemonic and the utilization of the port (see
+    :class:`SerialStats`), and :attr:`statsUpdated` delivers the same
+    report at most every :attr:`STATS_INTERVAL` ms while the
+    instrument is busy.
+
+    Signals
+    -------
+    statsUpdated(dict)
+        Emitted on the instrument's thread with the :meth:`stats`
+        report.
+
     Attributes
     ----------
     comm : dict
@@ -57,6 +107,52 @@ class QSerialInstrument(QAbstractInstrument):
 
     comm: dict = {}
 
+    RETRIES: int = 2
+    '''Times a failed query is repeated after :meth:`recover`.'''
+
+    RETRY_DELAY: int = 10
+    '''Delay [ms] before the first repeat; doubled for each further one.'''
+
+    BREAK_DURATION: int = 0
+    '''Serial break [ms] sent by :meth:`recover`, or 0 to send none.'''
+
+    TIMEOUTS: dict[str, int] = {}
+    '''Reply timeouts [ms] of slow commands, keyed by mnemonic.'''
+
+    TIMEOUT_QUANTILE: float = 0.99
+    '''Latency quantile from which adaptive timeouts are derived.'''
+
+    TIMEOUT_FACTOR: float = 3.
+    '''Adaptive timeout as a multiple of :attr:`TIMEOUT_QUANTILE`.'''
+
+    TIMEOUT_FLOOR: int = 20
+    '''Shortest adaptive timeout [ms].'''
+
+    TIMEOUT_CEILING: int = 2000
+    '''Longest adaptive timeout [ms].'''
+
+    TIMEOUT_SAMPLES: int = 20
+    '''Replies needed before a command's timeout adapts.'''
+
+    TIMEOUT_EXCLUDE: frozenset[str] = frozenset()
+    '''Mnemonics whose reply timeout never adapts.'''
+
+    STATS_INTERVAL: int = 1000
+    '''Shortest interval [ms] between :attr:`statsUpdated` signals.'''
+
+    statsUpdated = QtCore.Signal(dict)
+
+    _MNEMONIC = re.compile(r'\s*(\*?[A-Za-z]+)')
+
+    _synced: bool = False
+    _busyUntil: float = 0.
+    _latencies: dict = {}
+    _stats: SerialStats | None = None
+    _statsDue: float = 0.
+    _recovery: dict = dict.fromkeys(
+        ('timeouts', 'mismatches', 'recoveries', 'failures',
+         'unparsed'), 0)
+
     def __init__(self, portName: str | None = None, **kwargs) -> None:
         super().__init__()
         args = self.comm | kwargs
@@ -108,7 +204,8 @@ class QSerialInstrument(QAbstractInstrument):
             logger.debug(f'Device on {portName} is not '
                          f'{self.__class__.__name__}')
             self._interface.close()
-        return self._interface.isOpen()
+        self._synced = self._interface.isOpen()
+        return self._synced
 
     def isOpen(self) -> bool:
         '''Return True if the serial interface is currently open.'''
@@ -116,6 +213,7 @@ class QSerialInstrument(QAbstractInstrument):
 
     def close(self) -> None:
         '''Close the serial interface.'''
+        self._synced = False
         self._interface.close()
 
     def find(self) -> 'QSerialInstrument':
@@ -147,7 +245,20 @@ class QSerialInstrument(QAbstractInstrument):
         data : str | bytes
             Data to send.  See :meth:`QSerialInterface.transmit`.
         '''
+        if self.TIMEOUTS and isinstance(data, str):
+            slow = self.TIMEOUTS.get(self.mnemonic(data))
+            if slow:
+                self._busyUntil = time.monotonic() + slow / 1000.
+        stats = self._stats
+        if stats is None:
+            self._interface.transmit(data)
+            return
+        t0 = time.monotonic()
         self._interface.transmit(data)
+        t1 = time.monotonic()
+        mnemonic = self.mnemonic(data) if isinstance(data, str) else None
+        stats.transmitted(mnemonic, len(data), t0, t1)
+        self._statsRecorded(t1)
 
     def receive(self, **kwargs) -> str | bytes:
         '''Read a response from the instrument via the serial interface.
@@ -162,27 +273,40 @@ class QSerialInstrument(QAbstractInstrument):
         str | bytes
             Response from the instrument.
         '''
-        return self._interface.receive(**kwargs)
-
-    def handshake(self, data: str, **kwargs) -> str:
+        stats = self._stats
+        if stats is None:
+            return self._interface.receive(**kwargs)
+        t0 = time.monotonic()
+        response = self._interface.receive(**kwargs)
+        t1 = time.monotonic()
+        stats.received(len(response), t0, t1, self._interface.timedOut)
+        self._statsRecorded(t1)
+        return response
+
+    def handshake(self, data: str, retry: bool = True, **kwargs) -> str:
         '''Transmit a command and return the instrument's response.
 
         Parameters
         ----------
         data : str
             Command string to send to the instrument.
+        retry : bool, optional
+            False if *data* must not be sent twice.  See
+            :meth:`exchange`.  Default: ``True``.
         **kwargs :
             Passed through to :meth:`receive`.
 
         Returns
         -------
         str
-            Stripped response string from the instrument.
+            Stripped response string from the instrument.  Empty if
+            the instrument did not answer, even after :meth:`recover`.
         '''
-        self.transmit(data)
-        return self.receive(**kwargs).strip()
+        return self.exchange(data, lambda: self.receive(**kwargs).strip(),
+                             retry)
 
-    def expect(self, query: str, response: str, **kwargs) -> bool:
+    def expect(self, query: str, response: str, retry: bool = True,
+               **kwargs) -> bool:
         '''Return True if the instrument's response contains *response*.
 
         Parameters
@@ -191,6 +315,9 @@ class QSerialInstrument(QAbstractInstrument):
             Command string to send to the instrument.
         response : str
             Substring expected in the instrument's reply.
+        retry : bool, optional
+            False if *query* must not be sent twice.  See
+            :meth:`exchange`.  Default: ``True``.
         **kwargs :
             Passed through to :meth:`receive`.
 
@@ -199,7 +326,7 @@ class QSerialInstrument(QAbstractInstrument):
         bool
             ``True`` if *response* appears in the instrument's reply.
         '''
-        return response in self.handshake(query, **kwargs)
+        return response in self.handshake(query, retry, **kwargs)
 
     def getValue(self, query: str,
                  dtype: type = float
@@ -219,12 +346,272 @@ class QSerialInstrument(QAbstractInstrument):
         PropertyValue or None
             Value converted by *dtype*, or ``None`` if conversion fails.
         '''
-        response = self.handshake(query)
+        def read():
+            try:
+                return dtype(self.receive().strip())
+            except (ValueError, TypeError):
+                return None
+        return self.exchange(query, read)
+
+    def getValues(self, query: str,
+                  parser: ResponseParser) -> tuple | None:
+        '''Query the instrument and parse the reply with *parser*.
+
+        The reply is read as bytes and handed to *parser* without
+        being decoded, which makes this the cheapest way to read
+        numbers from the instrument.  Non-empty replies that cannot
+        be parsed are counted as ``unparsed`` in
+        :meth:`recoveryStats`.
+
+        Parameters
+        ----------
+        query : str
+            Command string that elicits a numeric response.
+        parser : ResponseParser
+            Parser for the format of the reply.
+
+        Returns
+        -------
+        tuple or None
+            Parsed values, or ``None`` if the reply could not be parsed.
+        '''
+        def read() -> tuple | None:
+            reply = self.receive(raw=True)
+            values = parser(reply)
+            if values is None and reply.strip():
+                self._count('unparsed')
+            return values
+        return self.exchange(query, read)
+
+    def exchange(self, data: str, read: Callable[[], object],
+                 retry: bool = True) -> object:
+        '''Transmit *data* and return the reply read by *read*.
+
+        This is the core of :meth:`handshake`, :meth:`getValue` and
+        :meth:`getValues`, and drivers with replies of their own
+        (e.g. a command echo to check) call it directly.  If the reply
+        times out or *read* rejects it, the instrument is resynchronized
+        with :meth:`recover` and *data* is sent again, up to
+        :attr:`RETRIES` times.  Before the instrument has been
+        identified (e.g. while probing ports in :meth:`find`), and
+        during :meth:`recover` itself, *data* is sent once.
+
+        A reply that is only late means that the instrument has
+        already carried out the command.  Commands that must not be
+        carried out twice, such as relative moves, are therefore sent
+        with *retry* set to False: a failed reply is still followed by
+        :meth:`recover`, which discards the late reply, but the command
+        is not sent again.
+
+        Parameters
+        ----------
+        data : str
+            Command string to send.
+        read : callable
+            Zero-argument callable that receives and converts the
+            reply, returning ``None`` if it is not a valid answer to
+            *data*.
+        retry : bool, optional
+            False to send *data* only once.  Default: ``True``.
+
+        Returns
+        -------
+        object
+            Result of the last call to *read*.
+        '''
+        mnemonic = self.mnemonic(data)
+        if not self._synced:
+            return self._attempt(data, read, mnemonic, None)
+        result = self._attempt(data, read, mnemonic, self.timeoutFor(data))
+        for attempt in range(self.RETRIES + 1):
+            timedOut = self._interface.timedOut
+            if result is not None and not timedOut:
+                return result
+            key = 'timeouts' if timedOut else 'mismatches'
+            self._count(key)
+            if not timedOut and self._stats is not None:
+                self._stats.rejected(mnemonic)
+            logger.debug(f'Desync after {data!r}: {key}')
+            if not retry:
+                self.recover()
+                break
+            if attempt == self.RETRIES:
+                break
+            QtCore.QThread.msleep(self.RETRY_DELAY << attempt)
+            if not self.recover():
+                break
+            timeout = max(self.timeoutFor(data), self._interface.timeout)
+            result = self._attempt(data, read, mnemonic, timeout)
+        self._count('failures')
+        logger.warning(f'No valid reply to {data!r}')
+        return result
+
+    def _attempt(self, data: str, read: Callable[[], object],
+                 mnemonic: str, timeout: int | None) -> object:
+        '''Send *data* once, waiting *timeout* ms (if given) for the reply.
+
+        Records the latency of a valid reply, and the exchange as a
+        trace span while :data:`tracer` is recording.
+        '''
+        interface = None if timeout is None else self._interface
+        if interface is not None:
+            default, interface.timeout = interface.timeout, timeout
+        t0 = time.monotonic()
         try:
-            value = dtype(response)
-        except (ValueError, TypeError):
-            value = None
-        return value
+            if tracer.enabled:
+                with tracer.span(data.strip(), 'serial',
+                                 instrument=self.__class__.__name__,
+                                 timeout=timeout):
+                    self.transmit(data)
+                    result = read()
+            else:
+                self.transmit(data)
+                result = read()
+        finally:
+            if interface is not None:
+                interface.timeout = default
+        if result is not None and not (interface and interface.timedOut):
+            self.latency(mnemonic).add(time.monotonic() - t0)
+        return result
+
+    @classmethod
+    def mnemonic(cls, data: str) -> str:
+        '''Return the command mnemonic of *data*, e.g. ``'FREQ'``.
+
+        Commands batched with ``;`` are keyed by their joined
+        mnemonics, e.g. ``'FREQ;AMPL'``, so that the round trip of a
+        batch is timed apart from that of its first command.
+        '''
+        if ';' in data:
+            return ';'.join(map(cls.mnemonic, data.split(';')))
+        match = cls._MNEMONIC.match(data)
+        return match.group(1) if match else data.strip()
+
+    def latency(self, mnemonic: str) -> LatencyHistogram:
+        '''Return the reply latency histogram of *mnemonic*.'''
+        histogram = self._latencies.get(mnemonic)
+        if histogram is None:
+            histogram = LatencyHistogram()
+            self._latencies = {**self._latencies, mnemonic: histogram}
+        return histogram
+
+    def timeoutFor(self, data: str) -> int:
+        '''Return the reply timeout [ms] for the command *data*.
+
+        The timeout is the override in :attr:`TIMEOUTS`, or else the
+        adaptive timeout once the command has enough latency samples
+        and is not in :attr:`TIMEOUT_EXCLUDE`, or else the port's
+        ``timeout``.  It is extended to cover any slow command still in
+        progress.
+        '''
+        mnemonic = self.mnemonic(data)
+        timeout = self.TIMEOUTS.get(mnemonic)
+        if timeout is None and mnemonic in self.TIMEOUT_EXCLUDE:
+            timeout = self._interface.timeout
+        elif timeout is None:
+            histogram = self._latencies.get(mnemonic)
+            if (histogram is not None and
+                    histogram.count >= self.TIMEOUT_SAMPLES):
+                latency = histogram.quantile(self.TIMEOUT_QUANTILE)
+                timeout = min(max(1000. * self.TIMEOUT_FACTOR * latency,
+                                  self.TIMEOUT_FLOOR),
+                              self.TIMEOUT_CEILING)
+            else:
+                timeout = self._interface.timeout
+        busy = 1000. * (self._busyUntil - time.monotonic())
+        return int(max(timeout, busy))
+
+    def recover(self) -> bool:
+        '''Resynchronize the request and reply streams.
+
+        Discards pending input, including replies that arrive late,
+        sends a break if :attr:`BREAK_DURATION` is set, and calls
+        :meth:`identify` to confirm that the instrument answers in
+        step again.
+
+        Returns
+        -------
+        bool
+            True if the instrument identified itself.
+        '''
+        interface = self._interface
+        with tracer.span('recover', 'serial',
+                         instrument=self.__class__.__name__):
+            interface.purge(interface.timeout)
+            if self.BREAK_DURATION:
+                interface.sendbreak(self.BREAK_DURATION)
+                interface.purge(interface.timeout)
+            self._synced = False
+            try:
+                synced = self.identify()
+            finally:
+                self._synced = interface.isOpen()
+        if synced:
+            self._count('recoveries')
+            logger.info(f'{self.__class__.__name__} resynchronized')
+        else:
+            logger.warning(f'{self.__class__.__name__} did not identify '
+                           'after desync')
+        return synced
+
+    def setStatsEnabled(self, enabled: bool) -> None:
+        '''Start or stop recording traffic statistics.
+
+        Enabling statistics that are already enabled keeps the counts;
+        use :meth:`resetStats` to start afresh.
+        '''
+        if not enabled:
+            self._stats = None
+        elif self._stats is None:
+            self._stats = SerialStats()
+
+    def statsEnabled(self) -> bool:
+        '''Return True if traffic statistics are being recorded.'''
+        return self._stats is not None
+
+    def resetStats(self) -> None:
+        '''Discard the traffic statistics recorded so far.
+
+        The next transmit or receive emits :attr:`statsUpdated`.
+        '''
+        if self._stats is not None:
+            self._stats.reset()
+            self._statsDue = 0.
+
+    def stats(self) -> dict:
+        '''Return the traffic statistics.
+
+        Returns
+        -------
+        dict
+            Report of :meth:`SerialStats.report`, or an empty dict if
+            statistics are not enabled.
+        '''
+        stats = self._stats
+        return {} if stats is None else stats.report()
+
+    def _statsRecorded(self, now: float) -> None:
+        if now >= self._statsDue:
+            self._statsDue = now + self.STATS_INTERVAL / 1000.
+            self.statsUpdated.emit(self.stats())
+
+    def _count(self, key: str) -> None:
+        self._recovery = {**self._recovery,
+                          key: self._recovery[key] + 1}
+
+    def recoveryStats(self) -> dict[str, int]:
+        '''Return the desync recovery counters.
+
+        Returns
+        -------
+        dict[str, int]
+            ``timeouts`` and ``mismatches``: failed replies by cause.
+            ``recoveries``: successful :meth:`recover` calls.
+            ``failures``: queries that failed after every retry.
+            ``unparsed``: replies to :meth:`getValues` that its
+            parser rejected.
+        '''
+        return dict(self._recovery)
 
     @classmethod
     def example(cls, portname: str | None = None) -> None:
@@ -48,6 +48,9 @@ class QSerialInterface(QSerialPort):
         End-of-line sequence used for read/write termination.
     timeout : int
         Read timeout in milliseconds.
+    timedOut : bool
+        True if the last :meth:`receive` ended without finding
+        :attr:`eol`.
     BaudRate : type
         Alias for ``QSerialPort.BaudRate``. Use as
         ``QSerialInstrument.BaudRate.Baud9600`` in ``comm`` dicts.
@@ -98,6 +101,8 @@ class QSerialInterface(QSerialPort):
             self.setFlowControl(flowControl)
         self.eol = eol if isinstance(eol, bytes) else eol.encode()
         self.timeout = timeout or 100
+        self.timedOut = False
+        self._pending = b''
         self.open(portName)
 
     def open(self, portName: str) -> bool:
@@ -122,6 +127,7 @@ class QSerialInterface(QSerialPort):
             logger.debug(f'Could not open {portName}')
             return False
         self.clear()
+        self._pending = b''
         return True
 
     def transmit(self, data: str | bytes) -> None:
@@ -153,7 +159,9 @@ class QSerialInterface(QSerialPort):
 
         Reads available data into a buffer until :attr:`eol` is found or
         the read times out.  The EOL bytes are stripped from the returned
-        value.
+        value.  Data after the first EOL, such as the further replies
+        to a multi-command query that arrive in the same read, is kept
+        and returned by the following calls.
 
         Intended to run in a dedicated worker thread (see
         :class:`QInstrumentWidget`), where blocking the thread with
@@ -179,16 +187,17 @@ class QSerialInterface(QSerialPort):
             eol = eol.encode() if isinstance(eol, str) else eol
         else:
             eol = self.eol
-        buffer = b''
-        while True:
+        buffer, self._pending = self._pending, b''
+        self.timedOut = False
+        while not (eol and eol in buffer):
             if not self.bytesAvailable():
                 if not self.waitForReadyRead(self.timeout):
                     logger.debug('Timeout waiting for response')
+                    self.timedOut = True
                     break
             buffer += bytes(self.readAll())
-            if eol and eol in buffer:
-                buffer = buffer[:buffer.index(eol)]
-                break
+        else:
+            buffer, _, self._pending = buffer.partition(eol)
         return buffer if raw else buffer.decode('utf-8', errors='replace')
 
     def readn(self, n: int = 1) -> bytes:
@@ -208,27 +217,54 @@ class QSerialInterface(QSerialPort):
         if not self.isOpen():
             logger.warning('Cannot read data: device is not open.')
             return b''
-        buffer = b''
+        buffer, self._pending = self._pending, b''
         while len(buffer) < n:
             if not self.bytesAvailable():
                 if not self.waitForReadyRead(self.timeout):
                     logger.warning('Timeout waiting for response')
                     break
             buffer += bytes(self.readAll())
-        return buffer[:n]
+        buffer, self._pending = buffer[:n], buffer[n:]
+        return buffer
+
+    def purge(self, settle: int = 0) -> bytes:
+        '''Discard buffered input and output.
+
+        Replies that arrive late, after their query timed out, would be
+        read as the answer to the next query.  Waiting *settle*
+        milliseconds for stragglers before clearing the buffers puts
+        the request and reply streams back in step.
+
+        Parameters
+        ----------
+        settle : int
+            Milliseconds to wait for further input; the wait restarts
+            whenever data arrives.  Default: ``0``.
+
+        Returns
+        -------
+        bytes
+            Input that was discarded.
+        '''
+        discarded, self._pending = self._pending, b''
+        if not self.isOpen():
+            return discarded
+        discarded += bytes(self.readAll())
+        while settle > 0 and self.waitForReadyRead(settle):
+            discarded += bytes(self.readAll())
+        self.clear()
+        if discarded:
+            logger.debug(f'Discarded {discarded!r}')
+        return discarded
 
     def sendbreak(self, duration: int = 250) -> None:
         '''Send a break signal to the instrument.
 
         Some instruments use a serial break to reset their communication
         state after a desynchronisation (e.g. a timeout caused by a
-        dropped response).  This method is not currently called anywhere;
-        it is retained as a building block for future error-recovery
-        logic.  A complete recovery strategy would: detect failure
-        (timeout in :meth:`receive`, ``None`` from
-        :meth:`QSerialInstrument.getValue`), flush buffers, call
-        :meth:`sendbreak`, and retry before surfacing a persistent
-        failure to the caller.
+        dropped response).  Blocks for *duration*, so that the break
+        is over before the next command; see
+        :meth:`QSerialInstrument.recover`.
 
         Parameters
         ----------
@@ -240,8 +276,8 @@ class QSerialInterface(QSerialPort):
             logger.warning('Cannot send break: port is not open.')
             return
         self.setBreakEnabled(True)
-        QtCore.QTimer.singleShot(duration,
-                                 lambda: self.setBreakEnabled(False))
+        QtCore.QThread.msleep(duration)
+        self.setBreakEnabled(False)
 
 
 __all__ = ['QSerialInterface']
@@ -0,0 +1,222 @@
+import logging
+import math
+import time
+from functools import partial
+import numpy as np
+from qtpy import QtCore
+from QInstrument.lib.QDispatcher import QDispatcher, field, readValues
+
+
+logger = logging.getLogger(__name__)
+
+
+class QSnapshot(QtCore.QObject):
+    '''Synchronized reads of several instruments.
+
+    :meth:`snapshot` asks every added instrument to read its chosen
+    properties at the same moment: one queued request is posted to all
+    of the device worker threads at once, so the reads overlap instead
+    of following one another.  Each read is bracketed by
+    :func:`time.monotonic` timestamps taken on the worker.  The
+    midpoint of the bracket is the best estimate of when the
+    instrument was sampled and half its width the uncertainty.
+    Command-map properties (see :class:`QCommandMapMixin`) of one
+    instrument are read with a single multi-query.
+
+    A snapshot is a dict:
+
+    .. code-block:: python
+
+        {'t': 1234.5671,                   # mean of the midpoints, s
+         'SR830': {'x': 1.2e-3, 'y': -4e-5,
+                   'skew': -0.0004,        # midpoint - t, s
+                   'latency': 0.0061},     # read duration, s
+         'stage': {'position': [10, 20, 0],
+                   'skew': 0.0004,
+                   'latency': 0.0042}}
+
+    :meth:`acquire` takes snapshots at a fixed interval and returns
+    them as a structured NumPy array with the same nesting:
+    ``data['SR830']['x']``, ``data['stage']['skew']``.
+
+    Instruments on the calling thread (e.g. fakes) are read
+    synchronously, one after another.  An instrument that does not
+    answer within the timeout contributes ``None`` values (``NaN`` in
+    arrays) and ``NaN`` skew; one whose read raises contributes
+    ``None`` values with its timing.  The reads are run by a
+    :class:`QDispatcher`.
+
+    .. code-block:: python
+
+        snap = QSnapshot()
+        snap.addInstrument(lockin, ['x', 'y'], label='SR830')
+        snap.addInstrument(stage, ['position'], label='stage')
+        data = snap.acquire(100, interval=50)
+
+    Parameters
+    ----------
+    timeout : int, optional
+        Milliseconds to wait for all instruments.  Default: ``1000``.
+    '''
+
+    RESERVED = ('skew', 'latency')
+    '''Per-instrument fields added to each snapshot.'''
+
+    def __init__(self, timeout: int = 1000,
+                 parent: QtCore.QObject | None = None) -> None:
+        super().__init__(parent)
+        self.timeout = timeout
+        self._sources: dict[str, tuple] = {}
+        self._dispatcher = QDispatcher(self)
+
+    @property
+    def labels(self) -> list[str]:
+        '''Labels of the added instruments.'''
+        return list(self._sources)
+
+    def addInstrument(self,
+                      instrument: QtCore.QObject,
+                      names: list[str],
+                      label: str | None = None) -> None:
+        '''Include *names* of *instrument* in every snapshot.
+
+        Parameters
+        ----------
+        instrument : QAbstractInstrument
+            Instrument to read.
+        names : list[str]
+            Properties to read.
+        label : str or None, optional
+            Key of the instrument in snapshots.  Default: the
+            instrument's class name.
+
+        Raises
+        ------
+        ValueError
+            If *label* is already in use or a name is one of
+            :attr:`RESERVED`.
+        '''
+        label = label or type(instrument).__name__
+        if label in self._sources or label == 't':
+            raise ValueError(f'Snapshot label already in use: {label}')
+        reserved = set(names) & set(self.RESERVED)
+        if reserved:
+            raise ValueError(f'Reserved snapshot names: {sorted(reserved)}')
+        self._sources[label] = (instrument, list(names))
+        self._dispatcher.setInstrument(label, instrument)
+
+    def removeInstrument(self, label: str) -> None:
+        '''Stop reading the instrument added as *label*.'''
+        self._sources.pop(label, None)
+        self._dispatcher.removeInstrument(label)
+
+    def snapshot(self, timeout: int | None = None) -> dict:
+        '''Read all instruments simultaneously and return one record.
+
+        Blocks until every instrument has answered or *timeout*
+        milliseconds (default :attr:`timeout`) have passed.
+
+        Returns
+        -------
+        dict
+            See the class description.
+        '''
+        timeout = self.timeout if timeout is None else timeout
+        calls = {label: partial(readValues, instrument, names)
+                 for label, (instrument, names) in self._sources.items()}
+        results = self._dispatcher.dispatch(calls, timeout)
+        missing = sorted(set(calls) - set(results))
+        if missing:
+            logger.warning(f'Snapshot timed out waiting for {missing}')
+        return self._record(results)
+
+    def _record(self, results: dict) -> dict:
+        mids = {label: (t0 + t1) / 2. for label, (t0, t1, _) in
+                results.items()}
+        t = sum(mids.values()) / len(mids) if mids else math.nan
+        record = {'t': t}
+        for label, (_, names) in self._sources.items():
+            if label in results:
+                t0, t1, values = results[label]
+                entry = dict(values or dict.fromkeys(names),
+                             skew=mids[label] - t, latency=t1 - t0)
+            else:
+                entry = dict.fromkeys(names)
+                entry.update(skew=math.nan, latency=math.nan)
+            record[label] = entry
+        return record
+
+    def dtype(self, record: dict) -> np.dtype:
+        '''Return the structured dtype that holds snapshots like *record*.
+
+        Numeric values become ``float64`` fields, fixed-length numeric
+        sequences ``float64`` subarrays, and anything else ``object``.
+        '''
+        fields = [('t', 'f8')]
+        for label, (_, names) in self._sources.items():
+            entry = record[label]
+            fields.append((label, [field(name, entry[name]) for name
+                                   in names + list(self.RESERVED)]))
+        return np.dtype(fields)
+
+    def acquire(self, count: int, interval: float = 0,
+                timeout: int | None = None) -> np.ndarray:
+        '''Take *count* snapshots, one every *interval* milliseconds.
+
+        Snapshots start on a fixed grid measured from the first one; a
+        snapshot that overruns its slot is followed immediately by the
+        next rather than shifting the grid.
+
+        Parameters
+        ----------
+        count : int
+            Number of snapshots.
+        interval : float, optional
+            Milliseconds between snapshot starts.  Default: ``0``
+            (back to back).
+        timeout : int or None, optional
+            Per-snapshot timeout.  Default: :attr:`timeout`.
+
+        Returns
+        -------
+        numpy.ndarray
+            Structured array of length *count*; see :meth:`dtype`.
+            Each field takes its type from its first value that is not
+            ``None``, so snapshots that time out do not decide it.
+        '''
+        records = []
+        start = time.monotonic()
+        for n in range(count):
+            wait = start + n * interval / 1000. - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            records.append(self.snapshot(timeout))
+        if not records:
+            return np.zeros(0, dtype=[('t', 'f8')])
+        data = np.zeros(count, dtype=self.dtype(self._typical(records)))
+        for n, record in enumerate(records):
+            data['t'][n] = record['t']
+            for label in self._sources:
+                column = data[label]
+                for name, value in record[label].items():
+                    try:
+                        column[name][n] = (math.nan if value is None
+                                           else value)
+                    except (TypeError, ValueError):
+                        logger.debug(f'{label}.{name}: cannot store '
+                                     f'{value!r}')
+        return data
+
+    def _typical(self, records: list[dict]) -> dict:
+        '''Return a record of the first value of each field that is not
+        ``None``, for :meth:`dtype`.'''
+        typical = {'t': records[0]['t']}
+        for label, (_, names) in self._sources.items():
+            typical[label] = {
+                name: next((r[label][name] for r in records
+                            if r[label][name] is not None), None)
+                for name in names + list(self.RESERVED)}
+        return typical
+
+
+__all__ = ['QSnapshot']
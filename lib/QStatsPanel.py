@@ -0,0 +1,187 @@
+import math
+from qtpy import QtCore, QtWidgets
+from QInstrument.lib.InstrumentProxy import InstrumentProxy
+
+
+class QStatsPanel(QtWidgets.QWidget):
+    '''Table of serial traffic statistics for a set of instruments.
+
+    Shows one row per instrument with the utilization of its port, the
+    number of commands sent, the worst p99 latency and the timeout and
+    error counts.  Below each instrument are its :attr:`SLOWEST`
+    slowest commands by p99 latency.  Rows are updated from the
+    :attr:`QSerialInstrument.statsUpdated` signal.
+
+    Statistics are recorded only while the panel is visible: showing
+    the panel enables them on every instrument that is not already
+    recording, and hiding it disables them again on those
+    instruments only, so an unused panel costs nothing and statistics
+    enabled by a script keep running.  Enabling, disabling, resetting
+    and reading the statistics are queued to each instrument's own
+    thread through an :class:`InstrumentProxy`.
+
+    .. code-block:: python
+
+        panel = QStatsPanel()
+        panel.addInstrument('SR830', lockin)
+        panel.show()
+
+    Parameters
+    ----------
+    parent : QWidget | None
+        Parent widget. Default: ``None``.
+    '''
+
+    SLOWEST: int = 5
+    '''Commands listed under each instrument.'''
+
+    HEADERS = ('Instrument', 'Utilization', 'Commands', 'p99 [ms]',
+               'Timeouts', 'Errors')
+
+    _reported = QtCore.Signal(str, object)
+
+    def __init__(self, parent: QtWidgets.QWidget | None = None) -> None:
+        super().__init__(parent)
+        self._devices: dict[str, QtCore.QObject] = {}
+        self._proxies: dict[str, InstrumentProxy] = {}
+        self._items: dict[str, QtWidgets.QTreeWidgetItem] = {}
+        self._enabled: set[str] = set()
+        self._reported.connect(self._onReport)
+        self._setupUi()
+
+    def _setupUi(self) -> None:
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.setContentsMargins(4, 4, 4, 4)
+        self._tree = QtWidgets.QTreeWidget()
+        self._tree.setHeaderLabels(self.HEADERS)
+        self._tree.setRootIsDecorated(True)
+        self._tree.setUniformRowHeights(True)
+        layout.addWidget(self._tree)
+        self._resetButton = QtWidgets.QPushButton('Reset')
+        self._resetButton.clicked.connect(self.resetStats)
+        layout.addWidget(self._resetButton,
+                         alignment=QtCore.Qt.AlignmentFlag.AlignRight)
+
+    @property
+    def names(self) -> list[str]:
+        '''Names of the instruments in the panel.'''
+        return list(self._devices)
+
+    def addInstrument(self, name: str, device: QtCore.QObject) -> None:
+        '''Show the traffic statistics of *device* as *name*.
+
+        Devices without statistics (see
+        :meth:`QSerialInstrument.stats`) are ignored.
+        '''
+        if not hasattr(device, 'stats') or name in self._devices:
+            return
+        self._devices[name] = device
+        self._proxies[name] = InstrumentProxy(device)
+        item = QtWidgets.QTreeWidgetItem(self._tree, [name])
+        self._items[name] = item
+        device.statsUpdated.connect(self._onStats)
+        if self.isVisible():
+            self._enable(name)
+        self._show(name, {})
+        self._request(name)
+
+    def removeInstrument(self, name: str) -> None:
+        '''Stop showing the instrument added as *name*.'''
+        device = self._devices.pop(name, None)
+        if device is None:
+            return
+        device.statsUpdated.disconnect(self._onStats)
+        self._disable(name)
+        self._proxies.pop(name)
+        item = self._items.pop(name)
+        self._tree.takeTopLevelItem(self._tree.indexOfTopLevelItem(item))
+
+    def clear(self) -> None:
+        '''Remove all instruments.'''
+        for name in list(self._devices):
+            self.removeInstrument(name)
+
+    @QtCore.Slot()
+    def resetStats(self) -> None:
+        '''Discard the statistics of every instrument.'''
+        for name, proxy in self._proxies.items():
+            proxy.submit('resetStats')
+            self._show(name, {})
+
+    def _enable(self, name: str) -> None:
+        '''Enable the statistics of *name* unless they are recording.'''
+        if name in self._enabled or self._devices[name].statsEnabled():
+            return
+        self._enabled.add(name)
+        self._proxies[name].submit('setStatsEnabled', True)
+
+    def _disable(self, name: str) -> None:
+        '''Disable the statistics of *name* if the panel enabled them.'''
+        if name in self._enabled:
+            self._enabled.discard(name)
+            self._proxies[name].submit('setStatsEnabled', False)
+
+    def _request(self, name: str) -> None:
+        '''Fetch a report of *name* on its thread for :meth:`_show`.'''
+        def done(future) -> None:
+            if future.exception() is None:
+                self._reported.emit(name, future.result())
+        self._proxies[name].submit('stats').add_done_callback(done)
+
+    @QtCore.Slot(str, object)
+    def _onReport(self, name: str, report: dict) -> None:
+        if name in self._items and report:
+            self._show(name, report)
+
+    @QtCore.Slot(dict)
+    def _onStats(self, report: dict) -> None:
+        device = self.sender()
+        for name, known in self._devices.items():
+            if known is device:
+                self._show(name, report)
+                return
+
+    def _show(self, name: str, report: dict) -> None:
+        '''Fill the rows of *name* from a :meth:`stats` *report*.'''
+        item = self._items[name]
+        commands = report.get('commands', {})
+        if 'utilization' in report:
+            item.setText(1, f"{100. * report['utilization']:.1f} %")
+        else:
+            item.setText(1, '')
+        item.setText(2, str(sum(c['count'] for c in commands.values())))
+        p99 = [c['p99'] for c in commands.values()
+               if not math.isnan(c['p99'])]
+        item.setText(3, self._ms(max(p99)) if p99 else '')
+        item.setText(4, str(sum(c['timeouts'] for c in commands.values())))
+        item.setText(5, str(sum(c['errors'] for c in commands.values())))
+        slowest = sorted(commands.items(), key=self._slowness,
+                         reverse=True)[:self.SLOWEST]
+        item.takeChildren()
+        for mnemonic, command in slowest:
+            QtWidgets.QTreeWidgetItem(item, [
+                mnemonic or '?', '', str(command['count']),
+                self._ms(command['p99']), str(command['timeouts']),
+                str(command['errors'])])
+
+    @staticmethod
+    def _slowness(entry: tuple[str, dict]) -> float:
+        p99 = entry[1]['p99']
+        return -1. if math.isnan(p99) else p99
+
+    @staticmethod
+    def _ms(seconds: float) -> str:
+        return '' if math.isnan(seconds) else f'{1000. * seconds:.1f}'
+
+    def showEvent(self, event) -> None:
+        for name in self._devices:
+            self._enable(name)
+        super().showEvent(event)
+
+    def hideEvent(self, event) -> None:
+        for name in self._devices:
+            self._disable(name)
+        super().hideEvent(event)
+
+
+__all__ = ['QStatsPanel']
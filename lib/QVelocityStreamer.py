@@ -0,0 +1,198 @@
+import logging
+import threading
+import numpy as np
+from qtpy import QtCore
+
+
+logger = logging.getLogger(__name__)
+
+
+class _Sender(QtCore.QObject):
+    '''Sends the streamer's latest velocity on the thread of the device.'''
+
+    def __init__(self, streamer: 'QVelocityStreamer') -> None:
+        super().__init__()
+        self._streamer = streamer
+
+    @QtCore.Slot()
+    def send(self) -> None:
+        streamer = self._streamer
+        while True:
+            velocity = streamer._take()
+            if velocity is None:
+                return
+            try:
+                getattr(streamer.device, streamer.method)(velocity.tolist())
+            except Exception as exc:
+                logger.error(f'velocity {velocity.tolist()}: {exc}')
+            streamer.velocitySent.emit(velocity)
+
+
+class QVelocityStreamer(QtCore.QObject):
+    '''Streams joystick deflection to a stage as velocity commands.
+
+    A joystick widget emits a new value for every mouse move.  Sending
+    each of them to the stage costs a serial round trip apiece, so
+    bursts pile up in the worker's queue, the stage lags behind the
+    hand, and the controller's command queue overflows.  The streamer
+    sits between the two:
+
+    - :meth:`setVelocity` only records the latest value.
+    - Every :attr:`interval` ms the latest value is sent if it differs
+      from the last one sent by more than :attr:`deadband` on any
+      axis.
+    - At most one command is in flight.  Values that arrive while the
+      device is busy replace one another, and only the latest is sent
+      when the device is free.
+    - A zero velocity (the joystick was released) is sent at once and
+      is never suppressed by the deadband.  :meth:`stop` also sends
+      one.
+
+    Commands run on the device's thread, so the GUI never waits for
+    the serial port.
+
+    .. code-block:: python
+
+        streamer = QVelocityStreamer(stage)
+        joystick.positionChanged.connect(streamer.setVelocity)
+
+    Parameters
+    ----------
+    device : QAbstractInstrument
+        Stage to drive.
+    method : str, optional
+        Name of the device method that takes a velocity sequence.
+        Default: ``'set_velocity'``.
+    interval : int, optional
+        Control period in milliseconds.  Default: :attr:`INTERVAL`.
+    deadband : float, optional
+        Smallest change on any axis that is sent, in velocity units.
+        Default: ``0``.
+
+    Signals
+    -------
+    velocitySent(numpy.ndarray)
+        Emitted on the device's thread after each command is sent.
+    '''
+
+    INTERVAL: int = 50
+    '''Default control period [ms].'''
+
+    velocitySent = QtCore.Signal(object)
+
+    _sendRequested = QtCore.Signal()
+
+    def __init__(self,
+                 device: QtCore.QObject,
+                 method: str = 'set_velocity',
+                 interval: int | None = None,
+                 deadband: float = 0.,
+                 parent: QtCore.QObject | None = None) -> None:
+        super().__init__(parent)
+        self.device = device
+        self.method = method
+        self.deadband = deadband
+        self.mutex = QtCore.QMutex()
+        self._latest = None
+        self._sent = None
+        self._pending = None
+        self._busy = False
+        self._idle = threading.Event()
+        self._idle.set()
+        self._dropped = 0
+        self._sender = None
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(interval or self.INTERVAL)
+        self._timer.timeout.connect(self._sample)
+
+    @property
+    def interval(self) -> int:
+        '''Control period [ms].'''
+        return self._timer.interval()
+
+    @interval.setter
+    def interval(self, interval: int) -> None:
+        self._timer.setInterval(int(interval))
+
+    @property
+    def dropped(self) -> int:
+        '''Number of values replaced by a newer one before being sent.'''
+        return self._dropped
+
+    @QtCore.Slot(object)
+    def setVelocity(self, velocity) -> None:
+        '''Record the commanded *velocity*; send it now if it is zero.'''
+        velocity = np.asarray(velocity, dtype=float)
+        self._latest = velocity
+        if not velocity.any():
+            self._timer.stop()
+            self._sample()
+        elif not self._timer.isActive():
+            self._sample()
+            self._timer.start()
+
+    @QtCore.Slot()
+    def stop(self, timeout: int = 1000) -> bool:
+        '''Send a zero velocity and wait up to *timeout* ms for it to go.
+
+        Returns
+        -------
+        bool
+            True if the device has been sent every command.
+        '''
+        shape = np.shape(self._latest if self._latest is not None else
+                         self._sent if self._sent is not None else (0, 0))
+        self.setVelocity(np.zeros(shape))
+        return self._idle.wait(timeout / 1000.)
+
+    @QtCore.Slot()
+    def _sample(self) -> None:
+        velocity = self._latest
+        if velocity is None:
+            return
+        sent = self._sent
+        if sent is not None and sent.shape == velocity.shape:
+            if not velocity.any():
+                if not sent.any():
+                    return
+            elif np.all(np.abs(velocity - sent) <= self.deadband):
+                return
+        self._sent = velocity
+        self._post(velocity)
+
+    def _post(self, velocity: np.ndarray) -> None:
+        with QtCore.QMutexLocker(self.mutex):
+            if self._pending is not None:
+                self._dropped += 1
+            self._pending = velocity
+            if self._busy:
+                return
+            self._busy = True
+            self._idle.clear()
+        self._senderFor()
+        self._sendRequested.emit()
+
+    def _take(self) -> np.ndarray | None:
+        '''Return the pending velocity, or None when the sender may rest.'''
+        with QtCore.QMutexLocker(self.mutex):
+            velocity, self._pending = self._pending, None
+            if velocity is None:
+                self._busy = False
+                self._idle.set()
+            return velocity
+
+    def _senderFor(self) -> _Sender:
+        '''Return the sender, living on the device's thread.'''
+        sender = self._sender
+        if sender is None or sender.thread() is not self.device.thread():
+            if sender is not None:
+                self._sendRequested.disconnect(sender.send)
+                sender.deleteLater()
+            sender = _Sender(self)
+            sender.moveToThread(self.device.thread())
+            self._sendRequested.connect(sender.send)
+            self._sender = sender
+        return sender
+
+
+__all__ = ['QVelocityStreamer']
@@ -0,0 +1,150 @@
+import logging
+import re
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseParser:
+    '''Converts numeric instrument replies without raising.
+
+    Most replies are one number or a few separated by commas, sometimes
+    wrapped in a command echo or a unit: ``'SNAP?'`` answers
+    ``b'1000.0,1.2e-3,45.1'``, the Opus ``b'0123.4mW'``, the IPG laser
+    ``b'ROP: 10.5'``.  A parser is built once per reply format,
+    usually as a class attribute of the driver, with the echo and unit
+    compiled into a single regular expression.  It then works directly
+    on the bytes returned by ``receive(raw=True)``, so a reply is never
+    decoded to ``str`` on the way to a number.
+
+    .. code-block:: python
+
+        SNAP = ResponseParser(float, count=3)
+        POWER = ResponseParser(float, suffix='mW')
+
+        SNAP(b'1000.0,1.2e-3,45.1')    # (1000.0, 0.0012, 45.1)
+        POWER.value(b'0123.4mW')       # 123.4
+        SNAP(b'1000.0,garbled')        # None
+
+    A reply that cannot be converted produces ``None`` (or ``False``
+    from :meth:`into`) and is logged at debug level.  The parser keeps
+    no state, so one instance is safely shared by every instrument of
+    a driver and every thread; :meth:`QSerialInstrument.getValues`
+    counts the failures of each instrument.  The echo and the unit are
+    optional in the reply, as a unit stripped with :meth:`str.rstrip`
+    would be, so only the numbers decide whether a reply is valid.
+
+    Parameters
+    ----------
+    dtype : type, optional
+        Converts each field: ``float`` or ``int``.  Default: ``float``.
+    count : int or None, optional
+        Number of values expected.  Default: ``None``, which accepts
+        any number.
+    prefix : str, optional
+        Command echo before the values, e.g. ``'ROP:'``.
+    suffix : str, optional
+        Unit after the values, e.g. ``'mW'``, ``'%'`` or ``'C'``.
+    separator : str, optional
+        Field separator.  Default: ``','``.
+    specials : dict or None, optional
+        Fields that stand for fixed values, e.g.
+        ``{'Off': 0., 'Low': 0.1}``.
+    '''
+
+    def __init__(self,
+                 dtype: type = float,
+                 count: int | None = None,
+                 prefix: str = '',
+                 suffix: str = '',
+                 separator: str = ',',
+                 specials: dict | None = None) -> None:
+        self.dtype = dtype
+        self.count = count
+        self.separator = separator.encode()
+        self.specials = {key.encode(): value for key, value in
+                         (specials or {}).items()}
+        self._pattern = None
+        if prefix or suffix:
+            head = re.escape(prefix.strip().encode())
+            tail = re.escape(suffix.strip().encode())
+            self._pattern = re.compile(
+                rb'\s*(?:' + head + rb')?\s*(.*?)\s*(?:' + tail + rb')?\s*\Z',
+                re.S)
+
+    def __repr__(self) -> str:
+        return (f'{self.__class__.__name__}({self.dtype.__name__}, '
+                f'count={self.count})')
+
+    def __call__(self, data: bytes | str) -> tuple | None:
+        '''Return the values in *data*, or ``None`` if it is invalid.
+
+        Parameters
+        ----------
+        data : bytes | str
+            Reply from the instrument, with or without the end-of-line
+            sequence.
+
+        Returns
+        -------
+        tuple or None
+            Converted values.
+        '''
+        if isinstance(data, str):
+            data = data.encode()
+        body = data
+        if self._pattern is not None:
+            body = self._pattern.match(data).group(1)
+        specials = self.specials
+        dtype = self.dtype
+        try:
+            if specials:
+                values = tuple(specials[field.strip()]
+                               if field.strip() in specials else dtype(field)
+                               for field in body.split(self.separator))
+            else:
+                values = tuple(map(dtype, body.split(self.separator)))
+        except (ValueError, TypeError):
+            return self._fail(data)
+        if self.count is not None and len(values) != self.count:
+            return self._fail(data)
+        return values
+
+    def value(self, data: bytes | str):
+        '''Return the first value in *data*, or ``None``.'''
+        values = self(data)
+        return None if values is None else values[0]
+
+    def into(self, data: bytes | str, out: np.ndarray) -> bool:
+        '''Store the values in *data* in the preallocated array *out*.
+
+        Parameters
+        ----------
+        data : bytes | str
+            Reply from the instrument.
+        out : numpy.ndarray
+            Array, or view into a larger array, with one element per
+            value.
+
+        Returns
+        -------
+        bool
+            True if *out* was filled.  *out* is left untouched
+            otherwise.
+        '''
+        values = self(data)
+        if values is None:
+            return False
+        if len(values) != out.size:
+            self._fail(data)
+            return False
+        out.flat[:] = values
+        return True
+
+    def _fail(self, data: bytes) -> None:
+        logger.debug(f'Could not parse {data!r} with {self!r}')
+        return None
+
+
+__all__ = ['ResponseParser']
@@ -0,0 +1,141 @@
+import math
+import time
+from QInstrument.lib.LatencyHistogram import LatencyHistogram
+
+
+class _Command:
+    '''Traffic counters of one command mnemonic.'''
+
+    __slots__ = ('count', 'sent', 'received', 'replies', 'timeouts',
+                 'errors', 'busy', 'latency')
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.sent = 0
+        self.received = 0
+        self.replies = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.busy = 0.
+        self.latency = LatencyHistogram()
+
+    def report(self) -> dict:
+        latency = self.latency
+        return {'count': self.count,
+                'replies': self.replies,
+                'sent': self.sent,
+                'received': self.received,
+                'timeouts': self.timeouts,
+                'errors': self.errors,
+                'busy': self.busy,
+                'mean': latency.mean,
+                'p50': latency.quantile(0.5),
+                'p99': latency.quantile(0.99),
+                'max': latency.maximum if latency.count else math.nan}
+
+
+class SerialStats:
+    '''Per-command traffic statistics of one serial instrument.
+
+    :class:`QSerialInstrument` reports every :meth:`transmit` and
+    :meth:`receive` here while statistics are enabled (see
+    :meth:`QSerialInstrument.setStatsEnabled`).  Replies are attributed
+    to the mnemonic of the last command sent, and so is binary data
+    such as a waveform upload.  For each mnemonic the statistics hold
+
+    - ``count``: commands sent,
+    - ``replies``: replies received in time,
+    - ``sent``, ``received``: bytes each way,
+    - ``timeouts``: replies that timed out,
+    - ``errors``: replies rejected as invalid (see
+      :meth:`QSerialInstrument.exchange`),
+    - ``busy``: seconds spent in transmit and receive,
+    - ``mean``, ``p50``, ``p99``, ``max``: latency [s] from the end
+      of the command to the end of its (first) reply.
+
+    The port's ``utilization`` is the fraction of the time since
+    :meth:`reset` spent in transmit and receive.
+
+    Parameters
+    ----------
+    clock : callable, optional
+        Zero-argument callable returning the time in seconds.
+        Default: :func:`time.monotonic`.
+    '''
+
+    def __init__(self, clock=None) -> None:
+        self.clock = clock or time.monotonic
+        self.reset()
+
+    def reset(self) -> None:
+        '''Discard all counts.'''
+        self._commands: dict[str, _Command] = {}
+        self._current = self._command('')
+        self._sentAt = None
+        self.start = self.clock()
+        self.busy = 0.
+
+    def _command(self, mnemonic: str) -> _Command:
+        command = self._commands.get(mnemonic)
+        if command is None:
+            command = _Command()
+            self._commands = {**self._commands, mnemonic: command}
+        return command
+
+    def transmitted(self, mnemonic: str | None, size: int,
+                    t0: float, t1: float) -> None:
+        '''Record *size* bytes sent between *t0* and *t1*.
+
+        *mnemonic* is None for binary data, which is counted against
+        the last command.
+        '''
+        if mnemonic is not None:
+            self._current = command = self._command(mnemonic)
+            command.count += 1
+        else:
+            command = self._current
+        command.sent += size
+        command.busy += t1 - t0
+        self.busy += t1 - t0
+        self._sentAt = t1
+
+    def received(self, size: int, t0: float, t1: float,
+                 timedOut: bool) -> None:
+        '''Record a reply of *size* bytes read between *t0* and *t1*.'''
+        command = self._current
+        command.received += size
+        command.busy += t1 - t0
+        self.busy += t1 - t0
+        if timedOut:
+            command.timeouts += 1
+        else:
+            command.replies += 1
+            if self._sentAt is not None:
+                command.latency.add(t1 - self._sentAt)
+        self._sentAt = None
+
+    def rejected(self, mnemonic: str) -> None:
+        '''Record an invalid reply to *mnemonic*.'''
+        self._command(mnemonic).errors += 1
+
+    def report(self) -> dict:
+        '''Return the statistics as a dict.
+
+        Returns
+        -------
+        dict
+            ``elapsed`` and ``busy`` [s], ``utilization`` in [0, 1],
+            and ``commands``: a dict of per-mnemonic statistics (see
+            the class description).
+        '''
+        elapsed = self.clock() - self.start
+        commands = {mnemonic: command.report() for mnemonic, command
+                    in self._commands.items()
+                    if command.count or command.received}
+        return {'elapsed': elapsed,
+                'busy': self.busy,
+                'utilization': self.busy / elapsed if elapsed > 0 else 0.,
+                'commands': commands}
+
+
+__all__ = ['SerialStats']
@@ -0,0 +1,197 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from qtpy import QtCore
+
+
+logger = logging.getLogger(__name__)
+
+
+class _NullSpan:
+    '''Span returned while tracing is off.'''
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+_NULL = _NullSpan()
+
+
+class _Span:
+    '''Times one ``with`` block and records it as a complete event.'''
+
+    __slots__ = ('tracer', 'name', 'category', 'args', 'start')
+
+    def __init__(self, tracer, name: str, category: str,
+                 args: dict) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.monotonic()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        end = time.monotonic()
+        self.tracer._record('X', self.name, self.category, self.start,
+                            self.args, dur=end - self.start)
+
+
+class Tracer:
+    '''Records timed spans and writes them as Chrome trace events.
+
+    Spans are recorded around serial exchanges, queued ``get``, ``set``
+    and ``execute`` deliveries, poll cycles, the application of
+    property values by widgets and :class:`Configure` file I/O.  Each
+    span carries the thread it ran on and, where there is one, the
+    instrument.  :meth:`save` writes them in the Chrome trace-event
+    format, which `Perfetto <https://ui.perfetto.dev>`_ and
+    ``chrome://tracing`` display as one timeline per thread, so a
+    worker blocked waiting for a reply, a slot call waiting in a queue
+    and a busy GUI thread can be told apart.
+
+    Tracing is off until :meth:`start`.  The package's instrumented
+    code tests :attr:`enabled` before it builds a span's name and
+    annotations, so while tracing is off it pays one attribute test.
+    Called while off, :meth:`span` returns a shared do-nothing context
+    manager.  At most :attr:`CAPACITY` events are kept; the oldest are
+    dropped first.
+
+    The package records into the module-level instance ``tracer``:
+
+    .. code-block:: python
+
+        from QInstrument.lib.Tracer import tracer
+
+        tracer.start()
+        ...                             # use the instruments
+        tracer.save('trace.json')       # open in ui.perfetto.dev
+
+    Code of one's own is traced the same way:
+
+    .. code-block:: python
+
+        with tracer.span('sweep', 'app', points=100):
+            ...
+    '''
+
+    CAPACITY: int = 1_000_000
+    '''Largest number of events kept.'''
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._events = deque(maxlen=self.CAPACITY)
+        self._threads: dict[int, str] = {}
+        self._origin = time.monotonic()
+
+    def start(self) -> None:
+        '''Discard earlier events and start recording.'''
+        self.clear()
+        self.enabled = True
+        logger.info('Tracing started')
+
+    def stop(self) -> None:
+        '''Stop recording.  Recorded events are kept.'''
+        self.enabled = False
+
+    def clear(self) -> None:
+        '''Discard all recorded events.'''
+        self._events = deque(maxlen=self.CAPACITY)
+        self._threads = {}
+        self._origin = time.monotonic()
+
+    def span(self, name: str, category: str = '', **args):
+        '''Return a context manager that records its block as a span.
+
+        Parameters
+        ----------
+        name : str
+            Label shown on the timeline, e.g. ``'get frequency'``.
+        category : str, optional
+            Comma-separated categories used for filtering, e.g.
+            ``'serial'``.
+        **args
+            Annotations, e.g. ``instrument='QSR830'``.  Values other
+            than numbers, strings, booleans and ``None`` are recorded
+            as their :func:`str`.
+        '''
+        if not self.enabled:
+            return _NULL
+        return _Span(self, name, category, args)
+
+    def instant(self, name: str, category: str = '', **args) -> None:
+        '''Record a momentary event such as a queued request.'''
+        if self.enabled:
+            self._record('i', name, category, time.monotonic(), args,
+                         s='t')
+
+    def _record(self, phase: str, name: str, category: str,
+                start: float, args: dict, **fields) -> None:
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            thread = QtCore.QThread.currentThread()
+            label = ((thread.objectName() if thread is not None else '')
+                     or threading.current_thread().name)
+            self._threads = {**self._threads, tid: label}
+        event = {'name': name, 'cat': category, 'ph': phase,
+                 'ts': 1e6 * (start - self._origin), 'tid': tid,
+                 'args': {key: self._jsonable(value)
+                          for key, value in args.items()}}
+        if 'dur' in fields:
+            fields['dur'] *= 1e6
+        event.update(fields)
+        self._events.append(event)
+
+    @staticmethod
+    def _jsonable(value):
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        return str(value)
+
+    def events(self) -> list[dict]:
+        '''Return the recorded events as trace-event dicts.
+
+        Returns
+        -------
+        list[dict]
+            Thread-name metadata events followed by the recorded
+            spans and instants.  Times are in microseconds since
+            :meth:`start`.
+        '''
+        pid = os.getpid()
+        names = [{'name': 'thread_name', 'ph': 'M', 'pid': pid,
+                  'tid': tid, 'args': {'name': label}}
+                 for tid, label in self._threads.items()]
+        return names + [{**event, 'pid': pid} for event in
+                        list(self._events)]
+
+    def save(self, filename: str) -> None:
+        '''Write the recorded events to *filename* as Chrome trace JSON.
+
+        Parameters
+        ----------
+        filename : str
+            Output path, conventionally ending in ``.json``.
+        '''
+        trace = {'traceEvents': self.events(), 'displayTimeUnit': 'ms'}
+        with open(filename, 'w', encoding='utf-8') as tracefile:
+            json.dump(trace, tracefile)
+        logger.info(f'Wrote {len(self._events)} trace events to '
+                    f'{filename}')
+
+
+tracer = Tracer()
+'''Tracer shared by the package.'''
+
+
+__all__ = ['Tracer', 'tracer']
@@ -2,12 +2,30 @@ import importlib
 
 _lazy = {
     'QAbstractInstrument': 'QAbstractInstrument',
+    'PropertySpec':        'PropertySpec',
     'QSerialInterface':     'QSerialInterface',
     'QSerialInstrument':    'QSerialInstrument',
+    'ResponseParser':       'ResponseParser',
+    'LatencyHistogram':     'LatencyHistogram',
+    'SerialStats':          'SerialStats',
+    'Tracer':               'Tracer',
+    'tracer':               'Tracer',
     'QFakeInstrument':      'QFakeInstrument',
     'QPollingMixin':        'QPollingMixin',
+    'PollScheduler':        'PollScheduler',
+    'PropertyHistory':      'PropertyHistory',
+    'QCommandMapMixin':     'QCommandMapMixin',
+    'Command':              'QCommandMapMixin',
     'QInstrumentWidget':    'QInstrumentWidget',
+    'QInstrumentEngine':    'QInstrumentEngine',
+    'InstrumentProxy':      'InstrumentProxy',
     'Configure':            'Configure',
+    'QDataLogger':          'QDataLogger',
+    'QDispatcher':          'QDispatcher',
+    'QSnapshot':            'QSnapshot',
+    'QSequencer':           'QSequencer',
+    'QVelocityStreamer':    'QVelocityStreamer',
+    'QStatsPanel':          'QStatsPanel',
 }
 
 
@@ -0,0 +1,56 @@
+from collections.abc import Iterator
+from pathlib import Path
+
+
+INSTRUMENTS_DIR = Path(__file__).parent.parent / 'instruments'
+
+
+def instrument_paths(module: str) -> Iterator[tuple[str, str]]:
+    '''Yield ``(manufacturer, instrument_name)`` for instrument packages.
+
+    Scans ``instruments/`` two levels deep for subdirectories that
+    contain ``<module>.py``.
+
+    Parameters
+    ----------
+    module : str
+        Name of the module a package must provide
+        (e.g. ``'instrument'`` or ``'widget'``).
+    '''
+    for mfr in INSTRUMENTS_DIR.iterdir():
+        if not mfr.is_dir() or mfr.name.startswith('_'):
+            continue
+        for inst in mfr.iterdir():
+            if inst.is_dir() and (inst / f'{module}.py').exists():
+                yield mfr.name, inst.name
+
+
+def available_instruments(module: str) -> list[str]:
+    '''Return the sorted bare names of packages that provide *module*.'''
+    return sorted(name for _, name in instrument_paths(module))
+
+
+def find_instrument_module(name: str, module: str) -> str | None:
+    '''Resolve a bare instrument name to the dotted path of *module*.
+
+    Parameters
+    ----------
+    name : str
+        Bare instrument name (e.g. ``'DS345'``).
+    module : str
+        Module within the instrument package (e.g. ``'widget'``).
+
+    Returns
+    -------
+    str | None
+        Dotted module path, or ``None`` if no package named *name*
+        provides *module*.
+    '''
+    return next(
+        (f'QInstrument.instruments.{mfr}.{name}.{module}'
+         for mfr, inst in instrument_paths(module) if inst == name),
+        None)
+
+
+__all__ = ['instrument_paths', 'available_instruments',
+           'find_instrument_module']
@@ -0,0 +1,173 @@
+import threading
+from concurrent.futures import Future
+
+import pytest
+from qtpy import QtCore
+from lib.InstrumentProxy import InstrumentProxy
+from lib.QFakeInstrument import QFakeInstrument
+
+
+class _Device(QFakeInstrument):
+    '''Fake whose getters record the thread they run on.'''
+
+    def _registerProperties(self) -> None:
+        self.threads = []
+        self._value = 1.
+        self.registerProperty('value', getter=self._getValue,
+                              setter=self._setValue, ptype=float)
+        self.registerProperty('other', getter=lambda: 2., setter=None)
+
+    def _getValue(self) -> float:
+        self.threads.append(QtCore.QThread.currentThread())
+        return self._value
+
+    def _setValue(self, value: float) -> None:
+        self.threads.append(QtCore.QThread.currentThread())
+        self._value = value
+
+    def fail(self) -> None:
+        raise ValueError('failed')
+
+
+@pytest.fixture
+def device(qtbot):
+    return _Device()
+
+
+@pytest.fixture
+def worker(device):
+    thread = QtCore.QThread()
+    device.moveToThread(thread)
+    thread.start()
+    yield thread
+    thread.quit()
+    thread.wait()
+
+
+@pytest.fixture
+def proxy(device):
+    return InstrumentProxy(device, timeout=2.)
+
+
+class TestSameThread:
+
+    def test_get_runs_immediately(self, proxy, device):
+        assert proxy.get('value') == 1.
+        assert device.threads == [QtCore.QThread.currentThread()]
+
+    def test_submit_returns_settled_future(self, proxy):
+        future = proxy.submit('get', 'value')
+        assert isinstance(future, Future)
+        assert future.done()
+        assert future.result() == 1.
+
+
+class TestWorkerThread:
+
+    def test_get_runs_on_worker(self, proxy, device, worker):
+        assert proxy.get('value') == 1.
+        assert device.threads == [worker]
+
+    def test_set(self, proxy, device, worker):
+        proxy.set('value', 3.)
+        assert proxy.get('value') == 3.
+        assert device.threads == [worker, worker]
+
+    def test_emits_property_value(self, qtbot, proxy, device, worker):
+        with qtbot.waitSignal(device.propertyValue) as blocker:
+            proxy.get('value')
+        assert blocker.args == ['value', 1.]
+
+    def test_submit(self, proxy, worker):
+        assert proxy.submit('get', 'other').result(2.) == 2.
+
+    def test_callable(self, proxy, device, worker):
+        thread = proxy.call(QtCore.QThread.currentThread)
+        assert thread is worker
+
+    def test_exception_propagates(self, proxy, worker):
+        with pytest.raises(ValueError, match='failed'):
+            proxy.call('fail')
+
+    def test_follows_device_to_new_thread(self, proxy, device):
+        assert proxy.get('value') == 1.
+        thread = QtCore.QThread()
+        device.moveToThread(thread)
+        thread.start()
+        try:
+            assert proxy.get('value') == 1.
+            assert device.threads[-1] is thread
+        finally:
+            thread.quit()
+            thread.wait()
+
+
+class TestBatch:
+
+    def test_results_in_order(self, proxy, worker):
+        assert proxy.batch([('get', 'value'), ('get', 'other'),
+                            ('set', 'value', 5.),
+                            ('get', 'value')]) == [1., 2., None, 5.]
+
+    def test_one_queued_operation(self, proxy, device, worker):
+        invoker = proxy._invokerFor()
+        jobs = []
+        invoker.requested.connect(
+            jobs.append, QtCore.Qt.ConnectionType.DirectConnection)
+        proxy.getMany(['value', 'other'])
+        assert len(jobs) == 1
+
+    def test_get_many(self, proxy, worker):
+        assert proxy.getMany(['value', 'other']) == {'value': 1.,
+                                                     'other': 2.}
+
+    def test_stops_at_first_exception(self, proxy, device, worker):
+        with pytest.raises(ValueError):
+            proxy.batch([('fail',), ('set', 'value', 9.)])
+        assert device._value == 1.
+
+
+class TestTimeout:
+
+    def test_raises_and_cancels(self, proxy, device):
+        thread = QtCore.QThread()
+        device.moveToThread(thread)
+        with pytest.raises(TimeoutError, match='_Device'):
+            proxy.set('value', 7., timeout=0.05)
+        thread.start()
+        try:
+            # Queued after the cancelled call, so it runs second.
+            assert proxy.get('value') == 1.
+        finally:
+            thread.quit()
+            thread.wait()
+
+    def test_default_timeout(self, device):
+        assert InstrumentProxy(device).timeout == InstrumentProxy.TIMEOUT
+
+
+class TestAttributes:
+
+    def test_property(self, proxy, device, worker):
+        assert proxy.properties == device.properties
+
+    def test_method(self, proxy, worker):
+        assert proxy.propertyMeta('value')['ptype'] is float
+        with pytest.raises(ValueError):
+            proxy.fail()
+
+    def test_unknown(self, proxy):
+        with pytest.raises(AttributeError):
+            proxy.nonexistent
+
+    def test_repr(self, proxy):
+        assert repr(proxy) == 'InstrumentProxy(_Device)'
+
+
+def test_from_python_thread(qtbot, proxy):
+    results = []
+    caller = threading.Thread(target=lambda: results.append(
+        proxy.get('value')))
+    caller.start()
+    qtbot.waitUntil(lambda: results == [1.])
+    caller.join()
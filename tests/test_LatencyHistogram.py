@@ -0,0 +1,50 @@
+import math
+import pytest
+from lib.LatencyHistogram import LatencyHistogram
+
+
+class TestLatencyHistogram:
+
+    def test_empty(self):
+        h = LatencyHistogram()
+        assert h.count == 0
+        assert math.isnan(h.mean)
+        assert math.isnan(h.quantile(0.99))
+
+    def test_counts_and_mean(self):
+        h = LatencyHistogram()
+        for latency in (0.001, 0.002, 0.003):
+            h.add(latency)
+        assert h.count == 3
+        assert h.mean == pytest.approx(0.002)
+        assert h.maximum == 0.003
+
+    def test_quantile_bounds_sample_within_one_bin(self):
+        h = LatencyHistogram()
+        for _ in range(100):
+            h.add(0.005)
+        ratio = h.EDGES[1] / h.EDGES[0]
+        assert 0.005 <= h.quantile(0.5) <= 0.005 * ratio
+
+    def test_quantile_never_exceeds_maximum(self):
+        h = LatencyHistogram()
+        h.add(0.0051)
+        assert h.quantile(1.) == 0.0051
+
+    def test_tail_quantile(self):
+        h = LatencyHistogram()
+        for _ in range(98):
+            h.add(0.002)
+        h.add(0.05)
+        h.add(0.5)
+        assert h.quantile(0.5) < 0.003
+        assert 0.05 <= h.quantile(0.99) < 0.06
+        assert h.quantile(1.) == 0.5
+
+    def test_out_of_range_latencies(self):
+        h = LatencyHistogram()
+        h.add(1e-6)
+        h.add(1e3)
+        assert h.counts[0] == 1
+        assert h.counts[-1] == 1
+        assert h.quantile(1.) == 1e3
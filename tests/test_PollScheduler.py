@@ -0,0 +1,135 @@
+import pytest
+from lib.PollScheduler import PollScheduler
+
+
+class Clock:
+    '''Manually advanced millisecond clock.'''
+
+    def __init__(self):
+        self.now = 0.
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def run_cycle(scheduler, clock, cost=1.):
+    '''Poll everything due, each taking *cost* ms; return (names, delay).'''
+    start = now = clock()
+    names = []
+    for name in scheduler.due(start):
+        clock.now += cost
+        scheduler.polled(name, now, clock.now)
+        names.append(name)
+        now = clock.now
+        if now >= start + scheduler.slice:
+            break
+    delay = scheduler.delay(start, now)
+    clock.now += delay
+    return names, delay
+
+
+# ---------------------------------------------------------------------------
+# Scheduling
+# ---------------------------------------------------------------------------
+
+class TestSchedule:
+
+    def test_new_entries_due_immediately(self, clock):
+        s = PollScheduler(clock=clock)
+        s.add('a', 100)
+        s.add('b')
+        assert s.due() == ['a', 'b']
+
+    def test_priority_orders_due_entries(self, clock):
+        s = PollScheduler(clock=clock)
+        s.add('slow', 1000)
+        s.add('fast', 100, priority=1)
+        assert s.due() == ['fast', 'slow']
+
+    def test_unscheduled_entries_wait_interval_after_cycle(self, clock):
+        s = PollScheduler(interval=50, clock=clock)
+        s.add('a')
+        s.add('b')
+        names, delay = run_cycle(s, clock, cost=5.)
+        assert names == ['a', 'b']
+        assert delay == 50
+
+    def test_empty_scheduler_waits_interval(self, clock):
+        assert PollScheduler(interval=30, clock=clock).delay(0., 0.) == 30
+
+    def test_fast_and_slow_interleave(self, clock):
+        s = PollScheduler(clock=clock)
+        s.add('fast', 100)
+        s.add('slow', 1000)
+        counts = {'fast': 0, 'slow': 0}
+        while clock() < 2000.:
+            for name in run_cycle(s, clock)[0]:
+                counts[name] += 1
+        assert counts['fast'] == pytest.approx(20, abs=1)
+        assert counts['slow'] == pytest.approx(2, abs=1)
+
+    def test_slice_defers_remaining_entries(self, clock):
+        s = PollScheduler(clock=clock)
+        s.add('fast', 10)
+        for n in range(5):
+            s.add(f'slow{n}', 1000)
+        names, _ = run_cycle(s, clock, cost=4.)
+        assert len(names) < 6
+
+    def test_remove_stops_polling(self, clock):
+        s = PollScheduler(clock=clock)
+        s.add('a', 100)
+        s.remove('a')
+        s.remove('missing')
+        assert s.due() == []
+
+
+# ---------------------------------------------------------------------------
+# Duty-cycle budget
+# ---------------------------------------------------------------------------
+
+class TestBudget:
+
+    def test_budget_stretches_delay(self, clock):
+        s = PollScheduler(budget=0.25, clock=clock)
+        s.add('a')
+        _, delay = run_cycle(s, clock, cost=10.)
+        assert delay == 30
+
+    def test_duty_tracks_busy_fraction(self, clock):
+        s = PollScheduler(budget=0.5, clock=clock)
+        s.add('a')
+        for _ in range(100):
+            run_cycle(s, clock, cost=10.)
+        assert s.duty == pytest.approx(0.5, abs=0.01)
+
+
+# ---------------------------------------------------------------------------
+# Statistics
+# ---------------------------------------------------------------------------
+
+class TestStats:
+
+    def test_rate_matches_period(self, clock):
+        s = PollScheduler(clock=clock)
+        s.add('a', 100)
+        for _ in range(50):
+            run_cycle(s, clock)
+        stats = s.stats()['a']
+        assert stats['period_ms'] == 100
+        assert stats['rate'] == pytest.approx(10., rel=0.01)
+        assert stats['jitter_ms'] == pytest.approx(0., abs=0.5)
+        assert stats['count'] == 50
+
+    def test_jitter_reflects_irregular_intervals(self, clock):
+        s = PollScheduler(clock=clock)
+        s.add('a')
+        for n in range(50):
+            s.polled('a', clock(), clock())
+            clock.now += 90. if n % 2 else 110.
+        assert s.stats()['a']['jitter_ms'] > 5.
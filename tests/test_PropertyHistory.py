@@ -0,0 +1,145 @@
+import numpy as np
+import pytest
+from lib.PropertyHistory import PropertyHistory
+
+
+class Clock:
+    '''Manually advanced clock in seconds.'''
+
+    def __init__(self):
+        self.now = 0.
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def fill(history, clock, name, values, dt=1.):
+    for value in values:
+        history.append(name, value)
+        clock.now += dt
+
+
+# ---------------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------------
+
+class TestAppend:
+
+    def test_records_in_order(self, clock):
+        h = PropertyHistory(depth=8, clock=clock)
+        fill(h, clock, 'a', [1., 2., 3.])
+        t, v = h.history('a')
+        assert list(t) == [0., 1., 2.]
+        assert list(v) == [1., 2., 3.]
+
+    def test_keeps_newest_depth_samples(self, clock):
+        h = PropertyHistory(depth=4, clock=clock)
+        fill(h, clock, 'a', range(10))
+        t, v = h.history('a')
+        assert list(v) == [6., 7., 8., 9.]
+        assert list(t) == [6., 7., 8., 9.]
+
+    def test_sequence_values_become_rows(self, clock):
+        h = PropertyHistory(depth=4, clock=clock)
+        fill(h, clock, 'xyz', [[1, 2, 3], [4, 5, 6]])
+        _, v = h.history('xyz')
+        assert v.shape == (2, 3)
+        assert list(v[-1]) == [4., 5., 6.]
+
+    def test_non_numeric_values_ignored(self, clock):
+        h = PropertyHistory(clock=clock)
+        assert h.append('label', 'text') is False
+        assert h.append('label', 1.) is False
+        assert h.names == []
+
+    def test_shape_change_ignored(self, clock):
+        h = PropertyHistory(clock=clock)
+        assert h.append('xy', [1, 2]) is True
+        assert h.append('xy', [1, 2, 3]) is False
+
+    def test_unknown_name_is_empty(self):
+        t, v = PropertyHistory().history('missing')
+        assert len(t) == len(v) == 0
+
+    def test_depth_must_be_positive(self):
+        with pytest.raises(ValueError):
+            PropertyHistory(depth=0)
+
+    def test_clear(self, clock):
+        h = PropertyHistory(clock=clock)
+        fill(h, clock, 'a', [1.])
+        fill(h, clock, 'b', [1.])
+        h.clear('a')
+        assert h.names == ['b']
+        h.clear()
+        assert h.names == []
+
+
+# ---------------------------------------------------------------------------
+# Views
+# ---------------------------------------------------------------------------
+
+class TestHistory:
+
+    def test_views_share_buffer_after_wrap(self, clock):
+        h = PropertyHistory(depth=4, clock=clock)
+        fill(h, clock, 'a', range(7))
+        t, v = h.history('a')
+        ring = h._rings['a']
+        assert np.shares_memory(v, ring.v)
+        assert np.shares_memory(t, ring.t)
+
+    def test_views_are_read_only(self, clock):
+        h = PropertyHistory(clock=clock)
+        fill(h, clock, 'a', [1.])
+        _, v = h.history('a')
+        with pytest.raises(ValueError):
+            v[0] = 2.
+
+    def test_seconds_limits_window(self, clock):
+        h = PropertyHistory(clock=clock)
+        fill(h, clock, 'a', range(10))
+        t, v = h.history('a', seconds=3)
+        assert list(v) == [6., 7., 8., 9.]
+
+
+# ---------------------------------------------------------------------------
+# Decimation
+# ---------------------------------------------------------------------------
+
+class TestDecimate:
+
+    def test_short_history_returned_unchanged(self, clock):
+        h = PropertyHistory(clock=clock)
+        fill(h, clock, 'a', [1., 2.])
+        t, vmin, vmax = h.decimate('a', 10)
+        assert list(vmin) == list(vmax) == [1., 2.]
+
+    def test_min_max_per_run(self, clock):
+        h = PropertyHistory(clock=clock)
+        fill(h, clock, 'a', [0., 5., 1., 2., -3., 4., 0., 0.])
+        t, vmin, vmax = h.decimate('a', 4)
+        assert list(t) == [0., 2., 4., 6.]
+        assert list(vmin) == [0., 1., -3., 0.]
+        assert list(vmax) == [5., 2., 4., 0.]
+
+    def test_spike_preserved(self, clock):
+        h = PropertyHistory(depth=10000, clock=clock)
+        values = np.zeros(10000)
+        values[4321] = 100.
+        fill(h, clock, 'a', values, dt=0.001)
+        _, _, vmax = h.decimate('a', 50)
+        assert len(vmax) == 50
+        assert vmax.max() == 100.
+
+    def test_sequence_values_reduced_per_column(self, clock):
+        h = PropertyHistory(clock=clock)
+        fill(h, clock, 'xy', [[0, 9], [1, 8], [2, 7], [3, 6]])
+        _, vmin, vmax = h.decimate('xy', 2)
+        assert vmin.tolist() == [[0., 8.], [2., 6.]]
+        assert vmax.tolist() == [[1., 9.], [3., 7.]]
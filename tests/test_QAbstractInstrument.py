@@ -1,6 +1,8 @@
 import logging
 import pytest
+from types import MappingProxyType
 from lib.QAbstractInstrument import QAbstractInstrument
+from QInstrument.lib.PropertySpec import PropertySpec
 
 
 class SimpleInstrument(QAbstractInstrument):
@@ -160,6 +162,80 @@ class TestSettings:
         inst.registerProperty('a', getter=lambda: 1.0, setter=lambda v: None)
         inst.settings = {'a': 1.0, 'bogus': 99.0}  # must not raise
 
+    def test_read_settings_emits_settings(self, qtbot, inst):
+        inst.registerProperty('a', getter=lambda: 1.0, setter=lambda v: None)
+        inst.registerProperty('ro', getter=lambda: 2.0, setter=None)
+        with qtbot.waitSignal(inst.settingsRead, timeout=500) as blocker:
+            inst.readSettings()
+        assert blocker.args == [{'a': 1.0}]
+
+
+# ---------------------------------------------------------------------------
+# applySettings
+# ---------------------------------------------------------------------------
+
+class TestApplySettings:
+
+    @pytest.fixture
+    def store(self, inst):
+        store = {'a': 0.0, 'b': 0.0, 'c': 0.0}
+        writes = []
+
+        def setter(name):
+            def _set(v):
+                writes.append(name)
+                store[name] = v
+            return _set
+
+        inst.registerProperty('a', getter=lambda: store['a'],
+                               setter=setter('a'))
+        inst.registerProperty('b', getter=lambda: store['b'],
+                               setter=setter('b'), after=('c',))
+        inst.registerProperty('c', getter=lambda: store['c'],
+                               setter=setter('c'))
+        inst.registerProperty('ro', getter=lambda: 1.0, setter=None)
+        store['writes'] = writes
+        return store
+
+    def test_writes_only_differing_keys(self, inst, store):
+        written = inst.applySettings({'a': 0.0, 'b': 2.0, 'c': 0.0})
+        assert written == {'b': 2.0}
+        assert store['writes'] == ['b']
+
+    def test_float_tolerance_counts_as_equal(self, inst, store):
+        assert inst.applySettings({'a': 1e-12}) == {}
+
+    def test_uses_supplied_current(self, inst, store):
+        written = inst.applySettings({'a': 1.0}, current={'a': 1.0})
+        assert written == {}
+
+    def test_skips_readonly_unknown_and_missing(self, inst, store):
+        written = inst.applySettings({'ro': 5.0, 'bogus': 1.0, 'a': 1.0},
+                                     current={'ro': 1.0})
+        assert written == {}
+
+    def test_follows_after_metadata(self, inst, store):
+        inst.applySettings({'b': 2.0, 'a': 1.0, 'c': 3.0})
+        assert store['writes'] == ['c', 'b', 'a']
+
+    def test_emits_property_value_for_writes(self, inst, store):
+        received = []
+        inst.propertyValue.connect(lambda n, v: received.append((n, v)))
+        inst.applySettings({'a': 1.0, 'c': 0.0})
+        assert received == [('a', 1.0)]
+
+    def test_cycle_is_broken(self, inst, store, caplog):
+        inst.registerProperty('a', getter=lambda: store['a'],
+                               setter=lambda v: store.__setitem__('a', v),
+                               after=('b',))
+        inst.registerProperty('b', getter=lambda: store['b'],
+                               setter=lambda v: store.__setitem__('b', v),
+                               after=('a',))
+        with caplog.at_level(logging.WARNING):
+            written = inst.applySettings({'a': 1.0, 'b': 2.0})
+        assert set(written) == {'a', 'b'}
+        assert 'Circular' in caplog.text
+
 # ---------------------------------------------------------------------------
 # registerMethod / execute
 # ---------------------------------------------------------------------------
@@ -211,3 +287,104 @@ class TestPropertyMeta:
         assert inst.propertyMeta('power')['debounce'] == 500
 
 
+
+
+# ---------------------------------------------------------------------------
+# PROPERTIES — declarative class-level specs
+# ---------------------------------------------------------------------------
+
+class DeclaredInstrument(QAbstractInstrument):
+
+    PROPERTIES = (
+        PropertySpec('gain', ptype=int, minimum=0, maximum=10),
+        PropertySpec('serial', getter=lambda inst: 'SN42', setter=None,
+                     ptype=str),
+    )
+
+    def __init__(self, **kwargs) -> None:
+        self._gain = 1
+        super().__init__(**kwargs)
+
+
+class ExtendedInstrument(DeclaredInstrument):
+
+    PROPERTIES = (
+        PropertySpec('gain', ptype=int, minimum=0, maximum=20),
+        PropertySpec('offset'),
+    )
+
+    def __init__(self, **kwargs) -> None:
+        self._offset = 0.
+        super().__init__(**kwargs)
+
+
+class MixedInstrument(DeclaredInstrument):
+    def _registerProperties(self) -> None:
+        self.registerProperty('pi', getter=lambda: 3.14, setter=None)
+
+    def _registerMethods(self) -> None:
+        self.registerMethod('reset', lambda: None)
+
+
+class TestDeclaredProperties:
+
+    def test_declared_properties_registered(self, qtbot):
+        inst = DeclaredInstrument()
+        assert set(inst.properties) == {'gain', 'serial'}
+
+    def test_auto_accessors_use_backing_attribute(self, qtbot):
+        inst = DeclaredInstrument()
+        inst.set('gain', 7.9)
+        assert inst._gain == 7
+        assert inst.get('gain') == 7
+
+    def test_explicit_getter_receives_instrument(self, qtbot):
+        assert DeclaredInstrument().get('serial') == 'SN42'
+
+    def test_readonly_spec(self, qtbot):
+        inst = DeclaredInstrument()
+        assert inst.propertyMeta('serial')['readonly'] is True
+        assert 'serial' not in inst.settings
+
+    def test_specs_compiled_once_and_shared(self, qtbot):
+        a, b = DeclaredInstrument(), DeclaredInstrument()
+        assert isinstance(DeclaredInstrument._specs, MappingProxyType)
+        assert a._properties is DeclaredInstrument._specs
+        assert b._properties is a._properties
+
+    def test_subclass_merges_and_overrides_base_specs(self, qtbot):
+        inst = ExtendedInstrument()
+        assert set(inst.properties) == {'gain', 'serial', 'offset'}
+        assert inst.propertyMeta('gain')['maximum'] == 20
+        assert DeclaredInstrument().propertyMeta('gain')['maximum'] == 10
+
+    def test_registry_is_read_only(self, qtbot):
+        inst = DeclaredInstrument()
+        with pytest.raises(TypeError):
+            inst._properties['extra'] = None
+
+    def test_register_property_does_not_touch_class_specs(self, qtbot):
+        inst = DeclaredInstrument()
+        inst.registerProperty('pi', getter=lambda: 3.14, setter=None)
+        assert inst.get('pi') == 3.14
+        assert 'pi' not in DeclaredInstrument._specs
+        assert 'pi' not in DeclaredInstrument().properties
+
+    def test_register_property_leaves_old_snapshot_intact(self, qtbot):
+        inst = DeclaredInstrument()
+        snapshot = inst._properties
+        inst.registerProperty('pi', getter=lambda: 3.14, setter=None)
+        assert 'pi' not in snapshot
+
+    def test_registrations_in_constructor_are_frozen(self, qtbot):
+        inst = MixedInstrument()
+        assert set(inst.properties) == {'gain', 'serial', 'pi'}
+        assert 'pi' not in DeclaredInstrument._specs
+        with pytest.raises(TypeError):
+            inst._properties['extra'] = None
+        with pytest.raises(TypeError):
+            inst._methods['extra'] = None
+
+    def test_bound_spec_requires_explicit_accessors(self):
+        with pytest.raises(ValueError):
+            PropertySpec('x', bound=True)
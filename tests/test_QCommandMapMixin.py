@@ -0,0 +1,163 @@
+import pytest
+from unittest.mock import patch
+from lib.QCommandMapMixin import Command, QCommandMapMixin
+from lib.QSerialInstrument import QSerialInstrument
+from lib.QFakeInstrument import QFakeInstrument
+
+
+class Meter(QCommandMapMixin, QSerialInstrument):
+    '''Minimal command-map instrument for testing.'''
+
+    COMMANDS = (
+        Command('frequency', 'FREQ', float, 0.001, 1e5),
+        Command('harmonic',  'HARM', int,   1, 10),
+        Command('coupling',  'ICPL', bool),
+    )
+
+
+class FakeMeter(QFakeInstrument, Meter):
+    pass
+
+
+class Responder:
+    '''Stand-in serial line that answers each query from a table.'''
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.sent = []
+        self.pending = []
+
+    def transmit(self, data):
+        self.sent.append(data)
+        for query in data.split(';'):
+            if query.endswith('?'):
+                self.pending.append(self.answers[query[:-1]])
+
+    def receive(self, **kwargs):
+        return self.pending.pop(0) + '\n'
+
+
+@pytest.fixture
+def meter(qtbot):
+    inst = Meter()
+    line = Responder({'FREQ': '1000.5', 'HARM': '3', 'ICPL': '1'})
+    with patch.object(inst, 'transmit', line.transmit), \
+         patch.object(inst, 'receive', line.receive):
+        yield inst, line
+
+
+# ---------------------------------------------------------------------------
+# Command
+# ---------------------------------------------------------------------------
+
+class TestCommand:
+
+    def test_query_appends_question_mark(self):
+        assert Command('frequency', 'FREQ').query == 'FREQ?'
+
+    def test_encode_bool_as_int(self):
+        assert Command('coupling', 'ICPL', bool).encode(True) == 'ICPL1'
+
+    def test_encode_float(self):
+        assert Command('frequency', 'FREQ').encode(2.5) == 'FREQ2.5'
+
+    def test_decode_bool_from_int(self):
+        assert Command('coupling', 'ICPL', bool).decode('0') is False
+
+    def test_decode_failure_returns_none(self):
+        assert Command('harmonic', 'HARM', int).decode('junk') is None
+
+    def test_validate_coerces_to_ptype(self):
+        assert Command('harmonic', 'HARM', int, 1, 10).validate(2.7) == 2
+
+    def test_validate_rejects_out_of_range(self):
+        with pytest.raises(ValueError):
+            Command('harmonic', 'HARM', int, 1, 10).validate(11)
+
+    def test_range_stored_as_metadata(self):
+        meta = Command('harmonic', 'HARM', int, 1, 10).spec.meta
+        assert (meta['minimum'], meta['maximum']) == (1, 10)
+
+    def test_default_raised_to_minimum(self):
+        assert Command('harmonic', 'HARM', int, 1, 10).default == 1
+
+
+# ---------------------------------------------------------------------------
+# Declared properties
+# ---------------------------------------------------------------------------
+
+class TestCommandProperties:
+
+    def test_commands_become_properties(self, meter):
+        inst, _ = meter
+        assert set(inst.properties) == {'frequency', 'harmonic', 'coupling'}
+        assert inst.commands == ['frequency', 'harmonic', 'coupling']
+
+    def test_get_sends_query(self, meter):
+        inst, line = meter
+        assert inst.get('harmonic') == 3
+        assert line.sent == ['HARM?']
+
+    def test_set_sends_command(self, meter):
+        inst, line = meter
+        inst.set('coupling', False)
+        assert line.sent == ['ICPL0']
+
+    def test_out_of_range_set_is_not_sent(self, meter, qtbot):
+        inst, line = meter
+        with qtbot.assertNotEmitted(inst.propertyValue):
+            inst.set('harmonic', 20)
+        assert line.sent == []
+
+
+# ---------------------------------------------------------------------------
+# Batched reads
+# ---------------------------------------------------------------------------
+
+class TestBatchedReads:
+
+    def test_settings_uses_one_multi_query(self, meter):
+        inst, line = meter
+        assert inst.settings == {'frequency': 1000.5,
+                                 'harmonic': 3,
+                                 'coupling': True}
+        assert line.sent == ['FREQ?;HARM?;ICPL?']
+
+    def test_read_commands_subset(self, meter):
+        inst, line = meter
+        assert inst.readCommands(['coupling', 'unknown']) == \
+            {'coupling': True}
+        assert line.sent == ['ICPL?']
+
+    def test_batches_respect_max_query_length(self, meter):
+        inst, line = meter
+        inst.MAX_QUERY_LENGTH = 11
+        inst.readCommands()
+        assert line.sent == ['FREQ?;HARM?', 'ICPL?']
+
+    def test_reregistered_property_read_through_own_getter(self, meter):
+        inst, line = meter
+        inst.registerProperty('harmonic', getter=lambda: 7,
+                              setter=lambda v: None, ptype=int)
+        assert inst.settings['harmonic'] == 7
+        assert line.sent == ['FREQ?;ICPL?']
+
+
+# ---------------------------------------------------------------------------
+# Fake
+# ---------------------------------------------------------------------------
+
+class TestFakeCommands:
+
+    def test_fake_stores_values(self, qtbot):
+        fake = FakeMeter()
+        fake.set('frequency', 50.)
+        assert fake.get('frequency') == pytest.approx(50.)
+
+    def test_fake_defaults_respect_minimum(self, qtbot):
+        assert FakeMeter().get('harmonic') == 1
+
+    def test_fake_rejects_out_of_range(self, qtbot):
+        fake = FakeMeter()
+        fake.set('harmonic', 0)
+        assert fake.get('harmonic') == 1
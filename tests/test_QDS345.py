@@ -1,9 +1,13 @@
+import numpy as np
 import pytest
 from instruments.StanfordResearch.DS345.fake import QFakeDS345
-from instruments.StanfordResearch.DS345.instrument import QDS345
+from instruments.StanfordResearch.DS345.instrument import QDS345, waveforms
 from instrument_contract import InstrumentContractTests
 
 
+Waveform = waveforms.Waveform
+
+
 # ---------------------------------------------------------------------------
 # Contract
 # ---------------------------------------------------------------------------
@@ -77,3 +81,203 @@ class TestMute:
         assert ds345.get('mute') is True
         ds345.set('mute', False)
         assert ds345.get('mute') is False
+
+
+# ---------------------------------------------------------------------------
+# Waveform upload — checksum, cache, chunks, cancellation
+# ---------------------------------------------------------------------------
+
+class Link:
+    '''Records transmitted data; acknowledges upload requests.'''
+
+    def __init__(self, ds345):
+        self.sent = []
+        ds345.transmit = self.transmit
+        ds345.receive = lambda **kwargs: '1'
+
+    def transmit(self, data):
+        self.sent.append(data if isinstance(data, str) else bytes(data))
+
+    def payload(self):
+        return b''.join(d for d in self.sent if isinstance(d, bytes))
+
+
+class TestUpload:
+
+    @pytest.fixture
+    def ds345(self, qtbot):
+        ds345 = QFakeDS345()
+        ds345.UPLOAD_CHUNK = 64
+        return ds345
+
+    def test_payload_matches_legacy_format(self, ds345):
+        link = Link(ds345)
+        waveform = np.linspace(-3000., 3000., 100)
+        assert ds345.load_waveform(waveform)
+        data = np.clip(np.round(waveform), -2048, 2047).astype('>i2')
+        checksum = (np.sum(data) & 0xFFFF).astype('>i2')
+        assert link.payload() == np.append(data, checksum).tobytes()
+        assert link.sent[0] == 'LDWF?0,100'
+
+    def test_repeated_waveform_is_not_resent(self, ds345):
+        link = Link(ds345)
+        assert ds345.load_waveform(np.arange(100))
+        count = len(link.sent)
+        assert ds345.load_waveform(np.arange(100))
+        assert len(link.sent) == count
+        assert ds345.load_waveform(np.arange(100), force=True)
+        assert len(link.sent) > count
+
+    def test_changed_waveform_is_sent(self, ds345):
+        link = Link(ds345)
+        ds345.load_waveform(np.arange(100))
+        count = len(link.sent)
+        ds345.load_waveform(np.arange(1, 101))
+        assert len(link.sent) > count
+
+    def test_reset_clears_cache(self, ds345):
+        link = Link(ds345)
+        ds345.load_waveform(np.arange(100))
+        ds345.reset()
+        count = len(link.sent)
+        ds345.load_waveform(np.arange(100))
+        assert len(link.sent) > count
+
+    def test_slots_are_independent(self, ds345):
+        link = Link(ds345)
+        ds345.load_waveform(np.zeros(10))
+        count = len(link.sent)
+        assert ds345.amplitude_modulation(np.zeros(10))
+        assert 'AMOD?10' in link.sent[count:]
+        count = len(link.sent)
+        assert ds345.amplitude_modulation(np.zeros(10))
+        assert link.sent[count:] == ['MENA0', 'MTYP2', 'MDWF5', 'MENA1']
+
+    def test_progress_reported_per_chunk(self, qtbot, ds345):
+        Link(ds345)
+        progress = []
+        ds345.uploadProgress.connect(lambda n, total: progress.append(n))
+        ds345.load_waveform(np.arange(100))
+        assert progress == [64, 128, 192, 202]
+
+    def test_cancel_completes_with_bad_checksum(self, qtbot, ds345):
+        link = Link(ds345)
+        waveform = np.arange(100)
+        ds345.uploadProgress.connect(lambda n, total: ds345.cancelUpload())
+        assert not ds345.load_waveform(waveform)
+        payload = np.frombuffer(link.payload(), dtype='<i2')
+        assert len(payload) == 101
+        assert np.array_equal(payload[:32], waveform[:32])
+        assert not payload[32:-1].any()
+        checksum = int(payload[:-1].sum()) & 0xFFFF
+        assert int(payload[-1]) & 0xFFFF != checksum
+        count = len(link.sent)
+        ds345.uploadProgress.disconnect()
+        assert ds345.load_waveform(waveform)
+        assert len(link.sent) > count
+
+    def test_too_many_points_rejected(self, ds345):
+        link = Link(ds345)
+        assert not ds345.load_waveform(np.zeros(ds345.ARB_POINTS + 1))
+        assert not ds345.amplitude_modulation(np.zeros(ds345.AM_POINTS + 1))
+        assert link.sent == []
+
+    def test_waveform_object_sent_without_copy(self, ds345):
+        link = Link(ds345)
+        waveform = Waveform(waveforms.chirp(100, 1e3, 10., 100.))
+        assert ds345.load_waveform(waveform)
+        assert link.payload() == waveform.buffer.tobytes()
+        assert ds345.load_waveform(waveform)
+        assert link.sent.count('LDWF?0,100') == 1
+
+    def test_waveform_for_wrong_slot_raises(self, ds345):
+        Link(ds345)
+        with pytest.raises(ValueError):
+            ds345.amplitude_modulation(Waveform(np.zeros(10)))
+
+
+# ---------------------------------------------------------------------------
+# Waveform synthesis
+# ---------------------------------------------------------------------------
+
+class TestWaveform:
+
+    def test_quantizes_to_slot_range(self):
+        w = Waveform([-2., -1., 0., 0.5, 1., 2.])
+        assert w.samples.tolist() == [-2048, -2047, 0, 1024, 2047, 2047]
+        m = Waveform([-1., 1.], 'modulation')
+        assert m.samples.tolist() == [-32767, 32767]
+        assert m.buffer.dtype.str == '>i2'
+
+    def test_checksum_is_low_16_bits_of_sum(self):
+        w = Waveform(np.full(100, 2047), scale=1.)
+        assert w.checksum & 0xFFFF == (100 * 2047) & 0xFFFF
+
+    def test_buffer_is_read_only(self):
+        w = Waveform(np.zeros(4))
+        with pytest.raises(ValueError):
+            w.buffer[0] = 1
+
+    def test_digest_identifies_content(self):
+        a = Waveform(np.linspace(-1, 1, 50))
+        assert a.digest == Waveform(np.linspace(-1, 1, 50)).digest
+        assert a.digest != Waveform(np.linspace(1, -1, 50)).digest
+
+    @pytest.mark.parametrize('slot, limit', [('waveform', 16300),
+                                             ('modulation', 10000)])
+    def test_point_limits(self, slot, limit):
+        Waveform(np.zeros(limit), slot)
+        with pytest.raises(ValueError):
+            Waveform(np.zeros(limit + 1), slot)
+        with pytest.raises(ValueError):
+            Waveform([], slot)
+
+    def test_unknown_slot_raises(self):
+        with pytest.raises(ValueError):
+            Waveform(np.zeros(4), 'sweep')
+
+
+class TestGenerators:
+
+    def test_linear_chirp_frequency_rises(self):
+        y = waveforms.chirp(10000, 1e4, 10., 1000.)
+        crossings = np.flatnonzero(np.diff(np.signbit(y)))
+        gaps = np.diff(crossings)
+        assert gaps[0] > 5 * gaps[-1]
+        assert np.abs(y).max() <= 1.
+
+    def test_log_chirp_ends_at_stop_frequency(self):
+        rate, npts = 1e5, 10000
+        y = waveforms.chirp(npts, rate, 100., 1000., spacing='log')
+        tail = y[-300:]
+        crossings = np.flatnonzero(np.diff(np.signbit(tail)))
+        frequency = rate / (2 * np.diff(crossings).mean())
+        assert frequency == pytest.approx(1000., rel=0.1)
+
+    def test_multitone_peak_is_one(self):
+        y = waveforms.multitone(1000, 1e3, [10., 30.], [1., 0.5])
+        assert np.abs(y).max() == pytest.approx(1.)
+        spectrum = np.abs(np.fft.rfft(y))
+        assert set(np.argsort(spectrum)[-2:]) == {10, 30}
+
+    def test_pulse_train_duty_cycle(self):
+        y = waveforms.pulse_train(1000, 1e3, period=0.1, width=0.025)
+        assert np.mean(y == 1.) == pytest.approx(0.25, abs=0.01)
+        assert set(np.unique(y)) == {-1., 1.}
+
+    @pytest.mark.parametrize('shape', ['sine', 'square', 'triangle', 'ramp'])
+    def test_am_envelope_spans_depth(self, shape):
+        y = waveforms.am_envelope(1000, 1e3, 5., depth=0.5, shape=shape)
+        assert y.max() == pytest.approx(1., abs=0.01)
+        assert y.min() == pytest.approx(0., abs=0.01)
+
+    def test_sweep(self):
+        assert waveforms.sweep(3).tolist() == [-1., 0., 1.]
+        assert waveforms.sweep(3, 1., 100., 'log').tolist() == \
+            pytest.approx([1., 10., 100.])
+
+    def test_generators_validate_points(self):
+        with pytest.raises(ValueError):
+            waveforms.chirp(0, 1e3, 1., 2.)
+        with pytest.raises(ValueError):
+            waveforms.sweep(waveforms.ARB_POINTS + 1)
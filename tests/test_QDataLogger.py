@@ -0,0 +1,146 @@
+import pytest
+from lib.QDataLogger import QDataLogger, read_log
+from lib.QFakeInstrument import QFakeInstrument
+from lib.QPollingMixin import QPollingMixin
+
+
+class LoggedDevice(QPollingMixin, QFakeInstrument):
+    '''Fake device with a scalar, a vector and a string property.'''
+
+    def _registerProperties(self):
+        self._level = 0.
+        self.registerProperty(
+            'level', getter=lambda: self._level,
+            setter=lambda v: setattr(self, '_level', float(v)))
+        self.registerProperty('xyz', getter=lambda: [1, 2, 3], setter=None,
+                              ptype=list)
+        self.registerProperty('name', getter=lambda: 'dev', setter=None,
+                              ptype=str)
+
+
+@pytest.fixture
+def device(qtbot):
+    return LoggedDevice()
+
+
+@pytest.fixture(params=['npz', 'csv'])
+def logger(request, qtbot, tmp_path):
+    log = QDataLogger(tmp_path / 'log', format=request.param,
+                      chunk_size=4, flush_interval=60000)
+    yield log
+    log.close()
+
+
+# ---------------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------------
+
+class TestRecord:
+
+    def test_property_values_logged(self, logger, device):
+        logger.addInstrument(device, label='dev')
+        logger.start()
+        for value in (1., 2., 3.):
+            device.set('level', value)
+        logger.stop()
+        t, v = read_log(logger.path)['dev.level']
+        assert list(v) == [1., 2., 3.]
+        assert all(t[1:] >= t[:-1])
+
+    def test_sequence_values_split_into_channels(self, logger, device):
+        logger.addInstrument(device, label='dev')
+        logger.start()
+        device.get('xyz')
+        logger.stop()
+        log = read_log(logger.path)
+        assert [log[f'dev.xyz[{i}]'][1][0] for i in range(3)] == [1, 2, 3]
+
+    def test_non_numeric_values_skipped(self, logger, device):
+        logger.addInstrument(device, label='dev')
+        logger.start()
+        device.get('name')
+        logger.stop()
+        assert 'dev.name' not in logger.channels
+
+    def test_names_filter(self, logger, device):
+        logger.addInstrument(device, ['xyz'], label='dev')
+        logger.start()
+        device.set('level', 1.)
+        logger.stop()
+        assert logger.channels == []
+
+    def test_settings_read_logged(self, logger, device):
+        logger.addInstrument(device, label='dev')
+        logger.start()
+        device.settingsRead.emit({'level': 4.})
+        logger.stop()
+        assert list(read_log(logger.path)['dev.level'][1]) == [4.]
+
+    def test_nothing_recorded_while_stopped(self, logger, device):
+        logger.addInstrument(device, label='dev')
+        device.set('level', 1.)
+        assert logger.channels == []
+
+    def test_remove_instrument(self, logger, device):
+        logger.addInstrument(device, label='dev')
+        logger.removeInstrument(device)
+        logger.start()
+        device.set('level', 1.)
+        logger.stop()
+        assert logger.channels == []
+
+
+# ---------------------------------------------------------------------------
+# Chunking and flushing
+# ---------------------------------------------------------------------------
+
+class TestFlush:
+
+    def test_full_chunk_written_in_background(self, logger, qtbot):
+        logger.start()
+        with qtbot.waitSignal(logger.written) as blocker:
+            for n in range(4):
+                logger.record('a', n)
+        assert blocker.args == [4]
+
+    def test_partial_chunk_written_on_interval(self, qtbot, tmp_path):
+        log = QDataLogger(tmp_path / 'log', format='csv', flush_interval=10)
+        log.start()
+        with qtbot.waitSignal(log.written) as blocker:
+            log.record('a', 1.)
+        assert blocker.args == [1]
+        log.close()
+
+    def test_many_chunks_round_trip(self, logger):
+        logger.start()
+        for n in range(50):
+            logger.record('a', n, t=float(n))
+        logger.stop()
+        t, v = read_log(logger.path)['a']
+        assert list(v) == list(range(50))
+
+
+# ---------------------------------------------------------------------------
+# Subscriptions and formats
+# ---------------------------------------------------------------------------
+
+class TestSetup:
+
+    def test_subscribes_logged_properties(self, logger, device):
+        logger.addInstrument(device, ['level'])
+        assert device.subscriptions == {'level': 1}
+        logger.removeInstrument(device)
+        assert device.subscriptions == {}
+
+    def test_unknown_format_rejected(self, tmp_path):
+        with pytest.raises(ValueError):
+            QDataLogger(tmp_path / 'log', format='xls')
+
+    def test_hdf5_round_trip(self, qtbot, tmp_path):
+        pytest.importorskip('h5py')
+        log = QDataLogger(tmp_path / 'log', format='hdf5', chunk_size=4)
+        log.start()
+        for n in range(10):
+            log.record('a', n)
+        log.stop()
+        assert list(read_log(log.path)['a'][1]) == list(range(10))
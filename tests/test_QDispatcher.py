@@ -0,0 +1,68 @@
+import time
+import pytest
+from qtpy import QtCore
+from lib.QDispatcher import QDispatcher, field, readValues
+from lib.QFakeInstrument import QFakeInstrument
+
+
+class Device(QFakeInstrument):
+    '''Fake device with one property and one query method.'''
+
+    def _registerProperties(self):
+        self.registerProperty('level', getter=lambda: 1.5, setter=None)
+
+    def report(self):
+        return [1., 2.]
+
+
+@pytest.fixture
+def worker(qtbot):
+    device = Device()
+    thread = QtCore.QThread()
+    device.moveToThread(thread)
+    thread.start()
+    yield device
+    thread.quit()
+    thread.wait()
+
+
+class TestDispatch:
+
+    def test_runs_on_instrument_thread(self, worker):
+        dispatcher = QDispatcher()
+        dispatcher.setInstrument('dev', worker)
+        results = dispatcher.dispatch(
+            {'dev': QtCore.QThread.currentThread}, 1000)
+        t0, t1, thread = results['dev']
+        assert thread is worker.thread()
+        assert t0 <= t1
+
+    def test_timeout_leaves_label_out(self, worker):
+        dispatcher = QDispatcher()
+        dispatcher.setInstrument('dev', worker)
+        results = dispatcher.dispatch({'dev': lambda: time.sleep(0.2)}, 20)
+        assert results == {}
+        time.sleep(0.25)
+        assert dispatcher.dispatch({'dev': lambda: 1}, 1000)['dev'][2] == 1
+
+    def test_exception_returns_none(self, qtbot):
+        dispatcher = QDispatcher()
+        dispatcher.setInstrument('dev', Device())
+        results = dispatcher.dispatch({'dev': lambda: 1 / 0}, 1000)
+        assert results['dev'][2] is None
+
+
+class TestHelpers:
+
+    def test_read_values(self, qtbot):
+        device = Device()
+        received = []
+        device.propertyValue.connect(lambda n, v: received.append(n))
+        values = readValues(device, ['level', 'report'])
+        assert values == {'level': 1.5, 'report': [1., 2.]}
+        assert received == ['level']
+
+    def test_field(self):
+        assert field('x', 1.) == ('x', 'f8', ())
+        assert field('xy', [1., 2.]) == ('xy', 'f8', (2,))
+        assert field('id', 'SR830') == ('id', 'O')
@@ -1,4 +1,5 @@
 import pytest
+from unittest.mock import patch
 from instruments.IPGPhotonics.IPGLaser.fake import QFakeIPGLaser
 from instruments.IPGPhotonics.IPGLaser.instrument import QIPGLaser
 from instrument_contract import InstrumentContractTests
@@ -162,3 +163,90 @@ class TestFaultDetail:
                       QIPGLaser.flag['PWR'] | QIPGLaser.flag['UNX'])
         laser._flags = lambda: all_faults
         assert len(QIPGLaser.fault_detail(laser)) == 4
+
+
+# ---------------------------------------------------------------------------
+# ROP / STA parsing (real logic via monkeypatched receive)
+# ---------------------------------------------------------------------------
+
+class TestReadings:
+
+    @pytest.fixture
+    def laser(self, qtbot):
+        return QFakeIPGLaser()
+
+    @pytest.mark.parametrize('reply, power', [
+        (b'ROP: 10.5', 10.5), (b'ROP: Off', 0.), (b'ROP: Low', 0.1)])
+    def test_power(self, laser, monkeypatch, reply, power):
+        monkeypatch.setattr(laser, 'receive', lambda **kw: reply)
+        assert QIPGLaser._getPower(laser) == power
+
+    def test_flags(self, laser, monkeypatch):
+        monkeypatch.setattr(laser, 'receive', lambda **kw: b'STA: 4096')
+        assert QIPGLaser._flags(laser) == 4096
+
+    def test_flags_share_one_status_query_per_poll(self, laser,
+                                                   monkeypatch):
+        queries = []
+
+        def read(cmd, parser):
+            queries.append(cmd)
+            return QIPGLaser.flag['AIM'] if cmd == 'STA' else 0.
+        monkeypatch.setattr(laser, '_read', read)
+        monkeypatch.setattr(laser, '_command', lambda cmd: '0')
+        QIPGLaser._registerProperties(laser)
+        received = {}
+        laser.propertyValue.connect(lambda n, v: received.update({n: v}))
+        laser._polling = True
+        with patch('qtpy.QtCore.QTimer.singleShot'):
+            laser._poll()
+        assert queries.count('STA') == 1
+        assert received['aiming'] is True
+        assert received['fault'] is False
+        QIPGLaser._flags(laser)
+        assert queries.count('STA') == 2
+
+    def test_invalid_reply_raises(self, laser, monkeypatch):
+        monkeypatch.setattr(laser, 'receive', lambda **kw: b'ERR: busy')
+        with pytest.raises(ValueError):
+            QIPGLaser._getPower(laser)
+
+
+# ---------------------------------------------------------------------------
+# Echo mismatch recovery
+# ---------------------------------------------------------------------------
+
+class Port:
+    '''Minimal interface stand-in for recover().'''
+
+    timeout = 1
+    timedOut = False
+
+    def purge(self, settle=0):
+        pass
+
+    def isOpen(self):
+        return True
+
+
+class TestEchoMismatch:
+
+    @pytest.fixture
+    def laser(self, qtbot, monkeypatch):
+        laser = QFakeIPGLaser()
+        laser._interface = Port()
+        laser._synced = True
+        monkeypatch.setattr(laser, 'RETRY_DELAY', 0)
+        return laser
+
+    def test_stale_echo_is_retried(self, laser, monkeypatch):
+        replies = ['STA: 4', 'ROP: 10.5']
+        monkeypatch.setattr(laser, 'receive', lambda **kw: replies.pop(0))
+        assert laser._command('ROP') == '10.5'
+        assert laser.recoveryStats()['mismatches'] == 1
+
+    def test_error_reply_is_not_retried(self, laser, monkeypatch):
+        replies = ['ERR: Keyswitch in remote']
+        monkeypatch.setattr(laser, 'receive', lambda **kw: replies.pop(0))
+        assert laser._command('EMON') == 'ERR: Keyswitch in remote'
+        assert laser.recoveryStats()['mismatches'] == 0
@@ -0,0 +1,235 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from qtpy import QtCore
+from lib.Configure import Configure
+from lib.QDataLogger import QDataLogger
+from lib.QInstrumentEngine import QInstrumentEngine
+from instruments.StanfordResearch.SR830.fake import QFakeSR830
+
+
+@pytest.fixture
+def configure(tmp_path):
+    return Configure(datadir=str(tmp_path / 'data'),
+                     configdir=str(tmp_path / 'config'))
+
+
+@pytest.fixture
+def engine(qtbot, configure):
+    e = QInstrumentEngine(configure=configure)
+    yield e
+    e.close()
+
+
+def _saved(configure, device):
+    with open(configure.configname(device)) as f:
+        return json.load(f)
+
+
+def _start(qtbot, engine, name='SR830'):
+    with qtbot.waitSignal(engine.instrumentReady, timeout=2000) as blocker:
+        engine.start()
+    assert blocker.args == [name]
+
+
+class TestDiscovery:
+
+    def test_available(self):
+        names = QInstrumentEngine.availableInstruments()
+        assert {'SR830', 'DS345', 'Proscan'} <= set(names)
+        assert names == sorted(names)
+
+    def test_add_fake_by_name(self, engine):
+        device = engine.addInstrumentByName('SR830', fake=True)
+        assert type(device).__name__ == 'QFakeSR830'
+        assert engine.names == ['SR830']
+        assert engine.device('SR830') is device
+
+    def test_unknown_name(self, engine, caplog):
+        assert engine.addInstrumentByName('Nonexistent') is None
+        assert engine.names == []
+        assert 'not found' in caplog.text
+
+    def test_names_are_unique(self, engine):
+        assert engine.addInstrument(QFakeSR830()) == 'FakeSR830'
+        assert engine.addInstrument(QFakeSR830()) == 'FakeSR830-2'
+
+    def test_constructor_adds_instruments(self, qtbot, configure):
+        e = QInstrumentEngine(instruments=['SR830', 'DS345'], fake=True,
+                              configure=configure)
+        assert e.names == ['SR830', 'DS345']
+        e.close()
+
+    def test_rejects_policy(self):
+        with pytest.raises(ValueError):
+            QInstrumentEngine(policy='ask')
+
+
+class TestStart:
+
+    def test_moves_device_to_thread(self, qtbot, engine):
+        device = QFakeSR830()
+        engine.addInstrument(device, 'SR830')
+        _start(qtbot, engine)
+        assert device.thread() is not engine.thread()
+        assert engine.isRunning()
+        assert engine.isReady('SR830')
+
+    def test_saves_hardware_without_config(self, qtbot, engine,
+                                           configure):
+        device = QFakeSR830()
+        engine.addInstrument(device, 'SR830')
+        _start(qtbot, engine)
+        assert _saved(configure, device) == device.settings
+
+    def test_hardware_policy_keeps_hardware(self, qtbot, engine,
+                                            configure):
+        device = QFakeSR830()
+        configure.save(device, settings={'harmonic': 3})
+        engine.addInstrument(device, 'SR830')
+        _start(qtbot, engine)
+        assert device.get('harmonic') == 1
+        assert _saved(configure, device)['harmonic'] == 1
+
+    def test_saved_policy_restores_saved(self, qtbot, configure):
+        engine = QInstrumentEngine(policy='saved', configure=configure)
+        device = QFakeSR830()
+        configure.save(device, settings={'harmonic': 3})
+        engine.addInstrument(device, 'SR830')
+        _start(qtbot, engine)
+        qtbot.waitUntil(lambda: device.get('harmonic') == 3)
+        engine.close()
+        assert _saved(configure, device)['harmonic'] == 3
+
+    def test_added_while_running(self, qtbot, engine):
+        engine.start()
+        with qtbot.waitSignal(engine.instrumentReady, timeout=2000):
+            engine.addInstrument(QFakeSR830(), 'SR830')
+
+    def test_starts_polling(self, qtbot, engine):
+        device = engine.addInstrumentByName('Proscan', fake=True)
+        _start(qtbot, engine, 'Proscan')
+        qtbot.waitUntil(lambda: getattr(device, '_polling', False))
+        engine.stop()
+        assert not device._polling
+        assert not engine.isRunning()
+
+    def test_polling_disabled(self, qtbot, configure):
+        engine = QInstrumentEngine(polling=False, configure=configure)
+        device = engine.addInstrumentByName('Proscan', fake=True)
+        _start(qtbot, engine, 'Proscan')
+        qtbot.wait(50)
+        assert not getattr(device, '_polling', False)
+        engine.close()
+
+
+    def test_proxy(self, qtbot, engine):
+        device = QFakeSR830()
+        engine.addInstrument(device, 'SR830')
+        _start(qtbot, engine)
+        proxy = engine.proxy('SR830')
+        proxy.set('harmonic', 2)
+        assert proxy.get('harmonic') == 2
+        assert engine.proxy('DS345') is None
+
+
+class TestClose:
+
+    def test_saves_last_values(self, qtbot, engine, configure):
+        device = QFakeSR830()
+        engine.addInstrument(device, 'SR830')
+        _start(qtbot, engine)
+        device.propertyValue.emit('phase', 45.)
+        device.propertyValue.emit('x', 1.)
+        engine.close()
+        saved = _saved(configure, device)
+        assert saved['phase'] == 45.
+        assert 'x' not in saved
+        assert engine.names == []
+
+    def test_remove_stops_thread(self, qtbot, engine):
+        device = QFakeSR830()
+        engine.addInstrument(device, 'SR830')
+        _start(qtbot, engine)
+        thread = device.thread()
+        engine.removeInstrument('SR830')
+        assert thread.isFinished()
+        assert engine.device('SR830') is None
+
+    def test_not_saved_before_start(self, engine, configure):
+        device = QFakeSR830()
+        engine.addInstrument(device, 'SR830')
+        engine.close()
+        assert configure.read(device) is None
+
+
+class TestDataLogger:
+
+    def test_logs_while_running(self, qtbot, configure, tmp_path):
+        log = QDataLogger(tmp_path / 'log', format='csv')
+        engine = QInstrumentEngine(datalogger=log, configure=configure)
+        device = QFakeSR830()
+        engine.addInstrument(device, 'SR830')
+        _start(qtbot, engine)
+        assert log.isRunning()
+        engine.close()
+        assert not log.isRunning()
+        assert 'SR830.harmonic' in log.channels
+        assert (tmp_path / 'log.csv').exists()
+
+
+class TestViews:
+
+    def test_widget_leaves_thread_to_engine(self, qtbot, engine):
+        from instruments.StanfordResearch.SR830.widget import QSR830Widget
+        device = QFakeSR830()
+        engine.addInstrument(device, 'SR830')
+        _start(qtbot, engine)
+        thread = device.thread()
+        widget = QSR830Widget(device=device)
+        qtbot.addWidget(widget)
+        widget._startDeviceThread()
+        assert widget._thread is None
+        assert device.thread() is thread
+
+    @pytest.mark.parametrize('view', ['widget', 'tree'])
+    def test_view_leaves_settings_to_engine(self, qtbot, engine,
+                                            configure, tmp_path, view):
+        if view == 'widget':
+            from instruments.StanfordResearch.SR830.widget import \
+                QSR830Widget as View
+        else:
+            from lib.QInstrumentTree import QInstrumentTree as View
+        device = QFakeSR830()
+        engine.addInstrument(device, 'SR830')
+        _start(qtbot, engine)
+        widget = View(device=device)
+        qtbot.addWidget(widget)
+        widget._configure = Configure(datadir=str(tmp_path / 'view'),
+                                      configdir=str(tmp_path / 'view'))
+        widget.show()
+        qtbot.waitUntil(lambda: widget._external)
+        assert not widget._reconciling
+        widget.close()
+        assert widget._configure.read(device) is None
+
+
+def test_headless_without_widgets(tmp_path):
+    code = ('import sys\n'
+            'from qtpy import QtCore\n'
+            'app = QtCore.QCoreApplication([])\n'
+            'from QInstrument.lib.QInstrumentEngine import '
+            'QInstrumentEngine\n'
+            'engine = QInstrumentEngine(instruments=["SR830"], fake=True)\n'
+            'engine.instrumentReady.connect(lambda name: app.quit())\n'
+            'engine.start()\n'
+            'app.exec()\n'
+            'engine.close()\n'
+            'assert not [m for m in sys.modules if "QtWidgets" in m]\n')
+    env = dict(os.environ, HOME=str(tmp_path))
+    result = subprocess.run([sys.executable, '-c', code], env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
@@ -5,6 +5,7 @@ from qtpy import QtCore, QtWidgets
 
 from QInstrumentRack import QInstrumentRack, _InstrumentSlot
 from lib.QInstrumentWidget import QInstrumentWidget
+from lib.QSerialInstrument import QSerialInstrument
 
 
 # ---------------------------------------------------------------------------
@@ -80,6 +81,61 @@ class TestRemoveInstrument:
         rack_with_two._removeInstrument('NoSuchInstrument')
         assert rack_with_two._slots.count() == 2
 
+    def test_removed_slot_is_hidden(self, rack_with_two):
+        rack_with_two.show()
+        widget = rack_with_two._slotAt(0).findChild(_FakeWidget)
+        assert widget.isVisible()
+        rack_with_two._removeInstrument('Alpha')
+        assert not widget.isVisible()
+
+
+# ---------------------------------------------------------------------------
+# Statistics panel
+# ---------------------------------------------------------------------------
+
+class _DeviceWidget(_FakeWidget):
+    '''Stand-in widget with a serial device.'''
+
+    def __init__(self):
+        super().__init__()
+        self.device = QSerialInstrument()
+
+
+class TestStatsPanel:
+
+    def test_hidden_by_default(self, rack):
+        assert rack._stats.isHidden()
+        assert not rack._statsButton.isChecked()
+
+    def test_button_toggles_panel(self, rack):
+        rack._statsButton.setChecked(True)
+        assert not rack._stats.isHidden()
+        rack._statsButton.setChecked(False)
+        assert rack._stats.isHidden()
+
+    def test_tracks_instruments_with_devices(self, rack):
+        rack.addInstrument(_FakeWidget(), 'Alpha')
+        rack.addInstrument(_DeviceWidget(), 'Beta')
+        assert rack._stats.names == ['Beta']
+        rack._removeInstrument('Beta')
+        assert rack._stats.names == []
+
+    def test_clear_empties_panel(self, rack):
+        rack.addInstrument(_DeviceWidget(), 'Beta')
+        rack.clearInstruments()
+        assert rack._stats.names == []
+
+    def test_visible_panel_enables_stats(self, rack):
+        widget = _DeviceWidget()
+        rack.addInstrument(widget, 'Beta')
+        with patch.object(rack._configure, 'restore'):
+            rack.show()
+        rack.setStatsVisible(True)
+        assert rack._statsButton.isChecked()
+        assert widget.device.statsEnabled()
+        rack.setStatsVisible(False)
+        assert not widget.device.statsEnabled()
+
 
 # ---------------------------------------------------------------------------
 # settings property
@@ -2,8 +2,11 @@ import logging
 import pytest
 from unittest.mock import MagicMock, patch
 
+from qtpy import QtCore
+
 from lib.QFakeInstrument import QFakeInstrument
 from lib.QInstrumentTree import QInstrumentTree
+from lib.QPollingMixin import QPollingMixin
 
 
 # ---------------------------------------------------------------------------
@@ -300,6 +303,32 @@ class TestRestoreSettings:
         assert kwargs.get('hardware_dominant') is True
 
 
+    def test_unrequested_settings_read_is_ignored(self, qtbot, device,
+                                                  tmp_path):
+        t = self._make_tree(qtbot, device, tmp_path)
+        device.readSettings()
+        assert t._configure.read(device) is None
+
+    def test_settings_read_on_worker_thread(self, qtbot, device, tmp_path):
+        t = self._make_tree(qtbot, device, tmp_path)
+        threads = []
+        device.registerProperty(
+            'probe',
+            getter=lambda: threads.append(QtCore.QThread.currentThread()),
+            setter=lambda v: None)
+        worker = QtCore.QThread()
+        device.moveToThread(worker)
+        worker.start()
+        try:
+            t._restoreSettings()
+            qtbot.waitUntil(lambda: not t._reconciling, timeout=1000)
+        finally:
+            worker.quit()
+            worker.wait()
+        assert threads == [worker]
+        assert t._configure.read(device) is not None
+
+
 # ---------------------------------------------------------------------------
 # Threading lifecycle
 # ---------------------------------------------------------------------------
@@ -345,3 +374,41 @@ class TestThreadLifecycle:
         from qtpy.QtGui import QShowEvent
         t.showEvent(QShowEvent())
         assert calls == []
+
+
+# ---------------------------------------------------------------------------
+# Visibility-aware subscriptions
+# ---------------------------------------------------------------------------
+
+class PollingTreeDevice(QPollingMixin, TreeDevice):
+    '''Tree device that supports subscriptions.'''
+
+
+class TestSubscriptions:
+
+    @pytest.fixture
+    def shown(self, qtbot):
+        device = PollingTreeDevice()
+        t = QInstrumentTree(device=device)
+        qtbot.addWidget(t)
+        t._restored = True     # skip first-show reconciliation
+        t.show()
+        return t, device
+
+    def test_show_subscribes_visible_properties(self, shown):
+        _, device = shown
+        assert device.subscriptions == {'frequency': 1, 'count': 1,
+                                        'label': 1}
+
+    def test_hide_unsubscribes(self, shown):
+        t, device = shown
+        t.hide()
+        assert device.subscriptions == {}
+
+    def test_collapse_unsubscribes_and_expand_resubscribes(self, shown):
+        t, device = shown
+        t.topLevelItem(0).setExpanded(False)
+        assert device.subscriptions == {}
+        t.topLevelItem(0).setExpanded(True)
+        assert device.subscriptions == {'frequency': 1, 'count': 1,
+                                        'label': 1}
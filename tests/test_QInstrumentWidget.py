@@ -519,6 +519,31 @@ class TestRestoreSettings:
         assert kwargs.get('hardware_dominant') is True
 
 
+    def test_hardware_values_applied_to_widgets(self, qtbot, tmp_path):
+        device = TwoPropertyDevice()
+        w = self._make_restore_widget(qtbot, device, tmp_path)
+        device._frequency = 77.0
+        w._restoreSettings()
+        assert w.frequency.value() == pytest.approx(77.0)
+
+    def test_unrequested_settings_read_is_ignored(self, qtbot, tmp_path):
+        device = TwoPropertyDevice()
+        w = self._make_restore_widget(qtbot, device, tmp_path)
+        device.readSettings()
+        assert w._configure.read(device) is None
+
+    def test_firstShow_starts_thread_before_restore(self, qtbot, tmp_path):
+        device = TwoPropertyDevice()
+        w = self._make_restore_widget(qtbot, device, tmp_path)
+        calls = []
+        with patch.object(w, '_startDeviceThread',
+                          side_effect=lambda: calls.append('thread')), \
+             patch.object(w, '_restoreSettings',
+                          side_effect=lambda: calls.append('restore')):
+            w._firstShow()
+        assert calls == ['thread', 'restore']
+
+
 # ---------------------------------------------------------------------------
 # Polling integration — startPolling / stopPolling
 # ---------------------------------------------------------------------------
@@ -566,3 +591,74 @@ class TestPollingIntegration:
         with patch.object(device, 'stopPolling') as mock_stop:
             w.close()
         mock_stop.assert_not_called()
+
+
+# ---------------------------------------------------------------------------
+# Visibility-aware subscriptions
+# ---------------------------------------------------------------------------
+
+class PollingTwoPropertyDevice(QPollingMixin, TwoPropertyDevice):
+    '''Two-property fake device that supports subscriptions.'''
+
+
+class TestSubscriptions:
+
+    @pytest.fixture
+    def shown(self, qtbot):
+        device = PollingTwoPropertyDevice()
+        w = _make_widget(qtbot, device)
+        w._restored = True     # skip first-show reconciliation
+        w.show()
+        qtbot.waitExposed(w)
+        return w, device
+
+    def test_not_subscribed_before_show(self, qtbot):
+        device = PollingTwoPropertyDevice()
+        _make_widget(qtbot, device)
+        assert device.subscriptions is None
+
+    def test_show_subscribes_linked_properties(self, shown):
+        w, device = shown
+        assert device.subscriptions == {'frequency': 1, 'count': 1}
+
+    def test_hide_unsubscribes(self, shown):
+        w, device = shown
+        w.hide()
+        assert device.subscriptions == {}
+
+    def test_hidden_parent_unsubscribes(self, qtbot, shown):
+        w, device = shown
+        container = QtWidgets.QWidget()
+        qtbot.addWidget(container)
+        w.setParent(container)
+        container.show()
+        assert device.subscriptions == {'frequency': 1, 'count': 1}
+        container.hide()
+        assert device.subscriptions == {}
+
+    def test_minimize_unsubscribes_and_restore_resyncs(self, qtbot, shown):
+        w, device = shown
+        w.showMinimized()
+        qtbot.waitUntil(lambda: device.subscriptions == {})
+        device._frequency = 5.
+        w.showNormal()
+        qtbot.waitUntil(lambda: bool(device.subscriptions))
+        assert w.frequency.value() == pytest.approx(5.)
+
+    def test_extra_subscriptions(self, qtbot):
+        class PositionW(QInstrumentWidget):
+            UIFILE = 'PositionW.ui'
+            SUBSCRIPTIONS = ('position',)
+
+        device = PollingTwoPropertyDevice()
+        with patch('qtpy.uic.loadUi'):
+            w = PositionW(device=device)
+        qtbot.addWidget(w)
+        w._restored = True
+        w.show()
+        assert device.subscriptions == {'position': 1}
+
+    def test_close_unsubscribes(self, shown):
+        w, device = shown
+        w.close()
+        assert device.subscriptions == {}
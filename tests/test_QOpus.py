@@ -136,3 +136,36 @@ class TestGetStatus:
     def test_status_is_readonly(self, laser):
         laser.set('status', False)
         assert laser.get('status') is True
+
+
+# ---------------------------------------------------------------------------
+# Unit suffixes (real parsing logic via monkeypatched receive)
+# ---------------------------------------------------------------------------
+
+class TestReadings:
+
+    @pytest.fixture
+    def laser(self, qtbot):
+        return QFakeOpus532()
+
+    def test_power_strips_mW(self, laser, monkeypatch):
+        monkeypatch.setattr(laser, 'receive', lambda **kw: b'0123.4mW')
+        assert QOpus._getPower(laser) == pytest.approx(123.4)
+        assert laser._power == pytest.approx(123.4)
+
+    def test_invalid_power_keeps_cached_value(self, laser, monkeypatch):
+        laser._power = 5.
+        monkeypatch.setattr(laser, 'receive', lambda **kw: b'')
+        assert QOpus._getPower(laser) == 5.
+
+    def test_current_strips_percent(self, laser, monkeypatch):
+        monkeypatch.setattr(laser, 'receive', lambda **kw: b'050.0%')
+        assert QOpus._getCurrent(laser) == pytest.approx(50.)
+
+    def test_temperature_strips_unit(self, laser, monkeypatch):
+        monkeypatch.setattr(laser, 'receive', lambda **kw: b'25.5 C')
+        assert QOpus._parseTemp(laser, 'LASTEMP?') == pytest.approx(25.5)
+
+    def test_invalid_temperature_reads_zero(self, laser, monkeypatch):
+        monkeypatch.setattr(laser, 'receive', lambda **kw: b'garbled')
+        assert QOpus._parseTemp(laser, 'LASTEMP?') == 0.
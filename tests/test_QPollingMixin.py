@@ -130,3 +130,243 @@ class TestPollInterval:
 
     def test_default_poll_interval_is_zero(self, inst):
         assert inst.POLL_INTERVAL == 0
+
+
+# ---------------------------------------------------------------------------
+# Scheduled polling
+# ---------------------------------------------------------------------------
+
+class TestScheduledPoll:
+
+    def test_scheduler_reads_poll_metadata(self, inst):
+        inst.registerProperty('fast', getter=lambda: 1., setter=None,
+                              poll_ms=100, poll_priority=1)
+        inst.registerProperty('slow', getter=lambda: 2., setter=None,
+                              poll_ms=5000)
+        stats = inst.pollStats()
+        assert stats['fast']['period_ms'] == 100
+        assert stats['slow']['period_ms'] == 5000
+        assert inst.pollScheduler.due() == ['fast', 'slow']
+
+    def test_scheduler_rebuilt_when_registry_changes(self, inst):
+        first = inst.pollScheduler
+        inst.registerProperty('a', getter=lambda: 1., setter=None)
+        assert inst.pollScheduler is not first
+        assert inst.pollScheduler.names == ['a']
+
+    def test_poll_skips_properties_not_due(self, inst):
+        inst.registerProperty('fast', getter=lambda: 1., setter=None,
+                              poll_ms=100)
+        inst.registerProperty('slow', getter=lambda: 2., setter=None,
+                              poll_ms=60000)
+        inst._polling = True
+        received = []
+        inst.propertyValue.connect(lambda n, v: received.append(n))
+        with patch('qtpy.QtCore.QTimer.singleShot'):
+            inst._poll()
+            inst.pollScheduler._entries['fast'].deadline = 0.
+            inst._poll()
+        assert received == ['fast', 'slow', 'fast']
+
+    def test_poll_waits_for_next_deadline(self, inst):
+        inst.registerProperty('fast', getter=lambda: 1., setter=None,
+                              poll_ms=100)
+        inst._polling = True
+        with patch('qtpy.QtCore.QTimer.singleShot') as mock_shot:
+            inst._poll()
+        delay = mock_shot.call_args.args[0]
+        assert 90 <= delay <= 100
+
+    def test_getter_error_skips_only_that_property(self, inst):
+        def broken():
+            raise ValueError('garbled reply')
+        inst.registerProperty('broken', getter=broken, setter=None,
+                              poll_priority=1)
+        inst.registerProperty('fine', getter=lambda: 1., setter=None)
+        inst._polling = True
+        received = []
+        inst.propertyValue.connect(lambda n, v: received.append(n))
+        with patch('qtpy.QtCore.QTimer.singleShot') as mock_shot:
+            inst._poll()
+        assert received == ['fine']
+        assert mock_shot.called
+        assert inst.pollStats()['broken']['count'] == 1
+
+
+# ---------------------------------------------------------------------------
+# Adaptive polling
+# ---------------------------------------------------------------------------
+
+class AdaptiveInstrument(QPollingMixin, QAbstractInstrument):
+    '''Adaptive instrument with one polled value.'''
+
+    POLL_ADAPTIVE = True
+    POLL_MIN_INTERVAL = 10
+    POLL_MAX_INTERVAL = 80
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.value = 0.
+        self.registerProperty('value', getter=lambda: self.value,
+                              setter=lambda v: None, deadband=0.5)
+
+
+@pytest.fixture
+def adaptive(qtbot):
+    inst = AdaptiveInstrument()
+    inst._polling = True
+    yield inst
+    inst.stopPolling()
+
+
+class TestAdaptivePoll:
+
+    def test_backs_off_while_steady(self, adaptive):
+        intervals = []
+        for _ in range(5):
+            adaptive._poll()
+            intervals.append(adaptive.pollInterval)
+        assert intervals == [10, 20, 40, 80, 80]
+
+    def test_change_snaps_back(self, adaptive):
+        for _ in range(4):
+            adaptive._poll()
+        adaptive.value = 1.
+        adaptive._poll()
+        assert adaptive.pollInterval == 10
+
+    def test_change_within_deadband_is_steady(self, adaptive):
+        adaptive._poll()
+        adaptive.value = 0.4
+        adaptive._poll()
+        assert adaptive.pollInterval == 20
+
+    def test_timer_uses_adaptive_interval(self, adaptive):
+        adaptive._poll()
+        adaptive._poll()
+        assert adaptive._pollTimer.isActive()
+        assert adaptive._pollTimer.interval() == 20
+
+    def test_set_snaps_back_and_brings_poll_forward(self, adaptive):
+        for _ in range(4):
+            adaptive._poll()
+        adaptive.set('value', 3.)
+        assert adaptive.pollInterval == 10
+        assert adaptive._pollTimer.remainingTime() <= 10
+
+    def test_min_interval_overrides_poll_interval(self, adaptive):
+        adaptive.POLL_MIN_INTERVAL = 5
+        adaptive._poll()
+        assert adaptive.pollInterval == 5
+
+    def test_sequence_values_compared_elementwise(self, adaptive):
+        assert adaptive._pollChanged('xy', [0, 0]) is True
+        assert adaptive._pollChanged('xy', [0, 0]) is False
+        assert adaptive._pollChanged('xy', [0, 1]) is True
+
+
+# ---------------------------------------------------------------------------
+# Subscriptions
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def subscribed(inst):
+    for name in ('a', 'b'):
+        inst.registerProperty(name, getter=lambda: 1., setter=None)
+    inst._polling = True
+    received = []
+    inst.propertyValue.connect(lambda n, v: received.append(n))
+    yield inst, received
+    inst.stopPolling()
+
+
+class TestSubscriptions:
+
+    def test_untracked_polls_everything(self, subscribed):
+        inst, received = subscribed
+        assert inst.subscriptions is None
+        assert inst.isSubscribed('a')
+        with patch('qtpy.QtCore.QTimer.singleShot'):
+            inst._poll()
+        assert received == ['a', 'b']
+
+    def test_only_subscribed_properties_polled(self, subscribed):
+        inst, received = subscribed
+        inst.subscribe('b')
+        with patch('qtpy.QtCore.QTimer.singleShot'):
+            inst._poll()
+        assert received == ['b']
+
+    def test_counts_balance(self, inst):
+        inst.subscribe(['a', 'b'])
+        inst.subscribe('a')
+        inst.unsubscribe(['a', 'b'])
+        assert inst.subscriptions == {'a': 1}
+        inst.unsubscribe('a')
+        inst.unsubscribe('a')
+        assert inst.subscriptions == {}
+
+    def test_unsubscribed_property_leaves_schedule(self, subscribed):
+        inst, _ = subscribed
+        inst.subscribe(['a', 'b'])
+        assert inst.pollScheduler.names == ['a', 'b']
+        inst.unsubscribe('a')
+        assert inst.pollScheduler.names == ['b']
+
+    def test_resubscribe_keeps_existing_statistics(self, subscribed):
+        inst, _ = subscribed
+        inst.subscribe('a')
+        with patch('qtpy.QtCore.QTimer.singleShot'):
+            inst._poll()
+        inst.subscribe('b')
+        assert inst.pollStats()['a']['count'] == 1
+        assert inst.pollStats()['b']['count'] == 0
+
+    def test_no_subscribers_idles_without_io(self, subscribed):
+        inst, received = subscribed
+        inst.subscribe('a')
+        inst.unsubscribe('a')
+        with patch('qtpy.QtCore.QTimer.singleShot') as mock_shot:
+            inst._poll()
+        assert received == []
+        mock_shot.assert_called_once_with(inst.POLL_MAX_INTERVAL, inst._poll)
+
+
+# ---------------------------------------------------------------------------
+# History
+# ---------------------------------------------------------------------------
+
+class TestHistory:
+
+    def test_polled_values_recorded(self, inst):
+        value = [1.]
+        inst.registerProperty('a', getter=lambda: value[0], setter=None)
+        inst._polling = True
+        with patch('qtpy.QtCore.QTimer.singleShot'):
+            inst._poll()
+            value[0] = 2.
+            inst.pollScheduler._entries['a'].deadline = 0.
+            inst._poll()
+        t, v = inst.history('a')
+        assert list(v) == [1., 2.]
+        assert t[1] >= t[0]
+        inst.stopPolling()
+
+    def test_depth_bounds_history(self, inst):
+        inst.HISTORY_DEPTH = 3
+        for n in range(5):
+            inst._pollChanged('a', n)
+        assert list(inst.history('a')[1]) == [2., 3., 4.]
+
+    def test_decimated_history(self, inst):
+        for n in range(8):
+            inst._pollChanged('a', n)
+        _, vmin, vmax = inst.decimatedHistory('a', 2)
+        assert list(vmin) == [0., 4.]
+        assert list(vmax) == [3., 7.]
+
+    def test_zero_depth_disables_recording(self, inst):
+        inst.HISTORY_DEPTH = 0
+        inst._pollChanged('a', 1.)
+        assert inst.propertyHistory is None
+        assert len(inst.history('a')[0]) == 0
@@ -1,5 +1,10 @@
+import itertools
+import time
+import numpy as np
 import pytest
+from qtpy import QtCore
 from unittest.mock import patch, MagicMock
+from lib.InstrumentProxy import InstrumentProxy
 from instruments.PriorScientific.Proscan.fake import QFakeProscan
 from instruments.PriorScientific.Proscan.instrument import QProscan
 
@@ -176,6 +181,26 @@ class TestFakeBehaviour:
         assert proscan.stop() is True
 
 
+# ---------------------------------------------------------------------------
+# Reply parsing (real logic via patched receive)
+# ---------------------------------------------------------------------------
+
+class TestReplies:
+
+    def test_position_parses_reply(self, proscan):
+        with patch.object(proscan, 'receive', return_value=b'10,-20,30'):
+            assert QProscan.position(proscan) == [10, -20, 30]
+
+    def test_invalid_position_raises(self, proscan):
+        with patch.object(proscan, 'receive', return_value=b''):
+            with pytest.raises(ValueError):
+                QProscan.position(proscan)
+
+    def test_stepsize_reads_x_field(self, proscan):
+        with patch.object(proscan, 'receive', return_value=b'0.5,0.25'):
+            assert QProscan._stepsize(proscan) == 0.5
+
+
 # ---------------------------------------------------------------------------
 # _poll() — position + limits batch
 # ---------------------------------------------------------------------------
@@ -224,7 +249,27 @@ class TestProscanPoll:
         with patch.object(proscan, 'position', side_effect=ValueError('bad')), \
              patch('qtpy.QtCore.QTimer.singleShot'):
             proscan._poll()
-        assert received == []
+        assert received == [None]
+        assert 'position' not in proscan._pollLast
+
+    def test_position_polled_first_every_cycle(self, proscan):
+        proscan._polling = True
+        received = []
+        proscan.propertyValue.connect(lambda n, v: received.append(n))
+        with patch('qtpy.QtCore.QTimer.singleShot'):
+            proscan._poll()
+            received.clear()
+            for entry in proscan.pollScheduler._entries.values():
+                if entry.name in ('position', 'limits', 'moving'):
+                    entry.deadline = 0.
+            proscan._poll()
+        assert received == ['position', 'limits', 'moving']
+
+    def test_slow_properties_have_periods(self, proscan):
+        stats = proscan.pollStats()
+        assert stats['position']['period_ms'] is None
+        assert stats['speed']['period_ms'] == 5000
+        assert stats['xresolution']['period_ms'] == 60000
 
     def test_poll_reschedules_after_error(self, proscan):
         proscan._polling = True
@@ -232,3 +277,294 @@ class TestProscanPoll:
              patch('qtpy.QtCore.QTimer.singleShot') as mock_shot:
             proscan._poll()
         mock_shot.assert_called_once_with(proscan.POLL_INTERVAL, proscan._poll)
+
+
+# ---------------------------------------------------------------------------
+# Adaptive polling
+# ---------------------------------------------------------------------------
+
+class TestProscanAdaptivePoll:
+
+    @pytest.fixture
+    def adaptive(self, proscan):
+        proscan.POLL_ADAPTIVE = True
+        proscan._polling = True
+        yield proscan
+        proscan.stopPolling()
+
+    @staticmethod
+    def cycle(proscan):
+        '''Poll once, as if the poll timer had expired.'''
+        for entry in proscan.pollScheduler._entries.values():
+            entry.deadline = 0.
+        proscan._poll()
+
+    def test_stage_at_rest_backs_off(self, adaptive):
+        for _ in range(3):
+            self.cycle(adaptive)
+        assert adaptive.pollInterval == 4 * adaptive.POLL_INTERVAL
+
+    def test_motion_snaps_back(self, adaptive):
+        for _ in range(3):
+            self.cycle(adaptive)
+        adaptive.move_to([10, 20])
+        self.cycle(adaptive)
+        assert adaptive.pollInterval == adaptive.POLL_INTERVAL
+
+    def test_motion_command_resets_interval(self, adaptive):
+        for _ in range(3):
+            self.cycle(adaptive)
+        adaptive.expect = lambda *args, **kwargs: True
+        assert QProscan.stepLeft(adaptive) is True
+        assert adaptive.pollInterval == adaptive.POLL_INTERVAL
+
+
+# ---------------------------------------------------------------------------
+# Motion commands — never repeated after a late acknowledgement
+# ---------------------------------------------------------------------------
+
+class LateLine:
+    '''Serial line on which acknowledgements of moves arrive late.'''
+
+    timeout = 1
+
+    def __init__(self):
+        self.sent = []
+        self.buffer = []
+        self.timedOut = False
+
+    def transmit(self, data):
+        self.sent.append(data)
+        self.buffer.append('0' if data == 'COMP,0' else 'R')
+
+    def receive(self, **kwargs):
+        self.timedOut = self.sent[-1].startswith('G')
+        return '' if self.timedOut else self.buffer.pop(0)
+
+    def purge(self, settle=0):
+        self.buffer.clear()
+
+    def isOpen(self):
+        return True
+
+
+class TestMotionCommands:
+
+    @pytest.fixture
+    def stage(self, qtbot):
+        stage = QProscan()
+        stage._interface = LateLine()
+        stage._synced = True
+        return stage
+
+    def test_late_reply_to_relative_move_is_sent_once(self, stage):
+        assert stage.move_to([10, 0], relative=True) is False
+        assert stage._interface.sent == ['GR,10,0', 'COMP,0']
+        assert stage.recoveryStats()['recoveries'] == 1
+
+    def test_stream_stays_in_step(self, stage):
+        stage.move_to([10, 0], relative=True)
+        assert stage.stepLeft() is True
+        assert stage._interface.sent[-1] == 'L'
+
+    def test_moves_keep_port_timeout(self, stage):
+        for _ in range(stage.TIMEOUT_SAMPLES):
+            stage.latency('G').add(1e-4)
+            stage.latency('P').add(1e-4)
+        assert stage.timeoutFor('G,5000,0') == stage._interface.timeout
+        assert stage.timeoutFor('P') == stage.TIMEOUT_FLOOR
+
+
+# ---------------------------------------------------------------------------
+# run_trajectory — streamed moves with arrival timestamps
+# ---------------------------------------------------------------------------
+
+class Controller:
+    '''Simulated controller queue: each query completes one move.'''
+
+    def __init__(self, proscan, capacity=8):
+        self.capacity = capacity
+        self.queue = []
+        self.position = [0, 0, 0]
+        self.longest = 0
+        proscan.move_to = self.move_to
+        proscan.position = self.read
+        proscan.status = self.status
+
+    def move_to(self, point):
+        if len(self.queue) >= self.capacity:
+            return False
+        self.queue.append(list(point) + [0] * (3 - len(point)))
+        self.longest = max(self.longest, len(self.queue))
+        return True
+
+    def read(self):
+        if self.queue:
+            self.position = self.queue.pop(0)
+        return self.position
+
+    def status(self):
+        moving = bool(self.queue)
+        self.read()
+        return int(moving)
+
+
+class TestTrajectory:
+
+    points = [[10 * n, 5 * n] for n in range(1, 9)]
+
+    def run(self, qtbot, proscan, *args, **kwargs):
+        with qtbot.waitSignal(proscan.trajectoryFinished,
+                              timeout=2000) as blocker:
+            assert proscan.run_trajectory(*args, **kwargs)
+        return blocker.args[0]
+
+    def test_streams_within_queue_depth(self, qtbot, proscan):
+        controller = Controller(proscan)
+        reached = []
+        proscan.pointReached.connect(lambda n, t: reached.append(n))
+        arrivals = self.run(qtbot, proscan, self.points)
+        assert reached == list(range(len(self.points)))
+        assert controller.longest == proscan.QUEUE_DEPTH
+        assert np.all(np.diff(arrivals) >= 0)
+
+    def test_queue_full_lowers_depth(self, qtbot, proscan):
+        controller = Controller(proscan, capacity=2)
+        arrivals = self.run(qtbot, proscan, self.points)
+        assert controller.longest == 2
+        assert np.isfinite(arrivals).all()
+
+    def test_three_axis_points(self, qtbot, proscan):
+        Controller(proscan)
+        arrivals = self.run(qtbot, proscan, [[1, 2, 3], [4, 5, 6]])
+        assert np.isfinite(arrivals).all()
+
+    def test_callback_stops_at_each_point(self, qtbot, proscan):
+        controller = Controller(proscan)
+        calls = []
+        self.run(qtbot, proscan, self.points,
+                 callback=lambda n, p: calls.append((n, list(p))))
+        assert calls == list(enumerate(self.points))
+        assert controller.longest == 1
+
+    def test_stop_ends_trajectory(self, qtbot, proscan):
+        Controller(proscan)
+        proscan.pointReached.connect(
+            lambda n, t: proscan.stop() if n == 1 else None)
+        arrivals = self.run(qtbot, proscan, self.points, dwell=0.001)
+        assert np.isfinite(arrivals[:2]).all()
+        assert np.isnan(arrivals[2:]).all()
+
+    def test_stage_at_rest_ends_trajectory(self, qtbot, proscan):
+        Controller(proscan)
+        proscan.move_to = lambda point: True
+        arrivals = self.run(qtbot, proscan, self.points)
+        assert np.isnan(arrivals).all()
+
+    def test_status_timeout_counts_as_motion(self, qtbot, proscan):
+        controller = Controller(proscan)
+        answers = itertools.cycle([False, True])
+        proscan.status = lambda: (controller.status() if next(answers)
+                                  else None)
+        arrivals = self.run(qtbot, proscan, self.points,
+                            callback=lambda n, p: None)
+        assert np.isfinite(arrivals).all()
+
+    def test_fake_reaches_every_point(self, qtbot, proscan):
+        arrivals = self.run(qtbot, proscan, self.points)
+        assert np.isfinite(arrivals).all()
+        assert proscan.position()[:2] == self.points[-1]
+
+    def test_bad_shape_raises(self, proscan):
+        with pytest.raises(ValueError):
+            proscan.run_trajectory([1, 2, 3])
+
+
+# ---------------------------------------------------------------------------
+# watchMotion / waitForMotion — backing-off status polls
+# ---------------------------------------------------------------------------
+
+class Motion:
+    '''Status word that reports motion for *duration* seconds.'''
+
+    def __init__(self, proscan, duration):
+        self.end = time.monotonic() + duration
+        self.queries = 0
+        self.threads = set()
+        proscan.status = self
+
+    def __call__(self):
+        self.queries += 1
+        self.threads.add(QtCore.QThread.currentThread())
+        return 1 if time.monotonic() < self.end else 0
+
+
+class TestWaitForMotion:
+
+    def test_watch_reports_rest(self, qtbot, proscan):
+        motion = Motion(proscan, 0.2)
+        with qtbot.waitSignal(proscan.motionFinished) as blocker:
+            proscan.watchMotion()
+        assert blocker.args == [True]
+        assert time.monotonic() >= motion.end
+        assert motion.queries < 12
+
+    def test_watch_times_out(self, qtbot, proscan):
+        Motion(proscan, 10.)
+        with qtbot.waitSignal(proscan.motionFinished) as blocker:
+            proscan.watchMotion(50)
+        assert blocker.args == [False]
+
+    def test_stop_cancels_watch(self, qtbot, proscan):
+        Motion(proscan, 10.)
+        with qtbot.waitSignal(proscan.motionFinished) as blocker:
+            proscan.watchMotion()
+            QtCore.QTimer.singleShot(20, proscan.stop)
+        assert blocker.args == [False]
+        assert not proscan._motionWatching
+
+    def test_wait_on_own_thread(self, qtbot, proscan):
+        motion = Motion(proscan, 0.05)
+        with qtbot.waitSignal(proscan.motionFinished):
+            assert proscan.waitForMotion() is True
+        assert time.monotonic() >= motion.end
+
+    def test_wait_on_own_thread_times_out(self, proscan):
+        Motion(proscan, 10.)
+        assert proscan.waitForMotion(30) is False
+
+    def test_wait_on_own_thread_serves_events(self, qtbot, proscan):
+        Motion(proscan, 10.)
+        QtCore.QTimer.singleShot(20, proscan.stop)
+        start = time.monotonic()
+        assert proscan.waitForMotion() is False
+        assert time.monotonic() - start < 1.
+        assert not proscan._motionWatching
+
+    def test_queued_stop_cancels_wait_on_worker(self, qtbot, proscan):
+        thread = QtCore.QThread()
+        proscan.moveToThread(thread)
+        thread.start()
+        try:
+            Motion(proscan, 10.)
+            proxy = InstrumentProxy(proscan)
+            waiting = proxy.submit('waitForMotion')
+            qtbot.waitUntil(lambda: proscan._motionWatching)
+            assert proxy.stop() is True
+            assert waiting.result(1.) is False
+        finally:
+            thread.quit()
+            thread.wait()
+
+    def test_wait_from_another_thread(self, qtbot, proscan):
+        thread = QtCore.QThread()
+        proscan.moveToThread(thread)
+        thread.start()
+        try:
+            motion = Motion(proscan, 0.1)
+            assert proscan.waitForMotion(2000) is True
+            assert time.monotonic() >= motion.end
+            assert motion.threads == {thread}
+        finally:
+            thread.quit()
+            thread.wait()
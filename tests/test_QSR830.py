@@ -51,6 +51,16 @@ class TestSR830Report:
     def test_report_values_are_float(self, sr830):
         assert all(isinstance(v, float) for v in sr830.report())
 
+    def test_report_parses_snap_reply(self, sr830):
+        with patch.object(sr830, 'receive',
+                          return_value=b'1000.0,1.5e-3,45.0'):
+            assert QSR830.report(sr830) == [1000., 1.5e-3, 45.]
+
+    def test_report_raises_on_invalid_reply(self, sr830):
+        with patch.object(sr830, 'receive', return_value=b''):
+            with pytest.raises(ValueError):
+                QSR830.report(sr830)
+
 
 # ---------------------------------------------------------------------------
 # auto_offset() — channel validation
@@ -71,3 +81,37 @@ class TestSR830AutoOffset:
 
     def test_invalid_channel_four_ignored(self, sr830):
         QSR830.auto_offset(sr830, 4)
+
+
+# ---------------------------------------------------------------------------
+# applySettings() — write order
+# ---------------------------------------------------------------------------
+
+class TestSR830ApplySettings:
+
+    @pytest.fixture
+    def sr830(self, qtbot):
+        return QFakeSR830()
+
+    def test_harmonic_written_before_frequency(self, sr830):
+        sr830.set('harmonic', 10)
+        written = sr830.applySettings({'frequency': 50000.0, 'harmonic': 1})
+        assert list(written) == ['harmonic', 'frequency']
+
+
+# ---------------------------------------------------------------------------
+# settleTime()
+# ---------------------------------------------------------------------------
+
+class TestSR830SettleTime:
+
+    @pytest.mark.parametrize('index, tau', [(0, 1e-5), (1, 3e-5),
+                                            (10, 1.), (19, 3e4)])
+    def test_tau(self, index, tau):
+        assert QSR830.tau(index) == pytest.approx(tau)
+
+    def test_settle_time_from_time_constant_and_slope(self, qtbot):
+        sr830 = QFakeSR830()
+        sr830.set('time_constant', 8)
+        sr830.set('low_pass_slope', 3)
+        assert sr830.settleTime() == pytest.approx(1.)
@@ -0,0 +1,285 @@
+import time
+import numpy as np
+import pytest
+from qtpy import QtCore
+from lib.QSequencer import QSequencer
+from lib.QFakeInstrument import QFakeInstrument
+
+
+class Source(QFakeInstrument):
+    '''Fake signal source with a writable frequency and amplitude.'''
+
+    DELAY = 0.
+
+    def _registerProperties(self):
+        self._frequency = 0.
+        self._amplitude = 0.
+        self.writes = []
+        self.registerProperty('frequency', getter=lambda: self._frequency,
+                              setter=lambda v: self._store_value('frequency', v))
+        self.registerProperty('amplitude', getter=lambda: self._amplitude,
+                              setter=lambda v: self._store_value('amplitude', v),
+                              settle=0.)
+
+    def _store_value(self, name, value):
+        time.sleep(self.DELAY)
+        self.writes.append(name)
+        setattr(self, f'_{name}', float(value))
+
+
+class Meter(QFakeInstrument):
+    '''Fake meter that reads back the source output.'''
+
+    DELAY = 0.
+    SETTLE = 0.
+
+    def __init__(self, source, **kwargs):
+        self.source = source
+        super().__init__(**kwargs)
+
+    def _registerProperties(self):
+        self.registerProperty('x', getter=self._read, setter=None)
+
+    def _read(self):
+        time.sleep(self.DELAY)
+        return self.source._frequency * self.source._amplitude
+
+    def report(self):
+        return [1., 2., 3.]
+
+    def settleTime(self):
+        return self.SETTLE
+
+
+@pytest.fixture
+def pair(qtbot):
+    source = Source()
+    return source, Meter(source)
+
+
+@pytest.fixture
+def threaded(qtbot):
+    source = Source()
+    meter = Meter(source)
+    source.DELAY = meter.DELAY = 0.03
+    threads = []
+    for device in (source, meter):
+        thread = QtCore.QThread()
+        device.moveToThread(thread)
+        thread.start()
+        threads.append(thread)
+    yield source, meter
+    for thread in threads:
+        thread.quit()
+        thread.wait()
+
+
+# ---------------------------------------------------------------------------
+# Grid
+# ---------------------------------------------------------------------------
+
+class TestGrid:
+
+    def test_first_axis_varies_slowest(self, pair):
+        source, _ = pair
+        seq = QSequencer()
+        seq.addSetpoints(source, 'frequency', [1., 2.])
+        seq.addSetpoints(source, 'amplitude', [10., 20., 30.])
+        grid = seq.grid()
+        assert grid.shape == (6, 2)
+        assert list(grid[:, 0]) == [1., 1., 1., 2., 2., 2.]
+        assert list(grid[:3, 1]) == [10., 20., 30.]
+
+    def test_label_conflict_rejected(self, pair):
+        source, meter = pair
+        seq = QSequencer()
+        seq.addSetpoints(source, 'frequency', [1.], label='a')
+        with pytest.raises(ValueError):
+            seq.addReadout(meter, 'x', label='a')
+
+    def test_readout_of_setpoint_needs_own_label(self, pair):
+        source, _ = pair
+        seq = QSequencer()
+        seq.addSetpoints(source, 'frequency', [1.])
+        with pytest.raises(ValueError):
+            seq.addReadout(source, 'frequency')
+        seq.addReadout(source, 'frequency', label='readback')
+
+
+# ---------------------------------------------------------------------------
+# Running
+# ---------------------------------------------------------------------------
+
+class TestRun:
+
+    def test_results_hold_setpoints_and_readings(self, pair):
+        source, meter = pair
+        seq = QSequencer()
+        seq.addSetpoints(source, 'frequency', [1., 2.], label='src')
+        seq.addSetpoints(source, 'amplitude', [10., 20.], label='src')
+        seq.addReadout(meter, ['x', 'report'], label='meter')
+        data = seq.run()
+        assert list(data['src']['frequency']) == [1., 1., 2., 2.]
+        assert list(data['meter']['x']) == [10., 20., 20., 40.]
+        assert data['meter']['report'].shape == (4, 3)
+        assert all(np.diff(data['t']) > 0)
+
+    def test_only_changed_setpoints_written(self, pair):
+        source, meter = pair
+        seq = QSequencer()
+        seq.addSetpoints(source, 'frequency', [1., 2.])
+        seq.addSetpoints(source, 'amplitude', [10., 20., 30.])
+        seq.addReadout(meter, 'x')
+        seq.run()
+        assert source.writes.count('frequency') == 2
+        assert source.writes.count('amplitude') == 6
+
+    def test_explicit_points(self, pair):
+        source, meter = pair
+        seq = QSequencer()
+        seq.addSetpoints(source, 'frequency', [])
+        seq.addReadout(meter, 'x')
+        data = seq.run(np.array([3., 1., 2.]))
+        assert list(data['Source']['frequency']) == [3., 1., 2.]
+
+    def test_settle_time_honoured(self, pair):
+        source, meter = pair
+        meter.SETTLE = 0.02
+        seq = QSequencer()
+        seq.addSetpoints(source, 'frequency', [1., 2., 3.])
+        seq.addReadout(meter, 'x')
+        start = time.monotonic()
+        seq.run()
+        assert time.monotonic() - start >= 0.06
+
+    def test_settle_metadata_honoured(self, pair):
+        source, meter = pair
+        source.registerProperty('frequency', getter=lambda: 0.,
+                                setter=lambda v: None, settle=0.03)
+        seq = QSequencer()
+        seq.addSetpoints(source, 'frequency', [1., 2.])
+        seq.addReadout(meter, 'x')
+        start = time.monotonic()
+        seq.run()
+        assert time.monotonic() - start >= 0.06
+
+    def test_step_signal(self, pair, qtbot):
+        source, meter = pair
+        seq = QSequencer()
+        seq.addSetpoints(source, 'frequency', [1., 2.])
+        steps = []
+        seq.stepFinished.connect(lambda k, n: steps.append((k, n)))
+        seq.run()
+        assert steps == [(0, 2), (1, 2)]
+
+    def test_failed_first_readout_is_nan(self, pair):
+        source, meter = pair
+        replies = iter([RuntimeError('no reply'), 5.])
+
+        def report():
+            reply = next(replies)
+            if isinstance(reply, Exception):
+                raise reply
+            return reply
+        meter.report = report
+        seq = QSequencer()
+        seq.addSetpoints(source, 'frequency', [1., 2.])
+        seq.addReadout(meter, ['report'], label='meter')
+        data = seq.run()
+        assert len(data) == 2
+        assert np.isnan(data['meter']['report'][0])
+        assert data['meter']['report'][1] == 5.
+
+    def test_abort_returns_completed_steps(self, pair):
+        source, meter = pair
+        seq = QSequencer()
+        seq.addSetpoints(source, 'frequency', [1., 2., 3.])
+        seq.addReadout(meter, 'x')
+        seq.stepFinished.connect(lambda k, n: k == 1 and seq.abort())
+        assert len(seq.run()) == 2
+
+    def test_timeout_returns_completed_steps(self, threaded):
+        source, meter = threaded
+        seq = QSequencer(timeout=200)
+        seq.addSetpoints(source, 'frequency', [1., 2., 3.])
+        seq.addReadout(meter, 'x')
+        seq.stepFinished.connect(
+            lambda k, n: setattr(meter, 'DELAY', 0.5))
+        assert len(seq.run()) == 1
+
+    def test_worker_io_overlaps(self, threaded):
+        source, meter = threaded
+        seq = QSequencer()
+        seq.addSetpoints(source, 'frequency', [1., 2., 3., 4.])
+        seq.addReadout(meter, 'x')
+        seq.addReadout(source, 'frequency', label='readback')
+        start = time.monotonic()
+        data = seq.run()
+        elapsed = time.monotonic() - start
+        # four writes and four overlapped reads, 30 ms each
+        assert elapsed < 4 * 3 * 0.03
+        assert list(data['readback']['frequency']) == [1., 2., 3., 4.]
+
+
+# ---------------------------------------------------------------------------
+# Step graph
+# ---------------------------------------------------------------------------
+
+class TestActions:
+
+    def test_action_runs_between_write_and_read(self, pair):
+        source, meter = pair
+        events = []
+        meter.registerProperty(
+            'x', setter=None,
+            getter=lambda: events.append('read') or meter._read())
+        seq = QSequencer()
+        seq.addSetpoints(source, 'frequency', [1., 2.])
+        seq.addReadout(meter, 'x')
+        seq.addAction(meter, 'autorange',
+                      lambda: events.append(('autorange',
+                                             source.writes[-1])))
+        seq.addAction(meter, 'log', lambda: events.append('log'),
+                      after=['read'])
+        seq.run()
+        assert events == [('autorange', 'frequency'), 'read', 'log'] * 2
+
+    def test_action_defaults_to_method(self, pair):
+        source, meter = pair
+        meter.calls = 0
+        meter.trigger = lambda: setattr(meter, 'calls', meter.calls + 1)
+        seq = QSequencer()
+        seq.addSetpoints(source, 'frequency', [1., 2., 3.])
+        seq.addAction(meter, 'trigger')
+        seq.run()
+        assert meter.calls == 3
+
+    def test_unknown_and_duplicate_nodes_rejected(self, pair):
+        _, meter = pair
+        seq = QSequencer()
+        with pytest.raises(ValueError):
+            seq.addAction(meter, 'a', lambda: None, after=['b'])
+        seq.addAction(meter, 'a', lambda: None)
+        with pytest.raises(ValueError):
+            seq.addAction(meter, 'a', lambda: None)
+        with pytest.raises(ValueError):
+            seq.addAction(meter, 'read', lambda: None)
+
+    def test_layers(self, pair):
+        _, meter = pair
+        seq = QSequencer()
+        seq.addAction(meter, 'open', lambda: None, after=())
+        seq.addAction(meter, 'range', lambda: None)
+        seq.addAction(meter, 'close', lambda: None, after=['read'])
+        assert seq._layers() == [['write', 'open'], ['range'],
+                                 ['read'], ['close']]
+
+    def test_independent_action_overlaps_writes(self, threaded):
+        source, meter = threaded
+        seq = QSequencer()
+        seq.addSetpoints(source, 'frequency', [1., 2., 3., 4.])
+        seq.addAction(meter, 'wait', lambda: time.sleep(0.03), after=())
+        start = time.monotonic()
+        seq.run()
+        # four writes overlapped with four 30 ms actions
+        assert time.monotonic() - start < 4 * 2 * 0.03
@@ -3,6 +3,8 @@ import pytest
 from unittest.mock import patch, MagicMock
 from qtpy.QtSerialPort import QSerialPortInfo
 from lib.QSerialInstrument import QSerialInstrument
+from lib.ResponseParser import ResponseParser
+from QInstrument.lib.Tracer import tracer
 
 
 class AlwaysIdentifies(QSerialInstrument):
@@ -169,3 +171,331 @@ class TestHelpers:
     def test_expect_returns_false_when_response_does_not_match(self, inst):
         with patch.object(inst._interface, 'receive', return_value='OTHER'):
             assert inst.expect('*IDN?', 'DS345') is False
+
+    def test_getValues_reads_raw_bytes(self, inst):
+        parser = ResponseParser(float, count=2)
+        with patch.object(inst._interface, 'receive',
+                          return_value=b'1.5,2') as receive:
+            assert inst.getValues('SNAP?', parser) == (1.5, 2.)
+        receive.assert_called_once_with(raw=True)
+
+    def test_getValues_returns_none_on_parse_failure(self, inst):
+        parser = ResponseParser(float)
+        with patch.object(inst._interface, 'receive', return_value=b''):
+            assert inst.getValues('SNAP?', parser) is None
+
+
+# ---------------------------------------------------------------------------
+# Desync recovery
+# ---------------------------------------------------------------------------
+
+class Line:
+    '''Stand-in serial interface that can drop or delay replies.
+
+    Each query is answered from *answers*.  Queries listed in *drop*
+    time out; their replies stay in the input buffer and are read as
+    the answer to the next query unless the buffer is purged.
+    '''
+
+    timeout = 1
+
+    def __init__(self, answers, drop=(), alive=True):
+        self.answers = answers
+        self.drop = list(drop)
+        self.alive = alive
+        self.buffer = []
+        self.sent = []
+        self.breaks = 0
+        self.waits = []
+        self.timedOut = False
+
+    def transmit(self, data):
+        self.sent.append(data)
+        if self.alive and data in self.answers:
+            self.buffer.append(self.answers[data])
+
+    def receive(self, raw=False, **kwargs):
+        self.waits.append(self.timeout)
+        query = self.sent[-1]
+        self.timedOut = not self.buffer or query in self.drop
+        if query in self.drop:
+            self.drop.remove(query)
+            return b'' if raw else ''
+        reply = self.buffer.pop(0) if self.buffer else ''
+        return reply.encode() if raw else reply
+
+    def purge(self, settle=0):
+        self.buffer.clear()
+
+    def sendbreak(self, duration=250):
+        self.breaks += 1
+
+    def isOpen(self):
+        return True
+
+
+class Identifies(QSerialInstrument):
+
+    RETRY_DELAY = 0
+
+    def identify(self):
+        return self.expect('*IDN?', 'DS345')
+
+
+@pytest.fixture
+def synced(qtbot):
+    def make(**kwargs):
+        inst = Identifies()
+        inst._interface = Line({'*IDN?': 'DS345', 'FREQ?': '1000.5',
+                                'SNAP?': '1,2,3'}, **kwargs)
+        inst._synced = True
+        return inst
+    return make
+
+
+class TestRecovery:
+
+    def test_clean_query_is_not_repeated(self, synced):
+        inst = synced()
+        assert inst.getValue('FREQ?') == 1000.5
+        assert inst._interface.sent == ['FREQ?']
+        assert inst.recoveryStats()['recoveries'] == 0
+
+    def test_timeout_is_recovered(self, synced):
+        inst = synced(drop=['FREQ?'])
+        assert inst.getValue('FREQ?') == 1000.5
+        assert inst._interface.sent == ['FREQ?', '*IDN?', 'FREQ?']
+        stats = inst.recoveryStats()
+        assert stats['timeouts'] == 1
+        assert stats['recoveries'] == 1
+
+    def test_late_reply_does_not_shift_later_queries(self, synced):
+        inst = synced(drop=['*IDN?'])
+        assert inst.handshake('*IDN?') == 'DS345'
+        assert inst.getValue('FREQ?') == 1000.5
+
+    def test_stale_reply_is_a_mismatch(self, synced):
+        inst = synced()
+        inst._interface.buffer.append('DS345')
+        assert inst.getValue('FREQ?') == 1000.5
+        assert inst.recoveryStats()['mismatches'] == 1
+
+    def test_parser_failure_is_a_mismatch(self, synced):
+        inst = synced()
+        inst._interface.buffer.append('DS345')
+        assert inst.getValues('SNAP?', ResponseParser(int)) == (1, 2, 3)
+        assert inst.recoveryStats()['mismatches'] == 1
+
+    def test_parse_failures_are_counted_per_instance(self, synced):
+        parser = ResponseParser(int)
+        first, second = synced(), synced(alive=False)
+        first._interface.buffer.append('DS345')
+        first.getValues('SNAP?', parser)
+        second.getValues('SNAP?', parser)
+        assert first.recoveryStats()['unparsed'] == 1
+        assert second.recoveryStats()['unparsed'] == 0
+
+    def test_dead_instrument_fails_once_recovery_fails(self, synced):
+        inst = synced(alive=False)
+        assert inst.getValue('FREQ?') is None
+        assert inst._interface.sent == ['FREQ?', '*IDN?']
+        stats = inst.recoveryStats()
+        assert stats['failures'] == 1
+        assert stats['recoveries'] == 0
+
+    def test_retries_are_bounded(self, synced):
+        inst = synced()
+        inst.RETRIES = 3
+        assert inst.getValue('*IDN?') is None
+        assert inst._interface.sent.count('*IDN?') == 4 + 3
+        assert inst.recoveryStats() == {'timeouts': 0, 'mismatches': 4,
+                                         'recoveries': 3, 'failures': 1,
+                                         'unparsed': 0}
+
+    def test_command_without_retry_is_sent_once(self, synced):
+        inst = synced(drop=['FREQ?'])
+        assert inst.handshake('FREQ?', retry=False) == ''
+        assert inst._interface.sent == ['FREQ?', '*IDN?']
+        assert inst.getValue('FREQ?') == 1000.5
+        stats = inst.recoveryStats()
+        assert stats['recoveries'] == 1
+        assert stats['failures'] == 1
+
+    def test_break_is_sent_when_configured(self, synced):
+        inst = synced(drop=['FREQ?'])
+        inst.BREAK_DURATION = 1
+        inst.getValue('FREQ?')
+        assert inst._interface.breaks == 1
+
+    def test_unidentified_instrument_is_not_recovered(self, inst):
+        with patch.object(inst._interface, 'receive', return_value='bad'):
+            assert inst.getValue('FREQ?') is None
+        assert inst.recoveryStats()['mismatches'] == 0
+
+    def test_counters_are_per_instance(self, synced):
+        first, second = synced(drop=['FREQ?']), synced()
+        first.getValue('FREQ?')
+        assert second.recoveryStats()['timeouts'] == 0
+
+
+# ---------------------------------------------------------------------------
+# Adaptive timeouts
+# ---------------------------------------------------------------------------
+
+class TestTimeouts:
+
+    @pytest.mark.parametrize('data, mnemonic', [
+        ('FREQ?', 'FREQ'), ('SNAP?9,3,4', 'SNAP'), ('*RST', '*RST'),
+        ('SDC 50.0', 'SDC'), ('X,1,1', 'X'), ('getSTATE', 'getSTATE'),
+        ('FREQ?;AMPL?', 'FREQ;AMPL')])
+    def test_mnemonic(self, data, mnemonic):
+        assert QSerialInstrument.mnemonic(data) == mnemonic
+
+    def fill(self, inst, mnemonic, latency, count=None):
+        histogram = inst.latency(mnemonic)
+        for _ in range(count or inst.TIMEOUT_SAMPLES):
+            histogram.add(latency)
+
+    def test_port_timeout_until_enough_samples(self, synced):
+        inst = synced()
+        self.fill(inst, 'FREQ', 0.1, inst.TIMEOUT_SAMPLES - 1)
+        assert inst.timeoutFor('FREQ?') == inst._interface.timeout
+
+    def test_adapts_to_latency(self, synced):
+        inst = synced()
+        self.fill(inst, 'FREQ', 0.1)
+        assert inst.timeoutFor('FREQ?') == 300
+
+    def test_floor_and_ceiling(self, synced):
+        inst = synced()
+        self.fill(inst, 'FREQ', 1e-4)
+        self.fill(inst, 'SNAP', 10.)
+        assert inst.timeoutFor('FREQ?') == inst.TIMEOUT_FLOOR
+        assert inst.timeoutFor('SNAP?') == inst.TIMEOUT_CEILING
+
+    def test_override(self, synced):
+        inst = synced()
+        inst.TIMEOUTS = {'FREQ': 700}
+        self.fill(inst, 'FREQ', 0.001)
+        assert inst.timeoutFor('FREQ?') == 700
+
+    def test_excluded_command_keeps_port_timeout(self, synced):
+        inst = synced()
+        inst.TIMEOUT_EXCLUDE = frozenset({'FREQ'})
+        self.fill(inst, 'FREQ', 0.001)
+        assert inst.timeoutFor('FREQ?') == inst._interface.timeout
+
+    def test_slow_command_extends_next_reply(self, synced):
+        inst = synced()
+        inst.TIMEOUTS = {'AGAN': 500}
+        self.fill(inst, 'FREQ', 0.001)
+        inst.transmit('AGAN')
+        assert 400 < inst.timeoutFor('FREQ?') <= 500
+
+    def test_exchange_applies_and_restores_timeout(self, synced):
+        inst = synced()
+        self.fill(inst, 'FREQ', 0.01)
+        assert inst.getValue('FREQ?') == 1000.5
+        assert inst._interface.waits == [30]
+        assert inst._interface.timeout == Line.timeout
+
+    def test_valid_replies_are_recorded(self, synced):
+        inst = synced()
+        inst.getValue('FREQ?')
+        assert inst.latency('FREQ').count == 1
+
+    def test_timed_out_replies_are_not_recorded(self, synced):
+        inst = synced(alive=False)
+        inst.getValue('FREQ?')
+        assert inst.latency('FREQ').count == 0
+
+    def test_batch_is_timed_apart_from_its_first_command(self, synced):
+        inst = synced()
+        inst._interface.answers['FREQ?;SNAP?'] = '1000.5'
+        self.fill(inst, 'FREQ', 0.001)
+        assert inst.timeoutFor('FREQ?;SNAP?') == inst._interface.timeout
+        assert inst.handshake('FREQ?;SNAP?') == '1000.5'
+        assert inst.latency('FREQ').count == inst.TIMEOUT_SAMPLES
+        assert inst.latency('FREQ;SNAP').count == 1
+
+    def test_latencies_are_per_instance(self, synced):
+        first, second = synced(), synced()
+        first.getValue('FREQ?')
+        assert second.latency('FREQ').count == 0
+
+
+class TestStats:
+
+    def test_disabled_by_default(self, synced):
+        inst = synced()
+        inst.getValue('FREQ?')
+        assert not inst.statsEnabled()
+        assert inst.stats() == {}
+
+    def test_records_exchange(self, synced):
+        inst = synced()
+        inst.setStatsEnabled(True)
+        assert inst.getValue('FREQ?') == 1000.5
+        command = inst.stats()['commands']['FREQ']
+        assert command['count'] == 1
+        assert command['replies'] == 1
+        assert command['sent'] == len('FREQ?')
+        assert command['received'] == len('1000.5')
+
+    def test_counts_timeouts_and_errors(self, synced):
+        inst = synced(drop=['FREQ?'])
+        inst._interface.answers['SNAP?'] = 'garbled'
+        inst.setStatsEnabled(True)
+        inst.getValue('FREQ?')
+        inst.getValues('SNAP?', ResponseParser(float, count=3))
+        commands = inst.stats()['commands']
+        assert commands['FREQ']['timeouts'] == 1
+        assert commands['SNAP']['errors'] == inst.RETRIES + 1
+
+    def test_reenabling_keeps_counts(self, synced):
+        inst = synced()
+        inst.setStatsEnabled(True)
+        inst.getValue('FREQ?')
+        inst.setStatsEnabled(True)
+        assert inst.stats()['commands']['FREQ']['count'] == 1
+        inst.resetStats()
+        assert inst.stats()['commands'] == {}
+
+    def test_updates_are_throttled(self, synced):
+        inst = synced()
+        inst.setStatsEnabled(True)
+        reports = []
+        inst.statsUpdated.connect(reports.append)
+        for _ in range(3):
+            inst.getValue('FREQ?')
+        assert len(reports) == 1
+        inst.STATS_INTERVAL = 0
+        inst.resetStats()
+        inst.getValue('FREQ?')
+        assert len(reports) == 3
+        assert reports[-1]['commands']['FREQ']['replies'] == 1
+
+
+class TestTrace:
+
+    @pytest.fixture
+    def recording(self):
+        tracer.start()
+        yield tracer
+        tracer.stop()
+        tracer.clear()
+
+    def test_exchange_is_traced(self, synced, recording):
+        inst = synced()
+        inst.getValue('FREQ?')
+        event, = (e for e in recording.events() if e['ph'] == 'X')
+        assert event['name'] == 'FREQ?'
+        assert event['cat'] == 'serial'
+        assert event['args']['instrument'] == 'Identifies'
+
+    def test_recovery_is_traced(self, synced, recording):
+        inst = synced(drop=['FREQ?'])
+        inst.getValue('FREQ?')
+        names = [e['name'] for e in recording.events() if e['ph'] == 'X']
+        assert names[:2] == ['FREQ?', '*IDN?']
+        assert 'recover' in names
@@ -1,4 +1,6 @@
 import logging
+import os
+import sys
 import pytest
 from unittest.mock import patch
 
@@ -137,6 +139,26 @@ class TestReceive:
     def test_returns_up_to_first_eol(self, mock_read, mock_avail, iface):
         assert iface.receive() == 'A'
 
+    @patch.object(QSerialInterface, 'bytesAvailable',
+                  side_effect=[True, False])
+    @patch.object(QSerialInterface, 'readAll', return_value=b'A\nB\nC\n')
+    def test_keeps_replies_after_eol(self, mock_read, mock_avail, iface):
+        assert [iface.receive() for _ in range(3)] == ['A', 'B', 'C']
+        assert iface.timedOut is False
+        mock_read.assert_called_once()
+
+    @patch.object(QSerialInterface, 'bytesAvailable', return_value=False)
+    def test_timeout_sets_timedOut(self, mock_avail, iface_fast):
+        iface_fast.receive()
+        assert iface_fast.timedOut is True
+
+    @patch.object(QSerialInterface, 'bytesAvailable', return_value=True)
+    @patch.object(QSerialInterface, 'readAll', return_value=b'HELLO\n')
+    def test_reply_clears_timedOut(self, mock_read, mock_avail, iface):
+        iface.timedOut = True
+        iface.receive()
+        assert iface.timedOut is False
+
 
 # ---------------------------------------------------------------------------
 # readn
@@ -180,3 +202,84 @@ class TestOpen:
 
     def test_none_port_returns_false(self, iface):
         assert iface.open(None) is False
+
+
+# ---------------------------------------------------------------------------
+# purge / sendbreak
+# ---------------------------------------------------------------------------
+
+class TestPurge:
+
+    @patch.object(QSerialInterface, 'isOpen', return_value=True)
+    @patch.object(QSerialInterface, 'clear')
+    @patch.object(QSerialInterface, 'waitForReadyRead',
+                  side_effect=[True, False])
+    @patch.object(QSerialInterface, 'readAll', side_effect=[b'A\n', b'B\n'])
+    def test_discards_late_input(self, mock_read, mock_wait, mock_clear,
+                                 mock_open, iface):
+        assert iface.purge(10) == b'A\nB\n'
+        mock_clear.assert_called_once()
+
+    @patch.object(QSerialInterface, 'isOpen', return_value=False)
+    def test_closed_returns_empty(self, mock_open, iface):
+        assert iface.purge(10) == b''
+
+    @patch.object(QSerialInterface, 'isOpen', return_value=False)
+    def test_discards_pending_replies(self, mock_open, iface):
+        iface._pending = b'B\n'
+        assert iface.purge() == b'B\n'
+        assert iface._pending == b''
+
+
+class TestSendbreak:
+
+    @patch.object(QSerialInterface, 'isOpen', return_value=True)
+    @patch.object(QSerialInterface, 'setBreakEnabled')
+    def test_break_ends_before_return(self, mock_break, mock_open, iface):
+        iface.sendbreak(1)
+        assert [c.args for c in mock_break.call_args_list] == [
+            (True,), (False,)]
+
+
+# ---------------------------------------------------------------------------
+# Framing on a real port
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def loopback(qtbot):
+    '''QSerialInterface opened on a pseudo-terminal, and its far end.'''
+    if sys.platform == 'win32':
+        pytest.skip('pseudo-terminals are not available on Windows')
+    import tty
+    master, slave = os.openpty()
+    tty.setraw(master)
+    tty.setraw(slave)
+    iface = QSerialInterface(eol='\n', timeout=1000)
+    if not iface.open(os.ttyname(slave)):
+        os.close(master)
+        os.close(slave)
+        pytest.skip('could not open pseudo-terminal')
+    yield iface, master
+    iface.close()
+    os.close(master)
+    os.close(slave)
+
+
+class TestFraming:
+
+    def test_replies_in_one_read(self, loopback):
+        iface, master = loopback
+        os.write(master, b'1.0\n2.0\n3.0\n')
+        replies = []
+        for _ in range(3):
+            replies.append(iface.receive())
+            assert iface.timedOut is False
+        assert replies == ['1.0', '2.0', '3.0']
+
+    def test_reply_split_across_reads(self, loopback):
+        iface, master = loopback
+        os.write(master, b'1.')
+        iface.waitForReadyRead(1000)
+        os.write(master, b'0\n2.0\n')
+        assert iface.receive() == '1.0'
+        assert iface.receive() == '2.0'
@@ -0,0 +1,149 @@
+import time
+import numpy as np
+import pytest
+from qtpy import QtCore
+from lib.QSnapshot import QSnapshot
+from lib.QFakeInstrument import QFakeInstrument
+
+
+class SlowDevice(QFakeInstrument):
+    '''Fake device whose reads take DELAY seconds.'''
+
+    DELAY = 0.
+
+    def _registerProperties(self):
+        self._level = 1.
+        self.registerProperty(
+            'level', getter=self._read,
+            setter=lambda v: setattr(self, '_level', float(v)))
+        self.registerProperty('xy', getter=lambda: [1., 2.], setter=None,
+                              ptype=list)
+
+    def _read(self):
+        time.sleep(self.DELAY)
+        return self._level
+
+
+@pytest.fixture
+def threaded(qtbot):
+    '''Two slow devices, each on its own worker thread.'''
+    threads, devices = [], []
+    for _ in range(2):
+        device = SlowDevice()
+        device.DELAY = 0.05
+        thread = QtCore.QThread()
+        device.moveToThread(thread)
+        thread.start()
+        threads.append(thread)
+        devices.append(device)
+    yield devices
+    for thread in threads:
+        thread.quit()
+        thread.wait()
+
+
+# ---------------------------------------------------------------------------
+# Single snapshots
+# ---------------------------------------------------------------------------
+
+class TestSnapshot:
+
+    def test_record_holds_values_and_timing(self, qtbot):
+        snap = QSnapshot()
+        snap.addInstrument(SlowDevice(), ['level', 'xy'], label='a')
+        record = snap.snapshot()
+        assert record['a']['level'] == 1.
+        assert record['a']['xy'] == [1., 2.]
+        assert record['a']['skew'] == pytest.approx(0.)
+        assert record['a']['latency'] >= 0.
+        assert record['t'] <= time.monotonic()
+
+    def test_reads_emit_property_values(self, qtbot):
+        device = SlowDevice()
+        snap = QSnapshot()
+        snap.addInstrument(device, ['level'])
+        with qtbot.waitSignal(device.propertyValue):
+            snap.snapshot()
+
+    def test_skews_average_to_zero(self, qtbot):
+        snap = QSnapshot()
+        snap.addInstrument(SlowDevice(), ['level'], label='a')
+        snap.addInstrument(SlowDevice(), ['level'], label='b')
+        record = snap.snapshot()
+        assert record['a']['skew'] + record['b']['skew'] == \
+            pytest.approx(0., abs=1e-9)
+
+    def test_worker_reads_overlap(self, threaded):
+        snap = QSnapshot()
+        for n, device in enumerate(threaded):
+            snap.addInstrument(device, ['level'], label=f'd{n}')
+        start = time.monotonic()
+        record = snap.snapshot()
+        elapsed = time.monotonic() - start
+        assert elapsed < 0.09
+        assert abs(record['d0']['skew']) < 0.02
+        assert record['d0']['level'] == record['d1']['level'] == 1.
+
+    def test_timeout_fills_missing_instrument(self, threaded):
+        threaded[1].DELAY = 0.5
+        snap = QSnapshot(timeout=100)
+        for n, device in enumerate(threaded):
+            snap.addInstrument(device, ['level'], label=f'd{n}')
+        record = snap.snapshot()
+        assert record['d0']['level'] == 1.
+        assert record['d1']['level'] is None
+        assert np.isnan(record['d1']['skew'])
+
+    def test_reserved_and_duplicate_names_rejected(self, qtbot):
+        snap = QSnapshot()
+        snap.addInstrument(SlowDevice(), ['level'], label='a')
+        with pytest.raises(ValueError):
+            snap.addInstrument(SlowDevice(), ['level'], label='a')
+        with pytest.raises(ValueError):
+            snap.addInstrument(SlowDevice(), ['skew'], label='b')
+
+    def test_remove_instrument(self, qtbot):
+        snap = QSnapshot()
+        snap.addInstrument(SlowDevice(), ['level'], label='a')
+        snap.removeInstrument('a')
+        assert snap.labels == []
+        assert snap.snapshot() == {'t': pytest.approx(np.nan,
+                                                     nan_ok=True)}
+
+
+# ---------------------------------------------------------------------------
+# Repeated acquisition
+# ---------------------------------------------------------------------------
+
+class TestAcquire:
+
+    def test_structured_array(self, qtbot):
+        snap = QSnapshot()
+        snap.addInstrument(SlowDevice(), ['level', 'xy'], label='a')
+        data = snap.acquire(5)
+        assert data.shape == (5,)
+        assert list(data['a']['level']) == [1.] * 5
+        assert data['a']['xy'].shape == (5, 2)
+        assert all(np.diff(data['t']) > 0)
+
+    def test_fixed_interval(self, qtbot):
+        snap = QSnapshot()
+        snap.addInstrument(SlowDevice(), ['level'], label='a')
+        data = snap.acquire(4, interval=20)
+        assert np.diff(data['t']) == pytest.approx([0.02] * 3, abs=0.01)
+
+    def test_first_snapshot_timed_out(self, threaded):
+        device = threaded[0]
+        delays = iter([0.2])
+        device._read = lambda: time.sleep(next(delays, 0.)) or 1.
+        device.registerProperty('level', getter=device._read, setter=None)
+        snap = QSnapshot(timeout=100)
+        snap.addInstrument(device, ['level', 'xy'], label='a')
+        data = snap.acquire(3, interval=300)
+        assert np.isnan(data['a']['level'][0])
+        assert np.isnan(data['a']['xy'][0]).all()
+        assert data['a']['xy'].shape == (3, 2)
+        assert data['a']['xy'][1:].tolist() == [[1., 2.], [1., 2.]]
+
+    def test_zero_count(self, qtbot):
+        assert len(QSnapshot().acquire(0)) == 0
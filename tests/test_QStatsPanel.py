@@ -0,0 +1,110 @@
+import pytest
+from qtpy import QtCore
+from lib.QSerialInstrument import QSerialInstrument
+from lib.QStatsPanel import QStatsPanel
+
+
+def _command(count, p99, timeouts=0, errors=0):
+    return {'count': count, 'replies': count, 'sent': 0, 'received': 0,
+            'timeouts': timeouts, 'errors': errors, 'busy': 0.,
+            'mean': p99, 'p50': p99, 'p99': p99, 'max': p99}
+
+
+REPORT = {'elapsed': 10., 'busy': 2.5, 'utilization': 0.25,
+          'commands': {'FREQ': _command(10, 0.012),
+                       'SNAP': _command(5, 0.030, timeouts=1),
+                       'AGAN': _command(1, 4.2, errors=2)}}
+
+
+@pytest.fixture
+def panel(qtbot):
+    w = QStatsPanel()
+    qtbot.addWidget(w)
+    return w
+
+
+@pytest.fixture
+def device(qtbot):
+    return QSerialInstrument()
+
+
+def _row(item):
+    return [item.text(column) for column in range(item.columnCount())]
+
+
+class TestQStatsPanel:
+
+    def test_add_and_remove(self, panel, device):
+        panel.addInstrument('SR830', device)
+        assert panel.names == ['SR830']
+        assert panel._tree.topLevelItemCount() == 1
+        panel.removeInstrument('SR830')
+        assert panel.names == []
+        assert panel._tree.topLevelItemCount() == 0
+
+    def test_ignores_devices_without_stats(self, panel):
+        panel.addInstrument('Widget', object())
+        assert panel.names == []
+
+    def test_show_enables_and_hide_disables(self, panel, device):
+        panel.addInstrument('SR830', device)
+        assert not device.statsEnabled()
+        panel.show()
+        assert device.statsEnabled()
+        panel.hide()
+        assert not device.statsEnabled()
+
+    def test_added_while_visible_is_enabled(self, panel, device):
+        panel.show()
+        panel.addInstrument('SR830', device)
+        assert device.statsEnabled()
+
+    def test_update_fills_rows(self, panel, device):
+        panel.addInstrument('SR830', device)
+        device.statsUpdated.emit(REPORT)
+        item = panel._tree.topLevelItem(0)
+        assert _row(item) == ['SR830', '25.0 %', '16', '4200.0', '1', '2']
+        assert [item.child(i).text(0) for i in range(item.childCount())] \
+            == ['AGAN', 'SNAP', 'FREQ']
+        assert _row(item.child(1)) == ['SNAP', '', '5', '30.0', '1', '0']
+
+    def test_lists_slowest_commands(self, panel, device):
+        panel.SLOWEST = 2
+        panel.addInstrument('SR830', device)
+        device.statsUpdated.emit(REPORT)
+        assert panel._tree.topLevelItem(0).childCount() == 2
+
+    def test_clear_disables(self, panel, device):
+        panel.show()
+        panel.addInstrument('SR830', device)
+        panel.clear()
+        assert panel.names == []
+        assert not device.statsEnabled()
+
+    def test_hide_keeps_stats_enabled_elsewhere(self, panel, device):
+        device.setStatsEnabled(True)
+        panel.addInstrument('SR830', device)
+        panel.show()
+        panel.hide()
+        assert device.statsEnabled()
+        panel.removeInstrument('SR830')
+        assert device.statsEnabled()
+
+    def test_calls_run_on_device_thread(self, panel, device, qtbot):
+        thread = QtCore.QThread()
+        device.moveToThread(thread)
+        thread.start()
+        try:
+            calls = []
+            device.resetStats = lambda: calls.append(
+                QtCore.QThread.currentThread())
+            panel.addInstrument('SR830', device)
+            panel.show()
+            qtbot.waitUntil(device.statsEnabled)
+            panel.resetStats()
+            qtbot.waitUntil(lambda: calls == [thread])
+            panel.hide()
+            qtbot.waitUntil(lambda: not device.statsEnabled())
+        finally:
+            thread.quit()
+            thread.wait()
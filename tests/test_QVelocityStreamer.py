@@ -0,0 +1,109 @@
+import threading
+import time
+import numpy as np
+import pytest
+from qtpy import QtCore
+from lib.QVelocityStreamer import QVelocityStreamer
+
+
+class Stage(QtCore.QObject):
+    '''Records velocity commands, each taking *delay* seconds.'''
+
+    def __init__(self, delay=0.):
+        super().__init__()
+        self.delay = delay
+        self.commands = []
+        self.threads = set()
+
+    def set_velocity(self, velocity):
+        self.threads.add(threading.get_ident())
+        time.sleep(self.delay)
+        self.commands.append(list(velocity))
+
+
+@pytest.fixture
+def stage(qtbot):
+    return Stage()
+
+
+@pytest.fixture
+def threaded():
+    stage = Stage(delay=0.02)
+    thread = QtCore.QThread()
+    stage.moveToThread(thread)
+    thread.start()
+    yield stage
+    thread.quit()
+    thread.wait()
+
+
+# ---------------------------------------------------------------------------
+# Rate limiting and deadband
+# ---------------------------------------------------------------------------
+
+class TestSampling:
+
+    def test_first_value_sent_at_once(self, stage):
+        streamer = QVelocityStreamer(stage)
+        streamer.setVelocity([10., 0.])
+        assert stage.commands == [[10., 0.]]
+
+    def test_burst_sends_latest_at_control_rate(self, qtbot, stage):
+        streamer = QVelocityStreamer(stage, interval=20)
+        for v in range(1, 11):
+            streamer.setVelocity([float(v), 0.])
+        assert stage.commands == [[1., 0.]]
+        qtbot.waitUntil(lambda: len(stage.commands) == 2, timeout=500)
+        assert stage.commands[-1] == [10., 0.]
+
+    def test_deadband_suppresses_small_changes(self, qtbot, stage):
+        streamer = QVelocityStreamer(stage, interval=10, deadband=2.)
+        streamer.setVelocity([10., 0.])
+        streamer.setVelocity([11., 1.])
+        qtbot.wait(50)
+        assert stage.commands == [[10., 0.]]
+        streamer.setVelocity([13., 0.])
+        qtbot.waitUntil(lambda: len(stage.commands) == 2, timeout=500)
+
+    def test_release_sends_zero_at_once(self, stage):
+        streamer = QVelocityStreamer(stage, deadband=100.)
+        streamer.setVelocity([10., 0.])
+        streamer.setVelocity([0., 0.])
+        assert stage.commands == [[10., 0.], [0., 0.]]
+        assert not streamer._timer.isActive()
+
+    def test_repeated_zero_not_resent(self, stage):
+        streamer = QVelocityStreamer(stage)
+        streamer.setVelocity([0., 0.])
+        streamer.setVelocity([0., 0.])
+        assert stage.commands == [[0., 0.]]
+
+    def test_stop_sends_zero(self, stage):
+        streamer = QVelocityStreamer(stage)
+        streamer.setVelocity([5., 5.])
+        assert streamer.stop()
+        assert stage.commands[-1] == [0., 0.]
+
+
+# ---------------------------------------------------------------------------
+# Worker thread: one command in flight, latest value wins
+# ---------------------------------------------------------------------------
+
+class TestWorker:
+
+    def test_commands_run_on_device_thread(self, qtbot, threaded):
+        streamer = QVelocityStreamer(threaded)
+        streamer.setVelocity([1., 2.])
+        assert streamer.stop()
+        assert threading.get_ident() not in threaded.threads
+
+    def test_busy_device_gets_latest_value(self, qtbot, threaded):
+        streamer = QVelocityStreamer(threaded, interval=1)
+        for v in range(1, 51):
+            streamer.setVelocity([float(v), 0.])
+            qtbot.wait(1)
+        streamer.setVelocity([0., 0.])
+        assert streamer._idle.wait(2.)
+        assert threaded.commands[-1] == [0., 0.]
+        assert len(threaded.commands) < 25
+        assert streamer.dropped > 0
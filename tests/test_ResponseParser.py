@@ -0,0 +1,120 @@
+import logging
+import numpy as np
+import pytest
+from lib.ResponseParser import ResponseParser
+
+
+# ---------------------------------------------------------------------------
+# Values
+# ---------------------------------------------------------------------------
+
+class TestParse:
+
+    def test_comma_separated_floats(self):
+        snap = ResponseParser(float, count=3)
+        assert snap(b'1000.0,1.2e-3,45.1') == (1000., 1.2e-3, 45.1)
+
+    def test_integers(self):
+        assert ResponseParser(int)(b'10,-20,0') == (10, -20, 0)
+
+    def test_accepts_str(self):
+        assert ResponseParser(int)('1,2') == (1, 2)
+
+    def test_ignores_surrounding_whitespace(self):
+        assert ResponseParser(float)(b' 1.5 , 2.5\r\n') == (1.5, 2.5)
+
+    def test_value_returns_first_field(self):
+        assert ResponseParser(float).value(b'1.5,2.5') == 1.5
+
+    def test_other_separator(self):
+        parser = ResponseParser(float, separator=';')
+        assert parser(b'1;2') == (1., 2.)
+
+
+# ---------------------------------------------------------------------------
+# Echoes, units and special tokens
+# ---------------------------------------------------------------------------
+
+class TestAffixes:
+
+    @pytest.mark.parametrize('suffix, reply, value', [
+        ('mW', b'0123.4mW', 123.4),
+        ('%', b'050.0%', 50.),
+        (' C', b'25.5 C', 25.5),
+        (' C', b'25.5C', 25.5),
+    ])
+    def test_strips_unit(self, suffix, reply, value):
+        parser = ResponseParser(float, suffix=suffix)
+        assert parser.value(reply) == pytest.approx(value)
+
+    def test_strips_echo(self):
+        parser = ResponseParser(float, prefix='ROP:')
+        assert parser.value(b'ROP: 10.5') == 10.5
+
+    def test_affixes_are_optional(self):
+        parser = ResponseParser(float, prefix='ROP:', suffix='W')
+        assert parser.value(b'10.5') == 10.5
+
+    def test_specials(self):
+        parser = ResponseParser(float, prefix='ROP:',
+                                specials={'Off': 0., 'Low': 0.1})
+        assert parser.value(b'ROP: Off') == 0.
+        assert parser.value(b'ROP: Low') == 0.1
+        assert parser.value(b'ROP: 3.2') == 3.2
+
+
+# ---------------------------------------------------------------------------
+# Failures
+# ---------------------------------------------------------------------------
+
+class TestFailures:
+
+    @pytest.mark.parametrize('reply', [b'', b'garbled', b'1,,2', b'1.5x'])
+    def test_invalid_reply_returns_none(self, reply):
+        parser = ResponseParser(float)
+        assert parser(reply) is None
+        assert parser.value(reply) is None
+
+    def test_wrong_count_returns_none(self):
+        parser = ResponseParser(float, count=3)
+        assert parser(b'1,2') is None
+
+    def test_parser_keeps_no_state(self):
+        parser = ResponseParser(float)
+        before = dict(vars(parser))
+        parser(b'garbled')
+        assert vars(parser) == before
+
+    def test_failure_is_logged(self, caplog):
+        with caplog.at_level(logging.DEBUG):
+            ResponseParser(int)(b'E18x')
+        assert 'E18x' in caplog.text
+
+
+# ---------------------------------------------------------------------------
+# Preallocated arrays
+# ---------------------------------------------------------------------------
+
+class TestInto:
+
+    def test_fills_array(self):
+        out = np.zeros(3)
+        assert ResponseParser(float).into(b'1,2,3', out)
+        assert list(out) == [1., 2., 3.]
+
+    def test_fills_row_of_larger_array(self):
+        data = np.zeros((4, 3))
+        assert ResponseParser(float).into(b'1,2,3', data[2])
+        assert list(data[2]) == [1., 2., 3.]
+        assert not data[[0, 1, 3]].any()
+
+    def test_size_mismatch_leaves_array(self):
+        out = np.full(3, np.nan)
+        parser = ResponseParser(float)
+        assert not parser.into(b'1,2', out)
+        assert np.isnan(out).all()
+
+    def test_invalid_reply_leaves_array(self):
+        out = np.full(2, np.nan)
+        assert not ResponseParser(float).into(b'bad', out)
+        assert np.isnan(out).all()
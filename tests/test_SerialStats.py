@@ -0,0 +1,91 @@
+import math
+import pytest
+from lib.SerialStats import SerialStats
+
+
+class Clock:
+    '''Manually advanced clock.'''
+
+    def __init__(self):
+        self.now = 0.
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+class TestSerialStats:
+
+    def test_empty(self, clock):
+        stats = SerialStats(clock)
+        clock.now = 1.
+        report = stats.report()
+        assert report['commands'] == {}
+        assert report['utilization'] == 0.
+
+    def test_counts_command_and_reply(self, clock):
+        stats = SerialStats(clock)
+        stats.transmitted('FREQ', 6, 0., 0.001)
+        stats.received(7, 0.001, 0.011, False)
+        command = stats.report()['commands']['FREQ']
+        assert command['count'] == 1
+        assert command['replies'] == 1
+        assert (command['sent'], command['received']) == (6, 7)
+        assert command['mean'] == pytest.approx(0.01)
+        assert command['max'] == pytest.approx(0.01)
+
+    def test_timeout_is_not_a_latency(self, clock):
+        stats = SerialStats(clock)
+        stats.transmitted('FREQ', 6, 0., 0.001)
+        stats.received(0, 0.001, 1.001, True)
+        command = stats.report()['commands']['FREQ']
+        assert command['timeouts'] == 1
+        assert command['replies'] == 0
+        assert math.isnan(command['p99'])
+
+    def test_binary_data_counts_against_last_command(self, clock):
+        stats = SerialStats(clock)
+        stats.transmitted('LDWF', 8, 0., 0.)
+        stats.transmitted(None, 1000, 0., 0.1)
+        command = stats.report()['commands']['LDWF']
+        assert command['count'] == 1
+        assert command['sent'] == 1008
+
+    def test_only_first_reply_has_latency(self, clock):
+        stats = SerialStats(clock)
+        stats.transmitted('SNAP', 6, 0., 0.)
+        stats.received(5, 0., 0.01, False)
+        stats.received(5, 0.01, 0.5, False)
+        command = stats.report()['commands']['SNAP']
+        assert command['replies'] == 2
+        assert command['max'] == pytest.approx(0.01)
+
+    def test_rejected(self, clock):
+        stats = SerialStats(clock)
+        stats.transmitted('FREQ', 6, 0., 0.)
+        stats.rejected('FREQ')
+        assert stats.report()['commands']['FREQ']['errors'] == 1
+
+    def test_utilization(self, clock):
+        stats = SerialStats(clock)
+        stats.transmitted('FREQ', 6, 0., 0.1)
+        stats.received(7, 0.1, 0.3, False)
+        clock.now = 1.
+        report = stats.report()
+        assert report['busy'] == pytest.approx(0.3)
+        assert report['utilization'] == pytest.approx(0.3)
+
+    def test_reset(self, clock):
+        stats = SerialStats(clock)
+        stats.transmitted('FREQ', 6, 0., 0.1)
+        clock.now = 2.
+        stats.reset()
+        clock.now = 3.
+        report = stats.report()
+        assert report['commands'] == {}
+        assert report['elapsed'] == 1.
+        assert report['busy'] == 0.
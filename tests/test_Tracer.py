@@ -0,0 +1,144 @@
+import json
+import pytest
+from unittest.mock import patch
+from qtpy import QtCore
+from lib.Configure import Configure
+from QInstrument.lib.Tracer import Tracer, tracer as shared
+from instruments.StanfordResearch.SR830.fake import QFakeSR830
+
+
+@pytest.fixture
+def tracer():
+    t = Tracer()
+    t.start()
+    return t
+
+
+@pytest.fixture
+def recording():
+    shared.start()
+    yield shared
+    shared.stop()
+    shared.clear()
+
+
+def _spans(t, phase='X'):
+    return [e for e in t.events() if e['ph'] == phase]
+
+
+# ---------------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------------
+
+class TestTracer:
+
+    def test_off_by_default(self):
+        t = Tracer()
+        with t.span('idle'):
+            pass
+        t.instant('idle')
+        assert t.events() == []
+
+    def test_span(self, tracer):
+        with tracer.span('get frequency', 'instrument', instrument='QSR830'):
+            pass
+        event, = _spans(tracer)
+        assert event['name'] == 'get frequency'
+        assert event['cat'] == 'instrument'
+        assert event['args'] == {'instrument': 'QSR830'}
+        assert event['ts'] >= 0 and event['dur'] >= 0
+
+    def test_nested_spans(self, tracer):
+        with tracer.span('outer'):
+            with tracer.span('inner'):
+                pass
+        inner, outer = _spans(tracer)
+        assert outer['ts'] <= inner['ts']
+        assert inner['ts'] + inner['dur'] <= outer['ts'] + outer['dur']
+
+    def test_instant(self, tracer):
+        tracer.instant('request get x', 'gui')
+        event, = _spans(tracer, 'i')
+        assert event['name'] == 'request get x'
+        assert event['s'] == 't'
+
+    def test_args_are_jsonable(self, tracer):
+        with tracer.span('set', value=[1, 2], flag=True, none=None):
+            pass
+        event, = _spans(tracer)
+        assert event['args'] == {'value': '[1, 2]', 'flag': True,
+                                 'none': None}
+
+    def test_stop_keeps_events(self, tracer):
+        with tracer.span('kept'):
+            pass
+        tracer.stop()
+        with tracer.span('dropped'):
+            pass
+        assert [e['name'] for e in _spans(tracer)] == ['kept']
+
+    def test_capacity(self, tracer):
+        tracer.CAPACITY = 2
+        tracer.start()
+        for name in 'abc':
+            tracer.instant(name)
+        assert [e['name'] for e in _spans(tracer, 'i')] == ['b', 'c']
+
+    def test_names_threads(self, tracer, qtbot):
+        worker = QtCore.QThread()
+        worker.setObjectName('QSR830')
+        worker.run = lambda: tracer.instant('on worker')
+        worker.start()
+        worker.wait()
+        tracer.instant('on main')
+        names = {e['tid']: e['args']['name'] for e in _spans(tracer, 'M')}
+        events = {e['name']: e['tid'] for e in _spans(tracer, 'i')}
+        assert names[events['on worker']] == 'QSR830'
+        assert events['on main'] != events['on worker']
+        assert names[events['on main']]
+
+    def test_save(self, tracer, tmp_path):
+        with tracer.span('saved'):
+            pass
+        filename = tmp_path / 'trace.json'
+        tracer.save(str(filename))
+        trace = json.loads(filename.read_text())
+        assert trace['displayTimeUnit'] == 'ms'
+        assert any(e['name'] == 'saved' for e in trace['traceEvents'])
+        assert all('pid' in e for e in trace['traceEvents'])
+
+
+# ---------------------------------------------------------------------------
+# Instrumented code paths
+# ---------------------------------------------------------------------------
+
+class TestInstrumentation:
+
+    def test_get_and_set(self, recording, qtbot):
+        device = QFakeSR830()
+        device.get('frequency')
+        device.set('frequency', 100.)
+        names = [e['name'] for e in _spans(recording)]
+        assert 'get frequency' in names
+        assert 'set frequency' in names
+        event = next(e for e in _spans(recording)
+                     if e['name'] == 'get frequency')
+        assert event['args']['instrument'] == 'QFakeSR830'
+
+    def test_off_builds_no_spans(self, qtbot):
+        device = QFakeSR830()
+        with patch.object(shared, 'span') as span:
+            device.get('frequency')
+            device.set('frequency', 100.)
+        assert not span.called
+
+    def test_configure_io(self, recording, tmp_path, qtbot):
+        class Holder:
+            settings = {'a': 1}
+        cfg = Configure(datadir=str(tmp_path / 'data'),
+                        configdir=str(tmp_path / 'config'))
+        cfg.save(Holder())
+        cfg.read(Holder())
+        names = [e['name'] for e in _spans(recording)
+                 if e['cat'] == 'config']
+        assert names == ['save', 'read']
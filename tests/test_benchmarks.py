@@ -0,0 +1,77 @@
+import pytest
+from benchmarks import harness
+
+
+def _result(value, unit='s', better='lower'):
+    return harness.summarize([value], unit, better)
+
+
+class TestSummarize:
+
+    def test_statistics(self):
+        result = harness.summarize([3., 1., 2.], 's', 'lower')
+        assert result['value'] == 2.
+        assert (result['min'], result['max']) == (1., 3.)
+        assert result['samples'] == 3
+        assert result['stdev'] == pytest.approx(1.)
+
+    def test_single_sample(self):
+        assert _result(1.)['stdev'] == 0.
+
+
+class TestCompare:
+
+    @pytest.mark.parametrize('then, now, better, status', [
+        (1., 1.05, 'lower', 'ok'),
+        (1., 1.5, 'lower', 'regression'),
+        (1., 0.5, 'lower', 'improvement'),
+        (100., 50., 'higher', 'regression'),
+        (100., 200., 'higher', 'improvement'),
+    ])
+    def test_status(self, then, now, better, status):
+        row, = harness.compare({'a': _result(then, better=better)},
+                               {'a': _result(now, better=better)})
+        assert row['status'] == status
+
+    def test_change_is_positive_when_worse(self):
+        row, = harness.compare({'rate': _result(100., 'Hz', 'higher')},
+                               {'rate': _result(80., 'Hz', 'higher')})
+        assert row['change'] == pytest.approx(0.25)
+
+    def test_threshold(self):
+        rows = harness.compare({'a': _result(1.)}, {'a': _result(1.5)},
+                               threshold=1.)
+        assert rows[0]['status'] == 'ok'
+
+    def test_skips_unmatched(self):
+        rows = harness.compare({'a': _result(1.)}, {'b': _result(1.)})
+        assert rows == []
+
+    def test_format(self):
+        rows = harness.compare({'a': _result(1.)}, {'a': _result(2.)})
+        assert 'regression' in harness.format_rows(rows)
+
+
+class TestRun:
+
+    def test_runs_selected(self, monkeypatch):
+        monkeypatch.setattr(harness, '_registry', {})
+        harness.benchmark('demo.one')(lambda quick: [1., 2., 3.])
+        harness.benchmark('other.two')(lambda quick: [1.])
+        results = harness.run(['demo'])
+        assert list(results) == ['demo.one']
+        assert results['demo.one']['value'] == 2.
+
+    def test_skipped(self, monkeypatch):
+        def unavailable(quick):
+            raise harness.Skipped('no pty')
+        monkeypatch.setattr(harness, '_registry', {})
+        harness.benchmark('demo.skip')(unavailable)
+        assert harness.run() == {}
+
+    def test_save_and_load(self, tmp_path):
+        filename = tmp_path / 'results' / 'run.json'
+        harness.save({'a': _result(1.)}, filename)
+        saved = harness.load(filename)
+        assert saved['results']['a']['value'] == 1.
+        assert {'commit', 'python', 'qt'} <= set(saved)
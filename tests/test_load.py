@@ -0,0 +1,89 @@
+import math
+
+import pytest
+from benchmarks import load
+
+
+def _result(**changes):
+    result = {'latency_p99': 0.001, 'heartbeat_p99': 0.001,
+              'coalesced': 0.}
+    result.update(changes)
+    return result
+
+
+class TestProbe:
+
+    def test_latency(self):
+        probe = load.LoadProbe()
+        device = object()
+        probe.register(device, ['a'])
+        probe.stamp(device, 'a')
+        probe.stamp(device, 'a')
+        assert probe.pending() == 2
+        probe.apply(device, 'a', 0., 0.5)
+        assert (probe.generated, probe.applied) == (2, 1)
+        assert probe.pending() == 1
+        assert probe.busy == pytest.approx(0.5)
+        assert probe.latency.count == 1
+
+    def test_ignores_unregistered(self):
+        probe = load.LoadProbe()
+        device = object()
+        probe.stamp(device, 'a')
+        probe.apply(device, 'a', 0., 1.)
+        assert (probe.generated, probe.applied) == (0, 0)
+
+    def test_reset_keeps_pending(self):
+        probe = load.LoadProbe()
+        device = object()
+        probe.register(device, ['a'])
+        probe.stamp(device, 'a')
+        probe.reset()
+        assert probe.generated == 0
+        assert probe.pending() == 1
+        probe.apply(device, 'a', 0., 0.5)
+        assert probe.applied == 0
+        assert probe.busy == pytest.approx(0.5)
+        assert probe.pending() == 0
+
+
+class TestSaturated:
+
+    @pytest.mark.parametrize('changes, expected', [
+        ({}, False),
+        ({'latency_p99': 0.2}, True),
+        ({'heartbeat_p99': 0.2}, True),
+        ({'coalesced': 0.5}, True),
+        ({'latency_p99': math.nan}, True),
+    ])
+    def test_criteria(self, changes, expected):
+        assert load.saturated(_result(**changes)) is expected
+
+
+class TestRun:
+
+    @pytest.mark.parametrize('view', ['widget', 'tree'])
+    @pytest.mark.parametrize('threads', [False, True])
+    def test_applies_values(self, qtbot, monkeypatch, tmp_path,
+                            view, threads):
+        monkeypatch.setenv('HOME', str(tmp_path))
+        result = load.run(instruments=2, properties=3, rate=50.,
+                          view=view, threads=threads,
+                          duration=0.3, warmup=0.1)
+        assert result['applied'] > 0
+        assert result['applied'] <= result['generated']
+        assert result['dropped'] == 0
+        assert result['latency_p99'] >= result['latency_p50'] > 0.
+        assert 'values/s' in load.format_result(result)
+
+    def test_rejects_dynamics(self, qtbot):
+        with pytest.raises(ValueError):
+            load.run(dynamics='chaotic')
+
+    def test_sweep_stops_at_limit(self, qtbot, monkeypatch, tmp_path):
+        monkeypatch.setenv('HOME', str(tmp_path))
+        report = load.sweep(limit=2, instruments=1, properties=1,
+                            rate=20., duration=0.2, warmup=0.1)
+        assert [r['properties'] for r in report['runs']] == [1, 2]
+        assert report['sustained']['properties'] == 2
+        assert report['saturated'] is None